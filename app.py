@@ -1,17 +1,39 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
-from utils.database import init_db, get_db_connection, init_app
-from utils.excel_processor import ExcelProcessor, DatabaseImporter
+from utils.database import (init_db, get_db_connection, init_app, temizle_eski_olaylar,
+                            temizle_eski_toplu_islem_anahtarlari)
+from utils.http_cache import init_http_cache
+from utils.fragment_cache import init_fragment_cache
+from utils.compression import init_compression
+from utils.assets import init_assets
+from utils.metrics import init_metrics
+from utils.memory_diagnostics import init_memory_diagnostics
+from utils.sql_profiler import init_sql_profiler
+from utils.request_profiler import init_request_profiler
+from utils.admission import init_admission_control
+from utils.single_flight import init_single_flight
+from utils.change_events import init_change_events
+from utils.logging_setup import init_logging
 import os
 import logging
 from datetime import datetime
 
-# Logging konfigürasyonu
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def create_app():
     app = Flask(__name__)
     
+    # Logging konfigürasyonu - kayıtlar kuyruğa konur, arka plandaki thread biçimlendirip yazar
+    # LOG_FORMAT: text veya json; LOG_SAMPLING / LOG_RATE_LIMITS: logger=oran / logger=kayıt_sn (virgülle)
+    app.config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', 'INFO')
+    app.config['LOG_FORMAT'] = os.environ.get('LOG_FORMAT', 'text')
+    app.config['LOG_SAMPLING'] = os.environ.get('LOG_SAMPLING', '')
+    app.config['LOG_RATE_LIMITS'] = os.environ.get('LOG_RATE_LIMITS', '')
+    app.config['LOG_QUEUE_SIZE'] = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    app.config['LOG_ASYNC'] = os.environ.get('LOG_ASYNC', '1') != '0'
+    # 1 = çağıran dosya / satır aranmaz (kayıt başına daha ucuz, tüm logger'larda bu bilgi kaybolur)
+    app.config['LOG_SKIP_CALLER_INFO'] = os.environ.get('LOG_SKIP_CALLER_INFO', '0') == '1'
+    init_logging(app)
+    
     # Environment-based configuration
     env = os.environ.get('FLASK_ENV', 'development')
     
@@ -27,18 +49,72 @@ def create_app():
     else:
         # Development configuration
         app.config['SECRET_KEY'] = 'dev-secret-key-change-in-production'
-        app.config['DATABASE_PATH'] = 'stok_takip_dev.db'
+        app.config['DATABASE_PATH'] = os.environ.get('DATABASE_PATH', 'stok_takip_dev.db')
         app.config['DEBUG'] = True
     
     app.config['UPLOAD_FOLDER'] = 'uploads'
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+    app.config['FRAGMENT_CACHE_SIZE'] = int(os.environ.get('FRAGMENT_CACHE_SIZE', 5000))  # 0 = kapalı
+    app.config['COMPRESS_MIN_SIZE'] = 500  # Bu boyutun altındaki yanıtlar sıkıştırılmaz
+    app.config['CHANGE_EVENT_RETENTION_DAYS'] = int(os.environ.get('CHANGE_EVENT_RETENTION_DAYS', 7))
+    app.config['API_TOKEN'] = os.environ.get('API_TOKEN')  # Entegrasyon API'leri (ERP senkronizasyonu vb.)
+    app.config['BULK_MOVEMENT_CHUNK_SIZE'] = int(os.environ.get('BULK_MOVEMENT_CHUNK_SIZE', 1000))  # Transaction başına satır
+    app.config['BULK_IDEMPOTENCY_RETENTION_DAYS'] = int(os.environ.get('BULK_IDEMPOTENCY_RETENTION_DAYS', 30))
     
     # Upload klasörünü oluştur
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
-    # Veritabanı bağlantısını başlat
+    # Veritabanı bağlantısını başlat - istek bağlantıları süreç içi havuzdan (boşta tutulan en fazla DB_POOL_SIZE)
+    app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 8))
     init_app(app)
     
+    # Koşullu GET (ETag) ayarları
+    init_http_cache(app)
+    
+    # Şablon parçası (fragment) önbelleği
+    init_fragment_cache(app)
+    
+    # Yanıt sıkıştırma (gzip / brotli) ve önceden sıkıştırılmış statik dosyalar
+    init_compression(app)
+    
+    # İçerik hash'li statik dosya URL'leri (immutable önbellek)
+    init_assets(app)
+    
+    # Endpoint bazında gecikme / SQL / yanıt boyutu metrikleri (/metrics)
+    init_metrics(app)
+    
+    # İstek bazında bellek tepe değeri, bütçe aşımları ve isteğe bağlı tracemalloc snapshot'ları
+    app.config['MEMORY_REQUEST_BUDGET_MB'] = float(os.environ.get('MEMORY_REQUEST_BUDGET_MB', 100))
+    app.config['MEMORY_SNAPSHOT_DIR'] = os.environ.get('MEMORY_SNAPSHOT_DIR', 'memory_snapshots')
+    init_memory_diagnostics(app)
+    
+    # SQL parmak izi istatistikleri ve yavaş sorgu kaydı
+    app.config['SQL_SLOW_QUERY_MS'] = int(os.environ.get('SQL_SLOW_QUERY_MS', 200))
+    init_sql_profiler(app)
+    
+    # Admin isteği üzerine istek bazında cProfile + SQL dağılımı (X-Profile: 1 veya ?_profile=1)
+    app.config['REQUEST_PROFILE_DIR'] = os.environ.get('REQUEST_PROFILE_DIR', 'profiles')
+    app.config['REQUEST_PROFILE_MAX_PER_MINUTE'] = int(os.environ.get('REQUEST_PROFILE_MAX_PER_MINUTE', 6))
+    init_request_profiler(app)
+    
+    # Ağır endpoint'ler (Excel, filtresiz rapor) için eşzamanlılık sınırı, kuyruk ve 503 + Retry-After
+    # ADMISSION_LIMITS: grup=eşzamanlı:kuyruk:bekleme_sn (export, import, report)
+    # Çalışan + bekleyen ağır istekler kapasite - ADMISSION_RESERVED_LIGHT yuvayı aşamaz, grup sınırları buna göre kırpılır
+    app.config['ADMISSION_ENABLED'] = os.environ.get('ADMISSION_ENABLED', '1') != '0'
+    app.config['ADMISSION_LIMITS'] = os.environ.get('ADMISSION_LIMITS', 'export=2:4:10,import=1:2:30,report=4:8:5')
+    app.config['ADMISSION_RESERVED_LIGHT'] = int(os.environ.get('ADMISSION_RESERVED_LIGHT', 1))
+    init_admission_control(app)
+    
+    # Aynı anda açılan dashboard / rapor sayfaları hesaplamayı paylaşır (worker'lar arası, veri sürümüne bağlı)
+    app.config['SINGLE_FLIGHT_ENABLED'] = os.environ.get('SINGLE_FLIGHT_ENABLED', '1') != '0'
+    app.config['SINGLE_FLIGHT_RESULT_TTL'] = float(os.environ.get('SINGLE_FLIGHT_RESULT_TTL', 5))
+    init_single_flight(app)
+    
+    # Worker başına açık tutulan SSE akışı (boşsa gunicorn thread sayısının yarısı) ve olay temizlik aralığı (sn)
+    app.config['SSE_MAX_HELD_STREAMS'] = int(os.environ['SSE_MAX_HELD_STREAMS']) if os.environ.get('SSE_MAX_HELD_STREAMS') else None
+    app.config['CHANGE_EVENT_PRUNE_INTERVAL'] = int(os.environ.get('CHANGE_EVENT_PRUNE_INTERVAL', 3600))
+    init_change_events(app)
+    
     # Blueprint'leri kaydet
     from routes.main import main_bp
     from routes.reservation import reservation_bp
@@ -48,6 +124,9 @@ def create_app():
     # Veritabanını başlat
     with app.app_context():
         init_db()
+        # Saklama süresini aşan değişiklik olaylarını temizle
+        temizle_eski_olaylar(app.config['CHANGE_EVENT_RETENTION_DAYS'])
+        temizle_eski_toplu_islem_anahtarlari(app.config['BULK_IDEMPOTENCY_RETENTION_DAYS'])
     
     # Health check endpoint for deployment platforms
     @app.route('/health')
@@ -0,0 +1,4 @@
+"""
+Performans ölçüm araçları (komut satırından çalıştırılır)
+Örnek: python -m benchmarks.db_bench --scales small,medium --json sonuc.json
+"""
@@ -0,0 +1,296 @@
+"""
+Veritabanı katmanı ve rapor sorguları benchmark'ı
+
+Ölçülenler (her ölçek için):
+- Stok fonksiyonları: stok_giris, stok_cikis, stok_transfer, get_product_stock_summary,
+  get_urun_rezervasyon_durumu
+- Route sorguları: get_dashboard_data ve build_stock_report_page (sadece sorgu), dashboard /
+  stock_list / stock_report / stock_movements (test istemcisiyle tam istek: sorgu + render)
+
+Her ölçeğin veritabanı tools.generate_dataset ile bir kez üretilip --data-dir altında saklanır.
+Ölçümler kopya üzerinde, her ölçek ayrı bir alt süreçte çalışır (önbellekler ve en yüksek RSS
+ölçekler arasında karışmaz). Sonuç: ops/s, p50/p99 (ms), çağrı başına en yüksek Python belleği
+(tracemalloc, KB) ve ölçek başına en yüksek RSS.
+
+Kullanım:
+    python -m benchmarks.db_bench --scales small,medium --json sonuc.json
+    python -m benchmarks.db_bench --scales small --json yeni.json --compare eski.json
+    python -m benchmarks.db_bench --compare eski.json yeni.json
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from tools.common import PROJECT_ROOT, load_app, admin_client
+from tools.generate_dataset import build_catalog, generate_database
+
+from .runner import (measure, measure_peak_memory, rss_peak_mb, environment_info, write_results, load_results,
+                     compare, print_comparison, print_results)
+
+# Ölçek adı -> veri seti parametreleri
+SCALES = {
+    'tiny': {'products': 200, 'movements': 10_000},
+    'small': {'products': 2_000, 'movements': 200_000},
+    'medium': {'products': 10_000, 'movements': 2_000_000},
+    'large': {'products': 30_000, 'movements': 10_000_000},
+}
+VARSAYILAN_VERI_KLASORU = os.path.join(PROJECT_ROOT, 'benchmarks', '.data')
+# Fonksiyonların döndüğü örnek stok satırı sayısı (tek satırın önbellekte kalması ölçümü bozmasın)
+ORNEK_SAYISI = 200
+
+# Eski kurulumlardan kalan rezervasyonlar tablosu yeni şemada oluşturulmuyor;
+# get_urun_rezervasyon_durumu ölçülebilsin diye kopyada boş olarak açılır
+ESKI_REZERVASYON_TABLOSU = '''
+    CREATE TABLE IF NOT EXISTS rezervasyonlar (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        urun_kodu TEXT NOT NULL,
+        urun_adi TEXT,
+        renk TEXT,
+        konum TEXT,
+        adet INTEGER NOT NULL,
+        rezerve_eden TEXT,
+        aciklama TEXT,
+        durum TEXT DEFAULT 'AKTIF',
+        rezerve_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        son_guncelleme TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+def dataset_path(veri_klasoru, olcek, seed=42):
+    """Ölçeğin veri setini döndür; yoksa üret"""
+    ayar = SCALES[olcek]
+    yol = os.path.join(veri_klasoru, f"{olcek}_{ayar['products']}_{ayar['movements']}_{seed}.db")
+    if not os.path.exists(yol):
+        os.makedirs(veri_klasoru, exist_ok=True)
+        print(f"[{olcek}] veri seti üretiliyor: {ayar['products']} ürün, {ayar['movements']:,} hareket",
+              file=sys.stderr)
+        gecici = yol + '.tmp'
+        if os.path.exists(gecici):
+            os.remove(gecici)
+        katalog = build_catalog(ayar['products'], seed=seed)
+        generate_database(gecici, katalog, ayar['movements'], seed=seed)
+        os.replace(gecici, yol)
+    return yol
+
+
+def _ornekler(db, sayi, seed):
+    """Ölçümlerde dönülecek örnek stok satırları ve transfer çiftleri"""
+    satirlar = [dict(row) for row in db.execute('''
+        SELECT urun_kodu, urun_adi, renk, konum, uzunluk, mt_kg, sistem_seri
+        FROM stoklar WHERE adet > 0
+    ''').fetchall()]
+    rng = random.Random(seed)
+    ornekler = rng.sample(satirlar, min(sayi, len(satirlar)))
+
+    # Aynı ürün + renkte iki konumu olan satırlar transfer için kullanılır
+    ciftler = db.execute('''
+        SELECT a.urun_kodu, a.renk, a.konum AS kaynak, MIN(b.konum) AS hedef
+        FROM stoklar a JOIN stoklar b
+          ON a.urun_kodu = b.urun_kodu AND a.renk = b.renk AND a.konum < b.konum
+        WHERE a.adet > 0
+        GROUP BY a.urun_kodu, a.renk, a.konum
+        LIMIT ?
+    ''', (sayi,)).fetchall()
+    return ornekler, [dict(row) for row in ciftler]
+
+
+def _function_benchmarks(ornekler, ciftler):
+    from utils import database
+
+    def sec(liste, i):
+        return liste[i % len(liste)]
+
+    def giris(i):
+        s = sec(ornekler, i)
+        sonuc = database.stok_giris(s['urun_kodu'], s['urun_adi'], s['renk'], s['konum'], 5, s['mt_kg'],
+                                    s['uzunluk'], s['sistem_seri'], kullanici='benchmark')
+        _basarili(sonuc)
+
+    def cikis(i):
+        s = sec(ornekler, i)
+        _basarili(database.stok_cikis(s['urun_kodu'], s['renk'], s['konum'], 1, kullanici='benchmark'))
+
+    def transfer(i):
+        c = sec(ciftler, i // 2)
+        # Tek / çift çağrılar ters yönde taşır, bakiyeler sabit kalır
+        kaynak, hedef = (c['kaynak'], c['hedef']) if i % 2 == 0 else (c['hedef'], c['kaynak'])
+        _basarili(database.stok_transfer(c['urun_kodu'], c['renk'], kaynak, hedef, 1, kullanici='benchmark'))
+
+    benchmarklar = {
+        'fn.stok_giris': giris,
+        'fn.stok_cikis': cikis,
+        'fn.stok_transfer': transfer,
+        'fn.get_product_stock_summary': lambda i: database.get_product_stock_summary(sec(ornekler, i)['urun_kodu']),
+        'fn.get_product_stock_summary_all': lambda i: database.get_product_stock_summary(),
+        'fn.get_urun_rezervasyon_durumu': lambda i: database.get_urun_rezervasyon_durumu(
+            sec(ornekler, i)['urun_kodu'], sec(ornekler, i)['renk']),
+    }
+    if not ciftler:
+        del benchmarklar['fn.stok_transfer']
+    return benchmarklar
+
+
+def _basarili(sonuc):
+    if not sonuc.get('success'):
+        raise RuntimeError(sonuc.get('message'))
+
+
+def _query_benchmarks(ornekler):
+    from utils.database import get_db_connection
+    from routes.main import get_dashboard_data, build_stock_report_page
+
+    def rapor(**kwargs):
+        return lambda i: build_stock_report_page(get_db_connection(), **kwargs)
+
+    kelime = ornekler[0]['urun_adi'].split()[-1]
+    return {
+        'query.dashboard': lambda i: get_dashboard_data(get_db_connection()),
+        'query.stock_report': rapor(),
+        'query.stock_report_page50': rapor(page=50),
+        'query.stock_report_search': rapor(search=kelime),
+        'query.stock_report_sort_adet': rapor(sort_by='toplam_adet', sort_order='desc'),
+    }
+
+
+def _route_benchmarks(app, ornekler):
+    client = admin_client(app)
+    s = ornekler[0]
+    kelime = s['urun_adi'].split()[-1]
+    yollar = {
+        'route.dashboard': '/',
+        'route.stock_list': '/stock-list',
+        'route.stock_list_search': f"/stock-list?search={s['urun_kodu']}",
+        'route.stock_report': '/stock-report',
+        'route.stock_report_search': f'/stock-report?search={kelime}',
+        'route.stock_movements': '/stock-movements',
+        'route.stock_movements_page100': '/stock-movements?page=100',
+        'route.stock_movements_product': f"/stock-movements?urun_kodu={s['urun_kodu']}",
+    }
+
+    def istek(yol):
+        def calistir(i):
+            response = client.get(yol)
+            if response.status_code != 200:
+                raise RuntimeError(f'{yol}: HTTP {response.status_code}')
+            response.close()
+        return calistir
+
+    return {ad: istek(yol) for ad, yol in yollar.items()}
+
+
+def run_scale(db_path, olcek, sure, secim=None, seed=42):
+    """Tek ölçeği bu süreçte çalıştır (alt süreç modu)"""
+    calisma_klasoru = tempfile.mkdtemp(prefix='stok_bench_')
+    kopya = os.path.join(calisma_klasoru, 'bench.db')
+    shutil.copyfile(db_path, kopya)
+    try:
+        # Route ölçümleri satır fragment önbelleğiyle (kararlı durum render'ı); single-flight ve kabul kontrolü
+        # kapalı - aksi halde ilk istekten sonra rapor / dashboard sonucu önbellekten gelir
+        app = load_app(kopya, single_flight=False, admission=False, fragment_cache=True)
+        sonuclar = {}
+        with app.app_context():
+            from utils.database import get_db_connection
+            db = get_db_connection()
+            db.execute(ESKI_REZERVASYON_TABLOSU)
+            db.commit()
+            ornekler, ciftler = _ornekler(db, ORNEK_SAYISI, seed)
+            sonuclar['_scale'] = {
+                'stoklar': db.execute('SELECT COUNT(*) FROM stoklar').fetchone()[0],
+                'stok_hareketleri': db.execute('SELECT COUNT(*) FROM stok_hareketleri').fetchone()[0],
+            }
+            benchmarklar = {**_function_benchmarks(ornekler, ciftler), **_query_benchmarks(ornekler)}
+            for ad, fn in benchmarklar.items():
+                if secim and not any(parca in ad for parca in secim):
+                    continue
+                print(f'[{olcek}] {ad}', file=sys.stderr)
+                sonuclar[ad] = measure(fn, sure=sure)
+                sonuclar[ad]['peak_kb'] = measure_peak_memory(fn)
+
+        for ad, fn in _route_benchmarks(app, ornekler).items():
+            if secim and not any(parca in ad for parca in secim):
+                continue
+            print(f'[{olcek}] {ad}', file=sys.stderr)
+            sonuclar[ad] = measure(fn, sure=sure)
+            sonuclar[ad]['peak_kb'] = measure_peak_memory(fn)
+        sonuclar['_scale']['rss_peak_mb'] = rss_peak_mb()
+        return sonuclar
+    finally:
+        shutil.rmtree(calisma_klasoru, ignore_errors=True)
+
+
+def _alt_surecte_calistir(db_path, olcek, sure, secim):
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        cikti = f.name
+    komut = [sys.executable, '-m', 'benchmarks.db_bench', '--worker', db_path, '--worker-scale', olcek,
+             '--duration', str(sure), '--json', cikti]
+    if secim:
+        komut += ['--only', ','.join(secim)]
+    try:
+        subprocess.run(komut, cwd=PROJECT_ROOT, check=True)
+        with open(cikti, encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.remove(cikti)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Veritabanı katmanı ve rapor sorguları benchmark\'ı')
+    parser.add_argument('--scales', default='small', help=f"Virgülle ayrılmış ölçekler: {', '.join(SCALES)}")
+    parser.add_argument('--duration', type=float, default=2.0, help='Benchmark başına ölçüm süresi (sn)')
+    parser.add_argument('--only', help='Sadece adı bu parçaları içeren benchmarklar (virgülle)')
+    parser.add_argument('--data-dir', default=VARSAYILAN_VERI_KLASORU, help='Üretilen veri setlerinin klasörü')
+    parser.add_argument('--json', help='Sonuç dosyası')
+    parser.add_argument('--compare', nargs='+', metavar='JSON',
+                        help='Tek dosya: bu çalıştırmayı onunla karşılaştır; iki dosya: sadece iki sonucu karşılaştır')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Gerileme eşiği (yüzde)')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--worker-scale', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    secim = [parca for parca in (args.only or '').split(',') if parca]
+
+    if args.worker:
+        sonuclar = run_scale(args.worker, args.worker_scale, args.duration, secim)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(sonuclar, f)
+        return 0
+
+    if args.compare and len(args.compare) == 2:
+        eski, yeni = load_results(args.compare[0]), load_results(args.compare[1])
+        gerilemeler = print_comparison(compare(eski, yeni, args.threshold), eski['meta'], yeni['meta'],
+                                       esik=args.threshold)
+        return 1 if gerilemeler else 0
+
+    olcekler = [olcek.strip() for olcek in args.scales.split(',') if olcek.strip()]
+    bilinmeyen = [olcek for olcek in olcekler if olcek not in SCALES]
+    if bilinmeyen:
+        parser.error(f"Bilinmeyen ölçek: {', '.join(bilinmeyen)}")
+
+    sonuclar = {}
+    for olcek in olcekler:
+        db_path = dataset_path(args.data_dir, olcek)
+        sonuclar[olcek] = _alt_surecte_calistir(db_path, olcek, args.duration, secim)
+    print_results(sonuclar)
+
+    meta = {'duration': args.duration, 'scales': {o: SCALES[o] for o in olcekler}}
+    veri = {'meta': {**environment_info(), **meta}, 'results': sonuclar}
+    if args.json:
+        veri = write_results(args.json, sonuclar, meta)
+        print(f'\nSonuçlar yazıldı: {args.json}')
+    if args.compare:
+        eski = load_results(args.compare[0])
+        print()
+        gerilemeler = print_comparison(compare(eski, veri, args.threshold), eski.get('meta'), veri.get('meta'),
+                                       esik=args.threshold)
+        return 1 if gerilemeler else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Excel import benchmark'ı - ExcelProcessor + DatabaseImporter akışının aşama bazında ölçümü
+
+Aşamalar: read (Excel okuma), validate (temizleme / tip dönüşümü), derive (boy_kg / toplam_kg),
+apply (veritabanına yazma). Her aşama için süre, satır/sn ve aşama boyunca örneklenen en yüksek RSS
+raporlanır.
+
+Karşılaştırılanlar:
+- Okuma motorları: ExcelProcessor.read_excel_file'ın pandas motorları (openpyxl, yüklüyse calamine)
+  ve openpyxl read_only modunda sadece CR:DB sütunlarının okunması (aynı DataFrame'i üretir)
+- Yazma stratejileri: mevcut DatabaseImporter (satır başına SELECT + UPDATE/INSERT) ve mevcut
+  kayıtları tek sorguda çekip executemany ile yazan toplu strateji (aynı tablolara aynı satırlar)
+- Hedef veritabanı: aynı katalogla üretilmiş dolu veritabanı (çoğunlukla güncelleme) veya boş şema
+
+Her kombinasyon ayrı bir alt süreçte çalışır; RSS değerleri birbirini etkilemez.
+
+Kullanım:
+    python -m benchmarks.import_bench --rows 1000,10000,50000,200000 --json import.json
+    python -m benchmarks.import_bench --rows 10000 --engines openpyxl,openpyxl_readonly --strategies importer,executemany
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from tools.common import PROJECT_ROOT
+from tools.generate_dataset import build_catalog, generate_database, write_source_workbook
+
+from .db_bench import VARSAYILAN_VERI_KLASORU
+from .runner import RssSampler, write_results, load_results, compare, print_comparison
+
+ASAMALAR = ('read', 'validate', 'derive', 'apply')
+VARSAYILAN_BOYUTLAR = '1000,10000,50000,200000'
+# Okuma motoru -> gereken modül (yüklü değilse atlanır)
+MOTORLAR = {'openpyxl': 'openpyxl', 'calamine': 'python_calamine', 'openpyxl_readonly': 'openpyxl'}
+STRATEJILER = ('importer', 'executemany')
+HEDEFLER = ('existing', 'empty')
+# ExcelProcessor.read_excel_file ile aynı düzen
+ILK_VERI_SATIRI = 7
+VERI_SUTUNLARI = (96, 106)
+SAYFA_KOLONLARI = ['urun_kodu', 'tedarikci', 'sistem_seri', 'urun_adi', 'renk', 'uzunluk', 'mt_kg', 'boy_kg',
+                   'adet', 'toplam_kg', 'konum']
+KOLONLAR = ['urun_kodu', 'urun_adi', 'sistem_seri', 'renk', 'uzunluk', 'mt_kg', 'boy_kg', 'adet', 'toplam_kg', 'konum']
+
+
+def _katalog_urun_sayisi(satir):
+    # Katalog ürün başına ortalama 3 satır üretir; örnekleme için satır sayısının ~1.5 katı yeterli
+    return satir // 2 + 100
+
+
+def prepare_inputs(veri_klasoru, satir, seed=42):
+    """Boyut için kaynak Excel'i ve aynı katalogla dolu veritabanını hazırla (önbellekli)"""
+    os.makedirs(veri_klasoru, exist_ok=True)
+    # Dosya adında düzen (CR:DB) var: eski CR:DA düzeninde önbelleğe alınmış dosyalar kullanılmasın
+    excel_yolu = os.path.join(veri_klasoru, f'import_{satir}_{seed}_crdb.xlsx')
+    db_yolu = os.path.join(veri_klasoru, f'import_{satir}_{seed}.db')
+    bos_db_yolu = os.path.join(veri_klasoru, f'import_bos_{seed}.db')
+    katalog = None
+    if not os.path.exists(excel_yolu) or not os.path.exists(db_yolu):
+        print(f'[{satir}] girdi dosyaları üretiliyor', file=sys.stderr)
+        katalog = build_catalog(_katalog_urun_sayisi(satir), seed=seed)
+    if not os.path.exists(excel_yolu):
+        write_source_workbook(excel_yolu + '.tmp.xlsx', katalog, satir, seed)
+        os.replace(excel_yolu + '.tmp.xlsx', excel_yolu)
+    if not os.path.exists(db_yolu):
+        generate_database(db_yolu + '.tmp', katalog, len(katalog), seed=seed)
+        os.replace(db_yolu + '.tmp', db_yolu)
+    if not os.path.exists(bos_db_yolu):
+        generate_database(bos_db_yolu + '.tmp', [], 0, seed=seed)
+        os.replace(bos_db_yolu + '.tmp', bos_db_yolu)
+    return excel_yolu, db_yolu, bos_db_yolu
+
+
+def _oku_openpyxl_readonly(processor, excel_yolu):
+    """Sadece veri sütunlarını openpyxl read_only modunda oku (pandas'a tüm sayfa verilmez)"""
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(excel_yolu, read_only=True, data_only=True)
+    try:
+        sayfa = workbook['3']
+        satirlar = list(sayfa.iter_rows(min_row=ILK_VERI_SATIRI, min_col=VERI_SUTUNLARI[0],
+                                        max_col=VERI_SUTUNLARI[1], values_only=True))
+    finally:
+        workbook.close()
+    processor.data = pd.DataFrame(satirlar, columns=SAYFA_KOLONLARI).drop(columns=['tedarikci'])
+    return True
+
+
+def _uygula_executemany(db, data):
+    """Mevcut kayıtları tek sorguda eşleyip güncelleme / ekleme / hareketleri executemany ile yaz
+
+    DatabaseImporter ile aynı sonucu üretir: değişen adetler için GIRIS/CIKIS, yeni kayıtlar için GIRIS.
+    """
+    mevcut = {(row[1], row[2], row[3]): (row[0], row[4]) for row in db.execute(
+        'SELECT id, urun_kodu, renk, konum, adet FROM stoklar').fetchall()}
+    simdi = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    guncellemeler, eklemeler, hareketler = [], [], []
+    for kayit in data[KOLONLAR].itertuples(index=False, name=None):
+        urun_kodu, urun_adi, sistem_seri, renk, uzunluk, mt_kg, boy_kg, adet, toplam_kg, konum = kayit
+        adet = int(adet)
+        eslesen = mevcut.get((urun_kodu, renk, konum))
+        if eslesen:
+            stok_id, eski_adet = eslesen
+            guncellemeler.append((urun_adi, sistem_seri, int(uzunluk), float(mt_kg), float(boy_kg), adet,
+                                  float(toplam_kg), stok_id))
+            if eski_adet != adet:
+                hareketler.append((urun_kodu, 'GIRIS' if adet > eski_adet else 'CIKIS', abs(adet - eski_adet),
+                                   eski_adet, adet, konum, 'Excel import güncelleme', 'System', simdi))
+        else:
+            eklemeler.append((urun_kodu, urun_adi, sistem_seri, renk, int(uzunluk), float(mt_kg), float(boy_kg),
+                              adet, float(toplam_kg), konum))
+            if adet > 0:
+                hareketler.append((urun_kodu, 'GIRIS', adet, 0, adet, konum, 'Excel import yeni kayıt', 'System',
+                                   simdi))
+    db.execute('BEGIN')
+    db.executemany('''
+        UPDATE stoklar SET urun_adi = ?, sistem_seri = ?, uzunluk = ?, mt_kg = ?, boy_kg = ?, adet = ?,
+               toplam_kg = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    ''', guncellemeler)
+    db.executemany('''
+        INSERT INTO stoklar (urun_kodu, urun_adi, sistem_seri, renk, uzunluk, mt_kg, boy_kg, adet, toplam_kg, konum)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', eklemeler)
+    db.executemany('''
+        INSERT INTO stok_hareketleri (urun_kodu, hareket_tipi, miktar, onceki_miktar, yeni_miktar, konum,
+                                      aciklama, kullanici, tarih)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', hareketler)
+    db.commit()
+    return {'success': True, 'imported': len(eklemeler), 'updated': len(guncellemeler), 'errors': 0}
+
+
+def run_combination(excel_yolu, db_yolu, motor, strateji):
+    """Tek kombinasyonun aşamalarını bu süreçte çalıştır"""
+    import sqlite3
+    from utils.database import InstrumentedConnection
+    from utils.excel_processor import ExcelProcessor, DatabaseImporter
+
+    processor = ExcelProcessor()
+    sonuc = {}
+
+    def asama(ad, fn):
+        with RssSampler() as rss:
+            t0 = time.perf_counter()
+            deger = fn()
+            sure = time.perf_counter() - t0
+        sonuc[ad] = {'sure_sn': round(sure, 3), 'rss_peak_mb': round(rss.tepe_mb, 1),
+                     'rss_delta_mb': round(rss.tepe_mb - rss.baslangic_mb, 1)}
+        return deger
+
+    if motor == 'openpyxl_readonly':
+        okundu = asama('read', lambda: _oku_openpyxl_readonly(processor, excel_yolu))
+    else:
+        okundu = asama('read', lambda: processor.read_excel_file(excel_yolu, '3', engine=motor))
+    if not okundu:
+        raise RuntimeError('; '.join(processor.errors))
+    gecerli, _ = asama('validate', processor.validate_data)
+    veri = asama('derive', lambda: processor.calculate_derived_fields(gecerli))
+
+    # Uygulama bağlantısıyla aynı ayarlar (WAL, foreign_keys, tetikleyiciler)
+    db = sqlite3.connect(db_yolu, factory=InstrumentedConnection, timeout=20.0)
+    db.row_factory = sqlite3.Row
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA foreign_keys=ON')
+    db.commit()
+    try:
+        if strateji == 'importer':
+            uygulama = asama('apply', lambda: DatabaseImporter(db).import_to_database(veri))
+        else:
+            uygulama = asama('apply', lambda: _uygula_executemany(db, veri))
+    finally:
+        db.close()
+    if not uygulama.get('success'):
+        raise RuntimeError(uygulama.get('message'))
+
+    satir = len(veri)
+    toplam = sum(sonuc[ad]['sure_sn'] for ad in ASAMALAR)
+    for ad in ASAMALAR:
+        sonuc[ad]['rows_s'] = round(satir / sonuc[ad]['sure_sn'], 1) if sonuc[ad]['sure_sn'] else None
+    sonuc['total'] = {'sure_sn': round(toplam, 3), 'rows_s': round(satir / toplam, 1) if toplam else None,
+                      'rss_peak_mb': max(sonuc[ad]['rss_peak_mb'] for ad in ASAMALAR),
+                      'rows': satir, 'imported': uygulama.get('imported'), 'updated': uygulama.get('updated'),
+                      'errors': uygulama.get('errors')}
+    return sonuc
+
+
+def _alt_surecte_calistir(excel_yolu, db_yolu, motor, strateji):
+    calisma_klasoru = tempfile.mkdtemp(prefix='stok_import_')
+    kopya = os.path.join(calisma_klasoru, 'import.db')
+    cikti = os.path.join(calisma_klasoru, 'sonuc.json')
+    shutil.copyfile(db_yolu, kopya)
+    try:
+        subprocess.run([sys.executable, '-m', 'benchmarks.import_bench', '--worker', excel_yolu, kopya, motor,
+                        strateji, '--json', cikti], cwd=PROJECT_ROOT, check=True)
+        with open(cikti, encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        shutil.rmtree(calisma_klasoru, ignore_errors=True)
+
+
+def _liste(metin, gecerli, ad):
+    secilen = [parca.strip() for parca in metin.split(',') if parca.strip()]
+    bilinmeyen = [parca for parca in secilen if parca not in gecerli]
+    if bilinmeyen:
+        raise ValueError(f"Bilinmeyen {ad}: {', '.join(bilinmeyen)} (geçerli: {', '.join(gecerli)})")
+    return secilen
+
+
+def print_import_results(sonuclar):
+    print(f"\n{'boyut':>7} {'kombinasyon':<38} " + ' '.join(f'{a + " r/s":>13}' for a in ASAMALAR) +
+          f" {'toplam sn':>10} {'tepe RSS':>9}")
+    for boyut, kombinasyonlar in sonuclar.items():
+        for ad, sonuc in kombinasyonlar.items():
+            hizlar = ' '.join(f"{sonuc[a]['rows_s'] or 0:>13,.0f}" for a in ASAMALAR)
+            print(f"{boyut:>7} {ad:<38} {hizlar} {sonuc['total']['sure_sn']:>10} {sonuc['total']['rss_peak_mb']:>9}")
+
+
+def _duzlestir(sonuclar):
+    """Karşılaştırma için {boyut: {kombinasyon.aşama: metrikler}} biçimine çevir"""
+    return {boyut: {f'{ad}.{asama}': metrikler for ad, sonuc in kombinasyonlar.items()
+                    for asama, metrikler in sonuc.items()}
+            for boyut, kombinasyonlar in sonuclar.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Excel import aşama bazında benchmark')
+    parser.add_argument('--rows', default=VARSAYILAN_BOYUTLAR, help='Virgülle ayrılmış satır sayıları')
+    parser.add_argument('--engines', default=','.join(MOTORLAR), help='Okuma motorları')
+    parser.add_argument('--strategies', default=','.join(STRATEJILER), help='Yazma stratejileri')
+    parser.add_argument('--targets', default='existing', help=f"Hedef veritabanları: {', '.join(HEDEFLER)}")
+    parser.add_argument('--data-dir', default=VARSAYILAN_VERI_KLASORU)
+    parser.add_argument('--json', help='Sonuç dosyası')
+    parser.add_argument('--compare', help='Önceki sonuç dosyasıyla karşılaştır')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    parser.add_argument('--worker', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        excel_yolu, db_yolu, motor, strateji = args.worker
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(run_combination(excel_yolu, db_yolu, motor, strateji), f)
+        return 0
+
+    try:
+        boyutlar = [int(parca) for parca in args.rows.split(',') if parca.strip()]
+        motorlar = _liste(args.engines, MOTORLAR, 'motor')
+        stratejiler = _liste(args.strategies, STRATEJILER, 'strateji')
+        hedefler = _liste(args.targets, HEDEFLER, 'hedef')
+    except ValueError as e:
+        parser.error(str(e))
+
+    eksik = [motor for motor in motorlar if importlib.util.find_spec(MOTORLAR[motor]) is None]
+    for motor in eksik:
+        print(f'{motor} motoru atlanıyor: {MOTORLAR[motor]} yüklü değil', file=sys.stderr)
+    motorlar = [motor for motor in motorlar if motor not in eksik]
+    if not motorlar:
+        parser.error('Kullanılabilir okuma motoru yok')
+
+    # Motorlar varsayılan stratejiyle, stratejiler ilk motorla karşılaştırılır (tam çarpım yerine)
+    kombinasyonlar = [(motor, stratejiler[0]) for motor in motorlar]
+    kombinasyonlar += [(motorlar[0], strateji) for strateji in stratejiler[1:]]
+
+    sonuclar = {}
+    for boyut in boyutlar:
+        excel_yolu, db_yolu, bos_db_yolu = prepare_inputs(args.data_dir, boyut)
+        sonuclar[str(boyut)] = {}
+        for hedef in hedefler:
+            for motor, strateji in kombinasyonlar:
+                ad = f'{motor}/{strateji}/{hedef}'
+                print(f'[{boyut}] {ad}', file=sys.stderr)
+                sonuclar[str(boyut)][ad] = _alt_surecte_calistir(
+                    excel_yolu, db_yolu if hedef == 'existing' else bos_db_yolu, motor, strateji)
+    print_import_results(sonuclar)
+
+    meta = {'rows': boyutlar, 'engines': motorlar, 'strategies': stratejiler, 'targets': hedefler}
+    if args.json:
+        veri = write_results(args.json, _duzlestir(sonuclar), meta)
+        print(f'\nSonuçlar yazıldı: {args.json}')
+    else:
+        veri = {'meta': meta, 'results': _duzlestir(sonuclar)}
+    if args.compare:
+        eski = load_results(args.compare)
+        print()
+        gerilemeler = print_comparison(compare(eski, veri, args.threshold), eski.get('meta'), veri.get('meta'),
+                                       esik=args.threshold)
+        return 1 if gerilemeler else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
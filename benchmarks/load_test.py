@@ -0,0 +1,491 @@
+"""
+HTTP yük testi - gerçekçi depo trafiği karışımıyla yerel sunucuya yük bindirir (harici servis gerekmez)
+
+Sanal kullanıcılar /login ile oturum açar ve ağırlıklı bir senaryo karışımını tekrarlar:
+- autocomplete: ürün arama kutusuna yazma (her tuş vuruşu bir /api/search-products isteği)
+- stock_report: rapor sayfası ve kaydırmayla sonraki sayfalar (/api/stock-report)
+- check_stock: /api/check-stock
+- stock_exit / stock_transfer: form gönderimi (başarı yönlendirme hedefinden anlaşılır)
+- excel_export: /export-all-stocks
+- excel_import: /excel-import (sayfa 3 düzeninde küçük bir kaynak dosya)
+
+Endpoint başına throughput, p50/p95/p99 gecikme ve hata oranı raporlanır. --sweep ile gunicorn
+worker / thread kombinasyonları sırayla başlatılır ve throughput artışının durduğu ya da p99'un
+belirgin bozulduğu nokta (diz noktası) işaretlenir. Sunucu her kombinasyonda veri setinin yeni bir
+kopyasıyla açılır.
+
+Kullanım:
+    python -m benchmarks.load_test --scale small --workers 2 --threads 4 --users 16 --duration 30
+    python -m benchmarks.load_test --scale small --sweep 1x1,2x1,2x4,4x4 --users 32 --json yuk.json
+    python -m benchmarks.load_test --url http://127.0.0.1:5000 --users 8 --duration 20
+"""
+
+import argparse
+import http.client
+import io
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from urllib.parse import urlencode, urlsplit, quote
+
+from tools.common import PROJECT_ROOT
+from tools.generate_dataset import build_catalog, write_source_workbook
+
+from .db_bench import SCALES, VARSAYILAN_VERI_KLASORU, dataset_path
+from .runner import percentile, write_results, load_results, compare, print_comparison
+
+# Senaryo adı -> varsayılan ağırlık (depo içi tipik gün: çoğunlukla arama ve sorgu, az yazma)
+VARSAYILAN_KARISIM = {
+    'autocomplete': 40,
+    'stock_report': 20,
+    'check_stock': 25,
+    'stock_exit': 7,
+    'stock_transfer': 5,
+    'excel_export': 2,
+    'excel_import': 1,
+}
+# Diz noktası: throughput bir önceki kombinasyona göre bu orandan az artıyorsa...
+DIZ_THROUGHPUT_ARTISI = 0.10
+# ...ya da p99 bu kattan fazla bozuluyorsa
+DIZ_P99_KATI = 2.0
+BASLATMA_ZAMAN_ASIMI = 60
+
+
+class EndpointStats:
+    """Tek endpoint'in istek sonuçları (thread'ler arasında kilitle paylaşılır)"""
+
+    def __init__(self):
+        self.sureler = []
+        self.hatalar = 0
+        self.bayt = 0
+        self.durumlar = {}
+        self.son_hata = None
+
+
+class Istatistikler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpointler = {}
+
+    def kaydet(self, endpoint, sure, durum, bayt, hata=None):
+        with self._lock:
+            stat = self.endpointler.get(endpoint)
+            if stat is None:
+                stat = self.endpointler[endpoint] = EndpointStats()
+            stat.sureler.append(sure)
+            stat.bayt += bayt
+            stat.durumlar[durum] = stat.durumlar.get(durum, 0) + 1
+            if hata:
+                stat.hatalar += 1
+                stat.son_hata = hata
+
+    def ozet(self, sure):
+        sonuc = {}
+        toplam_istek = toplam_hata = 0
+        tum_sureler = []
+        for endpoint, stat in sorted(self.endpointler.items()):
+            n = len(stat.sureler)
+            toplam_istek += n
+            toplam_hata += stat.hatalar
+            tum_sureler.extend(stat.sureler)
+            sonuc[endpoint] = _metrikler(stat.sureler, stat.hatalar, sure)
+            sonuc[endpoint]['kb_per_req'] = round(stat.bayt / n / 1024, 1) if n else 0
+            sonuc[endpoint]['status'] = {str(k): v for k, v in sorted(stat.durumlar.items(), key=str)}
+            if stat.son_hata:
+                sonuc[endpoint]['last_error'] = stat.son_hata[:300]
+        sonuc['_total'] = _metrikler(tum_sureler, toplam_hata, sure)
+        return sonuc
+
+
+def _metrikler(sureler, hatalar, sure):
+    n = len(sureler)
+    return {
+        'n': n,
+        'ops_s': round(n / sure, 2) if sure else 0.0,
+        'p50_ms': round(percentile(sureler, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(sureler, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(sureler, 0.99) * 1000, 1),
+        'error_rate': round(hatalar / n, 4) if n else 0.0,
+    }
+
+
+class Oturum:
+    """Kalıcı bağlantılı, çerez tutan basit HTTP istemcisi"""
+
+    def __init__(self, host, port, istatistik, zaman_asimi=120):
+        self.host, self.port = host, port
+        self.istatistik = istatistik
+        self.zaman_asimi = zaman_asimi
+        self.cerezler = {}
+        self.conn = None
+
+    def _baglan(self):
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.zaman_asimi)
+        return self.conn
+
+    def istek(self, endpoint, method, path, body=None, headers=None, kontrol=None):
+        """İsteği gönder, sonucu kaydet; (durum, başlıklar, gövde) döndür
+
+        kontrol(durum, başlıklar, gövde) hata mesajı döndürürse istek hatalı sayılır.
+        """
+        basliklar = dict(headers or {})
+        if self.cerezler:
+            basliklar['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cerezler.items())
+        t0 = time.perf_counter()
+        try:
+            conn = self._baglan()
+            conn.request(method, path, body=body, headers=basliklar)
+            response = conn.getresponse()
+            govde = response.read()
+            durum = response.status
+            cevap_basliklari = response.headers
+        except (OSError, http.client.HTTPException) as e:
+            self.kapat()
+            self.istatistik.kaydet(endpoint, time.perf_counter() - t0, 'baglanti', 0, f'{type(e).__name__}: {e}')
+            return None, None, None
+        sure = time.perf_counter() - t0
+
+        for cerez in cevap_basliklari.get_all('Set-Cookie') or []:
+            ad, _, deger = cerez.split(';', 1)[0].partition('=')
+            self.cerezler[ad.strip()] = deger.strip()
+
+        hata = None
+        if durum >= 400:
+            hata = f'HTTP {durum}'
+        elif kontrol:
+            hata = kontrol(durum, cevap_basliklari, govde)
+        self.istatistik.kaydet(endpoint, sure, durum, len(govde), hata)
+        if cevap_basliklari.get('Connection', '').lower() == 'close':
+            self.kapat()
+        return durum, cevap_basliklari, govde
+
+    def kapat(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def _yonlendirme_kontrolu(basari_yolu):
+    """Form gönderimleri başarıda basari_yolu'na, hatada aynı sayfaya yönlendirir"""
+    def kontrol(durum, basliklar, govde):
+        if durum != 302:
+            return f'Beklenmeyen durum {durum}'
+        hedef = urlsplit(basliklar.get('Location', '')).path
+        if hedef != basari_yolu:
+            return f'İşlem başarısız (yönlendirme: {hedef})'
+        return None
+    return kontrol
+
+
+def _json_basari_kontrolu(durum, basliklar, govde):
+    if b'"success": false' in govde or b'"success":false' in govde:
+        return 'success=false'
+    return None
+
+
+def _multipart(alan, dosya_adi, icerik, tip):
+    sinir = uuid.uuid4().hex
+    govde = (f'--{sinir}\r\nContent-Disposition: form-data; name="{alan}"; filename="{dosya_adi}"\r\n'
+             f'Content-Type: {tip}\r\n\r\n').encode('utf-8') + icerik + f'\r\n--{sinir}--\r\n'.encode('utf-8')
+    return govde, {'Content-Type': f'multipart/form-data; boundary={sinir}'}
+
+
+class Senaryolar:
+    """Ağırlıklı senaryo karışımı - örnek veriler sunucunun veritabanından bir kez okunur"""
+
+    def __init__(self, ornekler, ciftler, karisim, excel_icerigi, think_time):
+        self.ornekler = ornekler
+        self.ciftler = ciftler
+        self.excel_icerigi = excel_icerigi
+        self.think_time = think_time
+        self.adlar = [ad for ad, agirlik in karisim.items() if agirlik > 0]
+        self.agirliklar = [karisim[ad] for ad in self.adlar]
+
+    def calistir(self, oturum, rng):
+        ad = rng.choices(self.adlar, self.agirliklar)[0]
+        getattr(self, ad)(oturum, rng)
+
+    def autocomplete(self, oturum, rng):
+        s = rng.choice(self.ornekler)
+        metin = s['urun_kodu'] if rng.random() < 0.6 else s['urun_adi']
+        # Kullanıcı 2. karakterden itibaren yazdıkça her tuşta istek gider (debounce 3-6 karakterde durur)
+        for uzunluk in range(2, min(len(metin), rng.randint(3, 6)) + 1):
+            oturum.istek('autocomplete', 'GET', f'/api/search-products?q={quote(metin[:uzunluk])}')
+            time.sleep(rng.uniform(0.05, 0.15) * self.think_time)
+
+    def stock_report(self, oturum, rng):
+        oturum.istek('stock_report', 'GET', '/stock-report')
+        for sayfa in range(2, rng.randint(2, 4) + 1):
+            time.sleep(rng.uniform(0.5, 1.5) * self.think_time)
+            oturum.istek('stock_report_api', 'GET', f'/api/stock-report?page={sayfa}', kontrol=_json_basari_kontrolu)
+
+    def check_stock(self, oturum, rng):
+        s = rng.choice(self.ornekler)
+        sorgu = urlencode({'urun_kodu': s['urun_kodu'], 'renk': s['renk'] or '', 'konum': s['konum']})
+        oturum.istek('check_stock', 'GET', f'/api/check-stock?{sorgu}', kontrol=_json_basari_kontrolu)
+
+    def stock_exit(self, oturum, rng):
+        s = rng.choice(self.ornekler)
+        govde = urlencode({'urun_kodu': s['urun_kodu'], 'renk': s['renk'] or '', 'konum': s['konum'], 'adet': 1,
+                           'aciklama': 'Yük testi'})
+        oturum.istek('stock_exit', 'POST', '/stock-exit', govde,
+                     {'Content-Type': 'application/x-www-form-urlencoded'}, _yonlendirme_kontrolu('/stock-list'))
+
+    def stock_transfer(self, oturum, rng):
+        if not self.ciftler:
+            return self.stock_exit(oturum, rng)
+        c = rng.choice(self.ciftler)
+        kaynak, hedef = (c['kaynak'], c['hedef']) if rng.random() < 0.5 else (c['hedef'], c['kaynak'])
+        govde = urlencode({'urun_kodu': c['urun_kodu'], 'renk': c['renk'] or '', 'kaynak_konum': kaynak,
+                           'hedef_konum': hedef, 'adet': 1})
+        oturum.istek('stock_transfer', 'POST', '/stock-transfer', govde,
+                     {'Content-Type': 'application/x-www-form-urlencoded'}, _yonlendirme_kontrolu('/stock-list'))
+
+    def excel_export(self, oturum, rng):
+        oturum.istek('excel_export', 'GET', '/export-all-stocks')
+
+    def excel_import(self, oturum, rng):
+        govde, basliklar = _multipart('excel_file', 'yuk_testi.xlsx', self.excel_icerigi,
+                                      'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        oturum.istek('excel_import', 'POST', '/excel-import', govde, basliklar, _yonlendirme_kontrolu('/'))
+
+
+def _ornek_veriler(db_path, sayi=500, seed=42):
+    import sqlite3
+    db = sqlite3.connect(db_path)
+    db.row_factory = sqlite3.Row
+    try:
+        satirlar = [dict(r) for r in db.execute(
+            'SELECT urun_kodu, urun_adi, renk, konum FROM stoklar WHERE adet > 50').fetchall()]
+        ciftler = [dict(r) for r in db.execute('''
+            SELECT a.urun_kodu, a.renk, a.konum AS kaynak, MIN(b.konum) AS hedef
+            FROM stoklar a JOIN stoklar b
+              ON a.urun_kodu = b.urun_kodu AND a.renk = b.renk AND a.konum < b.konum
+            WHERE a.adet > 50 AND b.adet > 50
+            GROUP BY a.urun_kodu, a.renk, a.konum LIMIT ?
+        ''', (sayi,)).fetchall()]
+    finally:
+        db.close()
+    rng = random.Random(seed)
+    return rng.sample(satirlar, min(sayi, len(satirlar))), ciftler
+
+
+def run_load(host, port, senaryolar, kullanici_sayisi, sure, username, password, seed=42):
+    """Sanal kullanıcıları `sure` saniye çalıştır, endpoint özetini döndür"""
+    istatistik = Istatistikler()
+    bitis = time.perf_counter() + sure
+    giris_hatalari = []
+
+    def sanal_kullanici(no):
+        rng = random.Random(seed + no)
+        oturum = Oturum(host, port, istatistik)
+        govde = urlencode({'username': username, 'password': password})
+        durum, basliklar, _ = oturum.istek('login', 'POST', '/login', govde,
+                                           {'Content-Type': 'application/x-www-form-urlencoded'},
+                                           _yonlendirme_kontrolu('/'))
+        if durum != 302:
+            giris_hatalari.append(no)
+            oturum.kapat()
+            return
+        try:
+            while time.perf_counter() < bitis:
+                senaryolar.calistir(oturum, rng)
+                time.sleep(rng.uniform(0.5, 1.5) * senaryolar.think_time)
+        finally:
+            oturum.kapat()
+
+    baslangic = time.perf_counter()
+    threadler = [threading.Thread(target=sanal_kullanici, args=(i,), daemon=True) for i in range(kullanici_sayisi)]
+    for t in threadler:
+        t.start()
+    for t in threadler:
+        t.join()
+    gecen = time.perf_counter() - baslangic
+    sonuc = istatistik.ozet(gecen)
+    sonuc['_total']['users'] = kullanici_sayisi
+    sonuc['_total']['login_failures'] = len(giris_hatalari)
+    return sonuc
+
+
+def _bos_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class GunicornSunucusu:
+    """Veri setinin kopyasıyla geçici bir gunicorn süreci
+
+    Süreç geçici bir klasörde çalışır: yüklenen dosyalar oraya yazılır, kullanıcılar veri setinin kopyasında tutulur.
+    """
+
+    def __init__(self, db_path, workers, threads, ek_argumanlar=(), ortam=None):
+        self.klasor = tempfile.mkdtemp(prefix='stok_yuk_')
+        self.db_path = os.path.join(self.klasor, 'yuk.db')
+        shutil.copyfile(db_path, self.db_path)
+        self.port = _bos_port()
+        self.workers, self.threads = workers, threads
+        self.ek_argumanlar = list(ek_argumanlar)
+        self.ortam = dict(ortam or {})
+        self.surec = None
+
+    def __enter__(self):
+        env = dict(os.environ, **self.ortam, DATABASE_PATH=self.db_path,
+                   PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get('PYTHONPATH')])))
+        komut = [sys.executable, '-m', 'gunicorn', '--chdir', self.klasor, '-b', f'127.0.0.1:{self.port}',
+                 '-w', str(self.workers), '--threads', str(self.threads), '--timeout', '120',
+                 '--log-level', 'warning', *self.ek_argumanlar, 'app:app']
+        self.log = open(os.path.join(self.klasor, 'gunicorn.log'), 'wb')
+        self.surec = subprocess.Popen(komut, cwd=self.klasor, env=env, stdout=self.log, stderr=subprocess.STDOUT)
+        son = time.monotonic() + BASLATMA_ZAMAN_ASIMI
+        while time.monotonic() < son:
+            if self.surec.poll() is not None:
+                raise RuntimeError(f'gunicorn başlatılamadı:\n{self._log_sonu()}')
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=2)
+                conn.request('GET', '/health')
+                if conn.getresponse().status == 200:
+                    conn.close()
+                    return self
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError('gunicorn zamanında hazır olmadı')
+
+    def _log_sonu(self):
+        self.log.flush()
+        with open(self.log.name, 'rb') as f:
+            return f.read()[-2000:].decode('utf-8', 'replace')
+
+    def __exit__(self, *exc):
+        if self.surec and self.surec.poll() is None:
+            self.surec.send_signal(signal.SIGTERM)
+            try:
+                self.surec.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.surec.kill()
+        self.log.close()
+        shutil.rmtree(self.klasor, ignore_errors=True)
+
+
+def find_knee(sweep):
+    """Sıralı (ad, toplam) listesinde diz noktası: ek kapasitenin throughput'u artırmadığı ilk nokta"""
+    for (onceki_ad, onceki), (ad, toplam) in zip(sweep, sweep[1:]):
+        artis = (toplam['ops_s'] - onceki['ops_s']) / onceki['ops_s'] if onceki['ops_s'] else 1.0
+        p99_kati = toplam['p99_ms'] / onceki['p99_ms'] if onceki['p99_ms'] else 1.0
+        if artis < DIZ_THROUGHPUT_ARTISI or p99_kati > DIZ_P99_KATI:
+            return onceki_ad
+    return sweep[-1][0] if sweep else None
+
+
+def print_load_results(ad, sonuc):
+    print(f'\n== {ad} ==')
+    print(f"{'endpoint':<18} {'istek':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hata %':>7}")
+    for endpoint, m in sonuc.items():
+        print(f"{endpoint:<18} {m['n']:>7} {m['ops_s']:>8} {m['p50_ms']:>8} {m['p95_ms']:>8} {m['p99_ms']:>8} "
+              f"{m['error_rate'] * 100:>7.2f}")
+        if m.get('last_error'):
+            print(f"    son hata: {m['last_error']}")
+
+
+def _karisim(metin):
+    karisim = dict(VARSAYILAN_KARISIM)
+    for parca in filter(None, (metin or '').split(',')):
+        ad, _, agirlik = parca.partition('=')
+        if ad.strip() not in VARSAYILAN_KARISIM:
+            raise ValueError(f"Bilinmeyen senaryo: {ad} ({', '.join(VARSAYILAN_KARISIM)})")
+        karisim[ad.strip()] = float(agirlik)
+    return karisim
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Yerel sunucuya gerçekçi depo trafiği ile yük testi')
+    parser.add_argument('--scale', default='small', help=f"Veri seti ölçeği: {', '.join(SCALES)}")
+    parser.add_argument('--data-dir', default=VARSAYILAN_VERI_KLASORU)
+    parser.add_argument('--url', help='Çalışan bir sunucuyu hedefle (sunucu başlatılmaz, --sweep kullanılamaz)')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--sweep', help='Sırayla denenecek worker x thread kombinasyonları, ör. 1x1,2x1,2x4,4x4')
+    parser.add_argument('--users', type=int, default=16, help='Eşzamanlı sanal kullanıcı')
+    parser.add_argument('--duration', type=float, default=30, help='Her kombinasyon için süre (sn)')
+    parser.add_argument('--think-time', type=float, default=0.2,
+                        help='Düşünme süresi çarpanı (0 = kullanıcılar arka arkaya istek gönderir)')
+    parser.add_argument('--mix', help='Ağırlık değişiklikleri, ör. autocomplete=60,excel_import=0')
+    parser.add_argument('--import-rows', type=int, default=200, help='Excel import dosyasındaki satır sayısı')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--gunicorn-arg', action='append', default=[], help='gunicorn\'a ek argüman (tekrarlanabilir)')
+    parser.add_argument('--json', help='Sonuç dosyası')
+    parser.add_argument('--compare', help='Önceki sonuç dosyasıyla karşılaştır')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    try:
+        karisim = _karisim(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.url and args.sweep:
+        parser.error('--url ile --sweep birlikte kullanılamaz')
+
+    db_path = dataset_path(args.data_dir, args.scale)
+    ornekler, ciftler = _ornek_veriler(db_path)
+    katalog = build_catalog(SCALES[args.scale]['products'])
+    excel = io.BytesIO()
+    write_source_workbook(excel, katalog, min(args.import_rows, len(katalog)))
+    senaryolar = Senaryolar(ornekler, ciftler, karisim, excel.getvalue(), args.think_time)
+
+    sonuclar = {}
+    if args.url:
+        hedef = urlsplit(args.url)
+        ad = hedef.netloc
+        sonuclar[ad] = run_load(hedef.hostname, hedef.port or 80, senaryolar, args.users, args.duration,
+                                args.username, args.password)
+        print_load_results(ad, sonuclar[ad])
+    else:
+        kombinasyonlar = []
+        for parca in (args.sweep or f'{args.workers}x{args.threads}').split(','):
+            w, _, t = parca.strip().partition('x')
+            kombinasyonlar.append((int(w), int(t or 1)))
+        for workers, threads in kombinasyonlar:
+            ad = f'w{workers}t{threads}'
+            print(f'[{ad}] gunicorn başlatılıyor ({args.users} kullanıcı, {args.duration:g} sn)', file=sys.stderr)
+            with GunicornSunucusu(db_path, workers, threads, args.gunicorn_arg) as sunucu:
+                sonuclar[ad] = run_load('127.0.0.1', sunucu.port, senaryolar, args.users, args.duration,
+                                        args.username, args.password)
+            print_load_results(ad, sonuclar[ad])
+
+    if len(sonuclar) > 1:
+        print(f"\n{'kombinasyon':<12} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'hata %':>7}")
+        for ad, sonuc in sonuclar.items():
+            t = sonuc['_total']
+            print(f"{ad:<12} {t['ops_s']:>8} {t['p50_ms']:>8} {t['p99_ms']:>8} {t['error_rate'] * 100:>7.2f}")
+        diz = find_knee([(ad, sonuc['_total']) for ad, sonuc in sonuclar.items()])
+        print(f'\nDiz noktası: {diz} (sonraki kombinasyonda throughput %{DIZ_THROUGHPUT_ARTISI * 100:g}\'dan az '
+              f'artıyor ya da p99 {DIZ_P99_KATI:g} katından fazla bozuluyor)')
+
+    meta = {'scale': args.scale, 'users': args.users, 'duration': args.duration, 'think_time': args.think_time,
+            'mix': karisim}
+    if args.json:
+        veri = write_results(args.json, sonuclar, meta)
+        print(f'\nSonuçlar yazıldı: {args.json}')
+    else:
+        veri = {'meta': meta, 'results': sonuclar}
+    if args.compare:
+        eski = load_results(args.compare)
+        print()
+        gerilemeler = print_comparison(compare(eski, veri, args.threshold), eski.get('meta'), veri.get('meta'),
+                                       esik=args.threshold)
+        return 1 if gerilemeler else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
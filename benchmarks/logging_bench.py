@@ -0,0 +1,120 @@
+"""
+Log maliyeti benchmark'ı - istek thread'inde log çağrısı başına geçen süre
+
+Rezervasyon notu kaydetme isteğinin loglarını eski (basicConfig, senkron, f-string INFO) ve yeni
+(utils.logging_setup: kuyruk + arka plan yazıcı, tembel biçimlendirme) düzenle karşılaştırır.
+Çıktı os.devnull'a yazılır; yeni düzende yazıcı thread'inin işi ölçülen süreye dahil değildir.
+
+Senaryolar:
+- eski_sync_info: düzenlemeden önceki 6 satırlık f-string / repr INFO logu, senkron StreamHandler
+- yeni_info: aynı istek, yeni düzen LOG_LEVEL=INFO (DEBUG kayıtları oluşturulmaz)
+- yeni_debug_text / yeni_debug_json: LOG_LEVEL=DEBUG, tüm ayrıntı kuyruğa konur
+- yeni_debug_sampled: LOG_LEVEL=DEBUG + LOG_SAMPLING=routes.reservation=0.1
+- yeni_debug_no_caller: LOG_LEVEL=DEBUG + LOG_SKIP_CALLER_INFO=1
+
+Kullanım:
+    python -m benchmarks.logging_bench --json log.json
+    python -m benchmarks.logging_bench --compare log_eski.json
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+from utils.logging_setup import configure_logging, get_logging_stats, shutdown_logging
+
+from .runner import measure, write_results, load_results, compare, print_comparison, print_results
+
+logger = logging.getLogger('routes.reservation')
+
+VERI = {'urun_kodu': 'ALM-1042', 'renk': 'ELOKSAL', 'note': 'Müşteri X için 40 boy ayrıldı'}
+
+
+def eski_istek(i):
+    data = VERI
+    logger.info(f"Received reservation note save request: {data}")
+    urun_kodu, renk, note = data['urun_kodu'], data['renk'], data['note']
+    logger.info(f"Processing reservation note - Product: '{urun_kodu}', Color: '{renk}', Note: '{note}'")
+    logger.info(f"Color value type: {type(renk)}, Color value repr: {repr(renk)}")
+    logger.info(f"About to call save_urun_rezervasyon_notu for {urun_kodu}")
+    logger.info(f"save_urun_rezervasyon_notu returned: {True}")
+    logger.info(f"Successfully saved reservation note for {urun_kodu}")
+
+
+def yeni_istek(i):
+    data = VERI
+    urun_kodu, renk, note = data['urun_kodu'], data['renk'], data['note']
+    logger.debug("Reservation note save request - product: %r, color: %r, note: %r", urun_kodu, renk, note)
+    logger.debug("Saved reservation note for %s, verified: %r", urun_kodu, note)
+
+
+def _eski_duzen(cikti):
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(cikti)
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+SENARYOLAR = {
+    'eski_sync_info': (eski_istek, None),
+    'yeni_info': (yeni_istek, {'level': 'INFO'}),
+    'yeni_debug_text': (yeni_istek, {'level': 'DEBUG'}),
+    'yeni_debug_json': (yeni_istek, {'level': 'DEBUG', 'fmt': 'json'}),
+    'yeni_debug_sampled': (yeni_istek, {'level': 'DEBUG', 'sampling': {'routes.reservation': 0.1}}),
+    'yeni_debug_no_caller': (yeni_istek, {'level': 'DEBUG', 'skip_caller_info': True}),
+}
+
+
+def run(sure):
+    sonuclar = {}
+    with open(os.devnull, 'w') as cikti:
+        for ad, (fn, ayarlar) in SENARYOLAR.items():
+            if ayarlar is None:
+                _eski_duzen(cikti)
+            else:
+                configure_logging(stream=cikti, **ayarlar)
+            sonuc = measure(fn, sure=sure, min_tekrar=1000, max_tekrar=200_000)
+            # Ölçüm kuyruğu doldurduysa atılan kayıtlar sonuçta görünsün
+            if ayarlar is not None:
+                sonuc['dropped'] = get_logging_stats()['dropped_queue_full']
+            sonuc['us_per_request'] = round(sonuc['p50_ms'] * 1000, 2)
+            sonuclar[ad] = sonuc
+        shutdown_logging()
+    return {'logging': sonuclar}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='İstek thread\'inde log maliyeti (eski / yeni düzen)')
+    parser.add_argument('--duration', type=float, default=1.0, help='Senaryo başına ölçüm süresi (sn)')
+    parser.add_argument('--json', help='Sonuç dosyası')
+    parser.add_argument('--compare', help='Önceki sonuç dosyasıyla karşılaştır')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    sonuclar = run(args.duration)
+    print_results(sonuclar)
+    for ad, s in sonuclar['logging'].items():
+        print(f"{ad:<34} istek başına {s['us_per_request']} µs" + (f", atılan {s['dropped']}" if s.get('dropped') else ''))
+
+    meta = {'duration': args.duration}
+    if args.json:
+        veri = write_results(args.json, sonuclar, meta)
+        print(f'\nSonuçlar yazıldı: {args.json}')
+    else:
+        veri = {'meta': meta, 'results': sonuclar}
+    if args.compare:
+        eski = load_results(args.compare)
+        print()
+        gerilemeler = print_comparison(compare(eski, veri, args.threshold), eski.get('meta'), veri.get('meta'),
+                                       esik=args.threshold)
+        return 1 if gerilemeler else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
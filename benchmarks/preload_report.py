@@ -0,0 +1,190 @@
+"""
+Preload raporu - gunicorn.conf.py ile preload açık / kapalı açılış süresi, worker belleği ve copy-on-write kazancı
+
+Her mod için veri setinin kopyasıyla gunicorn başlatılır (gunicorn.conf.py, GUNICORN_PRELOAD=1/0):
+- Açılış: süreç başlangıcından tüm worker'lar /health'e yanıt verene kadar geçen süre
+- İlk istekler: worker'lara dağılan yeni oturumlarla /stock-report (şablon derleme / önbellek ısınması)
+- Excel export: ardından /export-all-stocks istekleri - pandas / openpyxl'i preload'da master'dan paylaşılan,
+  diğer modlarda her worker'da ayrı yüklenen bellek olarak gösterir (günler içinde her worker'ın ulaştığı durum)
+- Bellek (istekler sonrası): master ve her worker için /proc/<pid>/smaps_rollup - RSS, PSS, paylaşılan ve özel bellek.
+  Worker'ların PSS toplamı gerçek bellek kullanımıdır; paylaşılan kısım master'dan devralınan sayfalardır.
+
+Kullanım:
+    python -m benchmarks.preload_report --scale small --workers 4 --json preload.json
+    python -m benchmarks.preload_report --modes preload --compare preload_eski.json
+"""
+
+import argparse
+import http.client
+import os
+import sys
+import time
+from urllib.parse import urlencode
+
+from tools.common import PROJECT_ROOT
+from utils.memory_diagnostics import process_memory
+
+from .db_bench import SCALES, VARSAYILAN_VERI_KLASORU, dataset_path
+from .load_test import GunicornSunucusu, Istatistikler, Oturum
+from .runner import percentile, write_results, load_results, compare, print_comparison
+
+# mod -> (GUNICORN_PRELOAD, PRELOAD_HEAVY_MODULES)
+MODLAR = {'preload': ('1', '1'), 'preload_light': ('1', '0'), 'no_preload': ('0', '0')}
+GUNICORN_CONF = os.path.join(PROJECT_ROOT, 'gunicorn.conf.py')
+HAZIR_ZAMAN_ASIMI = 120
+
+
+def _cocuk_surecler(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def _workerlari_bekle(sunucu, worker_sayisi):
+    """Tüm worker'lar fork edilip istek kabul edene kadar bekle (yeni bağlantılar worker'lara dağılır)"""
+    son = time.monotonic() + HAZIR_ZAMAN_ASIMI
+    while time.monotonic() < son:
+        if len(_cocuk_surecler(sunucu.surec.pid)) >= worker_sayisi:
+            basarili = 0
+            for _ in range(worker_sayisi * 2):
+                conn = http.client.HTTPConnection('127.0.0.1', sunucu.port, timeout=30)
+                try:
+                    conn.request('GET', '/health')
+                    basarili += conn.getresponse().status == 200
+                except OSError:
+                    pass
+                finally:
+                    conn.close()
+            if basarili == worker_sayisi * 2:
+                return
+        time.sleep(0.1)
+    raise RuntimeError('Worker\'lar zamanında hazır olmadı')
+
+
+def _oturumlarla_iste(port, oturum_sayisi, username, password, endpoint, yol):
+    """Her istek için yeni bağlantı ve oturum (bağlantılar worker'lara dağılır); endpoint sonuçlarını döndür"""
+    istatistik = Istatistikler()
+    for _ in range(oturum_sayisi):
+        oturum = Oturum('127.0.0.1', port, istatistik)
+        govde = urlencode({'username': username, 'password': password})
+        oturum.istek('login', 'POST', '/login', govde, {'Content-Type': 'application/x-www-form-urlencoded'})
+        oturum.istek(endpoint, 'GET', yol)
+        oturum.kapat()
+    return istatistik.endpointler.get(endpoint)
+
+
+def _dagilim(stat):
+    sureler = stat.sureler if stat else []
+    return {
+        'n': len(sureler),
+        'p50_ms': round(percentile(sureler, 0.5) * 1000, 1),
+        'p99_ms': round(percentile(sureler, 0.99) * 1000, 1),
+        'error_rate': round(stat.hatalar / len(sureler), 4) if sureler else 1.0,
+    }
+
+
+def run_mode(db_yolu, mod, worker_sayisi, username, password, ilk_istek_sayisi, excel_istek_sayisi):
+    preload, agir_moduller = MODLAR[mod]
+    ortam = {'GUNICORN_PRELOAD': preload, 'PRELOAD_HEAVY_MODULES': agir_moduller, 'GUNICORN_MAX_REQUESTS': '0',
+             'GUNICORN_LOG_LEVEL': 'warning'}
+    baslangic = time.perf_counter()
+    with GunicornSunucusu(db_yolu, worker_sayisi, 1, ('-c', GUNICORN_CONF), ortam) as sunucu:
+        _workerlari_bekle(sunucu, worker_sayisi)
+        acilis_ms = (time.perf_counter() - baslangic) * 1000
+        ilk = _oturumlarla_iste(sunucu.port, ilk_istek_sayisi, username, password, 'stock_report', '/stock-report')
+        excel = _oturumlarla_iste(sunucu.port, excel_istek_sayisi, username, password,
+                                  'excel_export', '/export-all-stocks') if excel_istek_sayisi else None
+
+        master = process_memory(sunucu.surec.pid)
+        if master is None:
+            raise RuntimeError('/proc/<pid>/smaps_rollup okunamıyor (Linux 4.14+ gerekir)')
+        workerlar = [dict(process_memory(pid) or {}, pid=pid) for pid in _cocuk_surecler(sunucu.surec.pid)]
+        workerlar = [w for w in workerlar if 'rss_mb' in w]
+
+    def ortalama(alan):
+        return round(sum(w[alan] for w in workerlar) / len(workerlar), 1) if workerlar else 0.0
+
+    sonuc = {
+        'startup': {'startup_ms': round(acilis_ms, 1)},
+        'first_requests': _dagilim(ilk),
+        'worker_avg': {'rss_peak_mb': ortalama('rss_mb'), 'pss_mb': ortalama('pss_mb'),
+                       'shared_mb': ortalama('shared_mb'), 'private_mb': ortalama('private_mb')},
+        'total': {
+            'pss_mb': round(master['pss_mb'] + sum(w['pss_mb'] for w in workerlar), 1),
+            'rss_peak_mb': round(master['rss_mb'] + sum(w['rss_mb'] for w in workerlar), 1),
+        },
+        '_master': master,
+        '_workers': workerlar,
+    }
+    if excel_istek_sayisi:
+        sonuc['first_excel_export'] = _dagilim(excel)
+    return sonuc
+
+
+def print_preload_results(sonuclar):
+    print(f"\n{'mod':<14} {'açılış ms':>10} {'ilk p50':>8} {'ilk p99':>8} {'xls p50':>8} {'W RSS':>7} {'W PSS':>7} "
+          f"{'W payl.':>8} {'W özel':>7} {'M RSS':>7} {'top. PSS':>9} {'top. RSS':>9}")
+    for mod, s in sonuclar.items():
+        w, t, m = s['worker_avg'], s['total'], s['_master']
+        excel = s.get('first_excel_export', {}).get('p50_ms', '-')
+        print(f"{mod:<14} {s['startup']['startup_ms']:>10} {s['first_requests']['p50_ms']:>8} "
+              f"{s['first_requests']['p99_ms']:>8} {excel:>8} {w['rss_peak_mb']:>7} {w['pss_mb']:>7} {w['shared_mb']:>8} "
+              f"{w['private_mb']:>7} {m['rss_mb']:>7} {t['pss_mb']:>9} {t['rss_peak_mb']:>9}")
+    if 'no_preload' in sonuclar:
+        print()
+        for mod in ('preload', 'preload_light'):
+            if mod in sonuclar:
+                fark = sonuclar['no_preload']['total']['pss_mb'] - sonuclar[mod]['total']['pss_mb']
+                print(f"{mod}: no_preload'a göre toplam PSS farkı (copy-on-write kazancı): {fark:+.1f} MB")
+    print('(W = worker ortalaması, M = master, MB)')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='gunicorn preload açık / kapalı açılış ve bellek raporu')
+    parser.add_argument('--scale', default='small', choices=list(SCALES))
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--modes', default=','.join(MODLAR), help=f"Modlar: {', '.join(MODLAR)}")
+    parser.add_argument('--first-requests', type=int, default=12, help='Ölçülen ilk /stock-report isteği')
+    parser.add_argument('--excel-requests', type=int, default=None,
+                        help='Ardından gönderilen /export-all-stocks isteği (varsayılan: worker sayısı x 3, 0 = yok)')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--data-dir', default=VARSAYILAN_VERI_KLASORU)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='Sonuç dosyası')
+    parser.add_argument('--compare', help='Önceki sonuç dosyasıyla karşılaştır')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    modlar = [m.strip() for m in args.modes.split(',') if m.strip()]
+    bilinmeyen = [m for m in modlar if m not in MODLAR]
+    if bilinmeyen:
+        parser.error(f"Bilinmeyen mod: {', '.join(bilinmeyen)}")
+
+    db_yolu = dataset_path(args.data_dir, args.scale, args.seed)
+    sonuclar = {}
+    for mod in modlar:
+        print(f'[{mod}] {args.workers} worker başlatılıyor...', file=sys.stderr)
+        sonuclar[mod] = run_mode(db_yolu, mod, args.workers, args.username, args.password, args.first_requests,
+                                 args.workers * 3 if args.excel_requests is None else args.excel_requests)
+    print_preload_results(sonuclar)
+
+    meta = {'scale': args.scale, 'workers': args.workers, 'modes': modlar}
+    if args.json:
+        veri = write_results(args.json, sonuclar, meta)
+        print(f'\nSonuçlar yazıldı: {args.json}')
+    else:
+        veri = {'meta': meta, 'results': sonuclar}
+    if args.compare:
+        eski = load_results(args.compare)
+        print()
+        gerilemeler = print_comparison(compare(eski, veri, args.threshold), eski.get('meta'), veri.get('meta'),
+                                       esik=args.threshold)
+        return 1 if gerilemeler else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
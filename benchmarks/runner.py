@@ -0,0 +1,222 @@
+"""
+Benchmark ortak yardımcıları - süre / bellek ölçümü, JSON sonuç dosyası ve sürümler arası karşılaştırma
+
+Sonuç dosyası biçimi:
+    {"meta": {...ortam bilgisi...},
+     "results": {"<ölçek>": {"<benchmark>": {"ops_s": .., "p50_ms": .., "p99_ms": .., "peak_kb": ..}}}}
+"""
+
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from tools.common import PROJECT_ROOT
+
+# Karşılaştırmada yönü belirlenen metrikler (True = büyük olan iyi)
+METRIK_YONLERI = {'ops_s': True, 'rows_s': True, 'p50_ms': False, 'p99_ms': False, 'peak_kb': False,
+                  'rss_peak_mb': False, 'error_rate': False, 'startup_ms': False, 'pss_mb': False,
+                  'private_mb': False}
+
+
+def percentile(values, oran):
+    """Sıralı olmayan listeden yüzdelik (en yakın sıra yöntemi)"""
+    if not values:
+        return 0.0
+    sirali = sorted(values)
+    return sirali[min(len(sirali) - 1, int(round(oran * (len(sirali) - 1))))]
+
+
+def measure(fn, sure=2.0, min_tekrar=20, max_tekrar=100_000, isinma=3):
+    """fn'i en az `sure` saniye ve `min_tekrar` kez çalıştırıp süre dağılımını döndür
+
+    fn'e çağrı sırası (0, 1, 2, ...) verilir; böylece örnek veriler arasında dönebilir.
+    """
+    for i in range(isinma):
+        fn(i)
+    sureler = []
+    hatalar = 0
+    son_hata = None
+    baslangic = time.perf_counter()
+    i = 0
+    while i < max_tekrar and (i < min_tekrar or time.perf_counter() - baslangic < sure):
+        t0 = time.perf_counter()
+        try:
+            fn(isinma + i)
+        except Exception as e:
+            hatalar += 1
+            son_hata = str(e)
+        sureler.append(time.perf_counter() - t0)
+        i += 1
+    toplam = time.perf_counter() - baslangic
+    sonuc = {
+        'n': len(sureler),
+        'ops_s': round(len(sureler) / toplam, 2) if toplam else 0.0,
+        'p50_ms': round(percentile(sureler, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(sureler, 0.99) * 1000, 3),
+        'mean_ms': round(sum(sureler) / len(sureler) * 1000, 3),
+        'error_rate': round(hatalar / len(sureler), 4),
+    }
+    if son_hata:
+        sonuc['last_error'] = son_hata[:300]
+    return sonuc
+
+
+def measure_peak_memory(fn, tekrar=5):
+    """tracemalloc ile tek çağrının en yüksek Python bellek kullanımı (KB)
+
+    Süre ölçümünden ayrı çalıştırılır; tracemalloc çağrıları belirgin şekilde yavaşlatır.
+    """
+    tepe = 0
+    for i in range(tekrar):
+        tracemalloc.start()
+        try:
+            fn(i)
+        except Exception:
+            pass
+        finally:
+            _, anlik_tepe = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        tepe = max(tepe, anlik_tepe)
+    return round(tepe / 1024, 1)
+
+
+def rss_peak_mb():
+    """Sürecin en yüksek RSS değeri (Linux'ta KB, macOS'ta bayt döner)"""
+    tepe = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        tepe /= 1024
+    return round(tepe / 1024, 1)
+
+
+def current_rss_mb():
+    """Sürecin o anki RSS değeri (/proc varsa; yoksa en yüksek RSS döner)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return rss_peak_mb()
+
+
+class RssSampler:
+    """Blok boyunca RSS'i arka planda örnekleyip en yüksek değeri tutar (aşama bazında tepe bellek)
+
+    ru_maxrss süreç ömrü boyunca tek bir tepe verdiği için aşamaları ayırt edemez.
+    """
+
+    def __init__(self, aralik=0.01):
+        self.aralik = aralik
+        self.baslangic_mb = 0.0
+        self.tepe_mb = 0.0
+        self._dur = threading.Event()
+        self._thread = None
+
+    def _ornekle(self):
+        while not self._dur.wait(self.aralik):
+            self.tepe_mb = max(self.tepe_mb, current_rss_mb())
+
+    def __enter__(self):
+        self.baslangic_mb = self.tepe_mb = current_rss_mb()
+        self._thread = threading.Thread(target=self._ornekle, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._dur.set()
+        self._thread.join()
+        self.tepe_mb = max(self.tepe_mb, current_rss_mb())
+
+
+def environment_info():
+    """Sonuç dosyasına yazılan ortam bilgisi (sürümler arası karşılaştırma için)"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'tarih': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu': os.cpu_count(),
+    }
+
+
+def write_results(path, results, meta=None):
+    veri = {'meta': {**environment_info(), **(meta or {})}, 'results': results}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(veri, f, ensure_ascii=False, indent=2)
+    return veri
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(eski, yeni, esik=10.0):
+    """İki sonuç dosyasını karşılaştır
+
+    Her ortak ölçek / benchmark / metrik için yüzde değişim hesaplanır; iyi yöndeki değişim pozitif
+    gösterilir. `esik` yüzdesinden fazla kötüleşen metrikler gerileme (regression) sayılır.
+    """
+    satirlar = []
+    for olcek, benchmarklar in yeni['results'].items():
+        eski_olcek = eski['results'].get(olcek, {})
+        for ad, metrikler in benchmarklar.items():
+            eski_metrikler = eski_olcek.get(ad)
+            if not isinstance(metrikler, dict) or not isinstance(eski_metrikler, dict):
+                continue
+            for metrik, buyuk_iyi in METRIK_YONLERI.items():
+                once, sonra = eski_metrikler.get(metrik), metrikler.get(metrik)
+                if once is None or sonra is None:
+                    continue
+                if once == 0:
+                    # Sıfırdan değişim oranlanamaz; yönüne göre ±%100 sayılır
+                    degisim = 0.0 if sonra == 0 else (100.0 if (sonra > 0) == buyuk_iyi else -100.0)
+                else:
+                    degisim = (sonra - once) / abs(once) * 100 * (1 if buyuk_iyi else -1)
+                satirlar.append({
+                    'scale': olcek, 'benchmark': ad, 'metric': metrik, 'old': once, 'new': sonra,
+                    'change_pct': round(degisim, 1), 'regression': degisim < -esik,
+                })
+    return satirlar
+
+
+def print_comparison(satirlar, eski_meta=None, yeni_meta=None, sadece_onemli=False, esik=10.0):
+    if eski_meta or yeni_meta:
+        print(f"Eski: {(eski_meta or {}).get('commit')} ({(eski_meta or {}).get('tarih')})  "
+              f"Yeni: {(yeni_meta or {}).get('commit')} ({(yeni_meta or {}).get('tarih')})")
+    print(f"{'ölçek':<8} {'benchmark':<34} {'metrik':<11} {'eski':>12} {'yeni':>12} {'değişim':>9}")
+    for satir in satirlar:
+        if sadece_onemli and abs(satir['change_pct']) < esik:
+            continue
+        isaret = '  GERİLEME' if satir['regression'] else ''
+        print(f"{satir['scale']:<8} {satir['benchmark']:<34} {satir['metric']:<11} {satir['old']:>12} "
+              f"{satir['new']:>12} {satir['change_pct']:>+8.1f}%{isaret}")
+    gerilemeler = [s for s in satirlar if s['regression']]
+    print(f"\n{len(satirlar)} metrik karşılaştırıldı, {len(gerilemeler)} gerileme (eşik %{esik:g})")
+    return gerilemeler
+
+
+def print_results(results):
+    for olcek, benchmarklar in results.items():
+        print(f'\n== {olcek} ==')
+        ozet = benchmarklar.get('_scale', {})
+        if ozet:
+            print('   ' + ', '.join(f'{k}={v}' for k, v in ozet.items()))
+        print(f"{'benchmark':<34} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak KB':>9} {'hata':>6}")
+        for ad, m in benchmarklar.items():
+            if ad.startswith('_'):
+                continue
+            print(f"{ad:<34} {m.get('ops_s', 0):>10} {m.get('p50_ms', 0):>9} {m.get('p99_ms', 0):>9} "
+                  f"{m.get('peak_kb', '-'):>9} {m.get('error_rate', 0):>6}")
+            if m.get('last_error'):
+                print(f"    hata: {m['last_error']}")
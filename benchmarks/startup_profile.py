@@ -0,0 +1,214 @@
+"""
+Açılış (cold start) profili - `import app` + `create_app()` süresi, modül bazında import maliyeti ve RSS
+
+Her ölçüm `python -X importtime` ile yeni bir alt süreçte yapılır (sıcak modül önbelleği olmadan,
+scale-to-zero platformlarda ve gunicorn worker açılışında ödenen maliyet). importtime çıktısından
+modül ve üst paket bazında kendi (self) ve kümülatif süreler çıkarılır.
+
+Ağır bağımlılıklar (varsayılan: pandas, numpy, openpyxl) sadece Excel import/export isteklerinde
+yüklenmelidir; açılışta yüklenmişlerse --forbid ile süreç 1 koduyla biter (CI kontrolü).
+--lazy ile bu modüllerin ilk Excel isteğinde ödenen maliyeti de ölçülür.
+
+Kullanım:
+    python -m benchmarks.startup_profile --runs 5 --json startup.json
+    python -m benchmarks.startup_profile --compare startup_eski.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from tools.common import PROJECT_ROOT
+
+from .runner import percentile, write_results, load_results, compare, print_comparison
+
+VARSAYILAN_YASAKLI = 'pandas,numpy,openpyxl'
+# İlk Excel isteğinde yüklenen modüller (--lazy)
+TEMBEL_MODULLER = ('utils.excel_processor', 'openpyxl')
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+# Alt süreç create_app() bitince bu satırı yazar; sonraki (tembel) importlar açılışa sayılmaz
+_ACILIS_SONU = '-- startup_profile: create_app tamamlandı --'
+
+# Alt süreçte çalışan ölçüm betiği - son stdout satırı JSON sonuçtur
+_COCUK_BETIGI = '''
+import json, os, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+import app as app_modulu
+t1 = time.perf_counter()
+uygulama = app_modulu.create_app()
+t2 = time.perf_counter()
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+sonuc = {{'import_ms': (t1 - t0) * 1000, 'create_app_ms': (t2 - t1) * 1000, 'rss_mb': rss_mb(),
+          'modules': len(sys.modules), 'loaded': [m for m in {izlenen!r} if m in sys.modules], 'lazy': {{}}}}
+sys.stderr.write({son!r} + '\\n')
+for modul in {tembel!r}:
+    r0, t3 = rss_mb(), time.perf_counter()
+    __import__(modul)
+    sonuc['lazy'][modul] = {{'ms': (time.perf_counter() - t3) * 1000, 'rss_mb': rss_mb() - r0}}
+print(json.dumps(sonuc))
+'''
+
+
+def parse_importtime(stderr):
+    """-X importtime çıktısını [{'module', 'self_us', 'cumulative_us', 'depth'}] listesine çevir"""
+    satirlar = []
+    for satir in stderr.splitlines():
+        if satir == _ACILIS_SONU:
+            break
+        eslesme = _IMPORTTIME_RE.match(satir)
+        if eslesme:
+            satirlar.append({
+                'module': eslesme.group(4),
+                'self_us': int(eslesme.group(1)),
+                'cumulative_us': int(eslesme.group(2)),
+                'depth': len(eslesme.group(3)) // 2,
+            })
+    return satirlar
+
+
+def run_once(izlenen, tembel=(), db_yolu=None):
+    """Tek açılış ölçümü - yeni alt süreçte `import app` + `create_app()`"""
+    with tempfile.TemporaryDirectory(prefix='startup-') as klasor:
+        ortam = dict(os.environ, DATABASE_PATH=db_yolu or os.path.join(klasor, 'startup.db'))
+        betik = _COCUK_BETIGI.format(root=PROJECT_ROOT, izlenen=tuple(izlenen), tembel=tuple(tembel),
+                                      son=_ACILIS_SONU)
+        baslangic = time.perf_counter()
+        surec = subprocess.run([sys.executable, '-X', 'importtime', '-c', betik], cwd=klasor, env=ortam,
+                               capture_output=True, text=True, timeout=300)
+        toplam_ms = (time.perf_counter() - baslangic) * 1000
+    if surec.returncode != 0:
+        raise RuntimeError(f'Açılış başarısız:\n{surec.stderr[-2000:]}')
+    sonuc = json.loads(surec.stdout.strip().splitlines()[-1])
+    sonuc['process_ms'] = toplam_ms
+    sonuc['imports'] = parse_importtime(surec.stderr)
+    return sonuc
+
+
+def summarize_imports(olcumler, ilk=25):
+    """Ölçümler boyunca modül ve üst paket bazında medyan import süreleri"""
+    moduller = {}
+    for olcum in olcumler:
+        paketler = {}
+        for satir in olcum['imports']:
+            kayit = moduller.setdefault(satir['module'], {'self': [], 'cumulative': [], 'depth': satir['depth']})
+            kayit['self'].append(satir['self_us'])
+            kayit['cumulative'].append(satir['cumulative_us'])
+            paket = satir['module'].split('.', 1)[0]
+            paketler[paket] = paketler.get(paket, 0) + satir['self_us']
+        olcum['_paketler'] = paketler
+
+    modul_ozeti = sorted(({
+        'module': ad,
+        'self_ms': round(percentile(kayit['self'], 0.5) / 1000, 2),
+        'cumulative_ms': round(percentile(kayit['cumulative'], 0.5) / 1000, 2),
+        'depth': kayit['depth'],
+    } for ad, kayit in moduller.items()), key=lambda m: m['cumulative_ms'], reverse=True)
+
+    paket_adlari = {ad for olcum in olcumler for ad in olcum['_paketler']}
+    paket_ozeti = sorted(({
+        'package': ad,
+        'self_ms': round(percentile([olcum['_paketler'].get(ad, 0) for olcum in olcumler], 0.5) / 1000, 2),
+        'modules': sum(1 for m in moduller if m.split('.', 1)[0] == ad),
+    } for ad in paket_adlari), key=lambda p: p['self_ms'], reverse=True)
+    return modul_ozeti[:ilk], paket_ozeti[:ilk]
+
+
+def _dagilim(degerler):
+    return {
+        'n': len(degerler),
+        'p50_ms': round(percentile(degerler, 0.5), 1),
+        'p99_ms': round(max(degerler), 1),
+        'min_ms': round(min(degerler), 1),
+    }
+
+
+def profile_startup(calisma=5, izlenen=(), tembel=False, db_yolu=None, ilk=25):
+    # İlk çalışma şemayı oluşturur ve disk önbelleğini ısıtır - sonuçlara katılmaz
+    run_once(izlenen, db_yolu=db_yolu)
+    olcumler = [run_once(izlenen, TEMBEL_MODULLER if tembel else (), db_yolu) for _ in range(calisma)]
+
+    moduller, paketler = summarize_imports(olcumler, ilk)
+    sonuc = {
+        'process': {**_dagilim([o['process_ms'] for o in olcumler]),
+                    'rss_peak_mb': round(percentile([o['rss_mb'] for o in olcumler], 0.5), 1)},
+        'import_app': _dagilim([o['import_ms'] for o in olcumler]),
+        'create_app': _dagilim([o['create_app_ms'] for o in olcumler]),
+        '_scale': {'modules': olcumler[-1]['modules'], 'loaded_at_startup': olcumler[-1]['loaded']},
+        '_modules': moduller,
+        '_packages': paketler,
+    }
+    if tembel:
+        for modul in TEMBEL_MODULLER:
+            sonuc[f'lazy.{modul}'] = {
+                **_dagilim([o['lazy'][modul]['ms'] for o in olcumler]),
+                'rss_peak_mb': round(percentile([o['lazy'][modul]['rss_mb'] for o in olcumler], 0.5), 1),
+            }
+    return sonuc
+
+
+def print_startup(sonuc):
+    print(f"{'aşama':<28} {'p50 ms':>9} {'min ms':>9} {'max ms':>9} {'RSS MB':>8}")
+    for ad, m in sonuc.items():
+        if ad.startswith('_'):
+            continue
+        print(f"{ad:<28} {m['p50_ms']:>9} {m['min_ms']:>9} {m['p99_ms']:>9} {m.get('rss_peak_mb', ''):>8}")
+    print(f"\nYüklenen modül: {sonuc['_scale']['modules']}")
+
+    print(f"\n{'paket':<28} {'self ms':>9} {'modül':>6}")
+    for paket in sonuc['_packages']:
+        print(f"{paket['package']:<28} {paket['self_ms']:>9} {paket['modules']:>6}")
+
+    print(f"\n{'modül (kümülatif)':<48} {'kümülatif ms':>12} {'self ms':>9}")
+    for modul in sonuc['_modules']:
+        print(f"{'  ' * modul['depth'] + modul['module']:<48} {modul['cumulative_ms']:>12} {modul['self_ms']:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Uygulama açılışı ve modül bazında import maliyeti')
+    parser.add_argument('--runs', type=int, default=5, help='Ölçülen açılış sayısı')
+    parser.add_argument('--top', type=int, default=25, help='Listelenen modül / paket sayısı')
+    parser.add_argument('--db', help='Açılışta kullanılacak veritabanı (varsayılan: boş geçici veritabanı)')
+    parser.add_argument('--forbid', default=VARSAYILAN_YASAKLI,
+                        help='Açılışta yüklenmemesi gereken modüller (boş = kontrol yok)')
+    parser.add_argument('--lazy', action='store_true', help='Excel modüllerinin ilk istekteki yükleme maliyetini ölç')
+    parser.add_argument('--json', help='Sonuç dosyası')
+    parser.add_argument('--compare', help='Önceki sonuç dosyasıyla karşılaştır')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    yasakli = [ad.strip() for ad in args.forbid.split(',') if ad.strip()]
+    sonuc = profile_startup(args.runs, yasakli, args.lazy, args.db and os.path.abspath(args.db), args.top)
+    print_startup(sonuc)
+
+    cikis_kodu = 0
+    yuklenen = sonuc['_scale']['loaded_at_startup']
+    if yuklenen:
+        print(f"\nUYARI: açılışta yüklenmemesi gereken modüller yüklendi: {', '.join(yuklenen)}", file=sys.stderr)
+        cikis_kodu = 1
+
+    sonuclar = {'startup': sonuc}
+    meta = {'runs': args.runs, 'lazy': args.lazy}
+    if args.json:
+        veri = write_results(args.json, sonuclar, meta)
+        print(f'\nSonuçlar yazıldı: {args.json}')
+    else:
+        veri = {'meta': meta, 'results': sonuclar}
+    if args.compare:
+        eski = load_results(args.compare)
+        print()
+        if print_comparison(compare(eski, veri, args.threshold), eski.get('meta'), veri.get('meta'),
+                            esik=args.threshold):
+            cikis_kodu = 1
+    return cikis_kodu
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Worker modu karşılaştırması - sync / gthread / gevent worker'larının trafik karışımlarına göre davranışı
+
+Her mod için gunicorn.conf.py ile (GUNICORN_WORKER_CLASS) veri setinin kopyası üzerinde sunucu açılır ve
+aynı sanal kullanıcı sayısıyla üç karışım çalıştırılır:
+- interaktif: arama, stok sorgu, rapor ve stok hareketleri (Excel yok)
+- export_agir: aynı trafiğin yanında sık Excel export / import (saniyeler süren, CPU ağırlıklı istekler)
+- canli: interaktif trafik + /api/events'e bağlı kalan SSE istemcileri (açık sekmeler)
+
+Asıl ölçüt hafif endpoint'lerin (autocomplete, check_stock) p99'udur: ağır ya da uzun süren istekler
+worker / thread yuvalarını tuttuğunda kısa isteklerin ne kadar beklediğini gösterir. SSE istemcileri için
+bağlı kalınan süre oranı ve yeniden bağlanma sayısı raporlanır (sync worker'da akış açık tutulmaz,
+tarayıcı 'retry' süresi sonunda yeniden bağlanır).
+
+Sonuçların yorumu ve önerilen mod: docs/worker_modes.md. gevent kurulu değilse o mod atlanır.
+
+Kullanım:
+    python -m benchmarks.worker_modes --scale small --workers 2 --threads 4 --users 16 --duration 30
+    python -m benchmarks.worker_modes --modes sync,gthread --mixes canli --sse-clients 12 --json modlar.json
+"""
+
+import argparse
+import http.client
+import importlib.util
+import io
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+
+from tools.common import PROJECT_ROOT
+from tools.generate_dataset import build_catalog, write_source_workbook
+
+from .db_bench import SCALES, VARSAYILAN_VERI_KLASORU, dataset_path
+from .load_test import (GunicornSunucusu, Istatistikler, Oturum, Senaryolar, VARSAYILAN_KARISIM, run_load,
+                        _ornek_veriler)
+from .runner import percentile, write_results, load_results, compare, print_comparison
+
+GUNICORN_CONF = os.path.join(PROJECT_ROOT, 'gunicorn.conf.py')
+MODLAR = ('sync', 'gthread', 'gevent')
+# Karışım adı -> (senaryo ağırlık değişiklikleri, SSE istemcisi kullanılır mı)
+KARISIMLAR = {
+    'interaktif': ({'excel_export': 0, 'excel_import': 0}, False),
+    'export_agir': ({'excel_export': 12, 'excel_import': 4}, False),
+    'canli': ({'excel_export': 0, 'excel_import': 0}, True),
+}
+HAFIF_ENDPOINTLER = ('autocomplete', 'check_stock')
+AGIR_ENDPOINTLER = ('excel_export', 'excel_import')
+
+
+def _mod_kullanilabilir(mod):
+    return mod != 'gevent' or importlib.util.find_spec('gevent') is not None
+
+
+def _sse_istemcisi(port, bitis, username, password, sonuc, lock):
+    """Oturum açıp /api/events'i dinle; sunucu akışı kapatırsa 'retry' süresi sonra yeniden bağlan"""
+    oturum = Oturum('127.0.0.1', port, Istatistikler())
+    oturum.istek('login', 'POST', '/login', urlencode({'username': username, 'password': password}),
+                 {'Content-Type': 'application/x-www-form-urlencoded'})
+    oturum.kapat()
+    cerez = '; '.join(f'{k}={v}' for k, v in oturum.cerezler.items())
+
+    bagli = 0.0
+    ilk_olay_sureleri = []
+    yeniden = hata = 0
+    while time.monotonic() < bitis:
+        bekleme = 3.0
+        t0 = time.monotonic()
+        baglanti = None
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=max(0.1, bitis - t0))
+        try:
+            conn.request('GET', '/api/events', headers={'Cookie': cerez, 'Accept': 'text/event-stream'})
+            yanit = conn.getresponse()
+            if yanit.status != 200:
+                hata += 1
+            else:
+                baglanti = time.monotonic()
+                ilk = True
+                for satir in yanit:
+                    if ilk and satir.startswith(b'event:'):
+                        ilk = False
+                        ilk_olay_sureleri.append(time.monotonic() - t0)
+                    elif satir.startswith(b'retry:'):
+                        bekleme = int(satir.split(b':', 1)[1]) / 1000
+        except (OSError, http.client.HTTPException):
+            # Süre dolduğunda okuma zaman aşımıyla kesilir - hata sayılmaz
+            if time.monotonic() < bitis - 0.05:
+                hata += 1
+        finally:
+            if baglanti is not None:
+                bagli += min(time.monotonic(), bitis) - baglanti
+            conn.close()
+        kalan = bitis - time.monotonic()
+        if kalan <= 0:
+            break
+        yeniden += 1
+        time.sleep(min(bekleme, kalan))
+
+    with lock:
+        sonuc['connected_s'] += bagli
+        sonuc['reconnects'] += yeniden
+        sonuc['errors'] += hata
+        sonuc['first_event_s'].extend(ilk_olay_sureleri)
+
+
+def run_sse_clients(port, sayi, sure, username, password):
+    """SSE istemcilerini arka planda başlat; bitince özet veren fonksiyonu döndür"""
+    bitis = time.monotonic() + sure
+    sonuc = {'connected_s': 0.0, 'reconnects': 0, 'errors': 0, 'first_event_s': []}
+    lock = threading.Lock()
+    threadler = [threading.Thread(target=_sse_istemcisi, args=(port, bitis, username, password, sonuc, lock),
+                                  daemon=True) for _ in range(sayi)]
+    for t in threadler:
+        t.start()
+
+    def bekle():
+        for t in threadler:
+            t.join()
+        return {
+            'clients': sayi,
+            'connected_ratio': round(sonuc['connected_s'] / (sayi * sure), 3) if sayi else 0.0,
+            'reconnects': sonuc['reconnects'],
+            'errors': sonuc['errors'],
+            'first_event_p99_ms': round(percentile(sonuc['first_event_s'], 0.99) * 1000, 1),
+        }
+    return bekle
+
+
+def _birlestir(sonuc, endpointler):
+    """Endpoint grubunun toplam isteği ve en kötü p99'u"""
+    olanlar = [sonuc[e] for e in endpointler if e in sonuc]
+    if not olanlar:
+        return None
+    return {
+        'n': sum(m['n'] for m in olanlar),
+        'ops_s': round(sum(m['ops_s'] for m in olanlar), 2),
+        'p50_ms': max(m['p50_ms'] for m in olanlar),
+        'p99_ms': max(m['p99_ms'] for m in olanlar),
+        'error_rate': max(m['error_rate'] for m in olanlar),
+    }
+
+
+def run_mode(db_yolu, mod, karisimlar, args, senaryo_verisi):
+    ornekler, ciftler, excel = senaryo_verisi
+    ortam = {'GUNICORN_WORKER_CLASS': mod, 'GUNICORN_MAX_REQUESTS': '0', 'GUNICORN_LOG_LEVEL': 'warning',
+             'GUNICORN_WORKER_CONNECTIONS': str(args.worker_connections)}
+    threads = args.threads if mod == 'gthread' else 1
+    sonuclar = {}
+    with GunicornSunucusu(db_yolu, args.workers, threads, ('-c', GUNICORN_CONF), ortam) as sunucu:
+        for ad in karisimlar:
+            degisiklikler, sse = KARISIMLAR[ad]
+            karisim = dict(VARSAYILAN_KARISIM, **degisiklikler)
+            senaryolar = Senaryolar(ornekler, ciftler, karisim, excel, args.think_time)
+            print(f'[{mod}/{ad}] {args.users} kullanıcı' + (f' + {args.sse_clients} SSE' if sse else '')
+                  + f', {args.duration:g} sn', file=sys.stderr)
+            sse_bekle = run_sse_clients(sunucu.port, args.sse_clients, args.duration, args.username,
+                                        args.password) if sse else None
+            yuk = run_load('127.0.0.1', sunucu.port, senaryolar, args.users, args.duration, args.username,
+                           args.password)
+            sonuc = {'total': yuk['_total']}
+            for grup, endpointler in (('light', HAFIF_ENDPOINTLER), ('heavy', AGIR_ENDPOINTLER)):
+                ozet = _birlestir(yuk, endpointler)
+                if ozet:
+                    sonuc[grup] = ozet
+            if sse_bekle:
+                sonuc['sse'] = sse_bekle()
+            sonuclar[f'{mod}/{ad}'] = sonuc
+    return sonuclar
+
+
+def print_mode_results(sonuclar):
+    print(f"\n{'mod/karışım':<22} {'req/s':>8} {'hata %':>7} {'hafif p50':>10} {'hafif p99':>10} {'ağır p99':>9} "
+          f"{'SSE bağlı':>10} {'SSE yen.':>9}")
+    for ad, s in sonuclar.items():
+        t, hafif = s['total'], s.get('light', {})
+        agir = s.get('heavy', {}).get('p99_ms', '-')
+        sse = s.get('sse')
+        print(f"{ad:<22} {t['ops_s']:>8} {t['error_rate'] * 100:>7.2f} {hafif.get('p50_ms', '-'):>10} "
+              f"{hafif.get('p99_ms', '-'):>10} {agir:>9} "
+              f"{(str(round(sse['connected_ratio'] * 100)) + ' %') if sse else '-':>10} "
+              f"{sse['reconnects'] if sse else '-':>9}")
+    print('(hafif = autocomplete + check_stock, ağır = Excel export / import; gecikmeler ms, grup içinde en kötüsü)')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='sync / gthread / gevent worker modlarını trafik karışımlarıyla karşılaştır')
+    parser.add_argument('--scale', default='small', choices=list(SCALES))
+    parser.add_argument('--modes', default=','.join(MODLAR), help=f"Modlar: {', '.join(MODLAR)}")
+    parser.add_argument('--mixes', default=','.join(KARISIMLAR), help=f"Karışımlar: {', '.join(KARISIMLAR)}")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4, help='gthread modunda worker başına thread')
+    parser.add_argument('--worker-connections', type=int, default=100, help='gevent modunda worker başına bağlantı')
+    parser.add_argument('--users', type=int, default=16)
+    parser.add_argument('--sse-clients', type=int, default=8, help='canli karışımında açık SSE bağlantısı')
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--think-time', type=float, default=0.2)
+    parser.add_argument('--import-rows', type=int, default=200)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--data-dir', default=VARSAYILAN_VERI_KLASORU)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='Sonuç dosyası')
+    parser.add_argument('--compare', help='Önceki sonuç dosyasıyla karşılaştır')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    modlar = [m.strip() for m in args.modes.split(',') if m.strip()]
+    karisimlar = [k.strip() for k in args.mixes.split(',') if k.strip()]
+    bilinmeyen = [m for m in modlar if m not in MODLAR] + [k for k in karisimlar if k not in KARISIMLAR]
+    if bilinmeyen:
+        parser.error(f"Bilinmeyen mod / karışım: {', '.join(bilinmeyen)}")
+
+    db_yolu = dataset_path(args.data_dir, args.scale, args.seed)
+    ornekler, ciftler = _ornek_veriler(db_yolu)
+    katalog = build_catalog(SCALES[args.scale]['products'])
+    excel = io.BytesIO()
+    write_source_workbook(excel, katalog, min(args.import_rows, len(katalog)))
+
+    sonuclar = {}
+    for mod in modlar:
+        if not _mod_kullanilabilir(mod):
+            print(f'[{mod}] atlandı: gevent kurulu değil (pip install gevent)', file=sys.stderr)
+            continue
+        sonuclar.update(run_mode(db_yolu, mod, karisimlar, args, (ornekler, ciftler, excel.getvalue())))
+    print_mode_results(sonuclar)
+
+    meta = {'scale': args.scale, 'workers': args.workers, 'threads': args.threads, 'users': args.users,
+            'sse_clients': args.sse_clients, 'duration': args.duration, 'think_time': args.think_time}
+    if args.json:
+        veri = write_results(args.json, sonuclar, meta)
+        print(f'\nSonuçlar yazıldı: {args.json}')
+    else:
+        veri = {'meta': meta, 'results': sonuclar}
+    if args.compare:
+        eski = load_results(args.compare)
+        print()
+        gerilemeler = print_comparison(compare(eski, veri, args.threshold), eski.get('meta'), veri.get('meta'),
+                                       esik=args.threshold)
+        return 1 if gerilemeler else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Gunicorn üretim ayarları - preload + fork öncesi ısındırma
+
+    gunicorn -c gunicorn.conf.py app:app
+
+- Uygulama master'da bir kez oluşturulur (create_app, init_db, blueprint importları) ve utils.preload.warm_up
+  ile ısındırılır; worker'lar fork ile bu belleği copy-on-write paylaşır. gc.freeze() GC'nin paylaşılan
+  nesnelere dokunup sayfaları kopyalamasını engeller.
+- Worker'lar GUNICORN_MAX_REQUESTS (+ jitter) istekte veya RSS GUNICORN_MAX_WORKER_RSS_MB'ı aşınca
+  mevcut isteği bitirip yeniden başlatılır.
+- Kesintisiz yeniden başlatma: `kill -HUP <master>` ayarları yeniden okuyup worker'ları sırayla yeniler.
+  preload açıkken HUP yeni kodu yüklemez; kod güncellemesi için `kill -USR2 <master>` (yeni master
+  aynı soketle açılır), yeni worker'lar hazır olunca eski master'a `kill -WINCH` ve `kill -QUIT`.
+- Worker türü GUNICORN_WORKER_CLASS ile seçilir (GUNICORN_THREADS > 1 ise varsayılan gthread);
+  SQLite bağlantıları her modda süreç içi havuzdan istek başına alınır (utils.database.ConnectionPool).
+- Açılış süresi, master RSS'i ve her worker'ın RSS / PSS / paylaşılan bellek değeri loglanır
+  (ayrıntılı karşılaştırma: python -m benchmarks.preload_report).
+"""
+
+import gc
+import logging
+import os
+import time
+
+_baslangic = time.monotonic()
+
+
+def _env_int(ad, varsayilan):
+    return int(os.environ.get(ad, varsayilan))
+
+
+def _env_bool(ad, varsayilan):
+    return os.environ.get(ad, '1' if varsayilan else '0').lower() not in ('0', 'false', 'no', '')
+
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = _env_int('WEB_CONCURRENCY', 2)
+threads = _env_int('GUNICORN_THREADS', 1)
+# sync, gthread veya gevent - hangi trafik için hangisi: docs/worker_modes.md
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 100)
+timeout = _env_int('GUNICORN_TIMEOUT', 120)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = 5
+preload_app = _env_bool('GUNICORN_PRELOAD', True)
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 200)
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+if worker_class == 'gevent' and preload_app:
+    # Uygulama master'da yükleneceği için socket / threading / time modülleri ondan önce yamalanmalı
+    from gevent import monkey
+    monkey.patch_all()
+
+# Worker RSS sınırı (0 = kapalı) ve kaç istekte bir kontrol edileceği
+MAX_WORKER_RSS_MB = _env_int('GUNICORN_MAX_WORKER_RSS_MB', 512)
+RSS_CHECK_EVERY = _env_int('GUNICORN_RSS_CHECK_EVERY', 20)
+# Isındırmada ağır modüller (pandas / numpy / openpyxl) yüklensin mi
+PRELOAD_HEAVY_MODULES = _env_bool('PRELOAD_HEAVY_MODULES', True)
+
+logger = logging.getLogger('gunicorn.error')
+
+
+def _bellek_metni(pid='self'):
+    from utils.memory_diagnostics import process_memory, rss_mb
+    bellek = process_memory(pid)
+    if bellek is None:
+        return f'RSS {rss_mb():.1f} MB'
+    return (f"RSS {bellek['rss_mb']} MB, PSS {bellek['pss_mb']} MB, paylaşılan {bellek['shared_mb']} MB, "
+            f"özel {bellek['private_mb']} MB")
+
+
+def when_ready(server):
+    """Master hazır, worker'lar henüz fork edilmedi - preload'da ısındır ve GC nesnelerini dondur"""
+    if server.cfg.preload_app:
+        from utils.preload import warm_up
+        warm_up(server.app.wsgi(), heavy_modules=PRELOAD_HEAVY_MODULES)
+        gc.collect()
+        gc.freeze()
+    server.log.info(f"Master hazır: {time.monotonic() - _baslangic:.2f} s, {_bellek_metni()} "
+                    f"(preload={'açık' if server.cfg.preload_app else 'kapalı'}, dondurulan nesne {gc.get_freeze_count()})")
+
+
+def post_fork(server, worker):
+    worker._fork_zamani = time.monotonic()
+    worker._istek_sayisi = 0
+
+
+def post_worker_init(worker):
+    # Kabul kontrolü hafif API'lere ayrılan yuvaları gerçek worker x thread sayısından hesaplar
+    # (gevent'te ağır istekler hub'ı bloke ettiği için worker başına tek yuva sayılır)
+    from utils.admission import set_admission_capacity
+    cfg = worker.cfg
+    set_admission_capacity(cfg.workers * (cfg.threads if cfg.worker_class_str == 'gthread' else 1))
+    # Açık tutulan SSE akışları thread'lerin en fazla yarısını kullanır (gevent'te bağlantı sınırı)
+    if not os.environ.get('SSE_MAX_HELD_STREAMS'):
+        from utils.change_events import set_sse_stream_limit
+        if cfg.worker_class_str in ('gevent', 'eventlet'):
+            set_sse_stream_limit(cfg.worker_connections)
+        else:
+            set_sse_stream_limit(max(1, cfg.threads // 2))
+    worker.log.info(f"Worker {worker.pid} hazır: {time.monotonic() - worker._fork_zamani:.2f} s, {_bellek_metni()}")
+
+
+def post_request(worker, req, environ, resp):
+    """Her RSS_CHECK_EVERY istekte RSS'i kontrol et; sınır aşıldıysa worker isteği bitirip kapanır"""
+    if not MAX_WORKER_RSS_MB:
+        return
+    worker._istek_sayisi += 1
+    if worker._istek_sayisi % RSS_CHECK_EVERY:
+        return
+    from utils.memory_diagnostics import rss_mb
+    rss = rss_mb()
+    if rss > MAX_WORKER_RSS_MB and worker.alive:
+        worker.log.warning(f"Worker {worker.pid} RSS {rss:.1f} MB > {MAX_WORKER_RSS_MB} MB, "
+                           f"{worker._istek_sayisi} istekten sonra yeniden başlatılıyor")
+        worker.alive = False
+
+
+def worker_exit(server, worker):
+    server.log.info(f"Worker {worker.pid} kapandı ({getattr(worker, '_istek_sayisi', 0)} istek)")
@@ -1,11 +1,32 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, session, make_response
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, session,
+                   make_response, Response, stream_with_context, send_file)
 from utils.database import (get_db_connection, create_stok_hareketi, stok_giris, 
                             stok_cikis, stok_transfer, get_all_locations_for_product,
-                            get_product_stock_summary, get_urun_rezervasyon_notu)
-from utils.excel_processor import ExcelProcessor, DatabaseImporter
-from utils.auth import UserManager, login_required, admin_required, get_current_user, is_admin, can_access_page
+                            get_product_stock_summary, get_urun_rezervasyon_notu,
+                            get_urun_rezervasyon_notlari_toplu, get_stoklar_toplu,
+                            get_urun_konumlari_toplu, get_son_olay_id)
+from utils.auth import (UserManager, login_required, admin_required, api_token_required, get_current_user,
+                        is_admin, can_access_page)
+from utils.http_cache import conditional_get
+from utils.fragment_cache import get_fragment_cache_stats
+from utils.change_events import sse_response, build_change_batch, CursorExpiredError
+from utils.bulk_movements import toplu_hareket_akisi
+from utils.metrics import collect_metrics, render_prometheus
+from utils.sql_profiler import get_top_queries, get_slow_queries, get_profiler_settings, reset_sql_profile
+from utils.request_profiler import (list_profiles, load_profile, profile_path, clear_profiles,
+                                    get_request_profiler_settings)
+from utils.memory_diagnostics import (get_memory_status, get_request_memory_stats, reset_request_memory_stats,
+                                      start_tracing, stop_tracing, take_snapshot, list_snapshots,
+                                      load_snapshot_info, snapshot_top, diff_snapshots, clear_snapshots,
+                                      object_census)
+from utils.admission import (admission_control, admitted, AdmissionRejected, get_admission_status,
+                             render_admission_prometheus)
+from utils.logging_setup import get_logging_stats, render_logging_prometheus
+from utils.single_flight import single_flight
+import io
 import os
 import logging
+import threading
 import unicodedata
 
 logger = logging.getLogger(__name__)
@@ -41,13 +62,20 @@ def normalize_turkish_text(text):
 # Initialize UserManager
 user_manager = None
 
+_user_manager_lock = threading.Lock()
+
 def init_user_manager():
     """Initialize user manager with database connection"""
     global user_manager
-    if user_manager is None:
-        from utils.database import DatabaseManager
-        db_manager = DatabaseManager()
-        user_manager = UserManager(db_manager)
+    if user_manager is not None:
+        return
+    # gthread / gevent worker'larında ilk istekler aynı anda gelebilir
+    with _user_manager_lock:
+        if user_manager is None:
+            from utils.database import DatabaseManager, migrate_legacy_users
+            db_path = current_app.config['DATABASE_PATH']
+            migrate_legacy_users(db_path)
+            user_manager = UserManager(DatabaseManager(db_path))
 
 @main_bp.route('/login', methods=['GET', 'POST'])
 def login():
@@ -142,6 +170,96 @@ def welcome():
     """Hoş geldin sayfası - Rigel logosu ile"""
     return render_template('welcome.html')
 
+def get_dashboard_data(db):
+    """Dashboard istatistik ve widget verileri"""
+    # İstatistikleri hesapla
+    stats = {}
+    
+    # Toplam ürün çeşidi
+    result = db.execute('SELECT COUNT(DISTINCT urun_kodu) as count FROM stoklar').fetchone()
+    stats['total_products'] = result['count'] if result else 0
+    
+    # Toplam adet
+    result = db.execute('SELECT SUM(adet) as total FROM stoklar').fetchone()
+    stats['total_quantity'] = result['total'] if result and result['total'] else 0
+    
+    # Toplam ağırlık
+    result = db.execute('SELECT SUM(toplam_kg) as total FROM stoklar').fetchone()
+    stats['total_weight'] = result['total'] if result and result['total'] else 0
+    
+    # Konum sayısı
+    result = db.execute('SELECT COUNT(DISTINCT konum) as count FROM stoklar WHERE konum IS NOT NULL').fetchone()
+    stats['total_locations'] = result['count'] if result else 0
+    
+    # Son hareketler (son 10)
+    recent_movements = db.execute('''
+        SELECT DISTINCT h.id, h.urun_kodu, h.hareket_tipi, h.miktar, 
+               h.onceki_miktar, h.yeni_miktar, h.konum, h.aciklama, 
+               h.kullanici, h.tarih,
+               (SELECT s2.urun_adi FROM stoklar s2 WHERE s2.urun_kodu = h.urun_kodu LIMIT 1) as urun_adi
+        FROM stok_hareketleri h
+        ORDER BY h.tarih DESC 
+        LIMIT 10
+    ''').fetchall()
+    
+    # Kritik stok uyarıları (her ürün için özel sınır)
+    low_stock_items = db.execute('''
+        SELECT urun_kodu, urun_adi, konum, adet, kritik_stok_siniri
+        FROM stoklar 
+        WHERE adet <= kritik_stok_siniri AND adet > 0
+        ORDER BY (CAST(adet AS FLOAT) / NULLIF(kritik_stok_siniri, 0)) ASC, adet ASC
+        LIMIT 10
+    ''').fetchall()
+    
+    # En çok stok bulunan konumlar
+    top_locations = db.execute('''
+        SELECT konum, 
+               COUNT(DISTINCT urun_kodu) as urun_cesidi,
+               SUM(adet) as toplam_adet,
+               SUM(toplam_kg) as toplam_agirlik
+        FROM stoklar 
+        WHERE konum IS NOT NULL AND adet > 0
+        GROUP BY konum
+        ORDER BY toplam_adet DESC
+        LIMIT 8
+    ''').fetchall()
+    
+    # En çok stoku olan ürünler (4 adet)
+    top_products = db.execute('''
+        SELECT urun_kodu, urun_adi,
+               SUM(adet) as toplam_adet,
+               COUNT(DISTINCT konum) as konum_sayisi,
+               SUM(toplam_kg) as toplam_agirlik
+        FROM stoklar 
+        WHERE adet > 0
+        GROUP BY urun_kodu, urun_adi
+        ORDER BY toplam_adet DESC
+        LIMIT 4
+    ''').fetchall()
+    
+    # Stoğu azalan ürünler (kritik stok sınırına yakın olanlar)
+    low_stock_products = db.execute('''
+        SELECT urun_kodu, urun_adi, konum, adet, kritik_stok_siniri,
+               CASE 
+                   WHEN kritik_stok_siniri > 0 THEN ROUND((CAST(adet AS FLOAT) / kritik_stok_siniri) * 100, 1)
+                   ELSE 100.0
+               END as stok_yuzde
+        FROM stoklar 
+        WHERE adet > 0 AND adet <= (kritik_stok_siniri * 1.5)
+        ORDER BY stok_yuzde ASC, adet ASC
+        LIMIT 8
+    ''').fetchall()
+
+    # Sonuç single-flight ile worker'lar arasında paylaşılır - satırlar dict olmalı
+    return {
+        'stats': stats,
+        'recent_movements': [dict(row) for row in recent_movements],
+        'low_stock_items': [dict(row) for row in low_stock_items],
+        'top_locations': [dict(row) for row in top_locations],
+        'top_products': [dict(row) for row in top_products],
+        'low_stock_products': [dict(row) for row in low_stock_products]
+    }
+
 @main_bp.route('/')
 def dashboard():
     """Ana sayfa - Dashboard"""
@@ -156,91 +274,13 @@ def dashboard():
     try:
         db = get_db_connection()
         
-        # İstatistikleri hesapla
-        stats = {}
-        
-        # Toplam ürün çeşidi
-        result = db.execute('SELECT COUNT(DISTINCT urun_kodu) as count FROM stoklar').fetchone()
-        stats['total_products'] = result['count'] if result else 0
-        
-        # Toplam adet
-        result = db.execute('SELECT SUM(adet) as total FROM stoklar').fetchone()
-        stats['total_quantity'] = result['total'] if result and result['total'] else 0
-        
-        # Toplam ağırlık
-        result = db.execute('SELECT SUM(toplam_kg) as total FROM stoklar').fetchone()
-        stats['total_weight'] = result['total'] if result and result['total'] else 0
-        
-        # Konum sayısı
-        result = db.execute('SELECT COUNT(DISTINCT konum) as count FROM stoklar WHERE konum IS NOT NULL').fetchone()
-        stats['total_locations'] = result['count'] if result else 0
-        
-        # Son hareketler (son 10)
-        recent_movements = db.execute('''
-            SELECT DISTINCT h.id, h.urun_kodu, h.hareket_tipi, h.miktar, 
-                   h.onceki_miktar, h.yeni_miktar, h.konum, h.aciklama, 
-                   h.kullanici, h.tarih,
-                   (SELECT s2.urun_adi FROM stoklar s2 WHERE s2.urun_kodu = h.urun_kodu LIMIT 1) as urun_adi
-            FROM stok_hareketleri h
-            ORDER BY h.tarih DESC 
-            LIMIT 10
-        ''').fetchall()
-        
-        # Kritik stok uyarıları (her ürün için özel sınır)
-        low_stock_items = db.execute('''
-            SELECT urun_kodu, urun_adi, konum, adet, kritik_stok_siniri
-            FROM stoklar 
-            WHERE adet <= kritik_stok_siniri AND adet > 0
-            ORDER BY (CAST(adet AS FLOAT) / NULLIF(kritik_stok_siniri, 0)) ASC, adet ASC
-            LIMIT 10
-        ''').fetchall()
-        
-        # En çok stok bulunan konumlar
-        top_locations = db.execute('''
-            SELECT konum, 
-                   COUNT(DISTINCT urun_kodu) as urun_cesidi,
-                   SUM(adet) as toplam_adet,
-                   SUM(toplam_kg) as toplam_agirlik
-            FROM stoklar 
-            WHERE konum IS NOT NULL AND adet > 0
-            GROUP BY konum
-            ORDER BY toplam_adet DESC
-            LIMIT 8
-        ''').fetchall()
-        
-        # En çok stoku olan ürünler (4 adet)
-        top_products = db.execute('''
-            SELECT urun_kodu, urun_adi,
-                   SUM(adet) as toplam_adet,
-                   COUNT(DISTINCT konum) as konum_sayisi,
-                   SUM(toplam_kg) as toplam_agirlik
-            FROM stoklar 
-            WHERE adet > 0
-            GROUP BY urun_kodu, urun_adi
-            ORDER BY toplam_adet DESC
-            LIMIT 4
-        ''').fetchall()
-        
-        # Stoğu azalan ürünler (kritik stok sınırına yakın olanlar)
-        low_stock_products = db.execute('''
-            SELECT urun_kodu, urun_adi, konum, adet, kritik_stok_siniri,
-                   CASE 
-                       WHEN kritik_stok_siniri > 0 THEN ROUND((CAST(adet AS FLOAT) / kritik_stok_siniri) * 100, 1)
-                       ELSE 100.0
-                   END as stok_yuzde
-            FROM stoklar 
-            WHERE adet > 0 AND adet <= (kritik_stok_siniri * 1.5)
-            ORDER BY stok_yuzde ASC, adet ASC
-            LIMIT 8
-        ''').fetchall()
+        # Canlı güncellemeler bu olaydan sonrasını dinler (sorgulardan önce alınır)
+        last_event_id = get_son_olay_id()
+        dashboard_data = single_flight('dashboard', {}, lambda: get_dashboard_data(db))
         
         return render_template('index.html', 
-                             stats=stats, 
-                             recent_movements=recent_movements,
-                             low_stock_items=low_stock_items,
-                             top_locations=top_locations,
-                             top_products=top_products,
-                             low_stock_products=low_stock_products)
+                             last_event_id=last_event_id,
+                             **dashboard_data)
     
     except Exception as e:
         logger.error(f"Dashboard error: {str(e)}")
@@ -248,12 +288,69 @@ def dashboard():
         return render_template('index.html', stats={}, recent_movements=[], 
                              low_stock_items=[], top_locations=[], top_products=[], low_stock_products=[])
 
+@main_bp.route('/api/dashboard/widgets')
+@admin_required
+@conditional_get
+def api_dashboard_widgets():
+    """Dashboard widget'larını yeniden render et (canlı güncelleme)"""
+    try:
+        db = get_db_connection()
+        html = render_template('partials/dashboard_widgets.html',
+                               **single_flight('dashboard', {}, lambda: get_dashboard_data(db)))
+        return jsonify({'success': True, 'html': html})
+    except Exception as e:
+        logger.error(f"Dashboard widgets API error: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+LIVE_ROWS_LIMIT = 200
+
+def _read_live_row_keys(fields):
+    """Canlı satır güncelleme isteklerinden anahtar listesini oku
+
+    Dönüş: (anahtarlar, hata yanıtı) - hata yoksa ikincisi None
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({'success': False, 'message': 'Anahtar listesi gereklidir'}), 400)
+    if len(items) > LIVE_ROWS_LIMIT:
+        return None, (jsonify({'success': False, 'message': f'En fazla {LIVE_ROWS_LIMIT} satır istenebilir'}), 400)
+
+    anahtarlar = []
+    for item in items:
+        if not isinstance(item, dict):
+            item = {}
+        anahtar = tuple(str(item.get(field) or '').strip() for field in fields)
+        if anahtar[0]:
+            anahtarlar.append(anahtar)
+    return list(dict.fromkeys(anahtarlar)), None
+
+STOCK_LIST_COLUMNS = ('urun_kodu', 'urun_adi', 'renk', 'sistem_seri', 'uzunluk', 'mt_kg', 'boy_kg',
+                      'adet', 'toplam_kg', 'konum', 'kritik_stok_siniri')
+
+def attach_stock_list_reservations(stocks):
+    """Stok listesi satırlarına ürün bazlı rezervasyon notlarını (tek sorguda) ekle"""
+    notlar = get_urun_rezervasyon_notlari_toplu((stock['urun_kodu'], stock['renk']) for stock in stocks)
+    stocks_with_reservations = []
+    for stock in stocks:
+        stock_dict = {column: stock[column] for column in STOCK_LIST_COLUMNS}
+        rezervasyon_notu = notlar.get((stock['urun_kodu'], stock['renk'] or ''))
+        stock_dict['rezervasyon_notu'] = rezervasyon_notu
+        
+        # Rezervasyon olup olmadığını kontrol et
+        stock_dict['has_reservations'] = rezervasyon_notu is not None and rezervasyon_notu.strip() != ''
+        stocks_with_reservations.append(stock_dict)
+    return stocks_with_reservations
+
 @main_bp.route('/stock-list')
 @admin_required
+@conditional_get
 def stock_list():
     """Stok listesi sayfası"""
     try:
         db = get_db_connection()
+        # Canlı güncellemeler bu olaydan sonrasını dinler (sorgulardan önce alınır)
+        last_event_id = get_son_olay_id()
         page = request.args.get('page', 1, type=int)
         per_page = 50
         offset = (page - 1) * per_page
@@ -366,20 +463,8 @@ def stock_list():
         # Sayfalama uygula
         stocks = all_stocks[offset:offset + per_page]
         
-        # Her bir stok kaydı için ürün bazlı rezervasyon notunu al
-        stocks_with_reservations = []
-        for stock in stocks:
-            stock_dict = dict(stock)
-            # Ürün bazlı rezervasyon notunu al
-            rezervasyon_notu = get_urun_rezervasyon_notu(stock['urun_kodu'], stock['renk'] if stock['renk'] else None)
-            stock_dict['rezervasyon_notu'] = rezervasyon_notu
-            
-            # Rezervasyon olup olmadığını kontrol et
-            stock_dict['has_reservations'] = rezervasyon_notu is not None and rezervasyon_notu.strip() != ''
-            
-            logger.info(f"Stock {stock['urun_kodu']} with color {stock['renk']}: reservation note = '{rezervasyon_notu}'")
-            
-            stocks_with_reservations.append(stock_dict)
+        # Sayfadaki stok kayıtları için ürün bazlı rezervasyon notlarını al
+        stocks_with_reservations = attach_stock_list_reservations(stocks)
         
         # Filtre seçenekleri
         locations = db.execute('SELECT DISTINCT konum FROM stoklar WHERE konum IS NOT NULL ORDER BY konum').fetchall()
@@ -402,7 +487,8 @@ def stock_list():
         stats['total_weight'] = total_weight_sum
         
         # Debug: Veri sayılarını logla
-        logger.info(f"Stock list debug - all_stocks: {len(all_stocks)}, stocks: {len(stocks)}, stocks_with_reservations: {len(stocks_with_reservations)}")
+        logger.debug("Stock list - all_stocks: %d, stocks: %d, stocks_with_reservations: %d",
+                     len(all_stocks), len(stocks), len(stocks_with_reservations))
         
         # Sayfalama bilgileri
         has_prev = page > 1
@@ -428,14 +514,48 @@ def stock_list():
                              sistem_seri=sistem_seri,
                              sort_by=sort_by,
                              sort_order=sort_order,
-                             stats=stats)
+                             stats=stats,
+                             last_event_id=last_event_id)
     
     except Exception as e:
         logger.error(f"Stock list error: {str(e)}")
         flash(f'Stok listesi yüklenirken hata oluştu: {str(e)}', 'error')
         return render_template('stock_list.html', stocks=[], total=0, stats={})
 
+@main_bp.route('/api/stock-list/rows', methods=['POST'])
+@admin_required
+def api_stock_list_rows():
+    """Değişen stok kayıtlarının liste satırlarını yeniden render et (canlı güncelleme)
+
+    Gövde: {"items": [{"urun_kodu": "...", "renk": "...", "konum": "..."}, ...]}
+    Artık bulunmayan kayıtlar için html null döner.
+    """
+    try:
+        anahtarlar, error = _read_live_row_keys(('urun_kodu', 'renk', 'konum'))
+        if error:
+            return error
+
+        stoklar = get_stoklar_toplu(anahtarlar)
+        bulunanlar = [stock for stock in stoklar if stock is not None]
+        stock_dicts = iter(attach_stock_list_reservations(bulunanlar))
+
+        results = []
+        for (urun_kodu, renk, konum), stock in zip(anahtarlar, stoklar):
+            results.append({
+                'urun_kodu': urun_kodu,
+                'renk': renk,
+                'konum': konum,
+                'html': render_template('partials/stock_list_rows.html',
+                                        stocks=[next(stock_dicts)]) if stock is not None else None
+            })
+        return jsonify({'success': True, 'results': results})
+
+    except Exception as e:
+        logger.error(f"Stock list rows API error: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @main_bp.route('/excel-import', methods=['GET', 'POST'])
+@admission_control('import', lambda: request.method == 'POST')
 def excel_import():
     """Excel import sayfası"""
     if request.method == 'GET':
@@ -461,7 +581,8 @@ def excel_import():
         filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
         file.save(filepath)
         
-        # Excel işleme
+        # Excel işleme - pandas/numpy sadece import sırasında yüklenir (worker açılışını ve belleğini hafifletir)
+        from utils.excel_processor import ExcelProcessor, DatabaseImporter
         processor = ExcelProcessor()
         data, errors, stats = processor.process_excel_file(filepath, '3')
         
@@ -719,6 +840,74 @@ def api_check_stock():
             'message': f'Hata: {str(e)}'
         })
 
+STOCK_CHECK_BATCH_LIMIT = 200
+
+@main_bp.route('/api/check-stock/batch', methods=['POST'])
+@login_required
+def api_check_stock_batch():
+    """Toplu stok kontrol API - birden çok (urun_kodu, renk, konum) tek sorguda
+
+    Gövde: {"items": [{"urun_kodu": "...", "renk": "...", "konum": "..."}, ...]}
+    Sonuçlar istek sırasıyla döner; her biri /api/check-stock yanıtıyla aynı 'stock' alanını taşır.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('items')
+
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                'success': False,
+                'message': 'Kontrol edilecek ürün listesi gereklidir'
+            }), 400
+        if len(items) > STOCK_CHECK_BATCH_LIMIT:
+            return jsonify({
+                'success': False,
+                'message': f'En fazla {STOCK_CHECK_BATCH_LIMIT} kayıt kontrol edilebilir'
+            }), 400
+
+        anahtarlar = []
+        for item in items:
+            if not isinstance(item, dict):
+                item = {}
+            anahtarlar.append((
+                str(item.get('urun_kodu') or '').strip(),
+                str(item.get('renk') or '').strip(),
+                str(item.get('konum') or '').strip()
+            ))
+
+        # Ürün kodu veya konumu eksik olanlar sorguya gönderilmez
+        gecerli = [i for i, (urun_kodu, _renk, konum) in enumerate(anahtarlar) if urun_kodu and konum]
+        stoklar = get_stoklar_toplu([anahtarlar[i] for i in gecerli])
+        stok_by_index = dict(zip(gecerli, stoklar))
+
+        results = []
+        for i, (urun_kodu, renk, konum) in enumerate(anahtarlar):
+            stock = stok_by_index.get(i)
+            result = {
+                'urun_kodu': urun_kodu,
+                'renk': renk,
+                'konum': konum,
+                'success': stock is not None,
+                'stock': dict(stock) if stock is not None else None
+            }
+            if i not in stok_by_index:
+                result['message'] = 'Ürün kodu ve konum gereklidir'
+            elif stock is None:
+                result['message'] = 'Bu kombinasyon için stok bulunamadı'
+            results.append(result)
+
+        return jsonify({
+            'success': True,
+            'results': results
+        })
+
+    except Exception as e:
+        logger.error(f"Batch stock check API error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'Hata: {str(e)}'
+        }), 500
+
 @main_bp.route('/stock-exit', methods=['GET', 'POST'])
 @admin_required
 def stock_exit():
@@ -897,6 +1086,7 @@ def stock_transfer():
         return redirect(request.url)
 
 @main_bp.route('/api/stock-detail')
+@conditional_get
 def api_stock_detail():
     """Stok detay API endpoint"""
     try:
@@ -983,84 +1173,168 @@ def api_stock_detail():
 def locations():
     return render_template('placeholder.html', title='Konumlar', message='Bu özellik sonraki görevlerde eklenecektir.')
 
-@main_bp.route('/stock-report')
-@login_required
-def stock_report():
-    """Detaylı stok raporu - ürün bazında tüm konum dağılımları"""
-    # Kullanıcı rol bilgisini al
-    current_user = get_current_user()
-    user_is_admin = is_admin()
-    try:
-        db = get_db_connection()
-        
-        # Arama parametreleri
-        search = request.args.get('search', '').strip()
-        color_filter = request.args.get('color', '').strip()
-        sistem_seri_filter = request.args.get('sistem_seri', '').strip()  # Add sistem seri filter
-        
-        # Sıralama parametreleri
-        sort_by = request.args.get('sort_by', 'urun_kodu')
-        sort_order = request.args.get('sort_order', 'asc')
-        
-        # Geçerli sıralama kolonları
-        valid_sort_columns = {
-            'urun_kodu': 'urun_kodu',
-            'urun_adi': 'urun_adi',
-            'renk': 'renk',
-            'sistem_seri': 'sistem_seri',
-            'toplam_adet': 'toplam_adet',
-            'toplam_agirlik': 'toplam_agirlik'
+STOCK_REPORT_PAGE_SIZE = 100
+STOCK_REPORT_MAX_PAGE_SIZE = 200
+
+# Rapor sıralama kolonları (gruplanmış sorgu üzerindeki ifadeler)
+STOCK_REPORT_SORT_COLUMNS = {
+    'urun_kodu': 'urun_kodu',
+    'urun_adi': 'urun_adi',
+    'renk': "COALESCE(renk, '')",
+    'sistem_seri': "COALESCE(sistem_seri, '')",
+    'toplam_adet': 'toplam_adet',
+    'toplam_agirlik': 'toplam_agirlik'
+}
+
+def get_stock_report_params():
+    """Stok raporu filtre/sıralama/sayfa parametrelerini oku ve doğrula"""
+    sort_by = request.args.get('sort_by', 'urun_kodu')
+    sort_order = request.args.get('sort_order', 'asc')
+    if sort_by not in STOCK_REPORT_SORT_COLUMNS:
+        sort_by = 'urun_kodu'
+    if sort_order not in ['asc', 'desc']:
+        sort_order = 'asc'
+
+    page = request.args.get('page', 1, type=int) or 1
+    per_page = request.args.get('per_page', STOCK_REPORT_PAGE_SIZE, type=int) or STOCK_REPORT_PAGE_SIZE
+
+    return {
+        'search': request.args.get('search', '').strip(),
+        'color_filter': request.args.get('color', '').strip(),
+        'sistem_seri_filter': request.args.get('sistem_seri', '').strip(),
+        'sort_by': sort_by,
+        'sort_order': sort_order,
+        'page': max(page, 1),
+        'per_page': min(max(per_page, 1), STOCK_REPORT_MAX_PAGE_SIZE)
+    }
+
+def build_stock_report_page(db, search='', color_filter='', sistem_seri_filter='',
+                            sort_by='urun_kodu', sort_order='asc', page=1, per_page=STOCK_REPORT_PAGE_SIZE):
+    """Ürün bazında gruplanmış stok raporunun tek bir sayfasını getir
+
+    Gruplama, filtreleme, sıralama ve sayfalama SQLite'ta yapılır; Python'a sadece
+    istenen sayfadaki ürünler ve onların konum satırları gelir.
+    Dönüş: (products, stats, pagination)
+    """
+    # Türkçe karakter duyarsız arama için Python normalizasyonu SQL'de kullanılır
+    db.create_function('normalize_tr', 1, normalize_turkish_text, deterministic=True)
+
+    # Ürün/renk bazında grupla - urun_adi, sistem_seri, uzunluk, mt_kg ilk konumdaki satırdan gelir
+    grouped_where = ['adet > 0']
+    params = []
+    if color_filter:
+        grouped_where.append('renk = ?')
+        params.append(color_filter)
+
+    filters = ['sira = 1']
+    if search:
+        search_normalized = normalize_turkish_text(search)
+        filters.append('(instr(normalize_tr(urun_kodu), ?) > 0 OR instr(normalize_tr(urun_adi), ?) > 0)')
+        params.extend([search_normalized, search_normalized])
+    if sistem_seri_filter:
+        # Sistem seri alanında tam eşleşme veya ürün adında kısmi eşleşme
+        filters.append('(sistem_seri = ? OR instr(normalize_tr(urun_adi), ?) > 0)')
+        params.extend([sistem_seri_filter, normalize_turkish_text(sistem_seri_filter)])
+
+    filtered_cte = f'''
+        WITH grouped AS (
+            SELECT
+                urun_kodu,
+                renk,
+                urun_adi,
+                sistem_seri,
+                uzunluk,
+                mt_kg,
+                SUM(adet) OVER urun as toplam_adet,
+                SUM(toplam_kg) OVER urun as toplam_agirlik,
+                MIN(kritik_stok_siniri) OVER urun as min_kritik_sinir,
+                ROW_NUMBER() OVER (PARTITION BY urun_kodu, renk ORDER BY konum) as sira
+            FROM stoklar
+            WHERE {' AND '.join(grouped_where)}
+            WINDOW urun AS (PARTITION BY urun_kodu, renk)
+        ),
+        filtered AS (
+            SELECT * FROM grouped
+            WHERE {' AND '.join(filters)}
+        )
+    '''
+
+    # Genel istatistikler (tüm filtrelenmiş ürünler üzerinden)
+    stats_row = db.execute(filtered_cte + '''
+        SELECT
+            (SELECT COUNT(*) FROM filtered) as total_products,
+            (SELECT COALESCE(SUM(toplam_adet), 0) FROM filtered) as total_quantity,
+            (SELECT COALESCE(SUM(toplam_agirlik), 0) FROM filtered) as total_weight,
+            (SELECT COUNT(DISTINCT s.konum)
+             FROM stoklar s
+             JOIN filtered f ON s.urun_kodu = f.urun_kodu AND s.renk IS f.renk
+             WHERE s.adet > 0) as total_locations
+    ''', params).fetchone()
+    stats = {
+        'total_products': stats_row['total_products'],
+        'total_quantity': stats_row['total_quantity'],
+        'total_weight': stats_row['total_weight'],
+        'total_locations': stats_row['total_locations']
+    }
+
+    # İstenen sayfa - eşitlikte ürün kodu ve renk sırası korunur
+    direction = 'DESC' if sort_order == 'desc' else 'ASC'
+    offset = (page - 1) * per_page
+    page_rows = db.execute(filtered_cte + f'''
+        SELECT * FROM filtered
+        ORDER BY {STOCK_REPORT_SORT_COLUMNS[sort_by]} {direction}, urun_kodu, renk
+        LIMIT ? OFFSET ?
+    ''', params + [per_page, offset]).fetchall()
+
+    products = load_stock_report_products(db, page_rows)
+
+    has_next = offset + len(products) < stats['total_products']
+    pagination = {
+        'page': page,
+        'per_page': per_page,
+        'total': stats['total_products'],
+        'has_next': has_next,
+        'next_page': page + 1 if has_next else None
+    }
+    return products, stats, pagination
+
+def load_stock_report_products(db, grouped_rows):
+    """Gruplanmış rapor satırlarından konum ve rezervasyon bilgili ürün sözlükleri oluştur"""
+    products = []
+    product_index = {}
+    for row in grouped_rows:
+        min_kritik_sinir = row['min_kritik_sinir'] or 5
+        product = {
+            'urun_kodu': row['urun_kodu'],
+            'urun_adi': row['urun_adi'],
+            'renk': row['renk'],
+            'sistem_seri': row['sistem_seri'],
+            'toplam_adet': row['toplam_adet'] or 0,
+            'toplam_agirlik': row['toplam_agirlik'] or 0,
+            'kritik_stok_siniri': min_kritik_sinir,
+            'is_critical': (row['toplam_adet'] or 0) <= min_kritik_sinir,
+            'konumlar': [],
+            'uzunluk': row['uzunluk'],
+            'mt_kg': row['mt_kg']
         }
-        
-        # Sıralama parametrelerini doğrula
-        if sort_by not in valid_sort_columns:
-            sort_by = 'urun_kodu'
-        if sort_order not in ['asc', 'desc']:
-            sort_order = 'asc'
-        
-        # Ürün bazında stok özetini getir
-        stock_summary_query = '''
-            SELECT 
-                s.urun_kodu,
-                s.urun_adi,
-                s.renk,
-                s.sistem_seri,
-                s.konum,
-                s.adet,
-                s.toplam_kg,
-                s.kritik_stok_siniri,
-                s.uzunluk,
-                s.mt_kg,
-                SUM(s.adet) OVER (PARTITION BY s.urun_kodu, s.renk) as toplam_adet,
-                SUM(s.toplam_kg) OVER (PARTITION BY s.urun_kodu, s.renk) as toplam_agirlik,
-                MIN(s.kritik_stok_siniri) OVER (PARTITION BY s.urun_kodu, s.renk) as min_kritik_sinir
-            FROM stoklar s
+        products.append(product)
+        product_index[(row['urun_kodu'], row['renk'])] = product
+
+    if products:
+        # Ürünlerin konum dağılımı tek sorguda
+        values_clause = ', '.join(['(?, ?)'] * len(products))
+        key_params = [value for p in products for value in (p['urun_kodu'], p['renk'])]
+        location_rows = db.execute(f'''
+            WITH anahtar(urun_kodu, renk) AS (VALUES {values_clause})
+            SELECT s.urun_kodu, s.renk, s.konum, s.adet, s.toplam_kg, s.kritik_stok_siniri, s.uzunluk, s.mt_kg
+            FROM anahtar a
+            JOIN stoklar s ON s.urun_kodu = a.urun_kodu AND s.renk IS a.renk
             WHERE s.adet > 0
             ORDER BY s.urun_kodu, s.renk, s.konum
-        '''
-        
-        stock_summary = db.execute(stock_summary_query).fetchall()
-        
-        # Verileri ürün bazında grupla
-        grouped_products = {}
-        for row in stock_summary:
-            key = f"{row['urun_kodu']}|{row['renk'] or ''}"
-            if key not in grouped_products:
-                grouped_products[key] = {
-                    'urun_kodu': row['urun_kodu'],
-                    'urun_adi': row['urun_adi'],
-                    'renk': row['renk'],
-                    'sistem_seri': row['sistem_seri'],
-                    'toplam_adet': row['toplam_adet'] or 0,
-                    'toplam_agirlik': row['toplam_agirlik'] or 0,
-                    'kritik_stok_siniri': row['min_kritik_sinir'] or 5,
-                    'is_critical': (row['toplam_adet'] or 0) <= (row['min_kritik_sinir'] or 5),
-                    'konumlar': [],
-                    'uzunluk': row['uzunluk'],
-                    'mt_kg': row['mt_kg']
-                }
-            
-            grouped_products[key]['konumlar'].append({
+        ''', key_params).fetchall()
+
+        for row in location_rows:
+            product_index[(row['urun_kodu'], row['renk'])]['konumlar'].append({
                 'konum': row['konum'],
                 'adet': row['adet'] or 0,
                 'toplam_kg': row['toplam_kg'] or 0,
@@ -1069,107 +1343,186 @@ def stock_report():
                 'uzunluk': row['uzunluk'],
                 'mt_kg': row['mt_kg']
             })
-        
-        # Yeni tablodan (urun_rezervasyon_notlari) rezervasyon notlarını al
-        for key, product in grouped_products.items():
-            # Yeni tablodan rezervasyon notunu al
-            rezervasyon_notu = get_urun_rezervasyon_notu(product['urun_kodu'], product['renk'] if product['renk'] else None)
-            
-            # Rezervasyon bilgilerini güncelle
+
+        # Rezervasyon notları (urun_rezervasyon_notlari) tek sorguda
+        notlar = get_urun_rezervasyon_notlari_toplu((p['urun_kodu'], p['renk']) for p in products)
+        for product in products:
+            rezervasyon_notu = notlar.get((product['urun_kodu'], product['renk'] or ''))
             product['has_reservations'] = rezervasyon_notu is not None and rezervasyon_notu.strip() != ''
             product['reservation_count'] = 1 if product['has_reservations'] else 0
             product['rezervasyon_notu'] = rezervasyon_notu
-            
-            # Rezervasyon notu varsa, rezervasyon bilgilerini ekle
             if product['has_reservations']:
                 # Sayfada gösterilmek üzere rezervasyon bilgileri ekle
                 product['reservations'] = [{
                     'konum': 'Tüm Konumlar',
                     'rezervasyon_notu': rezervasyon_notu
                 }]
-        
-        # Filtreleme uygula
-        if search:
-            filtered_products = {}
-            # Türkçe karakterler için normalize edilmiş arama
-            search_normalized = normalize_turkish_text(search)
-            for key, product in grouped_products.items():
-                urun_kodu_normalized = normalize_turkish_text(product['urun_kodu'])
-                urun_adi_normalized = normalize_turkish_text(product['urun_adi'])
-                if (search_normalized in urun_kodu_normalized or 
-                    search_normalized in urun_adi_normalized):
-                    filtered_products[key] = product
-            grouped_products = filtered_products
-        
-        # Sistem seri filtresi - hem sistem_seri alanında hem de ürün adında ara
-        if sistem_seri_filter:
-            filtered_products = {}
-            sistem_seri_normalized = normalize_turkish_text(sistem_seri_filter)
-            for key, product in grouped_products.items():
-                # Sistem seri alanında tam eşleşme
-                sistem_seri_match = product['sistem_seri'] == sistem_seri_filter
-                # Ürün adında kısmi eşleşme (normalize edilmiş)
-                urun_adi_normalized = normalize_turkish_text(product['urun_adi'])
-                urun_adi_match = sistem_seri_normalized in urun_adi_normalized
-                
-                if sistem_seri_match or urun_adi_match:
-                    filtered_products[key] = product
-            grouped_products = filtered_products
-        
-        if color_filter:
-            filtered_products = {}
-            for key, product in grouped_products.items():
-                if product['renk'] == color_filter:
-                    filtered_products[key] = product
-            grouped_products = filtered_products
-        
-        # Sıralama uygula
-        sort_key_map = {
-            'urun_kodu': lambda x: x['urun_kodu'],
-            'urun_adi': lambda x: x['urun_adi'],
-            'renk': lambda x: x['renk'] or '',
-            'sistem_seri': lambda x: x['sistem_seri'] or '',
-            'toplam_adet': lambda x: x['toplam_adet'],
-            'toplam_agirlik': lambda x: x['toplam_agirlik']
-        }
-        
-        sorted_products = sorted(
-            grouped_products.values(), 
-            key=sort_key_map[sort_by],
-            reverse=(sort_order == 'desc')
+
+    return products
+
+def get_stock_report_products_by_keys(db, urun_anahtarlari):
+    """Belirli (urun_kodu, renk) anahtarları için rapor satırlarını getir (canlı güncelleme için)
+
+    Renk '' ise renksiz (NULL/'') kayıtlar eşleşir.
+    """
+    anahtarlar = list({(urun_kodu, (renk or '').strip()) for urun_kodu, renk in urun_anahtarlari})
+    if not anahtarlar:
+        return []
+
+    values_clause = ', '.join(['(?, ?)'] * len(anahtarlar))
+    params = [value for anahtar in anahtarlar for value in anahtar]
+    grouped_rows = db.execute(f'''
+        WITH anahtar(urun_kodu, renk) AS (VALUES {values_clause}),
+        grouped AS (
+            SELECT
+                s.urun_kodu,
+                s.renk,
+                s.urun_adi,
+                s.sistem_seri,
+                s.uzunluk,
+                s.mt_kg,
+                SUM(s.adet) OVER urun as toplam_adet,
+                SUM(s.toplam_kg) OVER urun as toplam_agirlik,
+                MIN(s.kritik_stok_siniri) OVER urun as min_kritik_sinir,
+                ROW_NUMBER() OVER (PARTITION BY s.urun_kodu, s.renk ORDER BY s.konum) as sira
+            FROM anahtar a
+            JOIN stoklar s ON s.urun_kodu = a.urun_kodu AND COALESCE(s.renk, '') = a.renk
+            WHERE s.adet > 0
+            WINDOW urun AS (PARTITION BY s.urun_kodu, s.renk)
         )
-        
-        # Filtre seçenekleri
-        colors = db.execute('SELECT DISTINCT renk FROM stoklar WHERE renk IS NOT NULL AND adet > 0 ORDER BY renk').fetchall()
-        sistem_seriler = db.execute('SELECT DISTINCT sistem_seri FROM stoklar WHERE sistem_seri IS NOT NULL ORDER BY sistem_seri').fetchall()  # Add sistem seri options
-        
-        # Genel istatistikler
-        stats = {
-            'total_products': len(sorted_products),
-            'total_quantity': sum(p['toplam_adet'] or 0 for p in sorted_products),
-            'total_weight': sum(p['toplam_agirlik'] or 0 for p in sorted_products),
-            'total_locations': len(set(lok['konum'] for p in sorted_products for lok in p['konumlar']))
-        }
+        SELECT * FROM grouped WHERE sira = 1
+    ''', params).fetchall()
+    return load_stock_report_products(db, grouped_rows)
+
+def _stock_report_data(db, report_params):
+    """Rapor sayfasının ilk sayfası ve filtre seçenekleri"""
+    products, stats, pagination = build_stock_report_page(db, **report_params)
+    colors = db.execute('SELECT DISTINCT renk FROM stoklar WHERE renk IS NOT NULL AND adet > 0 ORDER BY renk').fetchall()
+    sistem_seriler = db.execute('SELECT DISTINCT sistem_seri FROM stoklar WHERE sistem_seri IS NOT NULL ORDER BY sistem_seri').fetchall()  # Add sistem seri options
+    return products, stats, pagination, [dict(row) for row in colors], [dict(row) for row in sistem_seriler]
+
+def _filtresiz_rapor():
+    """Arama / renk / seri filtresi olmayan rapor tüm ürünleri tarar - kabul kontrolüne tabi"""
+    return not any(request.args.get(ad, '').strip() for ad in ('search', 'color', 'sistem_seri'))
+
+@main_bp.route('/stock-report')
+@login_required
+@conditional_get
+def stock_report():
+    """Detaylı stok raporu - ürün bazında tüm konum dağılımları
+
+    Sadece ilk sayfa render edilir, devamı /api/stock-report ile kaydırdıkça yüklenir.
+    """
+    # Kullanıcı rol bilgisini al
+    current_user = get_current_user()
+    user_is_admin = is_admin()
+    try:
+        db = get_db_connection()
+        report_params = get_stock_report_params()
+        # Sayfa her zaman baştan başlar
+        report_params['page'] = 1
+        # Canlı güncellemeler bu olaydan sonrasını dinler (sorgulardan önce alınır)
+        last_event_id = get_son_olay_id()
+
+        def hesapla():
+            # Kabul kontrolü sadece hesaplamayı yapan isteğe uygulanır; aynı raporu bekleyenler yuva almaz
+            if not _filtresiz_rapor():
+                return _stock_report_data(db, report_params)
+            with admitted('report'):
+                return _stock_report_data(db, report_params)
+
+        products, stats, pagination, colors, sistem_seriler = single_flight('stock_report', report_params, hesapla)
         
         return render_template('stock_report.html',
-                             products=sorted_products,
+                             products=products,
                              colors=colors,
                              sistem_seriler=sistem_seriler,  # Pass sistem seri options
                              stats=stats,
-                             search=search,
-                             color_filter=color_filter,
-                             sistem_seri_filter=sistem_seri_filter,  # Pass sistem seri filter
-                             sort_by=sort_by,
-                             sort_order=sort_order,
+                             pagination=pagination,
+                             last_event_id=last_event_id,
+                             search=report_params['search'],
+                             color_filter=report_params['color_filter'],
+                             sistem_seri_filter=report_params['sistem_seri_filter'],  # Pass sistem seri filter
+                             sort_by=report_params['sort_by'],
+                             sort_order=report_params['sort_order'],
                              current_user=current_user,
                              user_is_admin=user_is_admin)
     
+    except AdmissionRejected:
+        # 503 + Retry-After (uygulama hata işleyicisi)
+        raise
     except Exception as e:
         logger.error(f"Stock report error: {str(e)}")
         flash(f'Stok raporu hatası: {str(e)}', 'error')
-        return render_template('stock_report.html', products=[], stats={}, colors=[],
+        return render_template('stock_report.html', products=[], stats={}, colors=[], pagination={},
                              search='', color_filter='', sistem_seri_filter='', sort_by='urun_kodu', sort_order='asc')
 
+@main_bp.route('/api/stock-report')
+@login_required
+@conditional_get
+def api_stock_report():
+    """Stok raporu sayfalı JSON API - rapor sayfasıyla aynı filtre ve sıralama parametreleri
+
+    format=html verilirse ürünlerin tablo satırları da render edilip döner (sonsuz kaydırma için).
+    """
+    try:
+        db = get_db_connection()
+        report_params = get_stock_report_params()
+        products, stats, pagination = single_flight('stock_report_page', report_params,
+                                                    lambda: build_stock_report_page(db, **report_params))
+
+        result = {
+            'success': True,
+            'products': products,
+            'stats': stats,
+            **pagination
+        }
+        if request.args.get('format') == 'html':
+            result['html'] = render_template('partials/stock_report_rows.html',
+                                             products=products,
+                                             user_is_admin=is_admin())
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"Stock report API error: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@main_bp.route('/api/stock-report/rows', methods=['POST'])
+@login_required
+def api_stock_report_rows():
+    """Değişen ürünlerin rapor satırlarını yeniden render et (canlı güncelleme)
+
+    Gövde: {"items": [{"urun_kodu": "...", "renk": "..."}, ...]}
+    Stokta kalmayan ürünler için html null döner (satır sayfadan kaldırılır).
+    """
+    try:
+        anahtarlar, error = _read_live_row_keys(('urun_kodu', 'renk'))
+        if error:
+            return error
+
+        db = get_db_connection()
+        products = get_stock_report_products_by_keys(db, anahtarlar)
+        by_key = {}
+        for product in products:
+            by_key.setdefault((product['urun_kodu'], product['renk'] or ''), []).append(product)
+
+        user_is_admin = is_admin()
+        results = []
+        for urun_kodu, renk in anahtarlar:
+            matched = by_key.get((urun_kodu, renk))
+            results.append({
+                'urun_kodu': urun_kodu,
+                'renk': renk,
+                'html': render_template('partials/stock_report_rows.html',
+                                        products=matched,
+                                        user_is_admin=user_is_admin) if matched else None
+            })
+        return jsonify({'success': True, 'results': results})
+
+    except Exception as e:
+        logger.error(f"Stock report rows API error: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @main_bp.route('/value-report')
 def value_report():
     return render_template('placeholder.html', title='Değer Raporu', message='Bu özellik sonraki görevlerde eklenecektir.')
@@ -1184,6 +1537,247 @@ def settings():
     """Ayarlar ana sayfası"""
     return render_template('settings.html')
 
+@main_bp.route('/api/fragment-cache-stats')
+@admin_required
+def api_fragment_cache_stats():
+    """Şablon parçası önbelleği hit/miss metrikleri"""
+    return jsonify({
+        'success': True,
+        'stats': get_fragment_cache_stats(current_app)
+    })
+
+@main_bp.route('/metrics')
+@api_token_required
+def metrics():
+    """Prometheus metrikleri - admin oturumu veya API token gerekir"""
+    body = render_prometheus(collect_metrics(current_app.config.get('METRICS_DIR')))
+    body += render_admission_prometheus(get_admission_status())
+    body += render_logging_prometheus(get_logging_stats())
+    response = make_response(body)
+    response.mimetype = 'text/plain'
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@main_bp.route('/settings/sql-profile')
+@admin_required
+def settings_sql_profile():
+    """SQL sorgu profili - en maliyetli sorgular ve yavaş sorgu kaydı"""
+    sort = request.args.get('sort', 'total')
+    return render_template('settings/sql_profile.html',
+                           queries=get_top_queries(sort),
+                           slow_queries=get_slow_queries(),
+                           settings=get_profiler_settings(),
+                           sort=sort)
+
+@main_bp.route('/settings/sql-profile/reset', methods=['POST'])
+@admin_required
+def settings_sql_profile_reset():
+    """SQL profil istatistiklerini sıfırla"""
+    reset_sql_profile()
+    flash('SQL profil istatistikleri sıfırlandı.', 'success')
+    return redirect(url_for('main.settings_sql_profile'))
+
+@main_bp.route('/api/sql-profile')
+@api_token_required
+def api_sql_profile():
+    """SQL sorgu profili (JSON)"""
+    return jsonify({
+        'success': True,
+        'settings': get_profiler_settings(),
+        'queries': get_top_queries(request.args.get('sort', 'total'), request.args.get('limit', 50, type=int)),
+        'slow_queries': get_slow_queries()
+    })
+
+@main_bp.route('/settings/profiles')
+@admin_required
+def settings_profiles():
+    """Kayıtlı istek profilleri"""
+    return render_template('settings/profiles.html',
+                           profiles=list_profiles(),
+                           settings=get_request_profiler_settings())
+
+@main_bp.route('/settings/profiles/<profile_id>')
+@admin_required
+def settings_profile_detail(profile_id):
+    """Tek istek profili - en maliyetli fonksiyonlar ve SQL dağılımı"""
+    profile = load_profile(profile_id)
+    if profile is None:
+        flash('Profil bulunamadı.', 'error')
+        return redirect(url_for('main.settings_profiles'))
+    return render_template('settings/profile_detail.html', profile=profile)
+
+@main_bp.route('/settings/profiles/<profile_id>/download')
+@admin_required
+def settings_profile_download(profile_id):
+    """Profil dosyasını indir (format=prof: pstats / snakeviz, format=json: özet)"""
+    fmt = request.args.get('format', 'prof')
+    path = profile_path(profile_id, fmt)
+    if path is None:
+        flash('Profil bulunamadı.', 'error')
+        return redirect(url_for('main.settings_profiles'))
+    return send_file(path, as_attachment=True, download_name=f'{profile_id}.{fmt}',
+                     mimetype='application/json' if fmt == 'json' else 'application/octet-stream')
+
+@main_bp.route('/settings/profiles/clear', methods=['POST'])
+@admin_required
+def settings_profiles_clear():
+    """Tüm istek profillerini sil"""
+    silinen = clear_profiles()
+    flash(f'{silinen} profil silindi.', 'success')
+    return redirect(url_for('main.settings_profiles'))
+
+@main_bp.route('/settings/memory')
+@admin_required
+def settings_memory():
+    """Bellek tanılama - istek bazında tepe bellek, tracemalloc snapshot'ları ve nesne sayımı"""
+    return render_template('settings/memory.html',
+                           status=get_memory_status(),
+                           request_stats=get_request_memory_stats(),
+                           snapshots=list_snapshots(),
+                           census=object_census() if request.args.get('census') else None)
+
+@main_bp.route('/settings/memory/tracing', methods=['POST'])
+@admin_required
+def settings_memory_tracing():
+    """tracemalloc'u bu worker'da başlat / durdur"""
+    if request.form.get('action') == 'start':
+        if start_tracing(request.form.get('frames', type=int)):
+            flash('Bellek izleme (tracemalloc) başlatıldı. İnceleme bitince durdurmayı unutmayın.', 'success')
+        else:
+            flash('Bellek izleme zaten açık.', 'info')
+    else:
+        if stop_tracing():
+            flash('Bellek izleme durduruldu.', 'success')
+        else:
+            flash('Bellek izleme zaten kapalı.', 'info')
+    return redirect(url_for('main.settings_memory'))
+
+@main_bp.route('/settings/memory/snapshot', methods=['POST'])
+@admin_required
+def settings_memory_snapshot():
+    """tracemalloc snapshot'ı al"""
+    snapshot_id = take_snapshot(request.form.get('label', '').strip()[:100])
+    if snapshot_id is None:
+        flash('Snapshot için önce bellek izlemeyi başlatın.', 'warning')
+    else:
+        flash(f'Snapshot alındı: {snapshot_id}', 'success')
+    return redirect(url_for('main.settings_memory'))
+
+@main_bp.route('/settings/memory/snapshots/<snapshot_id>')
+@admin_required
+def settings_memory_snapshot_detail(snapshot_id):
+    """Snapshot'taki en büyük tahsis yerleri veya (compare ile) önceki snapshot'a göre fark"""
+    info = load_snapshot_info(snapshot_id)
+    if info is None:
+        flash('Snapshot bulunamadı.', 'error')
+        return redirect(url_for('main.settings_memory'))
+    group_by = request.args.get('group', 'lineno')
+    compare = request.args.get('compare')
+    compare_info = load_snapshot_info(compare) if compare else None
+    if compare_info is not None:
+        result = diff_snapshots(compare, snapshot_id, group_by)
+    else:
+        result = snapshot_top(snapshot_id, group_by)
+    return render_template('settings/memory_snapshot.html',
+                           info=info, compare_info=compare_info, result=result, group_by=group_by,
+                           snapshots=list_snapshots())
+
+@main_bp.route('/settings/memory/clear', methods=['POST'])
+@admin_required
+def settings_memory_clear():
+    """Snapshot'ları ve istek bellek istatistiklerini temizle"""
+    silinen = clear_snapshots()
+    reset_request_memory_stats()
+    flash(f'{silinen} snapshot silindi, istek bellek istatistikleri sıfırlandı.', 'success')
+    return redirect(url_for('main.settings_memory'))
+
+@main_bp.route('/api/memory')
+@api_token_required
+def api_memory():
+    """Bellek durumu ve istek bazında bellek istatistikleri (JSON)"""
+    return jsonify({
+        'success': True,
+        'status': get_memory_status(),
+        **get_request_memory_stats()
+    })
+
+@main_bp.route('/api/admission')
+@api_token_required
+def api_admission():
+    """Ağır endpoint grupları: sınırlar, çalışan / bekleyen istekler ve ret sayaçları (tüm worker'lar)"""
+    return jsonify({'success': True, **get_admission_status()})
+
+@main_bp.route('/api/events')
+@login_required
+def api_events():
+    """Stok değişiklik olayları (Server-Sent Events) - Last-Event-ID ile kaldığı yerden devam eder"""
+    return sse_response()
+
+CHANGE_FEED_LIMIT = 500
+CHANGE_FEED_MAX_LIMIT = 5000
+
+@main_bp.route('/api/changes')
+@api_token_required
+def api_changes():
+    """Artımlı senkronizasyon beslemesi - since imlecinden sonraki değişiklikler ve bir sonraki imleç
+
+    since=latest: veri göndermeden güncel imleci döndürür (ilk tam senkronizasyondan sonra kullanılır)
+    """
+    since_param = request.args.get('since', '0').strip()
+    if since_param == 'latest':
+        return jsonify({'success': True, 'since': None, 'cursor': get_son_olay_id(),
+                        'has_more': False, 'changes': []})
+    if not since_param.isdigit():
+        return jsonify({'success': False, 'message': 'Geçersiz since imleci'}), 400
+    since = int(since_param)
+
+    try:
+        limit = int(request.args.get('limit', CHANGE_FEED_LIMIT))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Geçersiz limit'}), 400
+    limit = max(1, min(limit, CHANGE_FEED_MAX_LIMIT))
+
+    try:
+        changes, cursor, has_more = build_change_batch(since, limit)
+    except CursorExpiredError:
+        # İstemcinin kaldığı olaylar temizlenmiş - tam senkronizasyon (export) gerekli
+        return jsonify({
+            'success': False,
+            'message': 'İmleç saklama süresi dışında, tam senkronizasyon gerekli',
+            'cursor': get_son_olay_id()
+        }), 410
+    except Exception as e:
+        logger.error(f"Değişiklik beslemesi hatası: {str(e)}")
+        return jsonify({'success': False, 'message': 'Değişiklikler alınamadı'}), 500
+
+    response = jsonify({'success': True, 'since': since, 'cursor': cursor,
+                        'has_more': has_more, 'changes': changes})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@main_bp.route('/api/stock-movements/bulk', methods=['POST'])
+@api_token_required
+def api_stock_movements_bulk():
+    """Toplu GIRIS/CIKIS/TRANSFER - NDJSON gövde, satır başına NDJSON sonuç akışı
+
+    Her satır: {"hareket_tipi": "CIKIS", "urun_kodu": ..., "renk": ..., "konum": ..., "adet": ...,
+    "idempotency_key": ...}. TRANSFER için konum yerine kaynak_konum ve hedef_konum gönderilir.
+    Idempotency-Key başlığı verilirse anahtarsız satırlar '<başlık>:<satır no>' anahtarını kullanır.
+    """
+    kullanici = session.get('username') or request.headers.get('X-API-User', '').strip() or 'API'
+    istek_anahtari = request.headers.get('Idempotency-Key', '').strip() or None
+    parca_boyutu = current_app.config.get('BULK_MOVEMENT_CHUNK_SIZE', 1000)
+
+    # Gövde akış halinde okunur; sonuçlar her parça commit edildikçe gönderilir.
+    # request.stream satır satır okunurken bayt bayt okur - tamponlu okuyucu ile sarılır
+    govde = io.BufferedReader(request.stream, 64 * 1024)
+    akis = toplu_hareket_akisi(govde, kullanici, istek_anahtari, parca_boyutu)
+    response = Response(stream_with_context(akis), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @main_bp.route('/settings/critical-stock')
 @admin_required
 def settings_critical_stock():
@@ -1381,6 +1975,7 @@ def stock_movements():
         return render_template('stock_movements.html', movements=[], total=0, products=[])
 
 @main_bp.route('/api/product-movements')
+@conditional_get
 def api_product_movements():
     """Belirli bir ürün için stok hareketlerini getir"""
     try:
@@ -1490,86 +2085,142 @@ def api_search_products():
         logger.error(f"Product search API error: {str(e)}")
         return jsonify([]), 500
 
-@main_bp.route('/api/product-detail')
-def api_product_detail():
-    """Ürün detay API - ürün bazında tüm konum bilgileri"""
-    try:
-        urun_kodu = request.args.get('urun_kodu', '').strip().upper()
-        renk = request.args.get('renk', '').strip()
-        
-        if not urun_kodu:
-            return jsonify({'success': False, 'message': 'Ürün kodu gereklidir'})
-        
-        # Ürün bazında tüm konum bilgilerini getir
-        locations = get_all_locations_for_product(urun_kodu, renk or None)
-        
+PRODUCT_DETAIL_BATCH_LIMIT = 200
+
+def build_product_details(urun_anahtarlari):
+    """(urun_kodu, renk) anahtarları için ürün detaylarını toplu hazırla
+
+    Konumlar ve rezervasyon notları anahtar sayısından bağımsız olarak iki sorguda gelir.
+    Dönüş: anahtarlarla aynı sırada ürün sözlüğü veya (konum yoksa) None listesi
+    """
+    urun_anahtarlari = list(urun_anahtarlari)
+    konum_listeleri = get_urun_konumlari_toplu(urun_anahtarlari)
+    notlar = get_urun_rezervasyon_notlari_toplu(urun_anahtarlari)
+
+    products = []
+    for (urun_kodu, renk), locations in zip(urun_anahtarlari, konum_listeleri):
         if not locations:
-            return jsonify({'success': False, 'message': 'Ürün bulunamadı'})
-        
-        # Ürün bilgisini al
-        db = get_db_connection()
-        if renk:
-            product_info = db.execute('''
-                SELECT DISTINCT urun_kodu, urun_adi, renk
-                FROM stoklar 
-                WHERE urun_kodu = ? AND renk = ?
-            ''', (urun_kodu, renk)).fetchone()
-        else:
-            product_info = db.execute('''
-                SELECT DISTINCT urun_kodu, urun_adi, renk
-                FROM stoklar 
-                WHERE urun_kodu = ?
-                LIMIT 1
-            ''', (urun_kodu,)).fetchone()
-        
-        if not product_info:
-            return jsonify({'success': False, 'message': 'Ürün bilgisi bulunamadı'})
-        
+            products.append(None)
+            continue
+
+        # Ürün bilgisi ilk konum satırından
+        first = locations[0]
+        rezervasyon_notu = notlar.get((urun_kodu, renk or ''))
+
         # Konum verilerini düzenle
         konumlar = []
         toplam_adet = 0
         toplam_agirlik = 0
-        rezervasyon_bilgileri = []
-        
         for loc in locations:
             konum_data = {
                 'konum': loc['konum'],
-                'adet': loc['adet'] if 'adet' in loc.keys() else loc[1],
-                'toplam_kg': float(loc['toplam_kg']) if 'toplam_kg' in loc.keys() else float(loc[2] if loc[2] else 0)
+                'adet': loc['adet'],
+                'toplam_kg': float(loc['toplam_kg'] or 0)
             }
-            
-            # Rezervasyon notunu kontrol et - artık ürün bazlı
-            rezervasyon_notu = get_urun_rezervasyon_notu(urun_kodu, renk if renk else None)
+            # Rezervasyon notu ürün bazlı - tüm konumlarda aynı not gösterilir
             if rezervasyon_notu:
                 konum_data['rezervasyon_notu'] = rezervasyon_notu
-                # Tüm konumlar için aynı rezervasyon notunu göster
-                if not any(rb['not'] == rezervasyon_notu for rb in rezervasyon_bilgileri):
-                    rezervasyon_bilgileri.append({
-                        'konum': 'Tüm Konumlar',
-                        'not': rezervasyon_notu
-                    })
-            
             konumlar.append(konum_data)
             toplam_adet += konum_data['adet']
             toplam_agirlik += konum_data['toplam_kg']
+
+        rezervasyon_bilgileri = []
+        if rezervasyon_notu:
+            rezervasyon_bilgileri.append({
+                'konum': 'Tüm Konumlar',
+                'not': rezervasyon_notu
+            })
+
+        products.append({
+            'urun_kodu': first['urun_kodu'],
+            'urun_adi': first['urun_adi'],
+            'renk': first['renk'] or '',
+            'sistem_seri': first['sistem_seri'],
+            'uzunluk': first['uzunluk'],
+            'mt_kg': first['mt_kg'],
+            'toplam_adet': toplam_adet,
+            'toplam_agirlik': round(toplam_agirlik, 2),
+            'konumlar': konumlar,
+            'rezervasyon_bilgileri': rezervasyon_bilgileri
+        })
+    return products
+
+@main_bp.route('/api/product-detail')
+@conditional_get
+def api_product_detail():
+    """Ürün detay API - ürün bazında tüm konum bilgileri"""
+    try:
+        urun_kodu = request.args.get('urun_kodu', '').strip().upper()
+        renk = request.args.get('renk', '').strip()
+        
+        if not urun_kodu:
+            return jsonify({'success': False, 'message': 'Ürün kodu gereklidir'})
+        
+        product = build_product_details([(urun_kodu, renk)])[0]
+        
+        if not product:
+            return jsonify({'success': False, 'message': 'Ürün bulunamadı'})
         
         return jsonify({
             'success': True,
-            'product': {
-                'urun_kodu': product_info['urun_kodu'],
-                'urun_adi': product_info['urun_adi'],
-                'renk': product_info['renk'] or '',
-                'toplam_adet': toplam_adet,
-                'toplam_agirlik': round(toplam_agirlik, 2),
-                'konumlar': konumlar,
-                'rezervasyon_bilgileri': rezervasyon_bilgileri
-            }
+            'product': product
         })
     
     except Exception as e:
         logger.error(f"Product detail API error: {str(e)}")
         return jsonify({'success': False, 'message': 'Sunucu hatası'}), 500
 
+@main_bp.route('/api/product-detail/batch', methods=['POST'])
+@login_required
+def api_product_detail_batch():
+    """Toplu ürün detay API - birden çok (urun_kodu, renk) için konumlar, toplamlar ve notlar
+
+    Gövde: {"items": [{"urun_kodu": "...", "renk": "..."}, ...]}
+    Sonuçlar istek sırasıyla ve /api/product-detail yanıtı biçiminde döner.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('items')
+
+        if not isinstance(items, list) or not items:
+            return jsonify({'success': False, 'message': 'Ürün listesi gereklidir'}), 400
+        if len(items) > PRODUCT_DETAIL_BATCH_LIMIT:
+            return jsonify({
+                'success': False,
+                'message': f'En fazla {PRODUCT_DETAIL_BATCH_LIMIT} ürün istenebilir'
+            }), 400
+
+        anahtarlar = []
+        for item in items:
+            if not isinstance(item, dict):
+                item = {}
+            anahtarlar.append((
+                str(item.get('urun_kodu') or '').strip().upper(),
+                str(item.get('renk') or '').strip()
+            ))
+
+        # Ürün kodu boş olanlar sorguya gönderilmez
+        gecerli = [i for i, (urun_kodu, _renk) in enumerate(anahtarlar) if urun_kodu]
+        products = build_product_details([anahtarlar[i] for i in gecerli])
+        product_by_index = dict(zip(gecerli, products))
+
+        results = []
+        for i, (urun_kodu, renk) in enumerate(anahtarlar):
+            result = {'urun_kodu': urun_kodu, 'renk': renk}
+            if i not in product_by_index:
+                result.update({'success': False, 'message': 'Ürün kodu gereklidir'})
+            elif product_by_index[i] is None:
+                result.update({'success': False, 'message': 'Ürün bulunamadı'})
+            else:
+                result.update({'success': True, 'product': product_by_index[i]})
+            results.append(result)
+
+        return jsonify({'success': True, 'results': results})
+
+    except Exception as e:
+        logger.error(f"Batch product detail API error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Sunucu hatası'}), 500
+
 # ==== REZERVASYON ENDPOINT'LERİ ====
 
 # Reservation system routes - Disabled (using inline notes only)
@@ -2001,6 +2652,7 @@ def api_save_critical_threshold():
         return jsonify({'success': False, 'message': f'Hata: {str(e)}'})
 
 @main_bp.route('/export-all-stocks')
+@admission_control('export')
 def export_all_stocks():
     """Tüm stokları Excel olarak indir"""
     try:
@@ -2098,6 +2750,7 @@ def export_all_stocks():
         return redirect(url_for('main.settings'))
 
 @main_bp.route('/import-and-update-stocks', methods=['POST'])
+@admission_control('import')
 def import_and_update_stocks():
     """Excel dosyasından stokları import et ve veritabanını güncelle"""
     try:
@@ -15,49 +15,39 @@ def api_rezervasyon_notu_kaydet():
     """Rezervasyon notu kaydetme API - artık ürün bazlı"""
     try:
         data = request.get_json()
-        logger.info(f"Received reservation note save request: {data}")
         
         urun_kodu = data.get('urun_kodu', '').strip()
         renk = data.get('renk', '').strip() if data.get('renk') else None
         note = data.get('note', '').strip()
         
-        # Gelen verileri daha detaylı logla
-        logger.info(f"Processing reservation note - Product: '{urun_kodu}', Color: '{renk}', Note: '{note}'")
-        logger.info(f"Color value type: {type(renk)}, Color value repr: {repr(renk)}")
+        # Ayrıntı sadece DEBUG seviyesinde - %r argümanları kayıt yazılırken biçimlendirilir
+        logger.debug("Reservation note save request - product: %r, color: %r, note: %r", urun_kodu, renk, note)
         
         if not urun_kodu:
             return jsonify({'success': False, 'message': 'Ürün kodu gereklidir'})
         
-        # Log before saving
-        logger.info(f"About to call save_urun_rezervasyon_notu for {urun_kodu}")
-        
         # Stok kaydı olup olmadığını kontrol etmeden direkt olarak notu kaydet
         result = save_urun_rezervasyon_notu(urun_kodu, renk, note)
         
-        # Log after saving
-        logger.info(f"save_urun_rezervasyon_notu returned: {result}")
-        
         # Verify the note was actually saved by retrieving it
         saved_note = get_urun_rezervasyon_notu(urun_kodu, renk)
-        logger.info(f"Verification - Retrieved note for {urun_kodu}: '{saved_note}'")
         
         if result:
-            logger.info(f"Successfully saved reservation note for {urun_kodu}")
+            logger.debug("Saved reservation note for %s, verified: %r", urun_kodu, saved_note)
             return jsonify({
                 'success': True,
                 'message': 'Rezervasyon notu başarıyla kaydedildi',
                 'saved_note': saved_note
             })
         else:
-            logger.error(f"Failed to save reservation note for {urun_kodu}")
+            logger.error("Failed to save reservation note for %s", urun_kodu)
             return jsonify({
                 'success': False,
                 'message': 'Rezervasyon notu kaydedilemedi'
             })
         
     except Exception as e:
-        logger.error(f"Rezervasyon notu kaydetme API error: {str(e)}")
-        logger.error(f"Traceback: ", exc_info=True)
+        logger.error("Rezervasyon notu kaydetme API error: %s", e, exc_info=True)
         return jsonify({'success': False, 'message': f'Hata: {str(e)}'})
 
 @reservation_bp.route('/api/rezervasyon-notu-getir')
@@ -0,0 +1,108 @@
+// Canlı stok güncellemeleri - /api/events (Server-Sent Events) akışını dinler
+// Sayfalar değişen satırları/widget'ları yerinde günceller, tam sayfa yenilemesi gerekmez
+(function () {
+    'use strict';
+
+    const FLUSH_DELAY = 300;
+
+    // SSE bağlantısını aç; olaylar kısa süre biriktirilip tek seferde işlenir
+    function connect(lastEventId, onChanges) {
+        if (!('EventSource' in window)) {
+            return null;
+        }
+
+        let pending = [];
+        let timer = null;
+
+        function flush() {
+            const events = pending;
+            pending = [];
+            timer = null;
+            if (events.length > 0) {
+                onChanges(events);
+            }
+        }
+
+        const url = '/api/events' + (lastEventId ? '?last_event_id=' + encodeURIComponent(lastEventId) : '');
+        const source = new EventSource(url);
+
+        source.addEventListener('changes', function (e) {
+            try {
+                pending = pending.concat(JSON.parse(e.data));
+            } catch (error) {
+                console.error('Canlı güncelleme verisi okunamadı:', error);
+                return;
+            }
+            clearTimeout(timer);
+            timer = setTimeout(flush, FLUSH_DELAY);
+        });
+
+        // Kaçırılan olaylar artık saklanmıyor - sayfanın tamamı yenilenmeli
+        source.addEventListener('reset', function () {
+            source.close();
+            window.location.reload();
+        });
+
+        return source;
+    }
+
+    // urun_kodu -> data-urun-kodu (dataset.urunKodu)
+    function datasetName(field) {
+        return field.replace(/_([a-z])/g, (match, letter) => letter.toUpperCase());
+    }
+
+    function rowMatches(row, fields, key) {
+        return fields.every(field => (row.dataset[datasetName(field)] || '') === (key[field] || ''));
+    }
+
+    // Sunucudan gelen satır HTML'leriyle tablodaki eşleşen satırları değiştir (html null ise satırı kaldır)
+    function replaceRows(tbody, results, fields, onRowAdded) {
+        results.forEach(result => {
+            const rows = Array.from(tbody.rows).filter(row => rowMatches(row, fields, result));
+            if (rows.length === 0) {
+                return;
+            }
+            // Kullanıcının o an düzenlediği satıra dokunma
+            if (rows.some(row => row.contains(document.activeElement))) {
+                return;
+            }
+
+            if (result.html) {
+                const template = document.createElement('tbody');
+                template.innerHTML = result.html;
+                const newRows = Array.from(template.rows);
+                newRows.forEach(newRow => rows[0].before(newRow));
+                newRows.forEach(newRow => onRowAdded && onRowAdded(newRow));
+            }
+            rows.forEach(row => row.remove());
+        });
+    }
+
+    // Satır yenileme isteği - anahtarlar sunucu sınırına göre parçalanır
+    function fetchRows(url, items) {
+        const chunks = [];
+        for (let i = 0; i < items.length; i += 200) {
+            chunks.push(items.slice(i, i + 200));
+        }
+        return Promise.all(chunks.map(chunk => fetch(url, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            credentials: 'same-origin',
+            body: JSON.stringify({ items: chunk })
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) {
+                    throw new Error(data.message || 'Satırlar alınamadı');
+                }
+                return data.results;
+            })))
+            .then(parts => parts.flat());
+    }
+
+    window.LiveUpdates = {
+        connect: connect,
+        replaceRows: replaceRows,
+        fetchRows: fetchRows
+    };
+})();
@@ -0,0 +1,109 @@
+"""Kabul kontrolü - kuyruktaki istekler beklemeli, ağır istekler hafif API'lere ayrılan yuvalara taşmamalı"""
+
+import os
+import sys
+import threading
+import time
+
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import admission  # noqa: E402
+
+
+def _uygulama(tmp_path, limitler, kapasite=2, ayrilan=1, sure=0.2):
+    app = Flask(__name__)
+    app.config.update(ADMISSION_DIR=str(tmp_path), ADMISSION_LIMITS=limitler, ADMISSION_CAPACITY=kapasite,
+                      ADMISSION_RESERVED_LIGHT=ayrilan, DATABASE_PATH=str(tmp_path / 'test.db'))
+    admission.init_admission_control(app)
+    admission.reset_admission_stats()
+
+    @app.route('/rapor')
+    @admission.admission_control('report')
+    def rapor():
+        time.sleep(sure)
+        return 'ok'
+
+    @app.route('/hafif')
+    def hafif():
+        return 'ok'
+
+    return app
+
+
+def _eszamanli_iste(app, sayi, yol='/rapor'):
+    durumlar = []
+    kilit = threading.Lock()
+
+    def iste():
+        yanit = app.test_client().get(yol, headers={'X-Requested-With': 'XMLHttpRequest'})
+        with kilit:
+            durumlar.append(yanit.status_code)
+
+    threadler = [threading.Thread(target=iste) for _ in range(sayi)]
+    for t in threadler:
+        t.start()
+    for t in threadler:
+        t.join()
+    return durumlar
+
+
+def test_kuyruk_sinirinin_altindaki_istekler_basarili(tmp_path):
+    # 10 - 1 ayrılan = 9 ağır yuva: 2 istek çalışır, 6 istek kuyrukta bekler
+    app = _uygulama(tmp_path, 'report=2:8:5', kapasite=10)
+    assert admission.get_admission_status()['heavy_slots'] == 9
+
+    durumlar = _eszamanli_iste(app, 8)
+
+    assert durumlar == [200] * 8
+    grup = admission.get_admission_status()['groups']['report']
+    assert grup['admitted'] == 8
+    assert grup['queued'] >= 6
+    assert grup['rejected_capacity'] == grup['rejected_queue_full'] == grup['rejected_timeout'] == 0
+
+
+def test_kuyruk_doluysa_503(tmp_path):
+    app = _uygulama(tmp_path, 'report=1:1:5', kapasite=5)
+
+    durumlar = _eszamanli_iste(app, 4)
+
+    assert sorted(durumlar) == [200, 200, 503, 503]
+    assert admission.get_admission_status()['groups']['report']['rejected_queue_full'] == 2
+
+
+def test_grup_siniri_agir_yuvalara_kirpilir(tmp_path):
+    _uygulama(tmp_path, 'report=4:8:5', kapasite=3)
+
+    durum = admission.get_admission_status()
+    assert durum['heavy_slots'] == 2
+    assert (durum['groups']['report']['limit'], durum['groups']['report']['queue']) == (2, 0)
+
+
+def test_agir_gruplar_doluyken_hafif_istek_hizmet_alir(tmp_path):
+    # 3 thread'li tek worker: ağır istekler (çalışan ya da bekleyen) en fazla 2 thread tutabilir
+    app = _uygulama(tmp_path, 'report=4:8:5', kapasite=3, sure=0.6)
+    threadler = threading.BoundedSemaphore(3)
+    wsgi = app.wsgi_app
+
+    def worker(environ, start_response):
+        # Hafif istek boş thread için kısa bekler; bulamazsa aç kalmış sayılır
+        if not threadler.acquire(timeout=0.2 if environ['PATH_INFO'] == '/hafif' else 5):
+            start_response('599 Worker Yok', [('Content-Type', 'text/plain')])
+            return [b'']
+        try:
+            return wsgi(environ, start_response)
+        finally:
+            threadler.release()
+    app.wsgi_app = worker
+
+    agir = []
+    baslat = threading.Thread(target=lambda: agir.extend(_eszamanli_iste(app, 4)))
+    baslat.start()
+    time.sleep(0.2)
+    hafif = app.test_client().get('/hafif')
+    baslat.join()
+
+    assert hafif.status_code == 200
+    assert sorted(agir) == [200, 200, 503, 503]
+    assert admission.get_admission_status()['groups']['report']['rejected_capacity'] == 2
@@ -0,0 +1,122 @@
+"""Değişiklik beslemesi - temizlenmiş olayların imleci tam senkronizasyon istemeli"""
+
+import os
+import sys
+import time
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import change_events  # noqa: E402
+from utils.change_events import build_change_batch, CursorExpiredError, _event_stream  # noqa: E402
+from utils.database import (init_app, init_db, get_db_connection, get_son_olay_id,  # noqa: E402
+                            close_pooled_connections)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['DATABASE_PATH'] = str(tmp_path / 'test.db')
+    init_app(app)
+    with app.app_context():
+        init_db()
+        yield app
+    close_pooled_connections(app.config['DATABASE_PATH'])
+
+
+def _stok_ekle(db, sayi):
+    """Her stok kaydı tetikleyiciyle bir değişiklik olayı üretir"""
+    db.executemany("INSERT INTO stoklar (urun_kodu, urun_adi, konum, adet) VALUES (?, 'Profil', 'A1', 10)",
+                   [(f'P{i}',) for i in range(sayi)])
+    db.commit()
+
+
+def test_temizlenmemis_beslemede_since_0_tum_olaylari_doner(app):
+    _stok_ekle(get_db_connection(), 3)
+
+    changes, cursor, has_more = build_change_batch(0, 100)
+
+    assert len(changes) == 3
+    assert not has_more
+
+
+def test_temizlik_sonrasi_since_0_tam_senkronizasyon_ister(app):
+    db = get_db_connection()
+    _stok_ekle(db, 5)
+    db.execute('DELETE FROM degisiklik_olaylari WHERE id <= 2')
+    db.commit()
+
+    with pytest.raises(CursorExpiredError):
+        build_change_batch(0, 100)
+    # Son görülen olay temizlenenlerin sonuncusuysa devam edilebilir
+    changes, _, _ = build_change_batch(2, 100)
+    assert len(changes) == 3
+
+
+def test_sse_last_event_id_0_temizlik_sonrasi_reset_gonderir(app):
+    db = get_db_connection()
+    _stok_ekle(db, 5)
+    db.execute('DELETE FROM degisiklik_olaylari WHERE id <= 2')
+    db.commit()
+
+    mesajlar = list(_event_stream(0, hold_open=False))
+
+    assert len(mesajlar) == 1 and 'event: reset' in mesajlar[0]
+
+
+def test_acik_akis_siniri_doluysa_kisa_baglantiya_duser(app):
+    app.config.update(SSE_STREAM_SECONDS=60, SSE_POLL_INTERVAL=0.01)
+    change_events.set_sse_stream_limit(1)
+    try:
+        acik = _event_stream(0, hold_open=True)
+        assert 'retry: 3000' in next(acik)
+
+        # İkinci akış açık tutulmaz: birikmiş olaylar gönderilip bağlantı kapanır
+        mesajlar = list(_event_stream(0, hold_open=True))
+        assert len(mesajlar) == 1 and 'retry: 5000' in mesajlar[0]
+
+        # İstemci ayrılınca yuva bırakılır
+        acik.close()
+        yeni = _event_stream(0, hold_open=True)
+        assert 'retry: 3000' in next(yeni)
+        yeni.close()
+    finally:
+        change_events._ayarlar['akis_siniri'] = None
+
+
+def test_eski_olaylar_aralikla_temizlenir(app):
+    app.config['CHANGE_EVENT_PRUNE_INTERVAL'] = 0.05
+    change_events.init_change_events(app)
+    db = get_db_connection()
+    _stok_ekle(db, 3)
+    db.execute("UPDATE degisiklik_olaylari SET olay_tarihi = datetime('now', '-30 days') WHERE id <= 2")
+    db.commit()
+
+    with app.test_request_context('/'):
+        app.preprocess_request()
+    assert db.execute('SELECT COUNT(*) FROM degisiklik_olaylari').fetchone()[0] == 3
+
+    time.sleep(0.06)
+    with app.test_request_context('/'):
+        app.preprocess_request()
+    assert db.execute('SELECT COUNT(*) FROM degisiklik_olaylari').fetchone()[0] == 1
+
+
+def test_tum_olaylar_temizlendiyse_eski_imlec_tam_senkronizasyon_ister(app):
+    db = get_db_connection()
+    _stok_ekle(db, 4)
+    db.execute('DELETE FROM degisiklik_olaylari')
+    db.commit()
+
+    with pytest.raises(CursorExpiredError):
+        build_change_batch(2, 100)
+    # Son verilen olaydan devam eden imleç geçerli, yeni bağlanan SSE istemcisi de oradan başlar
+    assert build_change_batch(4, 100) == ([], 4, False)
+    assert get_son_olay_id() == 4
+    assert 'event: hello' in list(_event_stream(get_son_olay_id(), hold_open=False))[0]
+
+
+def test_hic_olay_olusmadiysa_since_0_gecerli(app):
+    assert build_change_batch(0, 100) == ([], 0, False)
@@ -0,0 +1,38 @@
+"""Önceden sıkıştırılmış statik dosyalar - static/ dışındaki dosyalar sunulmamalı"""
+
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+PROJE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJE)
+
+from utils.compression import init_compression  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    app = Flask('app', root_path=PROJE)
+    init_compression(app)
+    return app.test_client()
+
+
+@pytest.mark.parametrize('yol', [
+    '/static/../templates/base.html',
+    '/static/..%2Ftemplates%2Fbase.html',
+    '/static/../requirements.txt',
+    '/static/css/..%2F..%2Frequirements.txt',
+])
+def test_static_disina_cikan_yol_sunulmaz(client, yol):
+    yanit = client.get(yol, headers={'Accept-Encoding': 'gzip'})
+
+    assert yanit.status_code == 404
+
+
+def test_static_dosyasi_sikistirilmis_sunulur(client):
+    yanit = client.get('/static/css/style.css', headers={'Accept-Encoding': 'gzip'})
+
+    assert yanit.status_code == 200
+    assert yanit.headers['Content-Encoding'] == 'gzip'
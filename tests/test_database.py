@@ -0,0 +1,173 @@
+"""Veritabanı yardımcıları - toplu stok sorgusu ve eski şema geçişleri"""
+
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import init_app, init_db, get_db_connection, get_stoklar_toplu, close_pooled_connections  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    app = Flask(__name__)
+    app.config['DATABASE_PATH'] = str(tmp_path / 'test.db')
+    init_app(app)
+    with app.app_context():
+        init_db()
+        db = get_db_connection()
+        db.executemany('INSERT INTO stoklar (urun_kodu, urun_adi, renk, konum, adet) VALUES (?, ?, ?, ?, ?)', [
+            ('P1', 'Profil 1', 'ELOKSAL', 'A1', 5),
+            ('P2', 'Profil 2', None, 'A1', 3),
+            ('P2', 'Profil 2', '', 'A1', 7),
+        ])
+        db.commit()
+        yield db
+    close_pooled_connections(app.config['DATABASE_PATH'])
+
+
+def test_toplu_satirlar_tekli_sorguyla_ayni_kolonlar(db):
+    tekli = db.execute("SELECT * FROM stoklar WHERE urun_kodu = 'P1'").fetchone()
+
+    sonuclar = get_stoklar_toplu([('P1', 'ELOKSAL', 'A1')])
+
+    assert dict(sonuclar[0]) == dict(tekli)
+
+
+def test_toplu_sira_bos_renk_ve_tekrarlanan_anahtar(db):
+    sonuclar = get_stoklar_toplu([('P2', '', 'A1'), ('YOK', '', 'A1'), ('P1', 'ELOKSAL', 'A1'), ('P2', None, 'A1')])
+
+    # Boş renkte NULL ve '' kayıtlarından adedi yüksek olan seçilir
+    assert [s['adet'] if s else None for s in sonuclar] == [7, None, 5, 7]
+
+
+def test_fk_kaldirma_eszamanli_acilista_bir_kez_yapilir(tmp_path, caplog):
+    import logging
+    import sqlite3
+    import threading
+    import time
+
+    from utils.database import _stok_hareketleri_fk_kaldir
+
+    yol = str(tmp_path / 'eski.db')
+    kurulum = sqlite3.connect(yol)
+    kurulum.executescript('''
+        CREATE TABLE stoklar (id INTEGER PRIMARY KEY, urun_kodu TEXT NOT NULL);
+        CREATE TABLE stok_hareketleri (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, urun_kodu TEXT NOT NULL, hareket_tipi TEXT NOT NULL,
+            miktar INTEGER NOT NULL, onceki_miktar INTEGER, yeni_miktar INTEGER, konum TEXT, aciklama TEXT,
+            kullanici TEXT, tarih TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (urun_kodu) REFERENCES stoklar(urun_kodu)
+        );
+        INSERT INTO stok_hareketleri (urun_kodu, hareket_tipi, miktar) VALUES ('P1', 'GIRIS', 5);
+    ''')
+    kurulum.commit()
+
+    # Yazma kilidi tutulurken iki "worker" ön kontrolü geçip kilidi bekler
+    kurulum.execute('BEGIN IMMEDIATE')
+    caplog.set_level(logging.INFO, logger='utils.database')
+    hatalar = []
+
+    def worker():
+        db = sqlite3.connect(yol, timeout=10)
+        try:
+            _stok_hareketleri_fk_kaldir(db)
+        except Exception as e:
+            hatalar.append(e)
+        finally:
+            db.close()
+
+    threadler = [threading.Thread(target=worker) for _ in range(2)]
+    for t in threadler:
+        t.start()
+    time.sleep(0.3)
+    kurulum.rollback()
+    for t in threadler:
+        t.join()
+
+    assert hatalar == []
+    assert sum('yeniden oluşturuluyor' in kayit.getMessage() for kayit in caplog.records) == 1
+    assert kurulum.execute('PRAGMA foreign_key_list(stok_hareketleri)').fetchall() == []
+    assert kurulum.execute('SELECT COUNT(*) FROM stok_hareketleri').fetchone()[0] == 1
+    kurulum.close()
+
+
+@pytest.fixture
+def kullanici_dbleri(tmp_path):
+    """Kullanıcıları olan eski varsayılan veritabanı ve kullanıcı tablosu olmayan yapılandırılmış veritabanı"""
+    from utils.auth import UserManager
+    from utils.database import DatabaseManager
+
+    eski, hedef = str(tmp_path / 'stok_takip_dev.db'), str(tmp_path / 'data' / 'stok_takip_prod.db')
+    os.makedirs(os.path.dirname(hedef))
+    UserManager(DatabaseManager(eski)).create_user('depo1', 'depo-sifre')
+    app = Flask(__name__)
+    app.config['DATABASE_PATH'] = hedef
+    init_app(app)
+    with app.app_context():
+        init_db()
+    yield eski, hedef
+    close_pooled_connections(eski)
+    close_pooled_connections(hedef)
+
+
+def _kullanici_adlari(yol):
+    from utils.database import DatabaseManager
+    return sorted(row['kullanici_adi'] for row in DatabaseManager(yol).fetch_all('SELECT kullanici_adi FROM kullanicilar'))
+
+
+def test_eski_kullanicilar_tasinir_ve_giris_yapabilir(kullanici_dbleri):
+    from utils.auth import UserManager
+    from utils.database import DatabaseManager, migrate_legacy_users
+
+    eski, hedef = kullanici_dbleri
+
+    assert migrate_legacy_users(hedef, eski_yol=eski) == 2
+    assert _kullanici_adlari(hedef) == ['admin', 'depo1']
+    assert UserManager(DatabaseManager(hedef)).authenticate_user('depo1', 'depo-sifre')
+
+
+def test_tasinmis_veya_kendi_kullanicilari_olan_veritabani_degismez(kullanici_dbleri):
+    from utils.auth import UserManager
+    from utils.database import DatabaseManager, migrate_legacy_users
+
+    eski, hedef = kullanici_dbleri
+    assert migrate_legacy_users(hedef, eski_yol=eski) == 2
+    UserManager(DatabaseManager(eski)).create_user('sonradan', 'sifre')
+
+    # İkinci açılış: hedefte tablo var, eski dosyadaki sonraki kayıtlar kopyalanmaz
+    assert migrate_legacy_users(hedef, eski_yol=eski) == 0
+    assert _kullanici_adlari(hedef) == ['admin', 'depo1']
+    # Eski dosya yoksa veya hedefle aynıysa hiçbir şey yapılmaz
+    assert migrate_legacy_users(hedef, eski_yol=eski + '.yok') == 0
+    assert migrate_legacy_users(eski, eski_yol=eski) == 0
+
+
+def test_eszamanli_acilista_kullanicilar_bir_kez_tasinir(kullanici_dbleri):
+    import threading
+
+    from utils.database import migrate_legacy_users
+
+    eski, hedef = kullanici_dbleri
+    baslat = threading.Barrier(4)
+    sonuclar, hatalar = [], []
+
+    def worker():
+        baslat.wait()
+        try:
+            sonuclar.append(migrate_legacy_users(hedef, eski_yol=eski))
+        except Exception as e:
+            hatalar.append(e)
+
+    threadler = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threadler:
+        t.start()
+    for t in threadler:
+        t.join()
+
+    assert hatalar == []
+    assert sorted(sonuclar) == [0, 0, 0, 2]
+    assert _kullanici_adlari(hedef) == ['admin', 'depo1']
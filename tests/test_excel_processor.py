@@ -0,0 +1,57 @@
+"""Excel import - sayfa 3 düzeni (CR7:DB1000, COLUMN_MAPPING sırası) doğru alanlara okunmalı"""
+
+import os
+import sys
+
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.excel_processor import ExcelProcessor  # noqa: E402
+from tools.generate_dataset import build_catalog, write_source_workbook  # noqa: E402
+
+BASLIKLAR = ['MAĞAZA PRES STOK', 'TEDARİKÇİ', 'SİSTEM SERİ', 'ÜRÜN ADI', 'RENK', 'UZUNLUK', 'MT KG', 'BOY KG',
+             'ADET', 'TOPLAM KG', 'KONUM']
+
+
+def _sayfa3(yol, satirlar):
+    workbook = Workbook()
+    sayfa = workbook.active
+    sayfa.title = '3'
+    for sira, hucreler in enumerate([BASLIKLAR] + satirlar):
+        for i, deger in enumerate(hucreler):
+            # CR = 96. sütun (1 tabanlı), başlıklar 6. satırda
+            sayfa.cell(row=6 + sira, column=96 + i, value=deger)
+        # Aralık dışındaki sütunlar (CP, DC) okunmamalı
+        sayfa.cell(row=6 + sira, column=94, value='ARALIK DIŞI')
+        sayfa.cell(row=6 + sira, column=107, value='ARALIK DIŞI')
+    workbook.save(yol)
+
+
+def test_sayfa3_sutunlari_alanlara_eslenir(tmp_path):
+    yol = str(tmp_path / 'kaynak.xlsx')
+    _sayfa3(yol, [['ALM-1042', 'Asaş', 'Rigel 6000', 'Kasa Profili', 'Antrasit Gri', 6, 1.2, 7.2, 40, 288,
+                   'A-01-1']])
+
+    processor = ExcelProcessor()
+    assert processor.read_excel_file(yol), processor.errors
+
+    assert list(processor.data.columns) == ['urun_kodu', 'sistem_seri', 'urun_adi', 'renk', 'uzunluk', 'mt_kg',
+                                            'boy_kg', 'adet', 'toplam_kg', 'konum']
+    satir = processor.data.iloc[0]
+    assert (satir['urun_kodu'], satir['urun_adi'], satir['sistem_seri'], satir['renk']) == \
+        ('ALM-1042', 'Kasa Profili', 'Rigel 6000', 'Antrasit Gri')
+    assert (satir['adet'], satir['konum']) == (40, 'A-01-1')
+
+
+def test_uretilen_kaynak_excel_okunabilir(tmp_path):
+    yol = str(tmp_path / 'uretilen.xlsx')
+    katalog = build_catalog(20, seed=1)
+    write_source_workbook(yol, katalog, 10, seed=1)
+
+    processor = ExcelProcessor()
+    assert processor.read_excel_file(yol), processor.errors
+
+    assert len(processor.data) == 10
+    kayitlar = {(k[0], k[3], k[7]) for k in katalog}
+    assert all((r.urun_kodu, r.renk, r.konum) in kayitlar for r in processor.data.itertuples())
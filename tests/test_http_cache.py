@@ -0,0 +1,60 @@
+"""Koşullu GET - doğrulama veri sürümü ETag'iyle yapılmalı, saniye hassasiyetindeki zamanla değil"""
+
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import init_app, init_db, get_db_connection, close_pooled_connections  # noqa: E402
+from utils.http_cache import init_http_cache, conditional_get  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config.update(DATABASE_PATH=str(tmp_path / 'test.db'), SECRET_KEY='test', ETAG_SALT='test')
+    init_app(app)
+    init_http_cache(app)
+    with app.app_context():
+        init_db()
+
+    @app.route('/rapor')
+    @conditional_get
+    def rapor():
+        return str(get_db_connection().execute('SELECT COUNT(*) FROM stoklar').fetchone()[0])
+
+    yield app
+    close_pooled_connections(app.config['DATABASE_PATH'])
+
+
+def _stok_ekle(app):
+    with app.app_context():
+        db = get_db_connection()
+        db.execute("INSERT INTO stoklar (urun_kodu, urun_adi, konum, adet) VALUES ('P1', 'Profil', 'A1', 1)")
+        db.commit()
+
+
+def test_sadece_if_modified_since_304_dondurmez(app):
+    client = app.test_client()
+    ilk = client.get('/rapor')
+    assert ilk.status_code == 200
+    assert 'Last-Modified' not in ilk.headers
+
+    # Aynı saniye içinde yazma - zaman damgası değişmese de sürüm değişir
+    _stok_ekle(app)
+    yanit = client.get('/rapor', headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+
+    assert yanit.status_code == 200
+    assert yanit.get_data(as_text=True) == '1'
+
+
+def test_etag_surum_degisene_kadar_304(app):
+    client = app.test_client()
+    etag = client.get('/rapor').headers['ETag']
+
+    assert client.get('/rapor', headers={'If-None-Match': etag}).status_code == 304
+    _stok_ekle(app)
+    assert client.get('/rapor', headers={'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,33 @@
+"""Metrikler - kapanan worker'ların dosyaları toplama katılmamalı"""
+
+import json
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import collect_metrics  # noqa: E402
+
+
+def _dosya_yaz(klasor, pid, istek):
+    with open(os.path.join(klasor, f'metrics-{pid}.json'), 'w', encoding='utf-8') as f:
+        json.dump({'main.index': {'count': istek, 'statuses': {'200': istek}}}, f)
+
+
+def test_kapanan_worker_dosyasi_silinir(tmp_path):
+    # Bitmiş bir sürecin pid'i (yeniden başlatılan worker)
+    olu = subprocess.Popen([sys.executable, '-c', 'pass'])
+    olu.wait()
+    canli = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        _dosya_yaz(tmp_path, olu.pid, 5)
+        _dosya_yaz(tmp_path, canli.pid, 3)
+
+        metrikler = collect_metrics(str(tmp_path))
+    finally:
+        canli.kill()
+        canli.wait()
+
+    assert (metrikler['main.index']['count'], metrikler['main.index']['statuses']) == (3, {'200': 3})
+    assert sorted(os.listdir(tmp_path)) == [f'metrics-{canli.pid}.json']
@@ -0,0 +1,89 @@
+"""Single-flight + kabul kontrolü birlikte - aynı raporu isteyenler yük atılmadan tek hesaplamayı paylaşmalı"""
+
+import os
+import stat
+import sys
+import threading
+import time
+
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import admission, single_flight as single_flight_module  # noqa: E402
+from utils.database import init_app, init_db, close_pooled_connections  # noqa: E402
+from utils.single_flight import init_single_flight, single_flight  # noqa: E402
+
+
+def test_bekleyenler_yuva_almadan_sonucu_paylasir(tmp_path):
+    app = Flask(__name__)
+    # Tek yuva, kuyruk yok: her istek ayrı ayrı kabul kontrolüne girseydi ilki dışındakiler 503 alırdı
+    app.config.update(DATABASE_PATH=str(tmp_path / 'test.db'), ADMISSION_DIR=str(tmp_path / 'admission'),
+                      ADMISSION_LIMITS='report=1:0:0', ADMISSION_CAPACITY=1, ADMISSION_RESERVED_LIGHT=0,
+                      SINGLE_FLIGHT_DIR=str(tmp_path / 'single-flight'))
+    init_app(app)
+    admission.init_admission_control(app)
+    admission.reset_admission_stats()
+    init_single_flight(app)
+    with app.app_context():
+        init_db()
+
+    hesaplama_sayisi = []
+
+    def hesapla():
+        with admission.admitted('report'):
+            hesaplama_sayisi.append(1)
+            time.sleep(0.3)
+            return {'urunler': 3}
+
+    @app.route('/rapor')
+    def rapor():
+        return single_flight('stock_report', {'page': 1}, hesapla)
+
+    sonuclar = []
+    kilit = threading.Lock()
+
+    def iste():
+        yanit = app.test_client().get('/rapor', headers={'X-Requested-With': 'XMLHttpRequest'})
+        with kilit:
+            sonuclar.append((yanit.status_code, yanit.headers.get('X-Single-Flight')))
+
+    threadler = [threading.Thread(target=iste) for _ in range(6)]
+    for t in threadler:
+        t.start()
+    for t in threadler:
+        t.join()
+    close_pooled_connections(app.config['DATABASE_PATH'])
+
+    assert [durum for durum, _ in sonuclar] == [200] * 6
+    assert len(hesaplama_sayisi) == 1
+    assert sorted(isaret for _, isaret in sonuclar).count('leader') == 1
+    assert admission.get_admission_status()['groups']['report']['admitted'] == 1
+
+
+def test_varsayilan_klasor_veritabaninin_yaninda_ve_ozel(tmp_path):
+    app = Flask(__name__)
+    app.config.update(DATABASE_PATH=str(tmp_path / 'test.db'))
+    init_single_flight(app)
+
+    klasor = app.config['SINGLE_FLIGHT_DIR']
+    assert klasor == str(tmp_path / 'test.db') + '-single-flight'
+    assert stat.S_IMODE(os.stat(klasor).st_mode) == 0o700
+    assert single_flight_module._ayarlar['acik']
+
+
+def test_baskalarinin_yazabildigi_klasor_kullanilmaz(tmp_path):
+    klasor = tmp_path / 'paylasilan'
+    klasor.mkdir()
+    os.chmod(klasor, 0o777)
+    (klasor / 'ekilen.pickle').write_bytes(b'kotu')
+    app = Flask(__name__)
+    app.config.update(DATABASE_PATH=str(tmp_path / 'test.db'), SINGLE_FLIGHT_DIR=str(klasor),
+                      ADMISSION_DIR=str(klasor))
+    init_single_flight(app)
+    admission.init_admission_control(app)
+
+    assert not single_flight_module._ayarlar['acik']
+    assert not admission._ayarlar['acik']
+    with app.test_request_context('/rapor'):
+        assert single_flight('stock_report', {'page': 1}, lambda: 'hesaplandı') == 'hesaplandı'
@@ -0,0 +1,4 @@
+"""
+Geliştirme ve performans araçları (komut satırından çalıştırılır)
+Örnek: python -m tools.index_advisor --db stok_takip_prod.db
+"""
@@ -0,0 +1,42 @@
+"""
+Araçlar için ortak yardımcılar - uygulamayı belirli bir veritabanıyla yükleme
+"""
+
+import logging
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(db_path, log_level=logging.WARNING, single_flight=False, admission=False, fragment_cache=True):
+    """Uygulamayı verilen veritabanı dosyasıyla oluştur
+
+    app modülü içe aktarılırken uygulama oluşturulduğu için DATABASE_PATH ve ayarlar önceden ortam
+    değişkenlerine yazılır. Ölçümler gerçek sorgu / render maliyetini görsün diye single-flight (sonuçları
+    SINGLE_FLIGHT_RESULT_TTL saniye paylaşır) ve kabul kontrolü varsayılan olarak kapalıdır.
+    """
+    os.environ['DATABASE_PATH'] = os.path.abspath(db_path)
+    os.environ['SINGLE_FLIGHT_ENABLED'] = '1' if single_flight else '0'
+    os.environ['ADMISSION_ENABLED'] = '1' if admission else '0'
+    if not fragment_cache:
+        os.environ['FRAGMENT_CACHE_SIZE'] = '0'
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    logging.getLogger().setLevel(log_level)
+
+    import app as app_module
+    app = app_module.app
+    logging.getLogger().setLevel(log_level)
+    app.config['TESTING'] = True
+    return app
+
+
+def admin_client(app):
+    """Admin oturumu açılmış test istemcisi"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+        session['username'] = 'admin'
+        session['user_role'] = 'admin'
+    return client
@@ -0,0 +1,436 @@
+"""
+Sentetik veri seti üretici - üretim boyutundaki performans sorunlarını yerelde yeniden üretmek için
+
+Üretilenler:
+- stoklar: ürün x renk x konum kombinasyonları (Türkçe ürün adları, sistem serileri, ağırlıklar)
+- stok_hareketleri: zaman sıralı giriş / çıkış / transfer geçmişi; hareket yoğunluğu Zipf benzeri
+  dağılımla birkaç popüler üründe toplanır (--skew), önceki/yeni miktarlar tutarlıdır ve
+  stoklar.adet son bakiyeyi gösterir
+- urun_rezervasyon_notlari: ürün + renk bazında notlar
+- İsteğe bağlı kaynak Excel dosyası: ExcelProcessor'ın beklediği '3' sayfası düzeninde
+  (7. satırdan itibaren CR:DB sütunları)
+
+Hız için şema uygulamanın init_db() fonksiyonuyla oluşturulur, yükleme sırasında tetikleyiciler ve
+ikincil indeksler kaldırılıp sonda yeniden oluşturulur; rastgele değerler numpy ile parça parça üretilir.
+
+Kullanım:
+    python -m tools.generate_dataset --db /tmp/stok_10m.db --products 20000 --movements 10000000
+    python -m tools.generate_dataset --excel /tmp/kaynak_50k.xlsx --products 20000 --excel-rows 50000
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from .common import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+# Bir seferde üretilip yazılan hareket sayısı
+PARCA_BOYUTU = 200_000
+
+URUN_TIPLERI = (
+    'Kasa Profili', 'Kanat Profili', 'Orta Kayıt', 'Pervaz', 'Eşik Profili', 'Köşe Birleşim Profili',
+    'Cam Çıtası', 'Kapı Kanadı', 'Sürme Ray', 'Üst Kasa', 'Alt Kasa', 'Kepenk Lameli', 'Giyotin Rayı',
+    'Küpeşte Profili', 'Baza Profili', 'Dikme Profili', 'Kayıt Profili', 'Kapak Profili', 'Adaptör Profili',
+    'Sineklik Profili', 'Panjur Kutusu', 'Sabit Cam Profili', 'Menteşe Profili', 'Birleşim Profili',
+)
+URUN_NITELIKLERI = (
+    'Isı Yalıtımlı', 'Yalıtımsız', 'Ağır Seri', 'Hafif Seri', 'Çift Kanal', 'Tek Kanal', 'Geniş',
+    'Dar', 'Takviyeli', 'Oluklu', 'Düz', 'Yuvarlak Hatlı', 'Köşeli', 'Gizli Kanat', 'Açılır',
+)
+SISTEM_SERILERI = (
+    'Rigel 4500', 'Rigel 6000', 'Rigel 7200 Isı Yalıtımlı', 'Sürme 60', 'Sürme 80 Katlanır',
+    'Giyotin 40', 'Cephe 50', 'Cephe 65 Kapaklı', 'Küpeşte 30', 'Kepenk 55', 'Panjur 39', 'Kapı 70',
+)
+RENKLER = (
+    'Ham', 'Beyaz', 'Antrasit Gri', 'Siyah', 'Bronz', 'Eloksal Gümüş', 'Altın Meşe', 'Ceviz', 'Krem',
+    'Bordo', 'Şampanya', 'Kahverengi', 'Füme', 'Açık Gri', 'Yeşil', 'Lacivert', 'Maun', 'Fındık',
+)
+TEDARIKCILER = ('Rigel Alüminyum', 'Asaş', 'Cuhadaroğlu', 'Pimapen Alüminyum', 'Sistem Profil')
+DEPOLAR = ('A', 'B', 'C', 'D', 'E', 'F', 'G', 'H')
+KULLANICILAR = ('admin', 'depo1', 'depo2', 'sevkiyat', 'uretim', 'muhasebe')
+NOT_SABLONLARI = (
+    '{musteri} için {adet} adet ayrıldı',
+    '{musteri} siparişi - teslim tarihi bekleniyor',
+    'Şantiye sevkiyatı: {musteri}',
+    'Kesim bekliyor, {adet} boy rezerve',
+)
+MUSTERILER = ('Yılmaz Yapı', 'Öztürk Alüminyum', 'Çelik İnşaat', 'Doğan Pencere', 'Şahin Cephe',
+              'Güneş Yapı Market', 'Aydın Doğrama', 'Koç Proje', 'Erdem Mimarlık', 'Kılıç Taahhüt')
+
+# Hareket tipi olasılıkları (çıkış yetersiz bakiyede girişe, transfer tek konumlu üründe çıkışa döner)
+GIRIS_ORANI = 0.35
+TRANSFER_ORANI = 0.08
+
+# ExcelProcessor.read_excel_file düzeni: veri 7. satırdan başlar, sütunlar 95-105 (CR:DB, COLUMN_MAPPING sırası)
+EXCEL_SAYFA_ADI = '3'
+EXCEL_BASLIK_SATIRI = 6
+EXCEL_ILK_SUTUN = 95
+EXCEL_BASLIKLAR = ('MAĞAZA PRES STOK', 'TEDARİKÇİ', 'SİSTEM SERİ', 'ÜRÜN ADI', 'RENK', 'UZUNLUK', 'MT KG',
+                   'BOY KG', 'ADET', 'TOPLAM KG', 'KONUM')
+
+# Yükleme sırasında kaldırılıp sonra yeniden oluşturulan nesnelerin tabloları
+YUKLENEN_TABLOLAR = ('stoklar', 'stok_hareketleri', 'urun_rezervasyon_notlari')
+
+
+def _konumlar(konum_sayisi):
+    """Depo-raf-kat biçiminde konum adları (A-01-1, A-01-2, ...)"""
+    konumlar = []
+    for i in range(konum_sayisi):
+        depo = DEPOLAR[i % len(DEPOLAR)]
+        raf, kat = divmod(i // len(DEPOLAR), 4)
+        konumlar.append(f'{depo}-{raf + 1:02d}-{kat + 1}')
+    return konumlar
+
+
+def _renkler(renk_sayisi):
+    renkler = list(RENKLER[:renk_sayisi])
+    ral = 1000
+    while len(renkler) < renk_sayisi:
+        renkler.append(f'RAL {ral + len(renkler) * 13}')
+    return renkler
+
+
+def build_catalog(urun_sayisi, renk_sayisi=12, konum_sayisi=60, varyant=3.0, seed=42):
+    """Stok satırlarını (ürün x renk x konum) üret
+
+    Her ürün için ortalama `varyant` kadar benzersiz renk-konum çifti seçilir. Dönen liste
+    stoklar tablosunun kolon sırasındaki tuple'lardır (adet hareket üretiminde doldurulur).
+    """
+    rng = np.random.default_rng(seed)
+    renkler = _renkler(renk_sayisi)
+    konumlar = _konumlar(konum_sayisi)
+    kombinasyon = renk_sayisi * konum_sayisi
+
+    # Renk popülerliği azalan ağırlıklıdır (ilk renkler çoğu üründe bulunur), konumlar eşit dağılır
+    renk_agirliklari = 1.0 / np.arange(1, renk_sayisi + 1)
+    olasiliklar = np.repeat(renk_agirliklari / renk_agirliklari.sum() / konum_sayisi, konum_sayisi)
+    olasiliklar /= olasiliklar.sum()
+
+    katalog = []
+    varyant_sayilari = np.clip(rng.poisson(max(varyant - 1, 0), urun_sayisi) + 1, 1, kombinasyon)
+    tipler = rng.integers(0, len(URUN_TIPLERI), urun_sayisi)
+    nitelikler = rng.integers(0, len(URUN_NITELIKLERI), urun_sayisi)
+    seriler = rng.integers(0, len(SISTEM_SERILERI), urun_sayisi)
+    uzunluklar = rng.choice((6000, 6500, 7000), urun_sayisi, p=(0.6, 0.25, 0.15))
+    mt_kglar = np.round(rng.uniform(0.25, 4.5, urun_sayisi), 3)
+    for i in range(urun_sayisi):
+        urun_kodu = f'RG{i + 1:06d}'
+        urun_adi = f'{SISTEM_SERILERI[seriler[i]].split()[0]} {URUN_NITELIKLERI[nitelikler[i]]} {URUN_TIPLERI[tipler[i]]}'
+        uzunluk = int(uzunluklar[i])
+        mt_kg = float(mt_kglar[i])
+        boy_kg = round(uzunluk / 1000 * mt_kg, 3)
+        secimler = rng.choice(kombinasyon, int(varyant_sayilari[i]), replace=False, p=olasiliklar)
+        for secim in secimler:
+            renk = renkler[min(int(secim) // konum_sayisi, renk_sayisi - 1)]
+            konum = konumlar[int(secim) % konum_sayisi]
+            katalog.append((urun_kodu, urun_adi, SISTEM_SERILERI[seriler[i]], renk, uzunluk, mt_kg, boy_kg, konum))
+    return katalog
+
+
+def _zipf_agirliklari(n, skew, rng):
+    """Popülerlik ağırlıkları - sıralama rastgele karıştırılır (popüler ürünler kod sırasına bağlı olmaz)"""
+    agirliklar = 1.0 / np.power(np.arange(1, n + 1, dtype=np.float64), skew)
+    rng.shuffle(agirliklar)
+    kumulatif = np.cumsum(agirliklar)
+    return kumulatif / kumulatif[-1]
+
+
+def _tarih_metinleri(saniyeler):
+    """Unix saniyelerini 'YYYY-MM-DD HH:MM:SS' metnine çevir (vektörel)"""
+    if not len(saniyeler):
+        return []
+    metinler = np.datetime_as_string(saniyeler.astype('datetime64[s]'), unit='s')
+    return np.char.replace(metinler, 'T', ' ').tolist()
+
+
+def _hareketler(katalog, hareket_sayisi, gun, skew, seed):
+    """Zaman sıralı hareket parçaları üret; bakiyeleri katalog satırı başına izler
+
+    Her stok satırı geçmişin başında bir ilk girişle açılır, sonra hareketler popülerlik
+    ağırlığıyla satırlara dağıtılır. Transfer iki hareket satırı yazar (çıkış ve giriş konumu).
+    """
+    rng = np.random.default_rng(seed + 1)
+    n = len(katalog)
+    bitis = int(time.time())
+    baslangic = bitis - gun * 86400
+    bakiyeler = [0] * n
+
+    # Aynı ürün + renkteki diğer konumlar (transfer hedefleri)
+    gruplar = {}
+    for idx, satir in enumerate(katalog):
+        gruplar.setdefault((satir[0], satir[3]), []).append(idx)
+    hedefler = [gruplar[(satir[0], satir[3])] for satir in katalog]
+
+    # İlk girişler geçmişin ilk %5'ine yayılır
+    ilk_sayi = min(n, hareket_sayisi)
+    ilk_tarihler = _tarih_metinleri(np.sort(rng.integers(baslangic, baslangic + gun * 4320 + 1, ilk_sayi)))
+    ilk_miktarlar = rng.integers(20, 400, ilk_sayi).tolist()
+    parca = []
+    for idx in range(ilk_sayi):
+        satir = katalog[idx]
+        adet = ilk_miktarlar[idx]
+        bakiyeler[idx] = adet
+        parca.append((satir[0], 'GIRIS', adet, 0, adet, satir[7], f'İlk stok girişi: {adet} adet',
+                      'admin', ilk_tarihler[idx]))
+    yield parca
+
+    kalan = hareket_sayisi - ilk_sayi
+    if kalan <= 0:
+        return bakiyeler
+    kumulatif = _zipf_agirliklari(n, skew, rng)
+    ilk_son = baslangic + gun * 4320
+    adim = (bitis - ilk_son) / kalan
+    uretilen = 0
+    while uretilen < kalan:
+        adet_parca = min(PARCA_BOYUTU, kalan - uretilen)
+        secilen = np.searchsorted(kumulatif, rng.random(adet_parca)).tolist()
+        tip_zar = rng.random(adet_parca).tolist()
+        miktarlar = np.minimum(rng.geometric(0.08, adet_parca), 250).tolist()
+        hedef_zar = rng.random(adet_parca).tolist()
+        kullanici_idx = rng.integers(0, len(KULLANICILAR), adet_parca).tolist()
+        saniyeler = ilk_son + ((np.arange(uretilen, uretilen + adet_parca) + rng.random(adet_parca)) * adim)
+        tarihler = _tarih_metinleri(saniyeler.astype(np.int64))
+
+        parca = []
+        for j in range(adet_parca):
+            idx = secilen[j]
+            satir = katalog[idx]
+            miktar = miktarlar[j]
+            onceki = bakiyeler[idx]
+            kullanici = KULLANICILAR[kullanici_idx[j]]
+            zar = tip_zar[j]
+            digerleri = hedefler[idx]
+            if zar < TRANSFER_ORANI and len(digerleri) > 1 and onceki >= miktar:
+                hedef = digerleri[int(hedef_zar[j] * len(digerleri))]
+                if hedef == idx:
+                    hedef = digerleri[(digerleri.index(idx) + 1) % len(digerleri)]
+                hedef_konum = katalog[hedef][7]
+                bakiyeler[idx] = onceki - miktar
+                hedef_onceki = bakiyeler[hedef]
+                bakiyeler[hedef] = hedef_onceki + miktar
+                parca.append((satir[0], 'TRANSFER', miktar, onceki, onceki - miktar, satir[7],
+                              f'Transfer çıkış: {hedef_konum} konumuna {miktar} adet', kullanici, tarihler[j]))
+                parca.append((satir[0], 'TRANSFER', miktar, hedef_onceki, hedef_onceki + miktar, hedef_konum,
+                              f'Transfer giriş: {satir[7]} konumundan {miktar} adet', kullanici, tarihler[j]))
+            elif zar < TRANSFER_ORANI + GIRIS_ORANI or onceki < miktar:
+                bakiyeler[idx] = onceki + miktar
+                parca.append((satir[0], 'GIRIS', miktar, onceki, onceki + miktar, satir[7],
+                              f'Stok girişi: {miktar} adet eklendi', kullanici, tarihler[j]))
+            else:
+                bakiyeler[idx] = onceki - miktar
+                parca.append((satir[0], 'CIKIS', miktar, onceki, onceki - miktar, satir[7],
+                              f'Stok çıkışı: {miktar} adet', kullanici, tarihler[j]))
+        uretilen += adet_parca
+        yield parca
+    return bakiyeler
+
+
+def _schema_olustur(db_path):
+    """Şemayı uygulamanın init_db() fonksiyonuyla oluştur (tam uygulama yüklenmeden)"""
+    from flask import Flask
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    from utils.database import init_db, init_app, close_pooled_connections
+
+    app = Flask(__name__)
+    app.config['DATABASE_PATH'] = db_path
+    init_app(app)
+    with app.app_context():
+        init_db()
+    # init_db'nin bağlantısı havuza iade edilir ve açık kalır; toplu yükleme journal_mode=OFF için
+    # dosyada başka bağlantı olmamalı
+    close_pooled_connections(db_path)
+
+
+def _yukleme_nesnelerini_kaldir(db):
+    """Yüklenen tablolardaki tetikleyicileri ve ikincil indeksleri kaldır, yeniden oluşturma SQL'lerini döndür"""
+    yer_tutucular = ','.join('?' * len(YUKLENEN_TABLOLAR))
+    nesneler = db.execute(f'''
+        SELECT type, name, sql FROM sqlite_master
+        WHERE type IN ('index', 'trigger') AND sql IS NOT NULL AND tbl_name IN ({yer_tutucular})
+    ''', YUKLENEN_TABLOLAR).fetchall()
+    for tip, ad, _ in nesneler:
+        db.execute(f'DROP {tip.upper()} {ad}')
+    # İndeksler tetikleyicilerden önce oluşturulur
+    return [sql for tip, _, sql in sorted(nesneler, key=lambda n: n[0] != 'index')]
+
+
+def generate_database(db_path, katalog, hareket_sayisi, gun=730, skew=1.0, not_orani=0.05, seed=42,
+                      ilerleme=None):
+    """Veritabanını sıfırdan oluşturup doldur; özet istatistikleri döndürür"""
+    if os.path.exists(db_path):
+        raise FileExistsError(f'{db_path} zaten var')
+    baslangic = time.perf_counter()
+    _schema_olustur(db_path)
+
+    db = sqlite3.connect(db_path)
+    db.execute('PRAGMA journal_mode=OFF')
+    db.execute('PRAGMA synchronous=OFF')
+    db.execute('PRAGMA cache_size=-262144')
+    yeniden_olustur = _yukleme_nesnelerini_kaldir(db)
+    db.commit()
+
+    db.execute('BEGIN')
+    yazilan = 0
+    uretici = _hareketler(katalog, hareket_sayisi, gun, skew, seed)
+    bakiyeler = None
+    while True:
+        try:
+            parca = next(uretici)
+        except StopIteration as bitis:
+            bakiyeler = bitis.value
+            break
+        db.executemany('''
+            INSERT INTO stok_hareketleri
+            (urun_kodu, hareket_tipi, miktar, onceki_miktar, yeni_miktar, konum, aciklama, kullanici, tarih)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', parca)
+        yazilan += len(parca)
+        if ilerleme:
+            ilerleme(yazilan, hareket_sayisi)
+
+    rng = np.random.default_rng(seed + 2)
+    kritik_sinirlar = rng.choice((5, 10, 20, 50), len(katalog), p=(0.55, 0.25, 0.15, 0.05)).tolist()
+    db.executemany('''
+        INSERT INTO stoklar (urun_kodu, urun_adi, sistem_seri, renk, uzunluk, mt_kg, boy_kg, adet, toplam_kg,
+                             konum, kritik_stok_siniri, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        (*satir[:7], bakiyeler[idx], round(bakiyeler[idx] * satir[6], 3), satir[7], kritik_sinirlar[idx],
+         _olusturma_tarihi(gun), datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        for idx, satir in enumerate(katalog)
+    ))
+
+    urun_renkleri = sorted({(satir[0], satir[3]) for satir in katalog})
+    not_sayisi = int(len(urun_renkleri) * not_orani)
+    secilenler = rng.choice(len(urun_renkleri), not_sayisi, replace=False).tolist() if not_sayisi else []
+    db.executemany('''
+        INSERT INTO urun_rezervasyon_notlari (urun_kodu, renk, rezervasyon_notu) VALUES (?, ?, ?)
+    ''', (
+        (*urun_renkleri[i], NOT_SABLONLARI[i % len(NOT_SABLONLARI)].format(
+            musteri=MUSTERILER[i % len(MUSTERILER)], adet=5 + i % 40))
+        for i in secilenler
+    ))
+    db.commit()
+
+    for sql in yeniden_olustur:
+        db.execute(sql)
+    db.execute('UPDATE veri_surumu SET surum = surum + 1, guncelleme_tarihi = CURRENT_TIMESTAMP WHERE id = 1')
+    db.commit()
+    db.execute('ANALYZE')
+    db.execute('PRAGMA journal_mode=WAL')
+    db.close()
+
+    return {
+        'db': db_path,
+        'stok_satiri': len(katalog),
+        'urun': len({satir[0] for satir in katalog}),
+        'hareket': yazilan,
+        'rezervasyon_notu': not_sayisi,
+        'sure_sn': round(time.perf_counter() - baslangic, 1),
+        'boyut_mb': round(os.path.getsize(db_path) / 1024 / 1024, 1),
+    }
+
+
+def _olusturma_tarihi(gun):
+    return (datetime.now() - timedelta(days=gun)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def write_source_workbook(path, katalog, satir_sayisi=None, seed=42):
+    """ExcelProcessor'ın okuduğu '3' sayfası düzeninde kaynak Excel dosyası yaz
+
+    Satırlar katalogdan alınır (mevcut stokları güncelleyen ve yeni ekleyen import senaryoları için
+    aynı katalogla üretilmiş veritabanı kullanılabilir). boy_kg / toplam_kg import sırasında yeniden
+    hesaplandığı için burada da aynı formülle yazılır.
+    """
+    from openpyxl import Workbook
+
+    satir_sayisi = len(katalog) if satir_sayisi is None else satir_sayisi
+    if satir_sayisi > len(katalog):
+        raise ValueError(f'Katalogda {len(katalog)} satır var, {satir_sayisi} istendi (--products artırılmalı)')
+    rng = np.random.default_rng(seed + 3)
+    secilenler = np.sort(rng.choice(len(katalog), satir_sayisi, replace=False)).tolist()
+    adetler = rng.integers(0, 500, satir_sayisi).tolist()
+
+    workbook = Workbook(write_only=True)
+    sayfa = workbook.create_sheet(EXCEL_SAYFA_ADI)
+    bos = [None] * EXCEL_ILK_SUTUN
+    for _ in range(EXCEL_BASLIK_SATIRI - 1):
+        sayfa.append([])
+    sayfa.append(bos + list(EXCEL_BASLIKLAR))
+    for sira, idx in enumerate(secilenler):
+        urun_kodu, urun_adi, sistem_seri, renk, uzunluk, mt_kg, boy_kg, konum = katalog[idx]
+        adet = adetler[sira]
+        sayfa.append(bos + [urun_kodu, TEDARIKCILER[idx % len(TEDARIKCILER)], sistem_seri, urun_adi, renk,
+                            uzunluk, mt_kg, boy_kg, adet, round(adet * boy_kg, 3), konum])
+    workbook.save(path)
+    # path dosya yolu ya da yazılabilir dosya nesnesi (ör. BytesIO) olabilir
+    boyut = os.path.getsize(path) if isinstance(path, str) else None
+    return {'excel': path, 'satir': satir_sayisi, 'boyut_mb': round(boyut / 1024 / 1024, 1) if boyut else None}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sentetik stok veritabanı ve kaynak Excel üretici')
+    parser.add_argument('--db', help='Oluşturulacak SQLite dosyası')
+    parser.add_argument('--excel', help='Oluşturulacak kaynak Excel dosyası (sayfa 3 düzeni)')
+    parser.add_argument('--products', type=int, default=5000, help='Ürün kodu sayısı')
+    parser.add_argument('--colors', type=int, default=12, help='Renk sayısı')
+    parser.add_argument('--locations', type=int, default=60, help='Konum sayısı')
+    parser.add_argument('--variants', type=float, default=3.0, help='Ürün başına ortalama renk-konum satırı')
+    parser.add_argument('--movements', type=int, default=1_000_000, help='Hareket satırı sayısı')
+    parser.add_argument('--days', type=int, default=730, help='Hareket geçmişinin uzunluğu (gün)')
+    parser.add_argument('--skew', type=float, default=1.0,
+                        help='Hareket yoğunluğu çarpıklığı (Zipf üssü; 0 = eşit dağılım)')
+    parser.add_argument('--notes', type=float, default=0.05, help='Rezervasyon notu olan ürün-renk oranı')
+    parser.add_argument('--excel-rows', type=int, help='Excel satır sayısı (varsayılan: tüm katalog)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--force', action='store_true', help='Var olan dosyaların üzerine yaz')
+    args = parser.parse_args(argv)
+
+    if not args.db and not args.excel:
+        parser.error('--db veya --excel verilmelidir')
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    for hedef in (args.db, args.excel):
+        if hedef and os.path.exists(hedef):
+            if not args.force:
+                parser.error(f'{hedef} zaten var (--force ile üzerine yazılır)')
+            os.remove(hedef)
+            for ek in ('-wal', '-shm'):
+                if os.path.exists(hedef + ek):
+                    os.remove(hedef + ek)
+
+    baslangic = time.perf_counter()
+    katalog = build_catalog(args.products, args.colors, args.locations, args.variants, args.seed)
+    logger.info(f'Katalog: {len(katalog)} stok satırı ({time.perf_counter() - baslangic:.1f} sn)')
+
+    if args.db:
+        son_bildirim = [0.0]
+
+        def ilerleme(yazilan, toplam):
+            simdi = time.perf_counter()
+            if simdi - son_bildirim[0] >= 5:
+                son_bildirim[0] = simdi
+                logger.info(f'  {yazilan:,} / {toplam:,} hareket ({simdi - baslangic:.0f} sn)')
+
+        ozet = generate_database(args.db, katalog, args.movements, args.days, args.skew, args.notes, args.seed,
+                                 ilerleme)
+        logger.info(f"Veritabanı: {ozet['db']} - {ozet['stok_satiri']:,} stok, {ozet['hareket']:,} hareket, "
+                    f"{ozet['rezervasyon_notu']:,} not, {ozet['boyut_mb']} MB ({ozet['sure_sn']} sn)")
+
+    if args.excel:
+        ozet = write_source_workbook(args.excel, katalog, args.excel_rows, args.seed)
+        logger.info(f"Excel: {ozet['excel']} - {ozet['satir']:,} satır, {ozet['boyut_mb']} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,535 @@
+"""
+İndeks danışmanı - uygulamanın sorgularını gerçek boyutlu bir veritabanında EXPLAIN QUERY PLAN ile inceler
+
+1. Sorgu kataloğu toplanır: temsili sayfa/API istekleri test istemcisiyle çalıştırılır, stok fonksiyonları
+   geri alınan bir SAVEPOINT içinde çağrılır ve her SQL metni kaydedilir. İsteğe bağlı olarak
+   /api/sql-profile çıktısı (canlı sunucudaki parmak izleri) da kataloğa eklenir.
+2. Her sorgunun planında tam tablo taraması (SCAN), geçici B-tree sıralaması ve otomatik indeks aranır.
+3. Sorgudaki eşitlik / aralık / sıralama kolonlarından bileşik, kısmi (partial) veya kapsayan (covering)
+   indeks önerileri üretilir. Öneriler geri alınan bir transaction içinde oluşturulup plan yeniden
+   alınarak doğrulanır - planı iyileştirmeyen öneri raporlanmaz.
+4. Katalogdaki hiçbir planda kullanılmayan indeksler yazma maliyeti için kaldırma adayı olarak listelenir.
+
+Kullanım:
+    python -m tools.index_advisor --db stok_takip_prod.db [--profile-json profil.json] [--json rapor.json]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import re
+import sys
+import time
+
+from .common import load_app, admin_client
+
+logger = logging.getLogger(__name__)
+
+# Uygulama tabloları (plan satırlarındaki takma adlar bu tablolara çözülür)
+UYGULAMA_TABLOLARI = ('stoklar', 'stok_hareketleri', 'urun_rezervasyon_notlari', 'rezervasyonlar',
+                      'rezervasyon_hareketleri', 'degisiklik_olaylari', 'kullanicilar', 'toplu_islem_anahtarlari')
+
+# Katalog için tekrar oynatılan GET istekleri - {alan} değerleri veritabanındaki örnek üründen doldurulur
+REPLAY_GET = (
+    '/',
+    '/api/dashboard/widgets',
+    '/stock-list',
+    '/stock-list?page=20',
+    '/stock-list?search={urun_kodu}',
+    '/stock-list?location={konum}',
+    '/stock-list?color={renk}',
+    '/stock-list?sistem_seri={sistem_seri}&sort_by=adet&sort_order=desc',
+    '/stock-report',
+    '/stock-report?search={urun_adi_kelime}',
+    '/api/stock-report?page=5',
+    '/api/stock-report?color={renk}&sort_by=toplam_adet&sort_order=desc',
+    '/api/stock-report?sistem_seri={sistem_seri}',
+    '/stock-movements',
+    '/stock-movements?page=100',
+    '/stock-movements?urun_kodu={urun_kodu}',
+    '/stock-movements?hareket_tipi=CIKIS',
+    '/stock-movements?search={urun_kodu}',
+    '/api/product-movements?urun_kodu={urun_kodu}',
+    '/api/search-products?q={urun_kodu_on_ek}',
+    '/api/product-detail?urun_kodu={urun_kodu}&renk={renk}',
+    '/api/check-stock?urun_kodu={urun_kodu}&renk={renk}&konum={konum}',
+    '/api/stock-detail?urun_kodu={urun_kodu}&renk={renk}&konum={konum}',
+    '/settings/critical-stock',
+    '/settings/critical-stock?search={urun_kodu}&location={konum}',
+    '/api/rezervasyon-notu-getir?urun_kodu={urun_kodu}&renk={renk}',
+    '/api/changes?since=0&limit=500',
+)
+
+# Katalog için tekrar oynatılan POST (JSON) istekleri
+REPLAY_POST = (
+    ('/api/check-stock/batch', 'stok'),
+    ('/api/product-detail/batch', 'urun'),
+    ('/api/stock-report/rows', 'urun'),
+    ('/api/stock-list/rows', 'stok'),
+)
+
+_TABLO_RE = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!WHERE\b|ON\b|JOIN\b|LEFT\b|INNER\b|GROUP\b|ORDER\b|LIMIT\b|USING\b)(\w+))?',
+                       re.IGNORECASE)
+_PLAN_RE = re.compile(r'^(SCAN|SEARCH) (\w+)(?: USING (COVERING )?INDEX (\w+))?')
+_KOSUL_RE = re.compile(
+    r'(?:(\w+)\.)?(\w+)\s*(==|=|>=|<=|<>|!=|>|<|\bIS\b|\bIN\b|\bBETWEEN\b|\bLIKE\b)\s*'
+    r"(\?|'(?:[^']|'')*'|-?\d+(?:\.\d+)?|(?:\w+\.)?\w+|\()",
+    re.IGNORECASE)
+_KOSUL_BOLUMU_RE = re.compile(
+    r'\b(?:WHERE|ON)\b(.*?)(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bHAVING\b|\bWINDOW\b|\bSELECT\b'
+    r'|\b(?:LEFT\s+|INNER\s+)?JOIN\b|\bUNION\b|$)',
+    re.IGNORECASE | re.DOTALL)
+_ORDER_RE = re.compile(r'\bORDER\s+BY\s+(.+?)(?=\bLIMIT\b|\)|$)', re.IGNORECASE | re.DOTALL)
+_KOLON_REF_RE = re.compile(r'\b(\w+)\.(\w+)\b')
+_SQL_ANAHTAR = {'AND', 'OR', 'NOT', 'NULL', 'SELECT', 'WHERE', 'CASE', 'WHEN', 'THEN', 'ELSE', 'END'}
+
+
+class QueryCatalog:
+    """Çalıştırılan SQL metinlerini parmak izine göre toplar"""
+
+    def __init__(self):
+        self.queries = {}
+        self.kaynak = None
+        self.aktif = False
+
+    def listener(self, sql, sure, fetch):
+        if not self.aktif or fetch:
+            return
+        from utils.sql_profiler import fingerprint
+        fp = fingerprint(sql)
+        entry = self.queries.get(fp)
+        if entry is None:
+            entry = self.queries[fp] = {'sql': sql, 'fingerprint': fp, 'sources': set(), 'count': 0, 'time': 0.0}
+        entry['sources'].add(self.kaynak or '?')
+        entry['count'] += 1
+        entry['time'] += sure
+
+
+def _ornek_degerler(db):
+    """Tekrar oynatma için en çok hareketi olan üründen örnek değerler"""
+    row = db.execute('''
+        SELECT urun_kodu, urun_adi, COALESCE(renk, '') AS renk, konum, COALESCE(sistem_seri, '') AS sistem_seri
+        FROM stoklar
+        WHERE adet > 0
+        ORDER BY adet DESC
+        LIMIT 1
+    ''').fetchone()
+    if row is None:
+        return None
+    urun_adi = (row['urun_adi'] or '').split()
+    return {
+        'urun_kodu': row['urun_kodu'],
+        'urun_kodu_on_ek': row['urun_kodu'][:3],
+        'urun_adi_kelime': urun_adi[0] if urun_adi else row['urun_kodu'],
+        'renk': row['renk'],
+        'konum': row['konum'] or '',
+        'sistem_seri': row['sistem_seri'],
+    }
+
+
+def _replay_requests(app, catalog, degerler):
+    from urllib.parse import quote
+    client = admin_client(app)
+    quoted = {key: quote(str(value)) for key, value in degerler.items()}
+    for template in REPLAY_GET:
+        url = template.format(**quoted)
+        catalog.kaynak = f'GET {template}'
+        response = client.get(url)
+        response.get_data()
+        response.close()
+        if response.status_code >= 400:
+            logger.warning(f"{url} -> {response.status_code}")
+
+    stok = {'urun_kodu': degerler['urun_kodu'], 'renk': degerler['renk'], 'konum': degerler['konum']}
+    urun = {'urun_kodu': degerler['urun_kodu'], 'renk': degerler['renk']}
+    for url, tur in REPLAY_POST:
+        catalog.kaynak = f'POST {url}'
+        items = [stok if tur == 'stok' else urun] * 3
+        response = client.post(url, json={'items': items})
+        response.get_data()
+        response.close()
+
+
+def _replay_functions(app, catalog, degerler):
+    """Stok fonksiyonlarını geri alınan bir SAVEPOINT içinde çalıştır (veritabanı değişmez)"""
+    from flask import g
+    from utils import database
+
+    urun_kodu, renk, konum = degerler['urun_kodu'], degerler['renk'], degerler['konum']
+    cagrilar = (
+        ('stok_giris', lambda: database.stok_giris(urun_kodu, 'Danışman', renk, konum, 1)),
+        ('stok_cikis', lambda: database.stok_cikis(urun_kodu, renk, konum, 1)),
+        ('stok_transfer', lambda: database.stok_transfer(urun_kodu, renk, konum, '__DANISMAN__', 1)),
+        ('get_product_stock_summary', lambda: database.get_product_stock_summary(urun_kodu, renk)),
+        ('get_urun_rezervasyon_durumu', lambda: database.get_urun_rezervasyon_durumu(urun_kodu, renk)),
+        ('get_aktif_rezervasyonlar', lambda: database.get_aktif_rezervasyonlar(urun_kodu)),
+        ('get_all_locations_for_product', lambda: database.get_all_locations_for_product(urun_kodu, renk)),
+    )
+    with app.test_request_context():
+        db = database.get_db_connection()
+        db.commit()
+        g.toplu_islem = True
+        try:
+            db.execute('SAVEPOINT index_danismani')
+            for ad, cagri in cagrilar:
+                catalog.kaynak = f'fonksiyon {ad}'
+                try:
+                    cagri()
+                except Exception as e:
+                    logger.warning(f"{ad} çalıştırılamadı: {str(e)}")
+        finally:
+            db.execute('ROLLBACK TO index_danismani')
+            db.execute('RELEASE index_danismani')
+            db.rollback()
+            g.toplu_islem = False
+
+
+def collect_catalog(app, profile_json=None):
+    """Uygulamanın çalıştırdığı sorgu şekillerini topla"""
+    from utils.database import add_sql_listener, get_db_connection
+
+    catalog = QueryCatalog()
+    add_sql_listener(catalog.listener)
+    with app.app_context():
+        degerler = _ornek_degerler(get_db_connection())
+
+    catalog.aktif = True
+    try:
+        if degerler is None:
+            logger.warning("Veritabanında stok yok - sadece profil dosyasındaki sorgular incelenecek")
+        else:
+            _replay_requests(app, catalog, degerler)
+            _replay_functions(app, catalog, degerler)
+    finally:
+        catalog.aktif = False
+
+    if profile_json:
+        with open(profile_json, encoding='utf-8') as f:
+            data = json.load(f)
+        for query in data.get('queries', []):
+            entry = catalog.queries.setdefault(query['sql'], {
+                'sql': query['sql'], 'fingerprint': query['sql'], 'sources': set(), 'count': 0, 'time': 0.0})
+            entry['sources'].add('canlı profil')
+            entry['count'] += query.get('count', 0)
+            entry['time'] += query.get('total_ms', 0) / 1000.0
+
+    return catalog
+
+
+def _explain(db, sql):
+    from utils.sql_profiler import explain_query_plan
+    return explain_query_plan(sql) or []
+
+
+def _alias_map(sql):
+    aliases = {}
+    for table, alias in _TABLO_RE.findall(sql):
+        if table.lower() in UYGULAMA_TABLOLARI:
+            aliases[table] = table
+            if alias and alias.upper() not in _SQL_ANAHTAR:
+                aliases[alias] = table
+    return aliases
+
+
+def analyze_plan(sql, plan):
+    """Plan satırlarından sorunları ve kullanılan indeksleri çıkar"""
+    aliases = _alias_map(sql)
+    issues = []
+    used = set()
+    for detail in plan:
+        match = _PLAN_RE.match(detail)
+        if match:
+            op, name, covering, index = match.groups()
+            table = aliases.get(name, name if name in UYGULAMA_TABLOLARI else None)
+            if index:
+                used.add(index)
+            if op == 'SCAN' and table:
+                if index is None:
+                    issues.append({'type': 'full_scan', 'table': table, 'detail': detail})
+                elif not covering:
+                    issues.append({'type': 'index_scan', 'table': table, 'detail': detail})
+        if 'USE TEMP B-TREE' in detail:
+            issues.append({'type': 'temp_btree', 'table': None, 'detail': detail})
+        if 'AUTOMATIC' in detail and 'INDEX' in detail:
+            issues.append({'type': 'automatic_index', 'table': None, 'detail': detail})
+    return issues, used
+
+
+def _table_columns(db, table):
+    return [row['name'] for row in db.execute(f'PRAGMA table_info({table})').fetchall()]
+
+
+def _existing_indexes(db):
+    indexes = {}
+    for row in db.execute("SELECT name, tbl_name, sql FROM sqlite_master WHERE type = 'index'").fetchall():
+        cols = [info['name'] for info in db.execute(f"PRAGMA index_info('{row['name']}')").fetchall()]
+        indexes[row['name']] = {'table': row['tbl_name'], 'columns': cols, 'sql': row['sql'],
+                                'partial': bool(row['sql'] and ' WHERE ' in row['sql'].upper())}
+    return indexes
+
+
+def _column_refs(sql, table, aliases, columns, single_table):
+    """Sorgunun tablo için kullandığı koşullar: eşitlik, aralık, kolon karşılaştırma, sıralama"""
+    eq, rng, partial, order, refs = [], [], [], [], set()
+    tablo_adlari = {alias for alias, t in aliases.items() if t == table}
+
+    def ait(qualifier, column):
+        if column not in columns:
+            return False
+        if qualifier:
+            return qualifier in tablo_adlari
+        return single_table
+
+    for qualifier, column, _ in ((q, c, None) for q, c in _KOLON_REF_RE.findall(sql)):
+        if ait(qualifier, column):
+            refs.add(column)
+    if single_table:
+        for word in re.findall(r'\b(\w+)\b', sql):
+            if word in columns:
+                refs.add(word)
+
+    # Koşullar sadece WHERE/ON bölümlerinden okunur (SELECT listesindeki CASE ifadeleri koşul değildir)
+    kosullar = ' '.join(_KOSUL_BOLUMU_RE.findall(sql))
+    for qualifier, column, op, rhs in _KOSUL_RE.findall(kosullar):
+        if not ait(qualifier, column):
+            continue
+        op = op.upper()
+        rhs_col = rhs.split('.')[-1]
+        literal = rhs != '?' and rhs != '(' and (rhs.startswith("'") or re.match(r'^-?\d', rhs))
+        if op == 'LIKE':
+            continue
+        if not literal and rhs not in ('?', '(') and rhs_col in columns and ('.' not in rhs or rhs.split('.')[0] in tablo_adlari):
+            # Aynı tablonun iki kolonu karşılaştırılıyor (ör. adet <= kritik_stok_siniri) - kısmi indeks koşulu
+            partial.append(f'{column} {op} {rhs_col}')
+        elif literal:
+            partial.append(f'{column} {op} {rhs}')
+        elif op in ('=', '==', 'IS', 'IN'):
+            if column not in eq:
+                eq.append(column)
+        elif column not in rng:
+            rng.append(column)
+
+    for clause in _ORDER_RE.findall(sql):
+        for part in clause.split(','):
+            tokens = part.strip().split()
+            if not tokens:
+                continue
+            ref = tokens[0]
+            qualifier, _, column = ref.rpartition('.')
+            if ait(qualifier, column) and column not in order:
+                order.append(column)
+    return eq, rng, partial, order, refs
+
+
+def propose_indexes(db, sql, issues, existing):
+    """Sorunlu tablo taramaları için indeks adayları"""
+    aliases = _alias_map(sql)
+    tables_in_query = set(aliases.values())
+    proposals = []
+    for table in {issue['table'] for issue in issues if issue['table']}:
+        columns = _table_columns(db, table)
+        eq, rng, partial, order, refs = _column_refs(sql, table, aliases, columns, len(tables_in_query) == 1)
+        index_cols = list(eq)
+        if rng:
+            index_cols.append(rng[0])
+        else:
+            index_cols += [col for col in order if col not in index_cols]
+        partial = sorted(set(partial))
+        if not index_cols and not partial:
+            continue
+        if not index_cols:
+            # Sadece sabit koşul var: kısmi indeksin kolonu olarak sorguda geçen ilk kolon kullanılır
+            index_cols = [sorted(refs)[0]] if refs else []
+            if not index_cols:
+                continue
+
+        # Aynı kolon dizisiyle başlayan tam (kısmi olmayan) indeks zaten varsa öneri gereksiz
+        if not partial and any(info['table'] == table and not info['partial']
+                               and info['columns'][:len(index_cols)] == index_cols
+                               for info in existing.values()):
+            continue
+
+        where = f" WHERE {' AND '.join(partial)}" if partial else ''
+        suffix = '_'.join(index_cols)[:40]
+        if partial:
+            # Aynı kolonlarla farklı koşullu öneriler ayrı adlar almalı
+            suffix += '_k' + hashlib.sha1(where.encode('utf-8')).hexdigest()[:6]
+        name = f'idx_oneri_{table}_{suffix}'
+        proposals.append({
+            'table': table,
+            'name': name,
+            'columns': index_cols,
+            'where': where.strip(),
+            'sql': f'CREATE INDEX {name} ON {table}({", ".join(index_cols)}){where}',
+            'kind': 'partial' if partial else ('composite' if len(index_cols) > 1 else 'single'),
+            'refs': sorted(refs),
+        })
+        # Sorgunun bu tablodan okuduğu kolonlar azsa kapsayan indeks de denenir (tabloya dönmeden okur)
+        extra = [col for col in sorted(refs) if col not in index_cols and col != 'id']
+        if refs and 0 < len(extra) <= 4 and '*' not in sql:
+            cover_cols = index_cols + extra
+            cover_name = f'{name}_kapsayan'
+            proposals.append({
+                'table': table,
+                'name': cover_name,
+                'columns': cover_cols,
+                'where': where.strip(),
+                'sql': f'CREATE INDEX {cover_name} ON {table}({", ".join(cover_cols)}){where}',
+                'kind': 'covering',
+                'refs': sorted(refs),
+            })
+    return proposals
+
+
+def _issue_score(issues):
+    weights = {'full_scan': 3, 'temp_btree': 2, 'automatic_index': 2, 'index_scan': 1}
+    return sum(weights[issue['type']] for issue in issues)
+
+
+def verify_proposals(db, proposals, queries):
+    """Her öneriyi geri alınan bir transaction içinde oluşturup ilgili sorguların planını yeniden al"""
+    verified = []
+    for proposal in proposals:
+        db.commit()
+        started = time.perf_counter()
+        try:
+            db.execute('BEGIN')
+            db.execute(proposal['sql'])
+            build_time = time.perf_counter() - started
+            improved = []
+            for query in queries:
+                if proposal['name'] not in {p['name'] for p in query['proposals']}:
+                    continue
+                plan = _explain(db, query['sql'])
+                issues, used = analyze_plan(query['sql'], plan)
+                if proposal['name'] in used and _issue_score(issues) < _issue_score(query['issues']):
+                    improved.append({'query_id': query['id'], 'plan_after': plan})
+        except Exception as e:
+            logger.warning(f"Öneri doğrulanamadı ({proposal['name']}): {str(e)}")
+            improved, build_time = [], 0.0
+        finally:
+            db.rollback()
+        if improved:
+            verified.append({**proposal, 'improves': improved, 'build_seconds': round(build_time, 2)})
+    return verified
+
+
+def find_unused_indexes(existing, used_indexes):
+    unused = []
+    for name, info in sorted(existing.items()):
+        if name in used_indexes or name.startswith('sqlite_autoindex'):
+            continue
+        unique = bool(info['sql'] and 'UNIQUE' in info['sql'].upper())
+        unused.append({
+            'name': name,
+            'table': info['table'],
+            'columns': info['columns'],
+            'unique': unique,
+            'note': 'UNIQUE kısıtı sağlıyor - kaldırılmamalı' if unique else 'Katalogdaki hiçbir planda kullanılmadı',
+        })
+    return unused
+
+
+def run_advisor(db_path, profile_json=None, verify=True, analyze=False):
+    """Danışmanı çalıştır ve rapor sözlüğünü döndür"""
+    app = load_app(db_path)
+    from utils.database import get_db_connection
+
+    with app.app_context():
+        db = get_db_connection()
+        if analyze:
+            # Planlayıcı istatistikleri (sqlite_stat1) olmadan indeks seçimi tahmine dayanır
+            db.execute('ANALYZE')
+            db.commit()
+
+    catalog = collect_catalog(app, profile_json)
+
+    with app.app_context():
+        db = get_db_connection()
+        existing = _existing_indexes(db)
+        queries = []
+        used_indexes = set()
+        for i, entry in enumerate(sorted(catalog.queries.values(), key=lambda e: -e['time']), 1):
+            plan = _explain(db, entry['sql'])
+            issues, used = analyze_plan(entry['sql'], plan)
+            used_indexes |= used
+            queries.append({
+                'id': i,
+                'sql': entry['sql'],
+                'fingerprint': entry['fingerprint'],
+                'sources': sorted(entry['sources']),
+                'count': entry['count'],
+                'time_ms': round(entry['time'] * 1000, 2),
+                'plan': plan,
+                'issues': issues,
+                'proposals': propose_indexes(db, entry['sql'], issues, existing) if issues else [],
+            })
+
+        unique_proposals = {}
+        for query in queries:
+            for proposal in query['proposals']:
+                unique_proposals.setdefault(proposal['name'], proposal)
+        proposals = list(unique_proposals.values())
+        if verify:
+            proposals = verify_proposals(db, proposals, queries)
+
+    return {
+        'database': db_path,
+        'query_count': len(queries),
+        'queries': queries,
+        'proposals': proposals,
+        'verified': verify,
+        'unused_indexes': find_unused_indexes(existing, used_indexes),
+    }
+
+
+def print_report(report, out=sys.stdout):
+    flagged = [q for q in report['queries'] if q['issues']]
+    print(f"Veritabanı: {report['database']}", file=out)
+    print(f"İncelenen sorgu şekli: {report['query_count']}, sorunlu plan: {len(flagged)}\n", file=out)
+
+    print('=== Sorunlu planlar ===', file=out)
+    for query in flagged:
+        print(f"[{query['id']}] {query['time_ms']} ms / {query['count']} çalıştırma - {', '.join(query['sources'][:3])}", file=out)
+        print(f"    {query['fingerprint'][:200]}", file=out)
+        for issue in query['issues']:
+            print(f"    ! {issue['type']}: {issue['detail']}", file=out)
+
+    print('\n=== İndeks önerileri ===', file=out)
+    if not report['proposals']:
+        print('Öneri yok', file=out)
+    for proposal in report['proposals']:
+        print(f"{proposal['sql']};", file=out)
+        if report['verified']:
+            ids = ', '.join(str(item['query_id']) for item in proposal['improves'])
+            print(f"    -- {proposal['kind']}, oluşturma {proposal['build_seconds']} sn, iyileşen sorgular: {ids}", file=out)
+        else:
+            print(f"    -- {proposal['kind']} (doğrulanmadı)", file=out)
+
+    print('\n=== Kullanılmayan indeksler ===', file=out)
+    if not report['unused_indexes']:
+        print('Yok', file=out)
+    for index in report['unused_indexes']:
+        print(f"{index['name']} ON {index['table']}({', '.join(index['columns'])}) - {index['note']}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sorgu kataloğunu EXPLAIN QUERY PLAN ile inceleyip indeks öner')
+    parser.add_argument('--db', required=True, help='İncelenecek SQLite veritabanı (üretim boyutunda bir kopya)')
+    parser.add_argument('--profile-json', help='/api/sql-profile çıktısı - canlı sunucudaki sorgular da eklenir')
+    parser.add_argument('--json', help='Raporu JSON olarak bu dosyaya yaz')
+    parser.add_argument('--no-verify', action='store_true', help='Önerileri oluşturup doğrulama (büyük DB\'de hızlı)')
+    parser.add_argument('--analyze', action='store_true', help='Önce ANALYZE çalıştır (sqlite_stat1 günceller)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    report = run_advisor(args.db, args.profile_json, verify=not args.no_verify, analyze=args.analyze)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,351 @@
+"""
+Ağır endpoint'ler için kabul kontrolü (admission control) ve yük atma
+- Excel export, Excel import ve filtresiz stok raporu birer gruptur; her grubun eşzamanlı istek sınırı,
+  bekleme kuyruğu uzunluğu ve en fazla bekleme süresi vardır (ADMISSION_LIMITS)
+- Sınırlar tüm gunicorn worker'ları için ortaktır: her yuva ADMISSION_DIR'deki bir kilit dosyasıdır (flock),
+  süreç ölünce kilidi kendiliğinden bırakılır
+- Tüm grupların çalışan + kuyrukta bekleyen ağır istek toplamı ADMISSION_CAPACITY - ADMISSION_RESERVED_LIGHT
+  ile sınırlıdır; bekleyen istek de bir worker thread'ini tuttuğundan kalan ADMISSION_RESERVED_LIGHT
+  yuva her zaman hafif API'lere kalır. Grup sınırı ve kuyruğu bu değere göre kırpılır
+- Ağır yuva boş değilse istek hemen 503 alır; grup yuvası boş değilse grubun kuyruğunda bekler, kuyruk
+  doluysa veya bekleme süresi dolarsa 503 + Retry-After döner
+- Grup bazında çalışan / bekleyen istek, kabul / ret sayaçları ve bekleme süresi tüm worker'lar için
+  /metrics ve /api/admission'da
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import request, jsonify, make_response, render_template
+
+from .runtime_dirs import varsayilan_klasor, ozel_klasor_hazirla, pid_yasiyor
+
+try:
+    import fcntl
+except ImportError:  # Windows - sınırlar süreç içinde uygulanır
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# grup=eşzamanlı:kuyruk:bekleme_saniye
+VARSAYILAN_LIMITLER = 'export=2:4:10,import=1:2:30,report=4:8:5'
+# Kuyrukta yuva boşalması bu aralıklarla (artarak) kontrol edilir
+BEKLEME_ADIMI = 0.02
+BEKLEME_ADIMI_MAX = 0.25
+RETRY_AFTER_MAX = 60
+
+_lock = threading.Lock()
+_surec_kilitleri = {}
+_ayarlar = {'acik': True, 'klasor': None, 'limitler': {}, 'kapasite': 2, 'ayrilan': 1}
+# grup -> bu süreçteki durum ve sayaçlar
+_durum = {}
+
+
+def parse_limits(metin):
+    """'export=2:4:10,import=1:2:30' -> {'export': {'limit': 2, 'queue': 4, 'wait': 10.0}, ...}"""
+    limitler = {}
+    for parca in filter(None, (p.strip() for p in (metin or '').split(','))):
+        grup, _, degerler = parca.partition('=')
+        sayilar = (degerler.split(':') + ['0', '0'])[:3]
+        limitler[grup.strip()] = {'limit': max(1, int(sayilar[0])), 'queue': max(0, int(sayilar[1] or 0)),
+                                  'wait': max(0.0, float(sayilar[2] or 0))}
+    return limitler
+
+
+def _yeni_durum():
+    return {'in_flight': 0, 'waiting': 0, 'admitted': 0, 'completed': 0, 'queued': 0, 'rejected_capacity': 0,
+            'rejected_queue_full': 0, 'rejected_timeout': 0, 'wait_seconds': 0.0, 'service_seconds': 0.0}
+
+
+def _kilit_yolu(ad):
+    return os.path.join(_ayarlar['klasor'], ad)
+
+
+def _kilitle(ad):
+    """Yuvayı beklemeden kilitle; bırakma fonksiyonu veya (doluysa) None döndür"""
+    if fcntl is None:
+        with _lock:
+            kilit = _surec_kilitleri.setdefault(ad, threading.Lock())
+        return kilit.release if kilit.acquire(blocking=False) else None
+    fd = os.open(_kilit_yolu(ad), os.O_CREAT | os.O_RDWR, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+
+    def birak():
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+    return birak
+
+
+def _herhangi_birini_kilitle(onek, sayi):
+    for i in range(sayi):
+        birak = _kilitle(f'{onek}-{i}.lock')
+        if birak:
+            return birak
+    return None
+
+
+def _agir_yuva_sayisi():
+    """Aynı anda çalışan + bekleyen ağır istek sayısı (tüm gruplar): kapasite - hafif API'lere ayrılan"""
+    return max(1, _ayarlar['kapasite'] - _ayarlar['ayrilan'])
+
+
+def _etkin_limit(grup):
+    """Grubun ağır yuva sayısına göre kırpılmış sınırı: grup sınırı + kuyruğu ağır yuvaları aşamaz"""
+    limit = _ayarlar['limitler'][grup]
+    agir = _agir_yuva_sayisi()
+    eszamanli = min(limit['limit'], agir)
+    return dict(limit, limit=eszamanli, queue=min(limit['queue'], agir - eszamanli))
+
+
+def _guncelle(grup, **degisimler):
+    with _lock:
+        durum = _durum.setdefault(grup, _yeni_durum())
+        for anahtar, deger in degisimler.items():
+            durum[anahtar] += deger
+        veri = json.dumps(_durum)
+    _durumu_yaz(veri)
+
+
+def _durum_dosyasi(pid):
+    return _kilit_yolu(f'state-{pid}.json')
+
+
+def _durumu_yaz(veri):
+    """Bu sürecin durumunu diğer worker'ların okuyabileceği dosyaya yaz (sadece ağır isteklerde)"""
+    yol = _durum_dosyasi(os.getpid())
+    # Aynı süreçteki thread'ler aynı geçici dosyaya yazmasın
+    gecici = f'{yol}.{threading.get_ident()}.tmp'
+    try:
+        with open(gecici, 'w', encoding='utf-8') as f:
+            f.write(veri)
+        os.replace(gecici, yol)
+    except OSError as e:
+        logger.warning(f"Kabul kontrolü durumu yazılamadı: {str(e)}")
+
+
+def _tahmini_bekleme(grup):
+    """Retry-After: grubun ortalama işlem süresi ve sıradaki istek sayısından kaba tahmin (saniye)"""
+    limit = _etkin_limit(grup)
+    with _lock:
+        durum = _durum.get(grup) or _yeni_durum()
+        ortalama = durum['service_seconds'] / durum['completed'] if durum['completed'] else limit['wait']
+        sira = durum['in_flight'] + durum['waiting'] + 1
+    return int(min(RETRY_AFTER_MAX, max(1, math.ceil(ortalama * sira / limit['limit']))))
+
+
+def _kabul_et(grup):
+    """Yuva al: (bırakma fonksiyonu, None) veya (None, ret nedeni)
+
+    Önce ağır yuva alınır ve istek bitene kadar (kuyrukta beklerken de) tutulur; boş ağır yuva yoksa
+    beklemeden 'capacity' ile reddedilir. Grup yuvası boş değilse istek grubun kuyruğunda grubun bekleme
+    süresi kadar bekler.
+    """
+    agir = _herhangi_birini_kilitle('heavy', _agir_yuva_sayisi())
+    if agir is None:
+        return None, 'capacity'
+    limit = _etkin_limit(grup)
+    yuva = _herhangi_birini_kilitle(f'{grup}-slot', limit['limit'])
+    if yuva is None:
+        bilet = _herhangi_birini_kilitle(f'{grup}-queue', limit['queue'])
+        if bilet is None:
+            agir()
+            return None, 'queue_full'
+        _guncelle(grup, waiting=1, queued=1)
+        baslangic = time.monotonic()
+        son = baslangic + limit['wait']
+        adim = BEKLEME_ADIMI
+        try:
+            while yuva is None and time.monotonic() < son:
+                time.sleep(min(adim, max(0.0, son - time.monotonic())))
+                adim = min(adim * 1.5, BEKLEME_ADIMI_MAX)
+                yuva = _herhangi_birini_kilitle(f'{grup}-slot', limit['limit'])
+        finally:
+            bilet()
+            _guncelle(grup, waiting=-1, wait_seconds=time.monotonic() - baslangic)
+        if yuva is None:
+            agir()
+            return None, 'timeout'
+
+    def birak():
+        try:
+            yuva()
+        finally:
+            agir()
+    return birak, None
+
+
+def _reddet(grup, neden):
+    retry = _tahmini_bekleme(grup)
+    _guncelle(grup, **{f'rejected_{neden}': 1})
+    logger.warning(f"Yük atma: {request.endpoint} reddedildi (grup: {grup}, neden: {neden}, Retry-After: {retry})")
+    mesaj = 'Sistem şu anda yoğun. Lütfen birkaç saniye sonra tekrar deneyin.'
+    if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest' \
+            or request.accept_mimetypes.best == 'application/json':
+        response = jsonify({'success': False, 'message': mesaj, 'retry_after': retry})
+    else:
+        response = make_response(render_template('placeholder.html', title='Sistem Yoğun',
+                                                 message=f'{mesaj} (yaklaşık {retry} sn)'))
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry)
+    return response
+
+
+class AdmissionRejected(Exception):
+    """Ağır iş için yer yok - uygulama hata işleyicisi 503 + Retry-After yanıtına çevirir"""
+
+    def __init__(self, grup, neden):
+        super().__init__(f'{grup}: {neden}')
+        self.grup = grup
+        self.neden = neden
+
+
+@contextmanager
+def admitted(grup):
+    """Bloğu grubun yuvasıyla çalıştır; yer yoksa AdmissionRejected
+
+    View'in tamamı yerine sadece pahalı hesaplamayı sınırlamak için - ör. single_flight içinde kullanılınca
+    sonucu bekleyen istekler yuva almaz, sadece hesaplamayı yapan istek alır.
+    """
+    if not _ayarlar['acik'] or grup not in _ayarlar['limitler']:
+        yield
+        return
+    birak, neden = _kabul_et(grup)
+    if birak is None:
+        raise AdmissionRejected(grup, neden)
+    _guncelle(grup, in_flight=1, admitted=1)
+    baslangic = time.monotonic()
+    try:
+        yield
+    finally:
+        birak()
+        _guncelle(grup, in_flight=-1, completed=1, service_seconds=time.monotonic() - baslangic)
+
+
+def admission_control(grup, kosul=None):
+    """Ağır endpoint decorator'ı - kosul() False dönerse (ör. filtreli rapor) istek sınırlanmaz"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if kosul and not kosul():
+                return f(*args, **kwargs)
+            try:
+                with admitted(grup):
+                    return f(*args, **kwargs)
+            except AdmissionRejected as e:
+                return _reddet(e.grup, e.neden)
+        return decorated_function
+    return decorator
+
+
+def set_admission_capacity(kapasite):
+    """Sunucunun toplam eşzamanlı istek kapasitesi (gunicorn: worker x thread)"""
+    _ayarlar['kapasite'] = max(1, int(kapasite))
+
+
+def get_admission_status():
+    """Tüm worker'ların durum dosyalarından grup bazında toplam"""
+    gruplar = {grup: dict(_yeni_durum(), **_etkin_limit(grup)) for grup in _ayarlar['limitler']}
+    klasor = _ayarlar['klasor']
+    try:
+        adlar = os.listdir(klasor) if klasor else []
+    except OSError:
+        adlar = []
+    for ad in adlar:
+        if not ad.startswith('state-') or not ad.endswith('.json'):
+            continue
+        yol = os.path.join(klasor, ad)
+        pid = int(ad[6:-5]) if ad[6:-5].isdigit() else 0
+        if pid != os.getpid() and not pid_yasiyor(pid):
+            # Kapanan worker: çalışan / bekleyen sayısı geçersiz, kilitleri zaten bırakıldı
+            try:
+                os.remove(yol)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(yol, encoding='utf-8') as f:
+                veri = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for grup, durum in veri.items():
+            if grup in gruplar:
+                for anahtar, deger in durum.items():
+                    if anahtar in gruplar[grup]:
+                        gruplar[grup][anahtar] += deger
+    return {
+        'enabled': _ayarlar['acik'],
+        'capacity': _ayarlar['kapasite'],
+        'reserved_light': _ayarlar['ayrilan'],
+        'heavy_slots': _agir_yuva_sayisi(),
+        'groups': gruplar,
+    }
+
+
+def render_admission_prometheus(durum):
+    """Kabul kontrolü metrikleri (Prometheus metin formatı)"""
+    lines = []
+    for ad, anahtar, tip, aciklama in (
+        ('stok_admission_in_flight', 'in_flight', 'gauge', 'Çalışan ağır istek'),
+        ('stok_admission_queue_depth', 'waiting', 'gauge', 'Kuyrukta bekleyen ağır istek'),
+        ('stok_admission_limit', 'limit', 'gauge', 'Grubun eşzamanlı istek sınırı'),
+        ('stok_admission_admitted_total', 'admitted', 'counter', 'Kabul edilen istek'),
+        ('stok_admission_queued_total', 'queued', 'counter', 'Kuyrukta beklemiş istek'),
+        ('stok_admission_wait_seconds_total', 'wait_seconds', 'counter', 'Kuyrukta geçen süre toplamı'),
+    ):
+        lines += [f'# HELP {ad} {aciklama}', f'# TYPE {ad} {tip}']
+        for grup, g in sorted(durum['groups'].items()):
+            lines.append(f'{ad}{{group="{grup}"}} {g[anahtar]}')
+    lines += ['# HELP stok_admission_rejected_total 503 ile reddedilen istek',
+              '# TYPE stok_admission_rejected_total counter']
+    for grup, g in sorted(durum['groups'].items()):
+        for neden in ('capacity', 'queue_full', 'timeout'):
+            lines.append(f'stok_admission_rejected_total{{group="{grup}",reason="{neden}"}} {g[f"rejected_{neden}"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset_admission_stats():
+    """Bu sürecin sayaçlarını sıfırla (ör. fork öncesi ısındırma isteklerinden sonra)"""
+    with _lock:
+        _durum.clear()
+    if _ayarlar['klasor']:
+        try:
+            os.remove(_durum_dosyasi(os.getpid()))
+        except OSError:
+            pass
+
+
+def init_admission_control(app):
+    """ADMISSION_ENABLED / ADMISSION_LIMITS / ADMISSION_CAPACITY / ADMISSION_RESERVED_LIGHT / ADMISSION_DIR"""
+    app.config.setdefault('ADMISSION_ENABLED', True)
+    app.config.setdefault('ADMISSION_LIMITS', VARSAYILAN_LIMITLER)
+    app.config.setdefault('ADMISSION_RESERVED_LIGHT', 1)
+    # gunicorn.conf.py worker açılışında gerçek worker x thread değerini set_admission_capacity ile verir
+    app.config.setdefault('ADMISSION_CAPACITY', int(os.environ.get('WEB_CONCURRENCY', 2))
+                          * int(os.environ.get('GUNICORN_THREADS', 1)))
+    if not app.config.get('ADMISSION_DIR'):
+        app.config['ADMISSION_DIR'] = varsayilan_klasor(app, 'admission')
+
+    _ayarlar['acik'] = bool(app.config['ADMISSION_ENABLED'])
+    # Başka bir kullanıcı yuva dosyalarını kilitleyip tüm ağır istekleri reddettirebilir
+    if _ayarlar['acik'] and not ozel_klasor_hazirla(app.config['ADMISSION_DIR']):
+        logger.warning("Kabul kontrolü kapatıldı: ADMISSION_DIR güvenli değil")
+        _ayarlar['acik'] = False
+        _ayarlar['klasor'] = None
+    else:
+        _ayarlar['klasor'] = app.config['ADMISSION_DIR']
+    _ayarlar['limitler'] = parse_limits(app.config['ADMISSION_LIMITS'])
+    _ayarlar['ayrilan'] = max(0, int(app.config['ADMISSION_RESERVED_LIGHT']))
+    set_admission_capacity(app.config['ADMISSION_CAPACITY'])
+    app.register_error_handler(AdmissionRejected, lambda e: _reddet(e.grup, e.neden))
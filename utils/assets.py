@@ -0,0 +1,110 @@
+"""
+Statik dosyalar için içerik hash'li (fingerprint) URL'ler
+- Başlangıçta static/ altındaki her dosyanın içerik hash'i hesaplanır (manifest)
+- url_for('static', filename='css/style.css') -> /static/css/style.1a2b3c4d5e.css
+- Hash'li URL'ler 'immutable' olarak 1 yıl önbelleğe alınır; içerik değişince URL de değişir
+"""
+
+import hashlib
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_MAX_AGE = 31536000  # 1 yıl
+HASH_LENGTH = 10
+
+
+class AssetManifest:
+    """Kaynak dosya adı <-> hash'li dosya adı eşlemesi"""
+
+    def __init__(self, static_folder, watch=False):
+        self.static_folder = static_folder
+        # Geliştirme modunda dosya değişiklikleri mtime ile takip edilir
+        self.watch = watch
+        self._by_source = {}
+        self._by_hashed = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hashed_name(filename, digest):
+        base, ext = os.path.splitext(filename)
+        return f'{base}.{digest[:HASH_LENGTH]}{ext}'
+
+    def _add(self, filename):
+        path = os.path.join(self.static_folder, *filename.split('/'))
+        try:
+            stat = os.stat(path)
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+
+        hashed = self._hashed_name(filename, digest)
+        with self._lock:
+            previous = self._by_source.get(filename)
+            if previous:
+                self._by_hashed.pop(previous[0], None)
+            self._by_source[filename] = (hashed, stat.st_mtime_ns)
+            self._by_hashed[hashed] = filename
+        return hashed
+
+    def build(self):
+        """static/ klasörünü tara ve manifest'i oluştur"""
+        if not self.static_folder or not os.path.isdir(self.static_folder):
+            return self
+        for root, _dirs, files in os.walk(self.static_folder):
+            for name in files:
+                rel = os.path.relpath(os.path.join(root, name), self.static_folder)
+                self._add(rel.replace(os.sep, '/'))
+        logger.info("Asset manifest oluşturuldu: %d dosya", len(self._by_source))
+        return self
+
+    def hashed(self, filename):
+        """Kaynak dosya adı için hash'li adı döndür (bilinmiyorsa aynen)"""
+        entry = self._by_source.get(filename)
+        if entry is None:
+            return filename
+        if self.watch:
+            try:
+                if os.stat(os.path.join(self.static_folder, *filename.split('/'))).st_mtime_ns != entry[1]:
+                    return self._add(filename) or filename
+            except OSError:
+                return filename
+        return entry[0]
+
+    def resolve(self, hashed_filename):
+        """Hash'li dosya adından kaynak dosya adını bul (hash'li değilse None)"""
+        return self._by_hashed.get(hashed_filename)
+
+    def as_dict(self):
+        return {source: entry[0] for source, entry in self._by_source.items()}
+
+
+def init_assets(app):
+    """Manifest'i oluştur, url_for('static') çağrılarını hash'li URL'lere yönlendir"""
+    manifest = AssetManifest(app.static_folder, watch=app.debug).build()
+    app.extensions['asset_manifest'] = manifest
+
+    @app.url_defaults
+    def fingerprint_static_url(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = manifest.hashed(values['filename'])
+
+    previous_static_view = app.view_functions['static']
+
+    def static(filename):
+        source = manifest.resolve(filename)
+        if source is None:
+            return previous_static_view(filename=filename)
+
+        response = previous_static_view(filename=source)
+        # İçerik hash'i URL'de olduğu için tarayıcı yeniden doğrulama yapmaz
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        return response
+
+    app.view_functions['static'] = static
@@ -4,7 +4,7 @@ Kullanıcı kimlik doğrulama ve yetkilendirme sistemi
 """
 
 from functools import wraps
-from flask import session, redirect, url_for, flash, request
+from flask import session, redirect, url_for, flash, request, current_app, jsonify
 import hashlib
 import secrets
 
@@ -146,6 +146,34 @@ def admin_required(f):
     return decorated_function
 
 
+def _request_api_token():
+    """İstekteki API token'ı (Authorization: Bearer ... veya X-API-Token)"""
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        return auth_header[len('Bearer '):].strip()
+    return request.headers.get('X-API-Token', '').strip()
+
+
+def api_token_required(f):
+    """Entegrasyon API'leri için decorator - admin oturumu veya API_TOKEN ile erişim
+
+    API_TOKEN ayarlı değilse sadece admin oturumu kabul edilir.
+    Yetkisiz isteklere yönlendirme yerine JSON 401 döner.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if session.get('user_role') == 'admin':
+            return f(*args, **kwargs)
+
+        expected = current_app.config.get('API_TOKEN')
+        token = _request_api_token()
+        if expected and token and secrets.compare_digest(token.encode('utf-8'), expected.encode('utf-8')):
+            return f(*args, **kwargs)
+
+        return jsonify({'success': False, 'message': 'Geçerli bir API token veya admin oturumu gereklidir'}), 401
+    return decorated_function
+
+
 def get_current_user():
     """Mevcut kullanıcı bilgilerini getir"""
     if 'user_id' in session:
@@ -0,0 +1,211 @@
+"""
+Toplu stok hareketleri (NDJSON) - ERP mutabakatı gibi binlerce GIRIS/CIKIS/TRANSFER satırı
+- Her satır mevcut stok_giris / stok_cikis / stok_transfer fonksiyonlarıyla uygulanır
+- Satırlar parça parça okunur ve her parça tek bir transaction'da commit edilir;
+  her satır kendi SAVEPOINT'inde çalışır, hatalı satır tek başına geri alınır
+- Satır sonuçları parça commit edildikten sonra NDJSON olarak akış halinde döner
+- idempotency_key'i daha önce uygulanmış satırlar tekrar gönderildiğinde yeniden uygulanmaz
+"""
+
+import json
+import logging
+
+from flask import g
+
+from .database import get_db_connection, stok_giris, stok_cikis, stok_transfer
+
+logger = logging.getLogger(__name__)
+
+HAREKET_TIPLERI = ('GIRIS', 'CIKIS', 'TRANSFER')
+
+
+class SatirHatasi(Exception):
+    """Satır doğrulama hatası - sadece o satır başarısız olur"""
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def _metin(satir, alan, zorunlu=False, buyuk_harf=False):
+    deger = satir.get(alan)
+    deger = '' if deger is None else str(deger).strip()
+    if buyuk_harf:
+        deger = deger.upper()
+    if zorunlu and not deger:
+        raise SatirHatasi(f'{alan} zorunludur')
+    return deger
+
+
+def _sayi(satir, alan, tip=int, zorunlu=False):
+    deger = satir.get(alan)
+    if deger in (None, ''):
+        if zorunlu:
+            raise SatirHatasi(f'{alan} zorunludur')
+        return None
+    try:
+        return tip(deger)
+    except (TypeError, ValueError):
+        raise SatirHatasi(f'{alan} geçersiz sayısal değer: {deger}')
+
+
+def _urun_bilgisi(db, urun_kodu, cache):
+    """Ürünün ad/ölçü bilgileri (GIRIS satırlarında eksik alanları tamamlamak için) - parça boyunca önbellekli"""
+    if urun_kodu not in cache:
+        cache[urun_kodu] = db.execute(
+            'SELECT urun_adi, sistem_seri, uzunluk, mt_kg FROM stoklar WHERE urun_kodu = ? LIMIT 1',
+            (urun_kodu,)
+        ).fetchone()
+    return cache[urun_kodu]
+
+
+def _hareketi_uygula(db, satir, kullanici, urun_cache):
+    """Tek satırı ilgili stok fonksiyonu ile uygula, {'success', 'message'} döndür"""
+    hareket_tipi = _metin(satir, 'hareket_tipi', zorunlu=True, buyuk_harf=True)
+    if hareket_tipi not in HAREKET_TIPLERI:
+        raise SatirHatasi(f'Geçersiz hareket_tipi: {hareket_tipi}')
+
+    urun_kodu = _metin(satir, 'urun_kodu', zorunlu=True, buyuk_harf=True)
+    renk = _metin(satir, 'renk')
+    adet = _sayi(satir, 'adet', zorunlu=True)
+    if adet <= 0:
+        raise SatirHatasi('adet 0\'dan büyük olmalıdır')
+    islem_tarihi = _metin(satir, 'islem_tarihi') or None
+    kullanici = _metin(satir, 'kullanici') or kullanici
+
+    if hareket_tipi == 'GIRIS':
+        konum = _metin(satir, 'konum', zorunlu=True)
+        mevcut = _urun_bilgisi(db, urun_kodu, urun_cache)
+        urun_adi = _metin(satir, 'urun_adi') or (mevcut['urun_adi'] if mevcut else '')
+        if not urun_adi:
+            raise SatirHatasi(f'Yeni ürün {urun_kodu} için urun_adi zorunludur')
+        mt_kg = _sayi(satir, 'mt_kg', float)
+        uzunluk = _sayi(satir, 'uzunluk')
+        sistem_seri = _metin(satir, 'sistem_seri')
+        if mevcut:
+            mt_kg = mt_kg if mt_kg is not None else mevcut['mt_kg']
+            uzunluk = uzunluk if uzunluk is not None else mevcut['uzunluk']
+            sistem_seri = sistem_seri or mevcut['sistem_seri']
+        result = stok_giris(urun_kodu=urun_kodu, urun_adi=urun_adi, renk=renk, konum=konum, adet=adet,
+                            mt_kg=mt_kg, uzunluk=uzunluk, sistem_seri=sistem_seri,
+                            kullanici=kullanici, islem_tarihi=islem_tarihi)
+        if result['success'] and not mevcut:
+            urun_cache.pop(urun_kodu, None)
+        return result
+
+    if hareket_tipi == 'CIKIS':
+        konum = _metin(satir, 'konum', zorunlu=True)
+        return stok_cikis(urun_kodu=urun_kodu, renk=renk, konum=konum, adet=adet, kullanici=kullanici,
+                          aciklama=_metin(satir, 'aciklama') or None, islem_tarihi=islem_tarihi)
+
+    kaynak_konum = _metin(satir, 'kaynak_konum', zorunlu=True)
+    hedef_konum = _metin(satir, 'hedef_konum', zorunlu=True)
+    if kaynak_konum == hedef_konum:
+        raise SatirHatasi('Kaynak ve hedef konum aynı olamaz')
+    return stok_transfer(urun_kodu=urun_kodu, renk=renk, kaynak_konum=kaynak_konum, hedef_konum=hedef_konum,
+                         adet=adet, kullanici=kullanici, islem_tarihi=islem_tarihi)
+
+
+def _satiri_isle(db, satir_no, ham, kullanici, istek_anahtari, urun_cache):
+    """Bir NDJSON satırını SAVEPOINT içinde uygula ve sonuç sözlüğünü döndür"""
+    sonuc = {'line': satir_no}
+    try:
+        satir = json.loads(ham)
+        if not isinstance(satir, dict):
+            raise SatirHatasi('Satır bir JSON nesnesi olmalıdır')
+    except (ValueError, SatirHatasi) as e:
+        sonuc.update(success=False, message=f'Geçersiz satır: {str(e)}')
+        return sonuc
+
+    anahtar = satir.get('idempotency_key')
+    if anahtar is None and istek_anahtari:
+        # İstek düzeyindeki anahtar: aynı dosya tekrar gönderildiğinde satır numarasıyla eşleşir
+        anahtar = f'{istek_anahtari}:{satir_no}'
+    if anahtar is not None:
+        anahtar = str(anahtar)
+        sonuc['idempotency_key'] = anahtar
+        onceki = db.execute('SELECT sonuc FROM toplu_islem_anahtarlari WHERE anahtar = ?', (anahtar,)).fetchone()
+        if onceki:
+            sonuc.update(json.loads(onceki['sonuc']), duplicate=True)
+            return sonuc
+
+    db.execute('SAVEPOINT toplu_satir')
+    try:
+        result = _hareketi_uygula(db, satir, kullanici, urun_cache)
+    except SatirHatasi as e:
+        result = {'success': False, 'message': str(e)}
+    except Exception as e:
+        logger.error(f"Toplu hareket satır {satir_no} hatası: {str(e)}")
+        result = {'success': False, 'message': f'Beklenmeyen hata: {str(e)}'}
+
+    if result['success']:
+        if anahtar is not None:
+            db.execute('INSERT INTO toplu_islem_anahtarlari (anahtar, sonuc) VALUES (?, ?)',
+                       (anahtar, json.dumps(result, ensure_ascii=False)))
+        db.execute('RELEASE toplu_satir')
+    else:
+        # Başarısız satır kaydedilmez: düzeltilip aynı anahtarla tekrar gönderilebilir
+        db.execute('ROLLBACK TO toplu_satir')
+        db.execute('RELEASE toplu_satir')
+
+    sonuc.update(result)
+    return sonuc
+
+
+def _parcalar(satirlar, parca_boyutu):
+    """Gövde satırlarını (satır_no, metin) parçaları halinde oku - boş satırlar atlanır"""
+    parca = []
+    for satir_no, ham in enumerate(satirlar, 1):
+        if isinstance(ham, bytes):
+            ham = ham.decode('utf-8', errors='replace')
+        ham = ham.strip()
+        if not ham:
+            continue
+        parca.append((satir_no, ham))
+        if len(parca) >= parca_boyutu:
+            yield parca
+            parca = []
+    if parca:
+        yield parca
+
+
+def toplu_hareket_akisi(satirlar, kullanici, istek_anahtari=None, parca_boyutu=1000):
+    """NDJSON satırlarını uygula ve her satırın sonucunu NDJSON olarak üret; son satır özet bilgisidir
+
+    Parça okunduktan sonra yazma kilidi alınır (yavaş istemci kilidi tutmaz) ve sonuçlar
+    ancak parça commit edildikten sonra gönderilir - gönderilen her 'success' kalıcıdır.
+    """
+    db = get_db_connection()
+    ozet = {'summary': True, 'total': 0, 'applied': 0, 'failed': 0, 'duplicates': 0}
+    urun_cache = {}
+
+    for parca in _parcalar(satirlar, parca_boyutu):
+        sonuclar = []
+        db.commit()
+        g.toplu_islem = True
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            for satir_no, ham in parca:
+                sonuclar.append(_satiri_isle(db, satir_no, ham, kullanici, istek_anahtari, urun_cache))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Toplu hareket parçası geri alındı: {str(e)}")
+            mesaj = f'Parça geri alındı: {str(e)}'
+            sonuclar = [{'line': satir_no, 'success': False, 'message': mesaj} for satir_no, _ in parca]
+        finally:
+            g.toplu_islem = False
+            urun_cache.clear()
+
+        for sonuc in sonuclar:
+            ozet['total'] += 1
+            if sonuc.get('duplicate'):
+                ozet['duplicates'] += 1
+            elif sonuc['success']:
+                ozet['applied'] += 1
+            else:
+                ozet['failed'] += 1
+            yield _dumps(sonuc)
+
+    logger.info(f"Toplu hareket tamamlandı: {ozet}")
+    yield _dumps(ozet)
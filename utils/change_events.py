@@ -0,0 +1,267 @@
+"""
+Stok değişiklik olayları: canlı sayfalar için SSE akışı ve senkronizasyon için değişiklik beslemesi
+- Olaylar degisiklik_olaylari tablosundan okunur (tetikleyicilerle doldurulur),
+  bu yüzden tüm gunicorn worker'ları aynı olay sırasını görür
+- Tarayıcı Last-Event-ID ile yeniden bağlandığında kaldığı yerden devam eder
+- Thread'li sunucularda bağlantı açık tutulur; sync worker'larda birikmiş olaylar
+  gönderilip bağlantı kapanır ve tarayıcı 'retry' süresi sonunda tekrar bağlanır
+- Açık tutulan akış her biri bir thread'i kilitlediğinden worker başına SSE_MAX_HELD_STREAMS ile sınırlıdır;
+  sınır doluysa yeni bağlantılar da sync davranışına (kısa bağlantı + yeniden bağlanma) düşer
+- Saklama süresini aşan olaylar CHANGE_EVENT_PRUNE_INTERVAL saniyede bir (istek başında) temizlenir
+- /api/changes aynı olay sırasını imleç (cursor) ile sayfalı ve sıkıştırılmış olarak sunar
+"""
+
+import json
+import logging
+import threading
+import time
+
+from flask import request, current_app, Response, stream_with_context
+
+from .database import (get_db_connection, get_son_olay_id, get_ilk_olay_id, get_degisiklik_olaylari,
+                       temizle_eski_olaylar, TOPLU_SORGU_PARCA_BOYUTU)
+
+logger = logging.getLogger(__name__)
+
+# akis_siniri None: sınırsız (gunicorn dışında, ör. geliştirme sunucusu)
+_ayarlar = {'akis_siniri': None, 'saklama_gun': 7, 'temizlik_araligi': 3600}
+_lock = threading.Lock()
+_acik_akis = 0
+_son_temizlik = 0.0
+
+
+def _format_sse(data, event=None, event_id=None, retry=None):
+    """Tek bir SSE mesajı oluştur"""
+    lines = []
+    if retry is not None:
+        lines.append(f'retry: {retry}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, ensure_ascii=False, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def _olay_to_dict(row):
+    return {
+        'id': row['id'],
+        'kaynak': row['kaynak'],
+        'islem': row['islem'],
+        'urun_kodu': row['urun_kodu'],
+        'renk': row['renk'] or '',
+        'konum': row['konum']
+    }
+
+
+def resolve_start_id():
+    """Akışın başlayacağı olay id'si: Last-Event-ID > last_event_id parametresi > şimdiki son olay"""
+    for value in (request.headers.get('Last-Event-ID'), request.args.get('last_event_id')):
+        if value and value.strip().isdigit():
+            return int(value)
+    return get_son_olay_id()
+
+
+def _can_hold_open():
+    """Bağlantıyı açık tutmak sadece istek başına thread/greenlet olan sunucularda güvenli"""
+    if current_app.config.get('SSE_HOLD_OPEN') is not None:
+        return current_app.config['SSE_HOLD_OPEN']
+    return bool(request.environ.get('wsgi.multithread'))
+
+
+def _akis_yuvasi_al():
+    global _acik_akis
+    with _lock:
+        sinir = _ayarlar['akis_siniri']
+        if sinir is not None and _acik_akis >= sinir:
+            return False
+        _acik_akis += 1
+        return True
+
+
+def _akis_yuvasi_birak():
+    global _acik_akis
+    with _lock:
+        _acik_akis -= 1
+
+
+def _event_stream(son_id, hold_open):
+    """Açık tutulan akış sınırı doluysa bağlantı kısa bağlantı olarak sunulur"""
+    tutulan = hold_open and _akis_yuvasi_al()
+    if hold_open and not tutulan:
+        logger.debug("SSE akış sınırı dolu, bağlantı açık tutulmuyor")
+    try:
+        yield from _olay_akisi(son_id, tutulan)
+    finally:
+        # İstemci bağlantıyı kapattığında da (GeneratorExit) yuva bırakılır
+        if tutulan:
+            _akis_yuvasi_birak()
+
+
+def _olay_akisi(son_id, hold_open):
+    config = current_app.config
+    poll_interval = config.get('SSE_POLL_INTERVAL', 1.0)
+    heartbeat_interval = config.get('SSE_HEARTBEAT_INTERVAL', 15)
+    max_duration = config.get('SSE_STREAM_SECONDS', 300)
+    retry_ms = config.get('SSE_RETRY_MS', 3000 if hold_open else 5000)
+    batch_size = config.get('SSE_BATCH_SIZE', 500)
+
+    # İstemcinin kaldığı olay artık saklanmıyorsa sayfa tamamen yenilenmeli
+    ilk_id = get_ilk_olay_id()
+    if son_id is not None and ilk_id is not None and son_id < ilk_id - 1:
+        yield _format_sse({'son_id': get_son_olay_id()}, event='reset', retry=retry_ms)
+        return
+
+    yield _format_sse({'son_id': son_id}, event='hello', event_id=son_id, retry=retry_ms)
+
+    started = time.monotonic()
+    last_sent = started
+    while True:
+        rows = get_degisiklik_olaylari(son_id, batch_size)
+        if rows:
+            son_id = rows[-1]['id']
+            yield _format_sse([_olay_to_dict(row) for row in rows], event='changes', event_id=son_id)
+            last_sent = time.monotonic()
+            # Birikmiş olaylar varsa beklemeden devam et
+            if len(rows) == batch_size:
+                continue
+
+        if not hold_open:
+            return
+
+        now = time.monotonic()
+        if now - started >= max_duration:
+            return
+        if now - last_sent >= heartbeat_interval:
+            # Proxy'lerin bağlantıyı boşta sanıp kapatmaması için yorum satırı
+            yield ': keepalive\n\n'
+            last_sent = now
+        time.sleep(poll_interval)
+
+
+def sse_response():
+    """Değişiklik olayları için SSE yanıtı"""
+    son_id = resolve_start_id()
+    hold_open = _can_hold_open()
+    response = Response(stream_with_context(_event_stream(son_id, hold_open)),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # nginx gibi ters proxy'lerin yanıtı tamponlamasını engelle
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def set_sse_stream_limit(sinir):
+    """Worker başına açık tutulabilecek SSE akışı (gunicorn: gerçek thread / bağlantı sayısından)"""
+    _ayarlar['akis_siniri'] = max(0, int(sinir))
+
+
+def _eski_olaylari_temizle():
+    """Son temizlikten bu yana CHANGE_EVENT_PRUNE_INTERVAL geçtiyse saklama süresini aşan olayları sil"""
+    global _son_temizlik
+    if _ayarlar['temizlik_araligi'] <= 0:
+        return
+    with _lock:
+        if time.monotonic() - _son_temizlik < _ayarlar['temizlik_araligi']:
+            return
+        _son_temizlik = time.monotonic()
+    silinen = temizle_eski_olaylar(_ayarlar['saklama_gun'])
+    if silinen:
+        logger.info("Saklama süresini aşan %d değişiklik olayı silindi", silinen)
+
+
+def init_change_events(app):
+    """SSE_MAX_HELD_STREAMS / CHANGE_EVENT_RETENTION_DAYS / CHANGE_EVENT_PRUNE_INTERVAL"""
+    global _son_temizlik
+    app.config.setdefault('SSE_MAX_HELD_STREAMS', None)
+    app.config.setdefault('CHANGE_EVENT_RETENTION_DAYS', 7)
+    app.config.setdefault('CHANGE_EVENT_PRUNE_INTERVAL', 3600)
+    if app.config['SSE_MAX_HELD_STREAMS'] is not None:
+        set_sse_stream_limit(app.config['SSE_MAX_HELD_STREAMS'])
+    _ayarlar['saklama_gun'] = int(app.config['CHANGE_EVENT_RETENTION_DAYS'])
+    _ayarlar['temizlik_araligi'] = float(app.config['CHANGE_EVENT_PRUNE_INTERVAL'])
+    # Açılışta create_app zaten temizler; sıradaki temizlik bir aralık sonra
+    _son_temizlik = time.monotonic()
+    app.before_request(_eski_olaylari_temizle)
+
+
+class CursorExpiredError(Exception):
+    """İstenen imleç saklama süresi dışında kaldı - tam senkronizasyon gerekir"""
+
+
+def _rows_by_id(tablo, kolonlar, ids):
+    """Tablodan id listesine göre satırları getir: {id: row}"""
+    db = get_db_connection()
+    ids = list(ids)
+    rows = {}
+    for i in range(0, len(ids), TOPLU_SORGU_PARCA_BOYUTU):
+        parca = ids[i:i + TOPLU_SORGU_PARCA_BOYUTU]
+        placeholders = ', '.join(['?'] * len(parca))
+        for row in db.execute(f'SELECT {kolonlar} FROM {tablo} WHERE id IN ({placeholders})', parca):
+            rows[row['id']] = row
+    return rows
+
+
+def build_change_batch(since, limit):
+    """İmleçten sonraki değişiklikleri sıkıştırılmış bir parti olarak hazırla
+
+    Aynı stok kaydı veya not için partideki birden çok olay tek bir güncel durum kaydına indirgenir;
+    hareketler (stok_hareketleri) ise tek tek döner. Dönüş: (changes, next_cursor, has_more)
+    """
+    ilk_id = get_ilk_olay_id()
+    # since=0 (baştan) da kontrol edilir - temizlenmiş olaylar varsa geçmiş eksik kalır
+    if ilk_id is not None and since < ilk_id - 1:
+        raise CursorExpiredError()
+
+    olaylar = get_degisiklik_olaylari(since, limit)
+    if not olaylar:
+        return [], since, False
+    next_cursor = olaylar[-1]['id']
+
+    # Varlık bazında son olay (sıra korunarak)
+    son_olaylar = {}
+    for olay in olaylar:
+        if olay['kaynak'] == 'stoklar':
+            anahtar = ('stok', olay['urun_kodu'], olay['renk'], olay['konum'])
+        elif olay['kaynak'] == 'urun_rezervasyon_notlari':
+            anahtar = ('rezervasyon_notu', olay['urun_kodu'], olay['renk'])
+        else:
+            anahtar = ('hareket', olay['kayit_id'])
+        son_olaylar.pop(anahtar, None)
+        son_olaylar[anahtar] = olay
+
+    def ids_for(kaynak):
+        return {olay['kayit_id'] for olay in son_olaylar.values() if olay['kaynak'] == kaynak}
+
+    stoklar = _rows_by_id('stoklar', '''id, urun_kodu, urun_adi, renk, konum, sistem_seri, uzunluk, mt_kg,
+        boy_kg, adet, toplam_kg, kritik_stok_siniri, updated_at''', ids_for('stoklar'))
+    hareketler = _rows_by_id('stok_hareketleri', '''id, urun_kodu, hareket_tipi, miktar, onceki_miktar,
+        yeni_miktar, konum, aciklama, kullanici, tarih''', ids_for('stok_hareketleri'))
+    notlar = _rows_by_id('urun_rezervasyon_notlari', '''id, urun_kodu, renk, rezervasyon_notu,
+        guncelleme_tarihi''', ids_for('urun_rezervasyon_notlari'))
+
+    changes = []
+    for anahtar, olay in son_olaylar.items():
+        tur = anahtar[0]
+        if tur == 'stok':
+            row = stoklar.get(olay['kayit_id'])
+            # Kayıt silinmiş ya da anahtarı değişmişse bu anahtar artık yok
+            mevcut = row is not None and (row['urun_kodu'], row['renk'], row['konum']) == anahtar[1:]
+            change = {'type': 'stok', 'event_id': olay['id'], 'deleted': not mevcut,
+                      'urun_kodu': olay['urun_kodu'], 'renk': olay['renk'], 'konum': olay['konum']}
+            if mevcut:
+                change.update({key: row[key] for key in row.keys() if key != 'id'})
+        elif tur == 'rezervasyon_notu':
+            row = notlar.get(olay['kayit_id'])
+            change = {'type': 'rezervasyon_notu', 'event_id': olay['id'], 'deleted': row is None,
+                      'urun_kodu': olay['urun_kodu'], 'renk': olay['renk'],
+                      'rezervasyon_notu': row['rezervasyon_notu'] if row else None,
+                      'guncelleme_tarihi': row['guncelleme_tarihi'] if row else None}
+        else:
+            row = hareketler.get(olay['kayit_id'])
+            if row is None:
+                continue
+            change = {'type': 'hareket', 'event_id': olay['id'], **dict(row)}
+        changes.append(change)
+
+    return changes, next_cursor, len(olaylar) == limit
@@ -0,0 +1,193 @@
+"""
+HTTP yanıt sıkıştırma (gzip, brotli kuruluysa br)
+- HTML/JSON/CSS/JS yanıtları içerik tipi ve minimum boyut kurallarına göre sıkıştırılır
+- Stream edilen yanıtlar parça parça (flush ederek) sıkıştırılır, akış bozulmaz
+- static/ altındaki dosyalar başlangıçta bir kez sıkıştırılıp bellekten sunulur
+"""
+
+import gzip
+import logging
+import mimetypes
+import os
+import threading
+import zlib
+
+from flask import request, current_app, Response
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli opsiyonel - yoksa sadece gzip kullanılır
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'application/x-ndjson',
+    'image/svg+xml',
+}
+
+# Anlık (dinamik) yanıtlar için hız/oran dengesi, statikler için en yüksek oran
+DYNAMIC_GZIP_LEVEL = 6
+DYNAMIC_BROTLI_QUALITY = 5
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+
+
+def _choose_encoding():
+    """İstemcinin kabul ettiği en iyi kodlamayı seç"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress(data, encoding, static=False):
+    if encoding == 'br':
+        quality = STATIC_BROTLI_QUALITY if static else DYNAMIC_BROTLI_QUALITY
+        return brotli.compress(data, quality=quality)
+    level = STATIC_GZIP_LEVEL if static else DYNAMIC_GZIP_LEVEL
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _stream_compress(chunks, encoding):
+    """Stream edilen yanıtı parça parça sıkıştır - her parça hemen istemciye gider"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=DYNAMIC_BROTLI_QUALITY)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(DYNAMIC_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+def compress_response(response):
+    """after_request: uygun yanıtları sıkıştır"""
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _stream_compress(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    data = response.get_data()
+    if len(data) < current_app.config.get('COMPRESS_MIN_SIZE', 500):
+        return response
+
+    response.set_data(_compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+class PrecompressedStatic:
+    """static/ dosyalarının gzip/br sürümlerini bellekte tutar"""
+
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        # Sadece warm() sırasında static/ altında bulunan dosyalar sunulur (diğerleri Flask'ın static view'ine düşer)
+        self._dosyalar = frozenset()
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _build_entry(self, filename, path, stat):
+        with open(path, 'rb') as f:
+            data = f.read()
+        entry = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'gzip': _compress(data, 'gzip', static=True)}
+        if brotli is not None:
+            entry['br'] = _compress(data, 'br', static=True)
+        return entry
+
+    def warm(self):
+        """Başlangıçta tüm sıkıştırılabilir statik dosyaları hazırla"""
+        if not self.static_folder or not os.path.isdir(self.static_folder):
+            return
+        self._dosyalar = frozenset(
+            os.path.relpath(os.path.join(root, name), self.static_folder).replace(os.sep, '/')
+            for root, _dirs, files in os.walk(self.static_folder) for name in files
+        )
+        count = sum(self.get(rel) is not None for rel in self._dosyalar)
+        logger.info("%d statik dosya önceden sıkıştırıldı", count)
+
+    def get(self, filename):
+        """Dosya değişmişse yeniden sıkıştırarak güncel girdiyi döndür"""
+        if filename not in self._dosyalar:
+            return None
+        mimetype = mimetypes.guess_type(filename)[0]
+        if mimetype not in COMPRESSIBLE_MIMETYPES:
+            return None
+        # Liste static/ içinden geldiği için '..' zaten olamaz; yine de yol static/ dışına çıkamasın
+        path = safe_join(self.static_folder, filename)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        entry = self._entries.get(filename)
+        if entry is None or entry['mtime'] != stat.st_mtime_ns:
+            entry = self._build_entry(filename, path, stat)
+            entry['mimetype'] = mimetype
+            with self._lock:
+                self._entries[filename] = entry
+        return entry
+
+
+def init_compression(app):
+    """Sıkıştırma middleware'ini ve önceden sıkıştırılmış statik sunumu kaydet"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    precompressed = PrecompressedStatic(app.static_folder)
+    precompressed.warm()
+    app.extensions['precompressed_static'] = precompressed
+
+    default_static_view = app.view_functions['static']
+
+    def static(filename):
+        encoding = _choose_encoding()
+        entry = precompressed.get(filename) if encoding else None
+        if entry is None or encoding not in entry:
+            return default_static_view(filename=filename)
+
+        response = Response(entry[encoding], mimetype=entry['mimetype'])
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.last_modified = entry['mtime'] / 1e9
+        response.set_etag(f"{entry['mtime']:x}-{entry['size']:x}-{encoding}")
+        max_age = app.get_send_file_max_age(filename)
+        if max_age is not None:
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+        return response.make_conditional(request)
+
+    app.view_functions['static'] = static
+    app.after_request(compress_response)
@@ -8,46 +8,247 @@ if project_home not in sys.path:
     sys.path = [project_home] + sys.path
 import sqlite3
 import threading
-from flask import current_app, g
+import time
+from flask import current_app, g, has_app_context
 from contextlib import contextmanager
 import logging
 
-# Thread-safe connection pool
+# get_direct_connection için thread başına bağlantı
 _connection_pool = threading.local()
 
 # Logger setup
 logger = logging.getLogger(__name__)
 
-def get_db_connection():
-    """Veritabanı bağlantısı al - Flask context içinde"""
-    if 'db' not in g:
-        db_path = current_app.config.get('DATABASE_PATH', 'stok_takip_dev.db')
-        g.db = sqlite3.connect(
+# Değişiklikleri veri sürümünü artıran tablolar
+VERSIONED_TABLES = ('stoklar', 'stok_hareketleri', 'urun_rezervasyon_notlari')
+
+# Toplu (VALUES) sorgularda tek seferde gönderilen anahtar sayısı - SQLite parametre sınırı 999
+TOPLU_SORGU_PARCA_BOYUTU = 400
+
+# Değişiklik olayı üreten tablolar: tablo -> (renk kolonu, konum kolonu)
+OLAY_TABLOLARI = {
+    'stoklar': ('renk', 'konum'),
+    'stok_hareketleri': (None, 'konum'),
+    'urun_rezervasyon_notlari': ('renk', None),
+}
+
+# SQL dinleyicileri: her sorgu/fetch sonrası fn(sql, sure_saniye, fetch) çağrılır (metrikler, profil)
+_sql_dinleyicileri = []
+
+def add_sql_listener(fn):
+    """Bağlantılardaki SQL çalıştırma sürelerini izleyecek fonksiyonu kaydet"""
+    if fn not in _sql_dinleyicileri:
+        _sql_dinleyicileri.append(fn)
+
+def _sql_bildir(sql, sure, fetch):
+    for dinleyici in _sql_dinleyicileri:
+        try:
+            dinleyici(sql, sure, fetch)
+        except Exception as e:
+            logger.debug("SQL dinleyici hatası: %s", e)
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Sorgu ve fetch sürelerini dinleyicilere bildiren cursor
+
+    SELECT sorgularında satırların çoğu fetch sırasında okunur, bu yüzden fetch süresi de
+    aynı sorguya eklenir. Cursor üzerinde doğrudan for döngüsüyle okunan satırlar ölçülmez.
+    """
+
+    _son_sql = None
+
+    def execute(self, sql, parameters=()):
+        baslangic = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._son_sql = sql
+            _sql_bildir(sql, time.perf_counter() - baslangic, False)
+
+    def executemany(self, sql, seq_of_parameters):
+        baslangic = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._son_sql = sql
+            _sql_bildir(sql, time.perf_counter() - baslangic, False)
+
+    def _fetch(self, method, *args):
+        baslangic = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._son_sql is not None:
+                _sql_bildir(self._son_sql, time.perf_counter() - baslangic, True)
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(super().fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection.execute kısayolları da ölçülen cursor'dan geçsin"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+# Yapılandırma olmadan kullanılan (geliştirme) veritabanı
+VARSAYILAN_DB_YOLU = 'stok_takip_dev.db'
+
+def _varsayilan_db_yolu():
+    """Uygulama yapılandırmasındaki veritabanı; uygulama dışında DATABASE_PATH ortam değişkeni"""
+    if has_app_context():
+        return current_app.config.get('DATABASE_PATH', VARSAYILAN_DB_YOLU)
+    return os.environ.get('DATABASE_PATH', VARSAYILAN_DB_YOLU)
+
+class ConnectionPool:
+    """Süreç içi SQLite bağlantı havuzu - veritabanı yolu başına boştaki bağlantılar (LIFO)
+
+    Bağlantı açmak (dosya açma, şema okuma, PRAGMA'lar) her istekte tekrarlanmaz ve sqlite3'ün
+    hazırlanmış ifade önbelleği istekler arasında korunur. Kullanımdaki bağlantı sayısı sınırlanmaz:
+    sync worker'da 1, gthread'de thread sayısı, gevent'te eşzamanlı greenlet sayısı kadar bağlantı açılır;
+    max_idle'dan fazlası iade edildiğinde kapatılır. Bağlantılar süreçler arasında paylaşılamaz, fork
+    sonrası çocuk süreç boş bir havuzla başlar.
+    """
+
+    def __init__(self, max_idle=8):
+        self.max_idle = max_idle
+        self._sifirla()
+
+    def _sifirla(self):
+        self._lock = threading.Lock()
+        self._bos = {}
+        self._wal_ayarli = set()
+        self._pid = os.getpid()
+        self.opened = 0
+        self.reused = 0
+        self.closed = 0
+        self.in_use = 0
+
+    def _ac(self, db_path):
+        conn = sqlite3.connect(
             db_path,
             check_same_thread=False,
-            timeout=20.0
+            timeout=20.0,
+            factory=InstrumentedConnection
         )
-        g.db.row_factory = sqlite3.Row
-        # WAL mode for better concurrency
-        g.db.execute('PRAGMA journal_mode=WAL')
-        # Foreign key support
-        g.db.execute('PRAGMA foreign_keys=ON')
-        g.db.commit()
+        conn.row_factory = sqlite3.Row
+        # WAL veritabanı dosyasında kalıcıdır - süreç başına ilk bağlantıda ayarlamak yeterli
+        if db_path not in self._wal_ayarli:
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._wal_ayarli.add(db_path)
+        # Foreign key desteği bağlantı başına
+        conn.execute('PRAGMA foreign_keys=ON')
+        conn.commit()
+        return conn
+
+    def acquire(self, db_path):
+        """Boştaki bir bağlantıyı ver veya yenisini aç"""
+        with self._lock:
+            bos = self._bos.get(db_path)
+            conn = bos.pop() if bos else None
+            self.in_use += 1
+            if conn is not None:
+                self.reused += 1
+                return conn
+        try:
+            conn = self._ac(db_path)
+        except Exception:
+            with self._lock:
+                self.in_use -= 1
+            raise
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    def release(self, db_path, conn):
+        """Bağlantıyı havuza iade et - yarım kalmış transaction geri alınır"""
+        saglam = True
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.warning(f"Havuza iade edilen bağlantı geri alınamadı, kapatılıyor: {str(e)}")
+            saglam = False
+        with self._lock:
+            self.in_use -= 1
+            bos = self._bos.setdefault(db_path, [])
+            if saglam and self._pid == os.getpid() and len(bos) < self.max_idle:
+                bos.append(conn)
+                return
+            self.closed += 1
+        conn.close()
+
+    def close_all(self, db_path=None):
+        """Boştaki bağlantıları kapat (fork öncesi, testler, kapanış)"""
+        with self._lock:
+            yollar = [db_path] if db_path else list(self._bos)
+            kapanacak = [conn for yol in yollar for conn in self._bos.pop(yol, [])]
+            self.closed += len(kapanacak)
+        for conn in kapanacak:
+            conn.close()
+
+    def _fork_sonrasi(self):
+        # Ebeveynden gelen bağlantılar çocukta kapatılmaz (kapanış WAL checkpoint'i yapabilir),
+        # referansları tutulur ki çöp toplayıcı da kapatmasın
+        miras = [conn for bagl in self._bos.values() for conn in bagl]
+        self._sifirla()
+        self._miras = miras
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_idle': self.max_idle,
+                'idle': sum(len(bos) for bos in self._bos.values()),
+                'in_use': self.in_use,
+                'opened': self.opened,
+                'reused': self.reused,
+                'closed': self.closed,
+            }
+
+_havuz = ConnectionPool()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_havuz._fork_sonrasi)
+
+def get_pool_stats():
+    """Bu süreçteki bağlantı havuzu sayaçları"""
+    return _havuz.stats()
+
+def close_pooled_connections(db_path=None):
+    """Havuzdaki boştaki bağlantıları kapat"""
+    _havuz.close_all(db_path)
+
+def get_db_connection():
+    """Veritabanı bağlantısı al - Flask context içinde
+
+    Bağlantı istek boyunca g.db'de tutulur (gthread'de her thread'in, gevent'te her greenlet'in
+    kendi uygulama context'i vardır) ve istek sonunda havuza iade edilir.
+    """
+    if 'db' not in g:
+        g.db_path = current_app.config.get('DATABASE_PATH', VARSAYILAN_DB_YOLU)
+        g.db = _havuz.acquire(g.db_path)
     return g.db
 
 def get_direct_connection():
-    """Direct veritabanı bağlantısı - Flask context dışında kullanım için"""
-    if not hasattr(_connection_pool, 'connection'):
-        db_path = os.environ.get('DATABASE_PATH', 'stok_takip_dev.db')
-        _connection_pool.connection = sqlite3.connect(
-            db_path,
-            check_same_thread=False,
-            timeout=20.0
-        )
-        _connection_pool.connection.row_factory = sqlite3.Row
-        _connection_pool.connection.execute('PRAGMA journal_mode=WAL')
-        _connection_pool.connection.execute('PRAGMA foreign_keys=ON')
-        _connection_pool.connection.commit()
+    """Direct veritabanı bağlantısı - Flask context dışında kullanım için
+
+    Thread başına tek bağlantı, iş parçacığı ömrü boyunca açık kalır; gevent worker'larında her greenlet
+    ayrı bağlantı açacağından istek işleyen kodda get_db_connection kullanılmalı.
+    """
+    db_path = _varsayilan_db_yolu()
+    if getattr(_connection_pool, 'pid', None) != os.getpid() or _connection_pool.db_path != db_path:
+        _connection_pool.connection = _havuz._ac(db_path)
+        _connection_pool.db_path = db_path
+        _connection_pool.pid = os.getpid()
     return _connection_pool.connection
 
 @contextmanager
@@ -62,17 +263,17 @@ def get_db_transaction():
         raise
 
 def close_db(error):
-    """Veritabanı bağlantısını kapat"""
+    """İsteğin veritabanı bağlantısını havuza iade et"""
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        _havuz.release(g.pop('db_path', VARSAYILAN_DB_YOLU), db)
 
 def save_urun_rezervasyon_notu(urun_kodu, renk, rezervasyon_notu):
     """Ürün bazlı rezervasyon notu kaydet"""
     db = get_db_connection()
     
     try:
-        logger.info(f"Saving reservation note for product: {urun_kodu}, color: {renk}, note: {rezervasyon_notu}")
+        logger.debug("Saving reservation note for product: %s, color: %r, note: %r", urun_kodu, renk, rezervasyon_notu)
         
         # Önce var mı kontrol et - daha tutarlı bir şekilde kontrol et
         if renk and renk.strip():
@@ -81,14 +282,12 @@ def save_urun_rezervasyon_notu(urun_kodu, renk, rezervasyon_notu):
                 'SELECT id FROM urun_rezervasyon_notlari WHERE urun_kodu = ? AND renk = ?',
                 (urun_kodu, renk)
             ).fetchone()
-            logger.info(f"Checking existing record with color - Found: {existing is not None}")
         else:
             # Renk yoksa veya boşsa NULL ile kontrol et
             existing = db.execute(
                 'SELECT id FROM urun_rezervasyon_notlari WHERE urun_kodu = ? AND (renk IS NULL OR renk = ?)',
                 (urun_kodu, '')
             ).fetchone()
-            logger.info(f"Checking existing record without color - Found: {existing is not None}")
         
         if existing:
             # Güncelle
@@ -97,23 +296,22 @@ def save_urun_rezervasyon_notu(urun_kodu, renk, rezervasyon_notu):
                     'UPDATE urun_rezervasyon_notlari SET rezervasyon_notu = ?, guncelleme_tarihi = CURRENT_TIMESTAMP WHERE urun_kodu = ? AND renk = ?',
                     (rezervasyon_notu, urun_kodu, renk)
                 )
-                logger.info(f"Updated existing reservation note for {urun_kodu} with color {renk}, rows affected: {result.rowcount}")
+                logger.debug("Updated reservation note for %s (color %r), rows affected: %d", urun_kodu, renk, result.rowcount)
             else:
                 result = db.execute(
                     'UPDATE urun_rezervasyon_notlari SET rezervasyon_notu = ?, guncelleme_tarihi = CURRENT_TIMESTAMP WHERE urun_kodu = ? AND (renk IS NULL OR renk = ?)',
                     (rezervasyon_notu, urun_kodu, '')
                 )
-                logger.info(f"Updated existing reservation note for {urun_kodu} without color, rows affected: {result.rowcount}")
+                logger.debug("Updated reservation note for %s (no color), rows affected: %d", urun_kodu, result.rowcount)
         else:
             # Yeni ekle
             result = db.execute(
                 'INSERT INTO urun_rezervasyon_notlari (urun_kodu, renk, rezervasyon_notu) VALUES (?, ?, ?)',
                 (urun_kodu, renk if renk and renk.strip() else None, rezervasyon_notu)
             )
-            logger.info(f"Inserted new reservation note for {urun_kodu} with color {renk}, lastrowid: {result.lastrowid}")
+            logger.debug("Inserted reservation note for %s (color %r), lastrowid: %d", urun_kodu, renk, result.lastrowid)
         
         db.commit()
-        logger.info(f"Successfully saved reservation note for {urun_kodu}")
         return True
     except Exception as e:
         logger.error(f"Ürün rezervasyon notu kaydetme hatası: {str(e)}")
@@ -125,8 +323,6 @@ def get_urun_rezervasyon_notu(urun_kodu, renk=None):
     db = get_db_connection()
     
     try:
-        logger.info(f"Retrieving reservation note for product: {urun_kodu}, color: {renk}")
-        
         if renk and renk.strip():
             # Renk varsa ve boş değilse
             result = db.execute(
@@ -141,15 +337,42 @@ def get_urun_rezervasyon_notu(urun_kodu, renk=None):
             ).fetchone()
         
         if result:
-            logger.info(f"Found reservation note: {result['rezervasyon_notu']}")
             return result['rezervasyon_notu']
         else:
-            logger.info("No reservation note found")
             return None
     except Exception as e:
         logger.error(f"Ürün rezervasyon notu getirme hatası: {str(e)}")
         return None
 
+def get_urun_rezervasyon_notlari_toplu(urun_anahtarlari):
+    """Birden çok (urun_kodu, renk) için rezervasyon notlarını tek sorguda getir
+
+    Dönüş: {(urun_kodu, renk or ''): rezervasyon_notu}
+    """
+    anahtarlar = list({(urun_kodu, (renk or '').strip()) for urun_kodu, renk in urun_anahtarlari})
+    if not anahtarlar:
+        return {}
+
+    db = get_db_connection()
+    notlar = {}
+    # SQLite parametre sınırını aşmamak için parçalar halinde sorgula
+    for i in range(0, len(anahtarlar), TOPLU_SORGU_PARCA_BOYUTU):
+        parca = anahtarlar[i:i + TOPLU_SORGU_PARCA_BOYUTU]
+        values_clause = ', '.join(['(?, ?)'] * len(parca))
+        params = [deger for anahtar in parca for deger in anahtar]
+
+        rows = db.execute(f'''
+            WITH anahtar(urun_kodu, renk) AS (VALUES {values_clause})
+            SELECT a.urun_kodu, a.renk, n.rezervasyon_notu
+            FROM anahtar a
+            JOIN urun_rezervasyon_notlari n ON n.urun_kodu = a.urun_kodu
+             AND (n.renk = a.renk OR (a.renk = '' AND n.renk IS NULL))
+        ''', params).fetchall()
+
+        for row in rows:
+            notlar[(row['urun_kodu'], row['renk'])] = row['rezervasyon_notu']
+    return notlar
+
 def delete_urun_rezervasyon_notu(urun_kodu, renk=None):
     """Ürün bazlı rezervasyon notu sil"""
     db = get_db_connection()
@@ -242,11 +465,13 @@ def init_db():
             konum TEXT,
             aciklama TEXT,
             kullanici TEXT,
-            tarih TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (urun_kodu) REFERENCES stoklar(urun_kodu)
+            tarih TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
     
+    # Eski şemadaki geçersiz yabancı anahtarı kaldır (indeksler bu adımdan sonra oluşturulur)
+    _stok_hareketleri_fk_kaldir(db)
+    
     # Stoklar tablosu indeksleri
     db.execute('CREATE INDEX IF NOT EXISTS idx_stoklar_urun_kodu ON stoklar(urun_kodu)')
     db.execute('CREATE INDEX IF NOT EXISTS idx_stoklar_konum ON stoklar(konum)')
@@ -285,7 +510,79 @@ def init_db():
     except sqlite3.OperationalError:
         # Sütun zaten mevcut
         pass
-    
+
+    # Veri sürümü tablosu - her yazma işleminde artan sayaç (ETag için)
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS veri_surumu (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            surum INTEGER NOT NULL DEFAULT 0,
+            guncelleme_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    db.execute('INSERT OR IGNORE INTO veri_surumu (id, surum) VALUES (1, 0)')
+
+    # Sürüm tetikleyicileri - route'lardaki doğrudan SQL yazımları dahil tüm değişiklikleri yakalar
+    for tablo in VERSIONED_TABLES:
+        for islem in ('INSERT', 'UPDATE', 'DELETE'):
+            db.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{tablo}_{islem.lower()}_surum
+                AFTER {islem} ON {tablo}
+                BEGIN
+                    UPDATE veri_surumu
+                    SET surum = surum + 1, guncelleme_tarihi = CURRENT_TIMESTAMP
+                    WHERE id = 1;
+                END
+            ''')
+
+    # Değişiklik olayları - canlı sayfalar (SSE) ve artımlı senkronizasyon için sıralı olay kaydı
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS degisiklik_olaylari (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kaynak TEXT NOT NULL,
+            islem TEXT NOT NULL,
+            kayit_id INTEGER,
+            urun_kodu TEXT,
+            renk TEXT,
+            konum TEXT,
+            olay_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Olay tetikleyicileri - stok fonksiyonları, importer'lar ve not kayıtları aynı yoldan yakalanır
+    for tablo, (renk_kolonu, konum_kolonu) in OLAY_TABLOLARI.items():
+        for islem, satir in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+            renk_degeri = f'{satir}.{renk_kolonu}' if renk_kolonu else 'NULL'
+            konum_degeri = f'{satir}.{konum_kolonu}' if konum_kolonu else 'NULL'
+            db.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{tablo}_{islem.lower()}_olay
+                AFTER {islem} ON {tablo}
+                BEGIN
+                    INSERT INTO degisiklik_olaylari (kaynak, islem, kayit_id, urun_kodu, renk, konum)
+                    VALUES ('{tablo}', '{islem}', {satir}.id, {satir}.urun_kodu, {renk_degeri}, {konum_degeri});
+                END
+            ''')
+
+    # Anahtarı değişen stok kaydı için eski anahtar da bildirilir (eski satır sayfadan kalkar)
+    db.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_stoklar_anahtar_degisim_olay
+        AFTER UPDATE OF urun_kodu, renk, konum ON stoklar
+        WHEN OLD.urun_kodu IS NOT NEW.urun_kodu OR OLD.renk IS NOT NEW.renk OR OLD.konum IS NOT NEW.konum
+        BEGIN
+            INSERT INTO degisiklik_olaylari (kaynak, islem, kayit_id, urun_kodu, renk, konum)
+            VALUES ('stoklar', 'UPDATE', OLD.id, OLD.urun_kodu, OLD.renk, OLD.konum);
+        END
+    ''')
+
+    # Toplu hareket API'si için idempotency anahtarları (tekrar gönderilen satırlar ikinci kez uygulanmaz)
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS toplu_islem_anahtarlari (
+            anahtar TEXT PRIMARY KEY,
+            sonuc TEXT NOT NULL,
+            olusturma_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_toplu_islem_tarih ON toplu_islem_anahtarlari(olusturma_tarihi)')
+
     db.commit()
 
     # Rezervasyon notlarını yeni tabloya taşı
@@ -294,6 +591,72 @@ def init_db():
     # except Exception as e:
     #     logger.error(f"Rezervasyon notları taşıma hatası: {str(e)}")
 
+def _stok_hareketleri_fk_kaldir(db):
+    """stok_hareketleri tablosunu yabancı anahtar olmadan yeniden oluştur
+
+    Eski şemadaki FOREIGN KEY (urun_kodu) REFERENCES stoklar(urun_kodu) benzersiz olmayan bir
+    kolonu gösterdiği için foreign_keys=ON iken her hareket kaydı "foreign key mismatch" hatası
+    veriyordu. Hareket geçmişi stok kaydı silinse de korunmalı, bu yüzden kısıt kaldırılır.
+    SQLite'ta kısıt ALTER ile silinemediği için tablo yeniden oluşturulur.
+    """
+    if not db.execute('PRAGMA foreign_key_list(stok_hareketleri)').fetchall():
+        return
+
+    db.commit()
+    # foreign_keys ayarı sadece transaction dışında değiştirilebilir
+    db.execute('PRAGMA foreign_keys=OFF')
+    try:
+        # Aynı anda açılan worker'lar (preload kapalı, sıralı yeniden başlatma) sırayla girer;
+        # kilidi bekleyen süreç tablo zaten yeniden oluşturulduysa bir şey yapmaz
+        db.execute('BEGIN IMMEDIATE')
+        if not db.execute('PRAGMA foreign_key_list(stok_hareketleri)').fetchall():
+            db.rollback()
+            return
+        logger.info("stok_hareketleri tablosu yabancı anahtar olmadan yeniden oluşturuluyor")
+        db.execute('DROP TABLE IF EXISTS stok_hareketleri_yeni')
+        db.execute('''
+            CREATE TABLE stok_hareketleri_yeni (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                urun_kodu TEXT NOT NULL,
+                hareket_tipi TEXT NOT NULL CHECK (hareket_tipi IN ('GIRIS', 'CIKIS', 'TRANSFER')),
+                miktar INTEGER NOT NULL CHECK (miktar > 0),
+                onceki_miktar INTEGER,
+                yeni_miktar INTEGER,
+                konum TEXT,
+                aciklama TEXT,
+                kullanici TEXT,
+                tarih TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        db.execute('''
+            INSERT INTO stok_hareketleri_yeni
+            (id, urun_kodu, hareket_tipi, miktar, onceki_miktar, yeni_miktar, konum, aciklama, kullanici, tarih)
+            SELECT id, urun_kodu, hareket_tipi, miktar, onceki_miktar, yeni_miktar, konum, aciklama, kullanici, tarih
+            FROM stok_hareketleri
+        ''')
+        # Eski tablonun indeks ve tetikleyicileri onunla birlikte silinir, init_db yeniden oluşturur
+        db.execute('DROP TABLE stok_hareketleri')
+        db.execute('ALTER TABLE stok_hareketleri_yeni RENAME TO stok_hareketleri')
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.execute('PRAGMA foreign_keys=ON')
+
+def toplu_islem_aktif():
+    """Toplu hareket API'si bir transaction içinde çalışıyor mu (commit/rollback onun kontrolünde)"""
+    return bool(g.get('toplu_islem'))
+
+def _commit(db):
+    if not toplu_islem_aktif():
+        db.commit()
+
+def _rollback(db):
+    # Toplu işlemde hatalı satır kendi SAVEPOINT'ine geri alınır, transaction'ın tamamı değil
+    if not toplu_islem_aktif():
+        db.rollback()
+
 def create_stok_hareketi(urun_kodu, hareket_tipi, miktar, onceki_miktar, yeni_miktar, konum=None, aciklama=None, kullanici=None, islem_tarihi=None):
     """Stok hareketi kaydı oluştur"""
     from datetime import datetime
@@ -320,7 +683,84 @@ def create_stok_hareketi(urun_kodu, hareket_tipi, miktar, onceki_miktar, yeni_mi
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (urun_kodu, hareket_tipi, miktar, onceki_miktar, yeni_miktar, konum, aciklama, kullanici, current_datetime))
     
-    db.commit()
+    _commit(db)
+
+def get_veri_surumu():
+    """Güncel veri sürümünü getir (her yazmada artan sayaç, ETag ve single-flight anahtarları için)"""
+    db = get_db_connection()
+    row = db.execute('SELECT surum FROM veri_surumu WHERE id = 1').fetchone()
+    return row['surum'] if row else 0
+
+def _son_verilen_olay_id(db):
+    """AUTOINCREMENT sayacındaki son verilen olay id'si - olaylar temizlense de korunur (hiç olay yoksa None)"""
+    row = db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'degisiklik_olaylari'").fetchone()
+    return row['seq'] if row else None
+
+def get_son_olay_id():
+    """En son değişiklik olayının id'si (hiç olay oluşmadıysa 0)
+
+    Tablo temizlikte tamamen boşalmışsa son verilen id kullanılır; 0 dönülseydi yeni bağlanan istemci
+    temizlenmiş olayların öncesinden başlamış sayılırdı.
+    """
+    db = get_db_connection()
+    row = db.execute('SELECT MAX(id) as son_id FROM degisiklik_olaylari').fetchone()
+    if row['son_id'] is not None:
+        return row['son_id']
+    return _son_verilen_olay_id(db) or 0
+
+def get_ilk_olay_id():
+    """Saklanan en eski değişiklik olayının id'si (hiç olay oluşmadıysa None)
+
+    Tablo temizlikte tamamen boşalmışsa sıradaki olayın id'si döner; böylece eski imleçler yine
+    saklama süresi dışında sayılır.
+    """
+    db = get_db_connection()
+    row = db.execute('SELECT MIN(id) as ilk_id FROM degisiklik_olaylari').fetchone()
+    if row['ilk_id'] is not None:
+        return row['ilk_id']
+    son = _son_verilen_olay_id(db)
+    return son + 1 if son is not None else None
+
+def get_degisiklik_olaylari(son_id, limit=500):
+    """Verilen id'den sonraki değişiklik olaylarını sırayla getir"""
+    db = get_db_connection()
+    return db.execute('''
+        SELECT id, kaynak, islem, kayit_id, urun_kodu, renk, konum, olay_tarihi
+        FROM degisiklik_olaylari
+        WHERE id > ?
+        ORDER BY id
+        LIMIT ?
+    ''', (son_id, limit)).fetchall()
+
+def temizle_eski_olaylar(saklama_gun=7):
+    """Saklama süresini aşan değişiklik olaylarını sil"""
+    db = get_db_connection()
+    try:
+        result = db.execute(
+            "DELETE FROM degisiklik_olaylari WHERE olay_tarihi < datetime('now', ?)",
+            (f'-{int(saklama_gun)} days',)
+        )
+        db.commit()
+        return result.rowcount
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Eski olayları temizleme hatası: {str(e)}")
+        return 0
+
+def temizle_eski_toplu_islem_anahtarlari(saklama_gun=30):
+    """Saklama süresini aşan toplu işlem idempotency anahtarlarını sil"""
+    db = get_db_connection()
+    try:
+        result = db.execute(
+            "DELETE FROM toplu_islem_anahtarlari WHERE olusturma_tarihi < datetime('now', ?)",
+            (f'-{int(saklama_gun)} days',)
+        )
+        db.commit()
+        return result.rowcount
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Eski idempotency anahtarlarını temizleme hatası: {str(e)}")
+        return 0
 
 def get_stok_by_urun_kodu(urun_kodu):
     """Ürün koduna göre stok bilgisi getir"""
@@ -343,6 +783,52 @@ def get_stok_by_urun_kodu_konum(urun_kodu, konum, renk=None):
             (urun_kodu, konum)
         ).fetchone()
 
+def get_stoklar_toplu(anahtarlar):
+    """Birden çok (urun_kodu, renk, konum) için stok kayıtlarını tek sorguda getir
+
+    UNIQUE(urun_kodu, renk, konum) indeksi üzerinden nokta aramaları yapılır.
+    Renk boşsa hem NULL hem '' renkli kayıtlar aday olur ve /api/check-stock ile
+    aynı şekilde adedi en yüksek olan seçilir.
+    Dönüş: anahtarlarla aynı sırada stok satırı (sqlite3.Row) veya None listesi
+    """
+    # (urun_kodu, renk, konum) -> anahtar listesindeki sıraları (aynı anahtar birden çok kez istenebilir)
+    siralar = {}
+    for sira, (urun_kodu, renk, konum) in enumerate(anahtarlar):
+        siralar.setdefault((urun_kodu, (renk or '').strip(), konum), []).append(sira)
+    # Boş renk için NULL ve '' ayrı ayrı aranır
+    aramalar = []
+    for urun_kodu, renk, konum in siralar:
+        aramalar.append((urun_kodu, renk, konum))
+        if not renk:
+            aramalar.append((urun_kodu, None, konum))
+
+    sonuclar = [None] * len(anahtarlar)
+    if not aramalar:
+        return sonuclar
+
+    db = get_db_connection()
+    # Her satır 3 parametre kullanır
+    parca_boyutu = TOPLU_SORGU_PARCA_BOYUTU // 3
+    for i in range(0, len(aramalar), parca_boyutu):
+        parca = aramalar[i:i + parca_boyutu]
+        values_clause = ', '.join(['(?, ?, ?)'] * len(parca))
+        params = [deger for arama in parca for deger in arama]
+
+        # Sadece stok kolonları seçilir - satır tekli /api/check-stock yanıtıyla aynı şekilde kalır
+        rows = db.execute(f'''
+            WITH anahtar(urun_kodu, renk, konum) AS (VALUES {values_clause})
+            SELECT s.*
+            FROM anahtar a
+            JOIN stoklar s ON s.urun_kodu = a.urun_kodu AND s.renk IS a.renk AND s.konum = a.konum
+        ''', params).fetchall()
+
+        for row in rows:
+            for sira in siralar[(row['urun_kodu'], row['renk'] or '', row['konum'])]:
+                mevcut = sonuclar[sira]
+                if mevcut is None or (row['adet'] or 0) > (mevcut['adet'] or 0):
+                    sonuclar[sira] = row
+    return sonuclar
+
 def get_all_locations_for_product(urun_kodu, renk=None):
     """Bir ürünün tüm konumlardaki stok bilgilerini getir"""
     db = get_db_connection()
@@ -361,6 +847,39 @@ def get_all_locations_for_product(urun_kodu, renk=None):
             (urun_kodu,)
         ).fetchall()
 
+def get_urun_konumlari_toplu(urun_anahtarlari):
+    """Birden çok (urun_kodu, renk) için tüm konum kayıtlarını tek sorguda getir
+
+    get_all_locations_for_product ile aynı kural: renk boşsa ürünün tüm renkleri döner.
+    Dönüş: anahtarlarla aynı sırada konum satırları listesi (konum, renk sıralı)
+    """
+    anahtarlar = [(urun_kodu, (renk or '').strip()) for urun_kodu, renk in urun_anahtarlari]
+    sonuclar = [[] for _ in anahtarlar]
+    if not anahtarlar:
+        return sonuclar
+
+    db = get_db_connection()
+    # Her satır 3 parametre kullanır
+    parca_boyutu = TOPLU_SORGU_PARCA_BOYUTU // 3
+    for i in range(0, len(anahtarlar), parca_boyutu):
+        parca = anahtarlar[i:i + parca_boyutu]
+        values_clause = ', '.join(['(?, ?, ?)'] * len(parca))
+        params = [deger for sira, anahtar in enumerate(parca, start=i) for deger in (sira,) + anahtar]
+
+        rows = db.execute(f'''
+            WITH anahtar(sira, urun_kodu, renk) AS (VALUES {values_clause})
+            SELECT a.sira, s.urun_kodu, s.urun_adi, s.renk, s.sistem_seri, s.konum,
+                   s.adet, s.toplam_kg, s.uzunluk, s.mt_kg
+            FROM anahtar a
+            JOIN stoklar s ON s.urun_kodu = a.urun_kodu AND (a.renk = '' OR s.renk = a.renk)
+            WHERE s.adet > 0
+            ORDER BY a.sira, s.konum, s.renk
+        ''', params).fetchall()
+
+        for row in rows:
+            sonuclar[row['sira']].append(row)
+    return sonuclar
+
 def stok_giris(urun_kodu, urun_adi, renk, konum, adet, mt_kg=None, uzunluk=None, 
               sistem_seri=None, kullanici=None, islem_tarihi=None):
     """Stok giriş işlemi - mevcut stokla birleştirir veya yeni kayıt oluşturur"""
@@ -429,11 +948,11 @@ def stok_giris(urun_kodu, urun_adi, renk, konum, adet, mt_kg=None, uzunluk=None,
                 islem_tarihi=islem_tarihi
             )
         
-        db.commit()
+        _commit(db)
         return {'success': True, 'message': 'Stok girişi başarılı'}
         
     except Exception as e:
-        db.rollback()
+        _rollback(db)
         return {'success': False, 'message': f'Stok giriş hatası: {str(e)}'}
 
 def stok_cikis(urun_kodu, renk, konum, adet, kullanici=None, aciklama=None, islem_tarihi=None):
@@ -482,11 +1001,11 @@ def stok_cikis(urun_kodu, renk, konum, adet, kullanici=None, aciklama=None, isle
             islem_tarihi=islem_tarihi
         )
         
-        db.commit()
+        _commit(db)
         return {'success': True, 'message': 'Stok çıkışı başarılı'}
         
     except Exception as e:
-        db.rollback()
+        _rollback(db)
         return {'success': False, 'message': f'Stok çıkış hatası: {str(e)}'}
 
 def stok_transfer(urun_kodu, renk, kaynak_konum, hedef_konum, adet, kullanici=None, islem_tarihi=None):
@@ -578,11 +1097,11 @@ def stok_transfer(urun_kodu, renk, kaynak_konum, hedef_konum, adet, kullanici=No
             islem_tarihi=islem_tarihi
         )
         
-        db.commit()
+        _commit(db)
         return {'success': True, 'message': 'Stok transferi başarılı'}
         
     except Exception as e:
-        db.rollback()
+        _rollback(db)
         return {'success': False, 'message': f'Stok transfer hatası: {str(e)}'}
 
 def get_product_stock_summary(urun_kodu=None, renk=None):
@@ -621,6 +1140,7 @@ def get_product_stock_summary(urun_kodu=None, renk=None):
 
 def init_app(app):
     """Flask uygulamasına veritabanı fonksiyonlarını kaydet"""
+    _havuz.max_idle = app.config.get('DB_POOL_SIZE', _havuz.max_idle)
     app.teardown_appcontext(close_db)
 
 # ==== REZERVASYON İŞLEVLERİ ====
@@ -822,7 +1342,7 @@ def get_urun_rezervasyon_durumu(urun_kodu, renk=None, konum=None):
     
     where_clause = ' AND '.join(where_conditions)
     
-    results = db.execute(f'''
+    rows = db.execute(f'''
         SELECT 
             s.urun_kodu,
             s.urun_adi,
@@ -840,67 +1360,91 @@ def get_urun_rezervasyon_durumu(urun_kodu, renk=None, konum=None):
         ORDER BY s.konum
     ''', params).fetchall()
     
-    # Rezervasyon notunu sonuçlara ekle
+    # Rezervasyon notunu sonuçlara ekle (sqlite3.Row salt okunur olduğu için dict'e çevrilir)
+    results = [dict(row) for row in rows]
     for result in results:
         result['rezervasyon_notu'] = rezervasyon_notu
     
     return results
 
 
+def migrate_legacy_users(db_path, eski_yol=VARSAYILAN_DB_YOLU):
+    """Kullanıcıları eski varsayılan veritabanından yapılandırılmış veritabanına taşı
+
+    DatabaseManager eskiden DATABASE_PATH yerine her zaman stok_takip_dev.db'yi kullanıyordu; üretimde
+    kullanıcılar bu dosyada kaldı. Hedefte kullanıcı tablosu yoksa tablo ve kayıtlar bir kez kopyalanır.
+    """
+    if not db_path or not os.path.exists(eski_yol) or os.path.abspath(db_path) == os.path.abspath(eski_yol):
+        return 0
+    conn = _havuz.acquire(db_path)
+    try:
+        conn.execute('ATTACH DATABASE ? AS eski', (eski_yol,))
+        try:
+            # Aynı anda açılan worker'lardan yalnızca biri taşır
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                hedefte_var = conn.execute(
+                    "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'kullanicilar'").fetchone()
+                tablo = conn.execute(
+                    "SELECT sql FROM eski.sqlite_master WHERE type = 'table' AND name = 'kullanicilar'").fetchone()
+                if hedefte_var or not tablo:
+                    conn.rollback()
+                    return 0
+                conn.execute(tablo['sql'])
+                conn.execute('INSERT INTO main.kullanicilar SELECT * FROM eski.kullanicilar')
+                tasinan = conn.execute('SELECT COUNT(*) FROM main.kullanicilar').fetchone()[0]
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        finally:
+            conn.execute('DETACH DATABASE eski')
+        logger.warning(f"{tasinan} kullanıcı {eski_yol} dosyasından {db_path} veritabanına taşındı")
+        return tasinan
+    finally:
+        _havuz.release(db_path, conn)
+
 class DatabaseManager:
-    """Veritabanı yönetim sınıfı - auth modülü için"""
+    """Veritabanı yönetim sınıfı - auth modülü için
+
+    Her işlem havuzdan kendi bağlantısını alır; tek bir paylaşılan bağlantıda eşzamanlı thread'lerin
+    commit / rollback'leri birbirini etkilerdi.
+    """
     
     def __init__(self, db_path=None):
-        self.db_path = db_path or 'stok_takip_dev.db'
-        self._connection = None
-    
-    def get_connection(self):
-        """Veritabanı bağlantısı al"""
-        if not self._connection:
-            self._connection = sqlite3.connect(
-                self.db_path,
-                check_same_thread=False,
-                timeout=20.0
-            )
-            self._connection.row_factory = sqlite3.Row
-            self._connection.execute('PRAGMA journal_mode=WAL')
-            self._connection.execute('PRAGMA foreign_keys=ON')
-            self._connection.commit()
-        return self._connection
+        self.db_path = db_path or _varsayilan_db_yolu()
+    
+    @contextmanager
+    def connection(self):
+        """Havuzdan bağlantı al, iş bitince iade et"""
+        conn = _havuz.acquire(self.db_path)
+        try:
+            yield conn
+        finally:
+            _havuz.release(self.db_path, conn)
     
     def execute_query(self, query, params=None):
         """SQL sorgusu çalıştır"""
-        conn = self.get_connection()
-        try:
-            if params:
-                conn.execute(query, params)
-            else:
-                conn.execute(query)
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
+        with self.connection() as conn:
+            try:
+                conn.execute(query, params or ())
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
     
     def fetch_one(self, query, params=None):
         """Tek satır getir"""
-        conn = self.get_connection()
-        if params:
-            result = conn.execute(query, params).fetchone()
-        else:
-            result = conn.execute(query).fetchone()
+        with self.connection() as conn:
+            result = conn.execute(query, params or ()).fetchone()
         return dict(result) if result else None
     
     def fetch_all(self, query, params=None):
         """Tüm satırları getir"""
-        conn = self.get_connection()
-        if params:
-            results = conn.execute(query, params).fetchall()
-        else:
-            results = conn.execute(query).fetchall()
+        with self.connection() as conn:
+            results = conn.execute(query, params or ()).fetchall()
         return [dict(row) for row in results]
     
     def close(self):
-        """Bağlantıyı kapat"""
-        if self._connection:
-            self._connection.close()
-            self._connection = None
\ No newline at end of file
+        """Havuzdaki boştaki bağlantıları kapat"""
+        _havuz.close_all(self.db_path)
@@ -46,9 +46,9 @@ def process_st_xlsx_data(file_path: str = 'st.xlsx', sheet_name: str = '8', cell
         logger.info(f"Veri başarıyla okundu: {len(data)} satır, {len(data.columns)} sütun")
         
         # İlk birkaç satırı kontrol et (header'ı bul)
-        logger.info("İlk 10 satır:")
-        for i in range(min(10, len(data))):
-            logger.info(f"Satır {i}: {data.iloc[i].tolist()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for i in range(min(10, len(data))):
+                logger.debug("Satır %d: %s", i, data.iloc[i].tolist())
         
         return {
             'success': True,
@@ -121,7 +121,7 @@ class ExcelProcessor:
     """Excel dosyalarını işlemek için sınıf"""
     
     # Sütun eşleme - Excel sütunları -> veritabanı alanları
-    # Veriler sütun 25-35 arasında (Y:AI)
+    # Veriler sütun 25-35 arasında (Y:AI); sayfa 3'te aynı sıra CR:DB'dedir (read_excel_file)
     COLUMN_MAPPING = {
         25: 'urun_kodu',      # MAĞAZA PRES STOK
         26: 'tedarikci',      # TEDARİKÇİ  
@@ -141,19 +141,20 @@ class ExcelProcessor:
         self.errors = []
         self.processed_count = 0
         
-    def read_excel_file(self, file_path: str, sheet_name: str = '3') -> bool:
-        """Excel dosyasını oku - Gerçek veri sütunlarından"""
+    def read_excel_file(self, file_path: str, sheet_name: str = '3', engine: Optional[str] = None) -> bool:
+        """Excel dosyasını oku - Gerçek veri sütunlarından (engine: pandas okuyucusu, None = varsayılan)"""
         try:
             # Tüm veriyi oku
             full_data = pd.read_excel(
                 file_path,
                 sheet_name=sheet_name,
-                header=None  # Header yok, ham veri
+                header=None,  # Header yok, ham veri
+                engine=engine
             )
             
-            # Gerçek veri sütunları: 95, 96, 97, 98, 99, 100, 101, 102, 103, 104, 93
-            # Bu sütunlar bizim mapping'imize karşılık geliyor
-            data_columns = [95, 96, 97, 98, 99, 100, 101, 102, 103, 104, 93]
+            # Sayfa 3'te veri CR7:DB1000 aralığındadır (config EXCEL_RANGE_START/END): 95-105 sütunları
+            # COLUMN_MAPPING ile aynı sıradadır (Y:AI düzeninin CR:DB'ye kaymış hali)
+            data_columns = list(range(95, 95 + len(self.COLUMN_MAPPING)))
             
             if len(full_data.columns) < max(data_columns) + 1:
                 raise ValueError(f"Excel dosyasında yeterli sütun yok. Bulunan: {len(full_data.columns)}, Gerekli: {max(data_columns) + 1}")
@@ -161,10 +162,9 @@ class ExcelProcessor:
             # İlgili sütunları seç ve satır 6'dan sonrasını al
             selected_data = full_data.iloc[6:, data_columns].copy()  # 6. satırdan sonra
             
-            # Sütun isimlerini ata (mapping'e göre)
-            column_names = ['urun_kodu', 'urun_adi', 'sistem_seri', 'renk', 'uzunluk', 
-                          'mt_kg', 'boy_kg', 'adet', 'toplam_kg', 'konum']
-            selected_data.columns = column_names
+            # Sütun isimlerini ata (mapping'e göre); tedarikçi veritabanında tutulmuyor
+            selected_data.columns = list(self.COLUMN_MAPPING.values())
+            selected_data = selected_data.drop(columns=['tedarikci'])
             
             # Index'i sıfırla
             selected_data.reset_index(drop=True, inplace=True)
@@ -261,12 +261,13 @@ class ExcelProcessor:
         
         return stats
     
-    def process_excel_file(self, file_path: str, sheet_name: str = '3') -> Tuple[Optional[pd.DataFrame], List[str], Dict]:
+    def process_excel_file(self, file_path: str, sheet_name: str = '3',
+                           engine: Optional[str] = None) -> Tuple[Optional[pd.DataFrame], List[str], Dict]:
         """Excel dosyasını tam olarak işle"""
         self.errors = []
         
         # 1. Excel dosyasını oku
-        if not self.read_excel_file(file_path, sheet_name):
+        if not self.read_excel_file(file_path, sheet_name, engine):
             return None, self.errors, {}
         
         # 2. Veri validasyonu yap
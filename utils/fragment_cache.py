@@ -0,0 +1,116 @@
+"""
+Jinja şablon parçası (fragment) önbelleği
+Büyük tablolarda her satırın render edilmiş HTML'ini verisinin sürümüne göre saklar
+
+Kullanım:
+    {% cache 'stock_report_row', user_is_admin, product %}
+        ... satır HTML'i ...
+    {% endcache %}
+
+Anahtar, verilen ifadelerin değerlerinden üretilir; satır verisi değiştiğinde
+anahtar da değişir, böylece sadece değişen ürünün parçası yeniden render edilir.
+"""
+
+from collections import OrderedDict
+import hashlib
+import threading
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+class FragmentCache:
+    """Thread-safe LRU fragment önbelleği"""
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(parts):
+        """Anahtar parçalarından sabit uzunlukta anahtar üret"""
+        return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss metrikleri"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0
+            }
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache ... %}{% endcache %} etiketi"""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=FragmentCache())
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key_parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            key_parts.append(parser.parse_expression())
+
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        call = self.call_method('_render_cached', [nodes.List(key_parts)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_cached(self, key_parts, caller):
+        cache = self.environment.fragment_cache
+        key = cache.make_key(key_parts)
+
+        html = cache.get(key)
+        if html is None:
+            html = Markup(caller())
+            cache.set(key, html)
+        return html
+
+
+def init_fragment_cache(app):
+    """Fragment önbelleğini Flask uygulamasının Jinja ortamına ekle"""
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.fragment_cache.max_entries = app.config.get('FRAGMENT_CACHE_SIZE', 5000)
+
+
+def get_fragment_cache_stats(app):
+    """Uygulamanın fragment önbelleği istatistikleri"""
+    cache = getattr(app.jinja_env, 'fragment_cache', None)
+    return cache.stats() if cache else {}
@@ -0,0 +1,86 @@
+"""
+HTTP koşullu GET desteği (ETag)
+Rapor ve okuma API'leri veri sürümü değişmediyse sorgu çalıştırmadan 304 döner
+
+Last-Modified kullanılmaz: veri sürümünün zamanı saniye hassasiyetinde olduğundan aynı saniyedeki
+bir yazmadan sonra sadece If-Modified-Since gönderen istemci eski veriyle 304 alırdı.
+Doğrulama yalnızca sürüm sayacından üretilen ETag ile yapılır.
+"""
+
+from functools import wraps
+from flask import request, session, current_app, make_response
+import hashlib
+import os
+
+from .database import get_veri_surumu
+
+
+def _release_token(app):
+    """Dağıtım sürümü - şablonlar veya statik dosyalar değiştiğinde eski ETag'leri geçersiz kılar"""
+    for env_name in ('RELEASE_VERSION', 'RENDER_GIT_COMMIT', 'RAILWAY_GIT_COMMIT_SHA'):
+        if os.environ.get(env_name):
+            return os.environ[env_name]
+
+    digest = hashlib.sha1()
+    folders = [os.path.join(app.root_path, app.template_folder or 'templates'), app.static_folder]
+    for folder in folders:
+        if not folder:
+            continue
+        for root, _dirs, files in os.walk(folder):
+            for name in sorted(files):
+                stat = os.stat(os.path.join(root, name))
+                digest.update(f'{name}:{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def init_http_cache(app):
+    """Koşullu GET için uygulama ayarlarını hazırla"""
+    app.config.setdefault('ETAG_SALT', _release_token(app))
+
+
+def _build_etag(surum):
+    """Veri sürümü + istek + kullanıcı bazlı ETag oluştur"""
+    parts = [
+        current_app.config.get('ETAG_SALT', ''),
+        str(surum),
+        request.full_path,
+        str(session.get('user_id', '')),
+        session.get('user_role', ''),
+    ]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _not_modified(etag):
+    """İstemcinin elindeki kopya güncel mi kontrol et (If-Modified-Since tek başına yeterli sayılmaz)"""
+    return bool(request.if_none_match) and request.if_none_match.contains_weak(etag)
+
+
+def _apply_headers(response, etag):
+    response.set_etag(etag, weak=True)
+    # Tarayıcı her seferinde doğrulasın, paylaşılan önbellekler saklamasın
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+
+def conditional_get(f):
+    """Veri sürümüne bağlı ETag üreten decorator
+
+    If-None-Match eşleşirse view fonksiyonu hiç çalışmaz.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # Bekleyen flash mesajı varsa sayfanın gerçekten render edilmesi gerekir
+        if request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+            return f(*args, **kwargs)
+
+        etag = _build_etag(get_veri_surumu())
+
+        if _not_modified(etag):
+            return _apply_headers(make_response('', 304), etag)
+
+        response = make_response(f(*args, **kwargs))
+        if response.status_code == 200:
+            _apply_headers(response, etag)
+        return response
+    return decorated_function
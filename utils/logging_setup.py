@@ -0,0 +1,278 @@
+"""
+Uygulama logları - istek thread'inden ayrılmış (kuyruk + arka plan yazıcı), JSON veya metin çıktısı
+- Log kaydı istek thread'inde sadece kuyruğa konur; biçimlendirme ve stderr'e yazma arka plandaki
+  QueueListener thread'inde yapılır. Kuyruk doluysa kayıt beklemeden atılır ve sayılır
+- Biçimlendirme tembeldir: logger.debug("... %s", deger) çağrısında mesaj yazıcı thread'inde oluşturulur.
+  Argümanlar basit tipler (str, int, float, ...) değilse istek sırasında değişebilecekleri için mesaj kuyruğa
+  konmadan önce oluşturulur
+- LOG_SAMPLING ile logger bazında örnekleme (ör. "utils.database=0.1" - kayıtların %10'u),
+  LOG_RATE_LIMITS ile saniye başına üst sınır (ör. "routes.reservation=20"). Kurallar logger adı ve alt
+  logger'ları için geçerlidir; ERROR ve üstü kayıtlar hiçbir zaman atılmaz. Sınır yüzünden atılan kayıt sayısı
+  o logger'ın bir sonraki kaydına "suppressed" olarak eklenir
+- JSON satırında istek içindeyken endpoint, method ve path de bulunur
+- gunicorn fork'undan sonra çocuk süreç kendi kuyruğu ve yazıcı thread'iyle başlar; süreç kapanırken
+  kuyrukta kalan kayıtlar yazılır
+- Kayıt başına maliyetin bir kısmı (~%20, kayıt başına ~1 µs) logging'in çağıran dosya / satırı bulmak
+  için stack'i yürümesidir. LOG_SKIP_CALLER_INFO=1 bunu kapatır; ancak süreçteki tüm logger'larda
+  (üçüncü parti dahil) %(pathname)s / %(lineno)d / %(funcName)s bilgisini boşaltır, bu yüzden
+  varsayılan olarak kapalıdır
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+# Kuyruğa konmadan önce mesajı oluşturmayı gerektirmeyen argüman tipleri
+_BASIT_TIPLER = (str, int, float, bool, type(None), bytes)
+# Örnekleme ve hız sınırı bu seviyenin altındaki kayıtlara uygulanır
+KORUNAN_SEVIYE = logging.ERROR
+METIN_FORMATI = '%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s'
+
+# logging'in çağıran bilgisini bulmak için kullandığı modül değişkeni (LOG_SKIP_CALLER_INFO kapatılınca geri konur)
+_ORIJINAL_SRCFILE = logging._srcfile
+
+_lock = threading.Lock()
+_ayarlar = {'handler': None, 'listener': None, 'queue_size': 10000}
+# Sayaçlar süreç başınadır (fork sonrası sıfırlanır)
+_sayaclar = {'enqueued': 0, 'dropped_queue_full': 0, 'sampled_out': 0, 'rate_limited': 0}
+
+
+def _say(anahtar):
+    with _lock:
+        _sayaclar[anahtar] += 1
+
+
+def parse_logger_rules(deger, tip=float):
+    """'utils.database=0.1,routes=5' -> {'utils.database': 0.1, 'routes': 5.0}"""
+    kurallar = {}
+    for parca in (deger or '').split(','):
+        if not parca.strip():
+            continue
+        try:
+            ad, sayi = parca.split('=', 1)
+            kurallar[ad.strip()] = tip(sayi)
+        except ValueError:
+            logger.warning("Geçersiz log kuralı yok sayıldı: %s", parca.strip())
+    return kurallar
+
+
+def _kural_bul(kurallar, ad):
+    """Logger adına en uzun eşleşen kural (root için boş ad veya 'root')"""
+    while True:
+        if ad in kurallar:
+            return ad
+        if '.' not in ad:
+            return 'root' if 'root' in kurallar else None
+        ad = ad.rsplit('.', 1)[0]
+
+
+class SamplingFilter(logging.Filter):
+    """Logger bazında örnekleme ve saniye başına sınır (token bucket)"""
+
+    def __init__(self, sampling=None, rate_limits=None):
+        super().__init__()
+        self.sampling = dict(sampling or {})
+        self.rate_limits = dict(rate_limits or {})
+        self._cozulmus = {}
+        # kural -> [jeton, son güncelleme, atılan]
+        self._kovalar = {}
+        # kural -> örnekleme sayacı (rastgele yerine deterministik: her 1/oran kayıttan biri)
+        self._ornek_sayaci = {}
+        self._lock = threading.Lock()
+
+    def _kurallar(self, ad):
+        kural = self._cozulmus.get(ad)
+        if kural is None:
+            kural = (_kural_bul(self.sampling, ad), _kural_bul(self.rate_limits, ad))
+            self._cozulmus[ad] = kural
+        return kural
+
+    def filter(self, record):
+        if record.levelno >= KORUNAN_SEVIYE or not (self.sampling or self.rate_limits):
+            return True
+        ornek_kurali, sinir_kurali = self._kurallar(record.name)
+        with self._lock:
+            if ornek_kurali is not None:
+                oran = self.sampling[ornek_kurali]
+                sayac = self._ornek_sayaci.get(ornek_kurali, 0.0) + oran
+                if sayac < 1.0:
+                    self._ornek_sayaci[ornek_kurali] = sayac
+                    _say('sampled_out')
+                    return False
+                self._ornek_sayaci[ornek_kurali] = sayac - 1.0
+            if sinir_kurali is not None:
+                sinir = self.rate_limits[sinir_kurali]
+                simdi = time.monotonic()
+                kova = self._kovalar.setdefault(sinir_kurali, [sinir, simdi, 0])
+                kova[0] = min(sinir, kova[0] + (simdi - kova[1]) * sinir)
+                kova[1] = simdi
+                if kova[0] < 1.0:
+                    kova[2] += 1
+                    _say('rate_limited')
+                    return False
+                kova[0] -= 1.0
+                if kova[2]:
+                    record.suppressed = kova[2]
+                    kova[2] = 0
+        return True
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """Kaydı (gerekirse) istek bilgisiyle kuyruğa koyar; kuyruk doluysa beklemeden atar"""
+
+    def prepare(self, record):
+        if record.args and not all(isinstance(a, _BASIT_TIPLER) for a in
+                                   (record.args.values() if isinstance(record.args, dict) else record.args)):
+            record.msg = record.getMessage()
+            record.args = None
+        if has_request_context():
+            record.endpoint = request.endpoint
+            record.method = request.method
+            record.path = request.path
+        return record
+
+    def enqueue(self, record):
+        # SimpleQueue kilitsiz ve C'de; sınır qsize ile kontrol edilir (eşzamanlı isteklerde birkaç kayıt aşabilir)
+        if self.queue.qsize() >= _ayarlar['queue_size']:
+            _say('dropped_queue_full')
+            return
+        self.queue.put(record)
+        _say('enqueued')
+
+
+class JsonFormatter(logging.Formatter):
+    """Tek satır JSON - ts, level, logger, msg, pid, thread ve varsa istek / hata bilgisi"""
+
+    def format(self, record):
+        veri = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+            'thread': record.threadName,
+        }
+        for alan in ('endpoint', 'method', 'path', 'suppressed'):
+            deger = getattr(record, alan, None)
+            if deger is not None:
+                veri[alan] = deger
+        if record.exc_info:
+            veri['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            veri['exc'] = record.exc_text
+        if record.stack_info:
+            veri['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(veri, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        metin = super().format(record)
+        suppressed = getattr(record, 'suppressed', None)
+        return f'{metin} (+{suppressed} kayıt sınırdan dolayı atlandı)' if suppressed else metin
+
+
+def _yazici_baslat(handler, hedef):
+    handler.queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(handler.queue, hedef, respect_handler_level=True)
+    listener.start()
+    _ayarlar['listener'] = listener
+
+
+def _fork_sonrasi():
+    # Yazıcı thread'i fork'ta çocuğa geçmez, eski kuyruğun kilidi de kilitli kalmış olabilir
+    handler = _ayarlar['handler']
+    listener = _ayarlar['listener']
+    if handler is None or listener is None:
+        return
+    _yazici_baslat(handler, listener.handlers[0])
+    with _lock:
+        for anahtar in _sayaclar:
+            _sayaclar[anahtar] = 0
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_fork_sonrasi)
+
+
+def shutdown_logging():
+    """Yazıcı thread'ini durdur (kuyrukta kalan kayıtlar yazılır)"""
+    listener = _ayarlar['listener']
+    _ayarlar['listener'] = None
+    if listener is not None and listener._thread is not None:
+        listener.stop()
+
+
+atexit.register(shutdown_logging)
+
+
+def configure_logging(level='INFO', fmt='text', sampling=None, rate_limits=None, queue_size=10000, async_=True,
+                      stream=None, skip_caller_info=False):
+    """Root logger'ı yapılandır; tekrar çağrılırsa önceki handler ve yazıcı kaldırılır"""
+    root = logging.getLogger()
+    shutdown_logging()
+    if _ayarlar['handler'] is not None:
+        root.removeHandler(_ayarlar['handler'])
+        _ayarlar['handler'] = None
+
+    hedef = logging.StreamHandler(stream or sys.stderr)
+    hedef.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter(METIN_FORMATI))
+    filtre = SamplingFilter(sampling, rate_limits)
+    if async_:
+        _ayarlar['queue_size'] = queue_size
+        handler = AsyncQueueHandler(None)
+        handler.addFilter(filtre)
+        _yazici_baslat(handler, hedef)
+    else:
+        handler = hedef
+        handler.addFilter(filtre)
+    root.addHandler(handler)
+    root.setLevel(level)
+    # İsteğe bağlı: çağıran frame aranmaz (tüm süreçteki logger'lar için dosya / satır / fonksiyon bilgisi boş kalır)
+    logging._srcfile = None if skip_caller_info else _ORIJINAL_SRCFILE
+    _ayarlar['handler'] = handler
+
+
+def get_logging_stats():
+    """Bu sürecin log sayaçları ve kuyruk doluluğu"""
+    with _lock:
+        stats = dict(_sayaclar)
+    handler = _ayarlar['handler']
+    stats['queue_depth'] = handler.queue.qsize() if isinstance(handler, AsyncQueueHandler) else 0
+    stats['queue_size'] = _ayarlar['queue_size']
+    return stats
+
+
+def render_logging_prometheus(stats):
+    """Log sayaçları (Prometheus metin formatı) - yanıtı veren worker'ın değerleri"""
+    lines = ['# HELP stok_log_records_total Kuyruğa konan log kaydı', '# TYPE stok_log_records_total counter',
+             f"stok_log_records_total {stats['enqueued']}",
+             '# HELP stok_log_dropped_total Yazılmadan atılan log kaydı', '# TYPE stok_log_dropped_total counter']
+    for neden in ('queue_full', 'sampled_out', 'rate_limited'):
+        anahtar = 'dropped_queue_full' if neden == 'queue_full' else neden
+        lines.append(f'stok_log_dropped_total{{reason="{neden}"}} {stats[anahtar]}')
+    lines += ['# HELP stok_log_queue_depth Yazılmayı bekleyen log kaydı', '# TYPE stok_log_queue_depth gauge',
+              f"stok_log_queue_depth {stats['queue_depth']}"]
+    return '\n'.join(lines) + '\n'
+
+
+def init_logging(app):
+    """LOG_LEVEL / LOG_FORMAT / LOG_SAMPLING / LOG_RATE_LIMITS / LOG_QUEUE_SIZE / LOG_ASYNC / LOG_SKIP_CALLER_INFO"""
+    configure_logging(level=str(app.config.get('LOG_LEVEL', 'INFO')).upper(),
+                      fmt=app.config.get('LOG_FORMAT', 'text'),
+                      sampling=parse_logger_rules(app.config.get('LOG_SAMPLING')),
+                      rate_limits=parse_logger_rules(app.config.get('LOG_RATE_LIMITS')),
+                      queue_size=int(app.config.get('LOG_QUEUE_SIZE', 10000)),
+                      async_=bool(app.config.get('LOG_ASYNC', True)),
+                      skip_caller_info=bool(app.config.get('LOG_SKIP_CALLER_INFO', False)))
@@ -0,0 +1,461 @@
+"""
+Bellek tanılama
+- İstek bazında bellek: her istekte RSS başlangıç/bitiş değeri ve sürecin en yüksek RSS'ini (high-water mark)
+  yükseltip yükseltmediği ölçülür; tracemalloc açıksa Python tahsislerinin istek içindeki tepe değeri kullanılır.
+  MEMORY_REQUEST_BUDGET_MB'ı aşan istekler loglanır ve admin sayfasında listelenir
+- tracemalloc isteğe bağlı açılır/kapanır; snapshot'lar MEMORY_SNAPSHOT_DIR'e yazılır, en çok bellek
+  ayıran satırlar ve iki snapshot arasındaki fark (sızıntı adayı) gösterilir
+- Nesne sayımı: canlı DataFrame, BytesIO ve sqlite3.Row listeleri gibi şüphelilerin sayısı ve boyutu
+
+Ölçüm RSS için istek başına iki /proc okuması ve bir getrusage çağrısıdır. tracemalloc ise tüm tahsisleri
+yavaşlattığı için sadece inceleme süresince açık tutulmalıdır. tracemalloc süreç geneli olduğundan
+aynı anda işlenen istekler (gthread) birbirinin tepe değerine karışır; bu istekler "eşzamanlı" işaretlenir.
+"""
+
+import gc
+import json
+import logging
+import os
+import re
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+from .metrics import ENVIRON_KEY as METRICS_ENVIRON_KEY
+
+logger = logging.getLogger(__name__)
+
+# Admin sayfasında tutulan bütçe aşımı kaydı
+FLAGGED_REQUEST_LIMIT = 100
+SNAPSHOT_LIMIT = 20
+_SNAPSHOT_ID_RE = re.compile(r'^[0-9]{8}-[0-9]{6}-[0-9]+-[0-9]+$')
+_GRUPLAMALAR = ('lineno', 'filename', 'traceback')
+
+_lock = threading.Lock()
+_endpoints = {}
+_asimlar = deque(maxlen=FLAGGED_REQUEST_LIMIT)
+_devam_eden = 0
+_snapshot_sayaci = 0
+_ayarlar = {'butce_mb': 100.0, 'dizin': 'memory_snapshots', 'frame': 10}
+_ru_maxrss_carpan = 1 if sys.platform == 'darwin' else 1024
+try:
+    _SAYFA_BOYUTU = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _SAYFA_BOYUTU = 4096
+
+
+def _mb(bayt):
+    return bayt / 1024 / 1024
+
+
+def rss_mb():
+    """Sürecin o anki RSS değeri (MB); /proc yoksa en yüksek RSS"""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return _mb(int(f.read().split()[1]) * _SAYFA_BOYUTU)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """Sürecin ömrü boyunca ulaştığı en yüksek RSS (MB)"""
+    return _mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _ru_maxrss_carpan)
+
+
+def process_memory(pid='self'):
+    """/proc/<pid>/smaps_rollup'tan RSS, PSS, paylaşılan ve özel bellek (MB); yoksa None
+
+    Fork edilen worker'larda paylaşılan (shared) kısım copy-on-write ile master'dan devralınan sayfalardır;
+    PSS paylaşılan sayfaları paylaşan süreç sayısına böler, worker'ların PSS toplamı gerçek bellek kullanımıdır.
+    """
+    alanlar = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for satir in f:
+                parcalar = satir.split()
+                if len(parcalar) == 3 and parcalar[2] == 'kB':
+                    alanlar[parcalar[0].rstrip(':')] = int(parcalar[1])
+    except (OSError, ValueError):
+        return None
+    if 'Rss' not in alanlar:
+        return None
+    return {
+        'rss_mb': round(alanlar['Rss'] / 1024, 1),
+        'pss_mb': round(alanlar.get('Pss', 0) / 1024, 1),
+        'shared_mb': round((alanlar.get('Shared_Clean', 0) + alanlar.get('Shared_Dirty', 0)) / 1024, 1),
+        'private_mb': round((alanlar.get('Private_Clean', 0) + alanlar.get('Private_Dirty', 0)) / 1024, 1),
+    }
+
+
+class _Olcum:
+    __slots__ = ('rss', 'tepe_rss', 'tracemalloc', 'eszamanli')
+
+    def __init__(self, eszamanli):
+        self.rss = rss_mb()
+        self.tepe_rss = peak_rss_mb()
+        self.eszamanli = eszamanli
+        self.tracemalloc = None
+        if tracemalloc.is_tracing():
+            if not eszamanli:
+                tracemalloc.reset_peak()
+            self.tracemalloc = tracemalloc.get_traced_memory()[0]
+
+
+def _basla():
+    global _devam_eden
+    with _lock:
+        _devam_eden += 1
+        eszamanli = _devam_eden > 1
+    return _Olcum(eszamanli)
+
+
+def _bitir(olcum, environ, status):
+    global _devam_eden
+    rss = rss_mb()
+    tepe_rss = peak_rss_mb()
+    # Süreç tepe değeri bu istekte yükseldiyse istek en az o seviyeye çıkmıştır
+    tepe = max(rss, tepe_rss if tepe_rss > olcum.tepe_rss else 0.0) - olcum.rss
+    kaynak = 'rss'
+    if olcum.tracemalloc is not None and tracemalloc.is_tracing():
+        tepe = _mb(tracemalloc.get_traced_memory()[1] - olcum.tracemalloc)
+        kaynak = 'tracemalloc'
+    stats = environ.get(METRICS_ENVIRON_KEY)
+    endpoint = (stats.endpoint if stats is not None else None) or '<unmatched>'
+    with _lock:
+        eszamanli = olcum.eszamanli or _devam_eden > 1
+        _devam_eden -= 1
+        entry = _endpoints.get(endpoint)
+        if entry is None:
+            entry = _endpoints[endpoint] = {'count': 0, 'peak_mb_sum': 0.0, 'peak_mb_max': 0.0,
+                                            'rss_growth_mb': 0.0, 'over_budget': 0}
+        entry['count'] += 1
+        entry['peak_mb_sum'] += max(tepe, 0.0)
+        entry['peak_mb_max'] = max(entry['peak_mb_max'], tepe)
+        entry['rss_growth_mb'] += rss - olcum.rss
+        butce_asildi = tepe > _ayarlar['butce_mb']
+        if butce_asildi:
+            entry['over_budget'] += 1
+            _asimlar.appendleft({
+                'zaman': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'endpoint': endpoint,
+                'method': environ.get('REQUEST_METHOD'),
+                'path': environ.get('PATH_INFO', ''),
+                'status': status,
+                'peak_mb': round(tepe, 1),
+                'rss_before_mb': round(olcum.rss, 1),
+                'rss_after_mb': round(rss, 1),
+                'source': kaynak,
+                'concurrent': eszamanli,
+            })
+    if butce_asildi:
+        logger.warning(f"Bellek bütçesi aşıldı: {endpoint} {environ.get('PATH_INFO', '')} "
+                       f"tepe {tepe:.1f} MB ({kaynak}), RSS {olcum.rss:.1f} -> {rss:.1f} MB")
+
+
+class _ResponseIterable:
+    """Akış yanıtları bitene kadar ölçümü açık tutar"""
+
+    def __init__(self, iterable, on_close):
+        self._iterable = iterable
+        self._on_close = on_close
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+    def close(self):
+        try:
+            if hasattr(self._iterable, 'close'):
+                self._iterable.close()
+        finally:
+            self._on_close()
+
+
+class MemoryTrackingMiddleware:
+    """Her isteğin bellek tepe değerini WSGI katmanında ölçen middleware"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        olcum = _basla()
+        status_holder = []
+
+        def _start_response(status, headers, exc_info=None):
+            status_holder[:] = [status.split(' ', 1)[0]]
+            return start_response(status, headers, exc_info)
+
+        try:
+            iterable = self.wsgi_app(environ, _start_response)
+        except Exception:
+            _bitir(olcum, environ, '500')
+            raise
+        return _ResponseIterable(iterable, lambda: _bitir(olcum, environ,
+                                                          status_holder[0] if status_holder else '500'))
+
+
+def init_memory_diagnostics(app):
+    """Bellek ölçüm middleware'ini kaydet - MEMORY_REQUEST_BUDGET_MB / MEMORY_SNAPSHOT_DIR / MEMORY_TRACE_FRAMES"""
+    app.config.setdefault('MEMORY_REQUEST_BUDGET_MB', 100)
+    app.config.setdefault('MEMORY_SNAPSHOT_DIR', 'memory_snapshots')
+    app.config.setdefault('MEMORY_TRACE_FRAMES', 10)
+    _ayarlar['butce_mb'] = float(app.config['MEMORY_REQUEST_BUDGET_MB'])
+    _ayarlar['dizin'] = app.config['MEMORY_SNAPSHOT_DIR']
+    _ayarlar['frame'] = int(app.config['MEMORY_TRACE_FRAMES'])
+    # Metrik middleware'inin dışında çalışır; endpoint adı onun ölçümünden okunur
+    app.wsgi_app = MemoryTrackingMiddleware(app.wsgi_app)
+
+
+def get_request_memory_stats():
+    """Endpoint bazında istek belleği ve son bütçe aşımları (bu worker)"""
+    with _lock:
+        endpoints = []
+        for endpoint, entry in _endpoints.items():
+            endpoints.append({
+                'endpoint': endpoint,
+                'count': entry['count'],
+                'avg_peak_mb': round(entry['peak_mb_sum'] / entry['count'], 2),
+                'max_peak_mb': round(entry['peak_mb_max'], 1),
+                'rss_growth_mb': round(entry['rss_growth_mb'], 1),
+                'over_budget': entry['over_budget'],
+            })
+        asimlar = list(_asimlar)
+    endpoints.sort(key=lambda e: e['max_peak_mb'], reverse=True)
+    return {'endpoints': endpoints, 'flagged': asimlar}
+
+
+def reset_request_memory_stats():
+    with _lock:
+        _endpoints.clear()
+        _asimlar.clear()
+
+
+def get_memory_status():
+    durum = {
+        'pid': os.getpid(),
+        'rss_mb': round(rss_mb(), 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'budget_mb': _ayarlar['butce_mb'],
+        'tracing': tracemalloc.is_tracing(),
+        'trace_frames': tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else _ayarlar['frame'],
+        'gc_counts': gc.get_count(),
+        'gc_frozen': gc.get_freeze_count(),
+        'smaps': process_memory(),
+    }
+    if durum['tracing']:
+        mevcut, tepe = tracemalloc.get_traced_memory()
+        durum['traced_mb'] = round(_mb(mevcut), 1)
+        durum['traced_peak_mb'] = round(_mb(tepe), 1)
+        durum['tracemalloc_overhead_mb'] = round(_mb(tracemalloc.get_tracemalloc_memory()), 1)
+    return durum
+
+
+def start_tracing(frame_sayisi=None):
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(frame_sayisi or _ayarlar['frame'])
+    logger.info(f"tracemalloc başlatıldı (pid {os.getpid()})")
+    return True
+
+
+def stop_tracing():
+    if not tracemalloc.is_tracing():
+        return False
+    tracemalloc.stop()
+    logger.info(f"tracemalloc durduruldu (pid {os.getpid()})")
+    return True
+
+
+def _snapshot_yolu(snapshot_id, uzanti):
+    if not _SNAPSHOT_ID_RE.match(snapshot_id or ''):
+        return None
+    return os.path.join(_ayarlar['dizin'], f'{snapshot_id}.{uzanti}')
+
+
+def take_snapshot(etiket=''):
+    """tracemalloc snapshot'ını diske yaz; tracemalloc kapalıysa None"""
+    global _snapshot_sayaci
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ))
+    with _lock:
+        _snapshot_sayaci += 1
+        sayac = _snapshot_sayaci
+    snapshot_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{sayac}"
+    os.makedirs(_ayarlar['dizin'], exist_ok=True)
+    snapshot.dump(_snapshot_yolu(snapshot_id, 'tmsnap'))
+    mevcut, tepe = tracemalloc.get_traced_memory()
+    ozet = {
+        'id': snapshot_id,
+        'label': etiket,
+        'zaman': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'pid': os.getpid(),
+        'rss_mb': round(rss_mb(), 1),
+        'traced_mb': round(_mb(mevcut), 1),
+        'traced_peak_mb': round(_mb(tepe), 1),
+        'frames': tracemalloc.get_traceback_limit(),
+    }
+    with open(_snapshot_yolu(snapshot_id, 'json'), 'w', encoding='utf-8') as f:
+        json.dump(ozet, f, ensure_ascii=False)
+    _eski_snapshotlari_sil()
+    logger.info(f"Bellek snapshot'ı alındı: {snapshot_id} ({ozet['traced_mb']} MB izlenen)")
+    return snapshot_id
+
+
+def _eski_snapshotlari_sil():
+    adlar = sorted(ad for ad in os.listdir(_ayarlar['dizin']) if ad.endswith('.json'))
+    for ad in adlar[:max(0, len(adlar) - SNAPSHOT_LIMIT)]:
+        delete_snapshot(ad[:-len('.json')])
+
+
+def list_snapshots():
+    """Diskteki snapshot özetleri (en yeni önce; tüm worker'lar)"""
+    try:
+        adlar = sorted((ad for ad in os.listdir(_ayarlar['dizin']) if ad.endswith('.json')), reverse=True)
+    except OSError:
+        return []
+    ozetler = []
+    for ad in adlar:
+        try:
+            with open(os.path.join(_ayarlar['dizin'], ad), encoding='utf-8') as f:
+                ozetler.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return ozetler
+
+
+def load_snapshot_info(snapshot_id):
+    yol = _snapshot_yolu(snapshot_id, 'json')
+    if yol is None or not os.path.exists(yol):
+        return None
+    with open(yol, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _yukle(snapshot_id):
+    yol = _snapshot_yolu(snapshot_id, 'tmsnap')
+    if yol is None or not os.path.exists(yol):
+        return None
+    return tracemalloc.Snapshot.load(yol)
+
+
+def _konum_metni(traceback):
+    return [f'{frame.filename}:{frame.lineno}' for frame in reversed(traceback)]
+
+
+def snapshot_top(snapshot_id, gruplama='lineno', limit=30):
+    """Snapshot'ta en çok bellek tutan tahsis yerleri"""
+    snapshot = _yukle(snapshot_id)
+    if snapshot is None:
+        return None
+    if gruplama not in _GRUPLAMALAR:
+        gruplama = 'lineno'
+    istatistikler = snapshot.statistics(gruplama)
+    toplam = sum(stat.size for stat in istatistikler)
+    return {
+        'total_mb': round(_mb(toplam), 2),
+        'rows': [{
+            'location': _konum_metni(stat.traceback),
+            'size_kb': round(stat.size / 1024, 1),
+            'count': stat.count,
+            'avg_b': stat.size // stat.count if stat.count else 0,
+        } for stat in istatistikler[:limit]],
+    }
+
+
+def diff_snapshots(eski_id, yeni_id, gruplama='lineno', limit=30):
+    """İki snapshot arasındaki fark - en çok büyüyen tahsis yerleri önce"""
+    eski, yeni = _yukle(eski_id), _yukle(yeni_id)
+    if eski is None or yeni is None:
+        return None
+    if gruplama not in _GRUPLAMALAR:
+        gruplama = 'lineno'
+    farklar = yeni.compare_to(eski, gruplama)
+    return {
+        'total_diff_mb': round(_mb(sum(stat.size_diff for stat in farklar)), 2),
+        'rows': [{
+            'location': _konum_metni(stat.traceback),
+            'size_kb': round(stat.size / 1024, 1),
+            'size_diff_kb': round(stat.size_diff / 1024, 1),
+            'count': stat.count,
+            'count_diff': stat.count_diff,
+        } for stat in farklar[:limit]],
+    }
+
+
+def delete_snapshot(snapshot_id):
+    for uzanti in ('json', 'tmsnap'):
+        yol = _snapshot_yolu(snapshot_id, uzanti)
+        if yol is None:
+            return
+        try:
+            os.remove(yol)
+        except OSError:
+            pass
+
+
+def clear_snapshots():
+    ozetler = list_snapshots()
+    for ozet in ozetler:
+        delete_snapshot(ozet['id'])
+    return len(ozetler)
+
+
+def _nesne_boyutu(nesne, tur_adi):
+    """Şüpheli nesnelerin gerçek boyutu (sys.getsizeof içeriği saymaz)"""
+    try:
+        if tur_adi in ('pandas.DataFrame', 'pandas.Series'):
+            return int(nesne.memory_usage(deep=False).sum()) if tur_adi == 'pandas.DataFrame' \
+                else int(nesne.memory_usage(deep=False))
+        if tur_adi == 'numpy.ndarray':
+            return int(nesne.nbytes)
+        if tur_adi == 'list' and nesne and type(nesne[0]).__name__ == 'Row':
+            return sys.getsizeof(nesne) + len(nesne) * sys.getsizeof(nesne[0])
+        return sys.getsizeof(nesne)
+    except Exception:
+        return 0
+
+
+def object_census(limit=25):
+    """Canlı nesnelerin tür bazında sayımı ve şüpheli nesnelerin boyutu
+
+    gc.get_objects() tüm heap'i dolaştığı için büyük süreçlerde yüzlerce ms sürebilir - sadece admin isteğiyle.
+    """
+    baslangic = time.perf_counter()
+    sayilar = {}
+    supheliler = {}
+    satir_listeleri = []
+    for nesne in gc.get_objects():
+        tur = type(nesne)
+        modul = str(tur.__module__).split('.', 1)[0]
+        tur_adi = f'{modul}.{tur.__name__}' if modul not in ('builtins', '__main__') else tur.__name__
+        sayilar[tur_adi] = sayilar.get(tur_adi, 0) + 1
+        if tur_adi in ('pandas.DataFrame', 'pandas.Series', 'numpy.ndarray', '_io.BytesIO'):
+            kayit = supheliler.setdefault(tur_adi, {'type': tur_adi, 'count': 0, 'size_kb': 0.0, 'largest_kb': 0.0})
+            boyut = _nesne_boyutu(nesne, tur_adi) / 1024
+            kayit['count'] += 1
+            kayit['size_kb'] += boyut
+            kayit['largest_kb'] = max(kayit['largest_kb'], boyut)
+        elif tur is list and len(nesne) >= 100 and type(nesne[0]).__name__ == 'Row':
+            satir_listeleri.append(_nesne_boyutu(nesne, 'list') / 1024)
+    if satir_listeleri:
+        supheliler['sqlite3.Row listesi'] = {'type': 'sqlite3.Row listesi (>=100 satır)',
+                                             'count': len(satir_listeleri), 'size_kb': sum(satir_listeleri),
+                                             'largest_kb': max(satir_listeleri)}
+    for kayit in supheliler.values():
+        kayit['size_kb'] = round(kayit['size_kb'], 1)
+        kayit['largest_kb'] = round(kayit['largest_kb'], 1)
+    return {
+        'duration_ms': round((time.perf_counter() - baslangic) * 1000, 1),
+        'suspects': sorted(supheliler.values(), key=lambda k: k['size_kb'], reverse=True),
+        'types': sorted(({'type': ad, 'count': sayi} for ad, sayi in sayilar.items()),
+                        key=lambda k: k['count'], reverse=True)[:limit],
+    }
@@ -0,0 +1,329 @@
+"""
+İstek metrikleri (Prometheus metin formatı)
+- Endpoint bazında gecikme histogramı, durum kodları, istek başına SQL sayısı,
+  veritabanı süresi, şablon render süresi ve yanıt boyutu
+- Ölçüm WSGI katmanında yapılır: akış (stream) yanıtları ve sıkıştırma sonrası boyut dahildir
+- Çok worker'lı gunicorn'da METRICS_DIR ayarlanırsa her worker kendi özetini dosyaya yazar,
+  /metrics çalışan worker'ların toplamını döner (kapanan worker'ların dosyaları silinir)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import request, before_render_template, template_rendered
+
+from .database import add_sql_listener
+from .runtime_dirs import pid_yasiyor
+
+logger = logging.getLogger(__name__)
+
+# Saniye cinsinden gecikme kovaları
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# İstek başına SQL sorgusu kovaları
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+ENVIRON_KEY = 'stok.metrics'
+
+_aktif = threading.local()
+_lock = threading.Lock()
+# endpoint -> toplanan değerler; status -> sayaç
+_endpoints = {}
+_son_yazma = 0.0
+
+
+class RequestStats:
+    """Tek isteğin ölçümleri - istek süresince thread'e bağlıdır"""
+
+    __slots__ = ('endpoint', 'method', 'sql_count', 'db_time', 'render_time', '_render_start', 'extra')
+
+    def __init__(self, method):
+        self.endpoint = None
+        self.method = method
+        self.sql_count = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self._render_start = None
+        # Diğer tanılama modülleri (profil, bellek) isteğe ait ek bilgi bırakabilir
+        self.extra = None
+
+
+def current_request_stats():
+    """Bu thread'de işlenen isteğin ölçümleri (istek dışında None)"""
+    return getattr(_aktif, 'stats', None)
+
+
+def _on_sql(sql, sure, fetch):
+    stats = getattr(_aktif, 'stats', None)
+    if stats is None:
+        return
+    stats.db_time += sure
+    if not fetch:
+        stats.sql_count += 1
+
+
+def _on_before_render(sender, template, context, **extra):
+    stats = getattr(_aktif, 'stats', None)
+    if stats is not None:
+        stats._render_start = time.perf_counter()
+
+
+def _on_template_rendered(sender, template, context, **extra):
+    stats = getattr(_aktif, 'stats', None)
+    if stats is not None and stats._render_start is not None:
+        stats.render_time += time.perf_counter() - stats._render_start
+        stats._render_start = None
+
+
+def _new_endpoint_entry():
+    return {
+        'statuses': {},
+        'latency_buckets': [0] * len(LATENCY_BUCKETS),
+        'latency_sum': 0.0,
+        'count': 0,
+        'sql_buckets': [0] * len(SQL_COUNT_BUCKETS),
+        'sql_sum': 0,
+        'db_seconds': 0.0,
+        'render_seconds': 0.0,
+        'response_bytes': 0,
+    }
+
+
+def _observe(buckets, limits, value):
+    for i, limit in enumerate(limits):
+        if value <= limit:
+            buckets[i] += 1
+            return
+
+
+def _record(stats, status, duration, response_bytes, metrics_dir):
+    global _son_yazma
+    endpoint = stats.endpoint or '<unmatched>'
+    with _lock:
+        entry = _endpoints.get(endpoint)
+        if entry is None:
+            entry = _endpoints[endpoint] = _new_endpoint_entry()
+        status_key = f'{stats.method} {status}'
+        entry['statuses'][status_key] = entry['statuses'].get(status_key, 0) + 1
+        _observe(entry['latency_buckets'], LATENCY_BUCKETS, duration)
+        entry['latency_sum'] += duration
+        entry['count'] += 1
+        _observe(entry['sql_buckets'], SQL_COUNT_BUCKETS, stats.sql_count)
+        entry['sql_sum'] += stats.sql_count
+        entry['db_seconds'] += stats.db_time
+        entry['render_seconds'] += stats.render_time
+        entry['response_bytes'] += response_bytes
+
+        yazilacak = metrics_dir and time.monotonic() - _son_yazma >= 5
+        if yazilacak:
+            _son_yazma = time.monotonic()
+            snapshot = json.dumps(_endpoints)
+    if yazilacak:
+        _write_snapshot(metrics_dir, snapshot)
+
+
+def _snapshot_path(metrics_dir, pid):
+    return os.path.join(metrics_dir, f'metrics-{pid}.json')
+
+
+def _write_snapshot(metrics_dir, snapshot):
+    """Worker özetini atomik olarak dosyaya yaz (diğer worker'lar /metrics'te okur)"""
+    try:
+        path = _snapshot_path(metrics_dir, os.getpid())
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Metrik özeti yazılamadı: {str(e)}")
+
+
+class _ResponseIterable:
+    """Yanıt gövdesini sayar, kapanınca (akış bittiğinde) ölçümü kaydeder"""
+
+    def __init__(self, iterable, on_close):
+        self._iterable = iterable
+        self._on_close = on_close
+        self.bytes = 0
+
+    def __iter__(self):
+        for chunk in self._iterable:
+            self.bytes += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self._iterable, 'close'):
+                self._iterable.close()
+        finally:
+            self._on_close(self.bytes)
+
+
+class MetricsMiddleware:
+    """Her isteği WSGI katmanında ölçen middleware"""
+
+    def __init__(self, wsgi_app, metrics_dir=None):
+        self.wsgi_app = wsgi_app
+        self.metrics_dir = metrics_dir
+
+    def __call__(self, environ, start_response):
+        stats = RequestStats(environ.get('REQUEST_METHOD', 'GET'))
+        environ[ENVIRON_KEY] = stats
+        status_holder = []
+        started = time.perf_counter()
+
+        def _start_response(status, headers, exc_info=None):
+            status_holder[:] = [status.split(' ', 1)[0]]
+            return start_response(status, headers, exc_info)
+
+        _aktif.stats = stats
+        try:
+            iterable = self.wsgi_app(environ, _start_response)
+        except Exception:
+            _aktif.stats = None
+            _record(stats, '500', time.perf_counter() - started, 0, self.metrics_dir)
+            raise
+
+        def _finish(response_bytes):
+            _aktif.stats = None
+            status = status_holder[0] if status_holder else '500'
+            _record(stats, status, time.perf_counter() - started, response_bytes, self.metrics_dir)
+
+        return _ResponseIterable(iterable, _finish)
+
+
+def _set_endpoint():
+    stats = request.environ.get(ENVIRON_KEY)
+    if stats is not None:
+        # Endpoint adı kullanılır (URL değil) - etiket sayısı route sayısıyla sınırlı kalır
+        stats.endpoint = request.endpoint or '<unmatched>'
+
+
+def init_metrics(app):
+    """Metrik middleware'ini, SQL dinleyicisini ve şablon sinyallerini kaydet"""
+    app.config.setdefault('METRICS_DIR', os.environ.get('METRICS_DIR'))
+    metrics_dir = app.config['METRICS_DIR']
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+
+    app.wsgi_app = MetricsMiddleware(app.wsgi_app, metrics_dir)
+    app.before_request(_set_endpoint)
+    add_sql_listener(_on_sql)
+    before_render_template.connect(_on_before_render, app)
+    template_rendered.connect(_on_template_rendered, app)
+
+
+def reset_metrics():
+    """Bu worker'ın metriklerini sıfırla (ör. fork öncesi ısındırma isteklerinden sonra)"""
+    with _lock:
+        _endpoints.clear()
+
+
+def _merge(target, source):
+    for endpoint, entry in source.items():
+        merged = target.setdefault(endpoint, _new_endpoint_entry())
+        for key, value in entry.items():
+            if key == 'statuses':
+                for status_key, count in value.items():
+                    merged['statuses'][status_key] = merged['statuses'].get(status_key, 0) + count
+            elif isinstance(value, list):
+                merged[key] = [a + b for a, b in zip(merged[key], value)]
+            else:
+                merged[key] += value
+
+
+def collect_metrics(metrics_dir=None):
+    """Bu worker'ın ve (varsa) diğer worker'ların dosyalarındaki metriklerin toplamı"""
+    with _lock:
+        own = json.loads(json.dumps(_endpoints))
+
+    if not metrics_dir:
+        return own
+
+    merged = {}
+    _merge(merged, own)
+    own_path = _snapshot_path(metrics_dir, os.getpid())
+    try:
+        names = os.listdir(metrics_dir)
+    except OSError:
+        names = []
+    for name in names:
+        path = os.path.join(metrics_dir, name)
+        # Kendi dosyamız eski olabilir - canlı değerler zaten eklendi
+        if not name.startswith('metrics-') or not name.endswith('.json') or path == own_path:
+            continue
+        pid = name[8:-5]
+        if not pid.isdigit():
+            continue
+        if not pid_yasiyor(int(pid)):
+            # Yeniden başlatılan (max_requests, RSS sınırı) worker: sayaçları her taramada tekrar eklenmesin
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path, encoding='utf-8') as f:
+                _merge(merged, json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Metrik dosyası okunamadı ({name}): {str(e)}")
+    return merged
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram_lines(name, endpoint, limits, buckets, total, count):
+    lines = []
+    cumulative = 0
+    for limit, bucket in zip(limits, buckets):
+        cumulative += bucket
+        lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{limit}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {count}')
+    lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {total}')
+    lines.append(f'{name}_count{{endpoint="{endpoint}"}} {count}')
+    return lines
+
+
+def render_prometheus(metrics):
+    """Metrikleri Prometheus metin formatına çevir"""
+    lines = [
+        '# HELP stok_http_requests_total İşlenen HTTP istekleri',
+        '# TYPE stok_http_requests_total counter',
+    ]
+    endpoints = sorted(metrics.items())
+    for endpoint, entry in endpoints:
+        ep = _label(endpoint)
+        for status_key, count in sorted(entry['statuses'].items()):
+            method, status = status_key.split(' ', 1)
+            lines.append(f'stok_http_requests_total{{endpoint="{ep}",method="{method}",status="{status}"}} {count}')
+
+    lines += [
+        '# HELP stok_http_request_duration_seconds İstek süresi (akış yanıtları dahil)',
+        '# TYPE stok_http_request_duration_seconds histogram',
+    ]
+    for endpoint, entry in endpoints:
+        lines += _histogram_lines('stok_http_request_duration_seconds', _label(endpoint), LATENCY_BUCKETS,
+                                  entry['latency_buckets'], entry['latency_sum'], entry['count'])
+
+    lines += [
+        '# HELP stok_http_request_sql_queries İstek başına çalıştırılan SQL sorgusu',
+        '# TYPE stok_http_request_sql_queries histogram',
+    ]
+    for endpoint, entry in endpoints:
+        lines += _histogram_lines('stok_http_request_sql_queries', _label(endpoint), SQL_COUNT_BUCKETS,
+                                  entry['sql_buckets'], entry['sql_sum'], entry['count'])
+
+    for name, key, help_text in (
+        ('stok_http_request_db_seconds_total', 'db_seconds', 'SQL çalıştırma ve fetch süresi toplamı'),
+        ('stok_http_request_render_seconds_total', 'render_seconds', 'Şablon render süresi toplamı'),
+        ('stok_http_response_bytes_total', 'response_bytes', 'Gönderilen yanıt gövdesi (sıkıştırma sonrası)'),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for endpoint, entry in endpoints:
+            lines.append(f'{name}{{endpoint="{_label(endpoint)}"}} {entry[key]}')
+
+    return '\n'.join(lines) + '\n'
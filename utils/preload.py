@@ -0,0 +1,100 @@
+"""
+Fork öncesi ısındırma (gunicorn preload_app)
+Master süreçte bir kez yapılan işler worker'lara copy-on-write ile paylaşılan bellek olarak geçer:
+- Ağır modüller (pandas / numpy / openpyxl) - tek başına çalışan worker'da tembel yüklenir,
+  preload'da master'da yüklenip paylaşılır
+- Tüm Jinja şablonlarının derlenmesi
+- Kullanıcı tablosu / varsayılan admin kontrolü (init_user_manager)
+- Sık açılan sayfaların render edilmesi: şablon parçası önbelleği ve ilk istek yolları ısınır
+
+Fork'tan önce havuzdaki tüm SQLite bağlantıları kapatılır (bağlantılar süreçler arasında paylaşılamaz) ve ısındırma
+isteklerinin metrikleri sıfırlanır. Sonrasında gc.freeze() çağrılması (gunicorn.conf.py) GC'nin paylaşılan
+nesnelere yazıp sayfaları kopyalamasını önler.
+"""
+
+import importlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Isındırma sırasında yüklenen ağır modüller
+HEAVY_MODULES = ('utils.excel_processor', 'openpyxl', 'openpyxl.styles')
+# Isındırma için render edilen sayfalar (admin ve normal kullanıcı olarak)
+WARMUP_PATHS = ('/', '/stock-report', '/stock-list')
+
+
+def _sayfalari_isit(app, yollar, sonuc):
+    """Sayfaları test istemcisiyle render et - fragment önbelleği kullanıcı rolüne göre ayrıldığı için iki rolle"""
+    from routes.main import init_user_manager
+    import routes.main as main_routes
+
+    with app.app_context():
+        init_user_manager()
+        admin = main_routes.user_manager.db.fetch_one(
+            "SELECT id, kullanici_adi FROM kullanicilar WHERE rol = 'admin' AND aktif = 1 ORDER BY id LIMIT 1")
+    if not admin or not yollar:
+        return
+
+    istemci = app.test_client()
+    for rol in ('admin', 'user'):
+        with istemci.session_transaction() as oturum:
+            oturum['user_id'] = admin['id']
+            oturum['username'] = admin['kullanici_adi']
+            oturum['user_role'] = rol
+        for yol in yollar:
+            t0 = time.perf_counter()
+            yanit = istemci.get(yol)
+            yanit.close()
+            sonuc['pages'][f'{rol} {yol}'] = {'status': yanit.status_code,
+                                             'ms': round((time.perf_counter() - t0) * 1000, 1)}
+
+
+def warm_up(app, heavy_modules=True, paths=WARMUP_PATHS):
+    """Master süreçte fork öncesi ısındırma - süreleri ve sonuçları döndürür"""
+    from .metrics import reset_metrics
+    from .sql_profiler import reset_sql_profile
+    from .memory_diagnostics import reset_request_memory_stats
+    from .database import close_pooled_connections
+    from .admission import reset_admission_stats
+
+    baslangic = time.perf_counter()
+    sonuc = {'modules': [], 'templates': 0, 'pages': {}}
+
+    if heavy_modules:
+        for modul in HEAVY_MODULES:
+            try:
+                importlib.import_module(modul)
+                sonuc['modules'].append(modul)
+            except ImportError as e:
+                logger.warning(f"Isındırma: {modul} yüklenemedi: {str(e)}")
+
+    # Şablonlar ortam önbelleğine sığmalı; aksi halde derlenenler ilk isteklerde atılır
+    sablonlar = app.jinja_env.list_templates(extensions=('html',))
+    if app.jinja_env.cache is not None and getattr(app.jinja_env.cache, 'capacity', 0) < len(sablonlar):
+        logger.warning(f"Isındırma: Jinja önbelleği ({app.jinja_env.cache.capacity}) şablon sayısından küçük")
+    for ad in sablonlar:
+        try:
+            app.jinja_env.get_template(ad)
+            sonuc['templates'] += 1
+        except Exception as e:
+            logger.warning(f"Isındırma: {ad} derlenemedi: {str(e)}")
+
+    try:
+        _sayfalari_isit(app, paths, sonuc)
+    except Exception as e:
+        logger.warning(f"Isındırma: sayfalar render edilemedi: {str(e)}")
+    finally:
+        # Master'da açılan bağlantılar fork ile worker'lara geçmemeli - worker'lar kendi bağlantılarını açar
+        close_pooled_connections()
+
+    # Isındırma istekleri worker metriklerine sayılmamalı
+    reset_metrics()
+    reset_sql_profile()
+    reset_request_memory_stats()
+    reset_admission_stats()
+
+    sonuc['duration_ms'] = round((time.perf_counter() - baslangic) * 1000, 1)
+    logger.info(f"Fork öncesi ısındırma tamamlandı: {len(sonuc['modules'])} modül, {sonuc['templates']} şablon, "
+                f"{len(sonuc['pages'])} sayfa, {sonuc['duration_ms']} ms")
+    return sonuc
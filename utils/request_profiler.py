@@ -0,0 +1,298 @@
+"""
+İstek bazında profil (admin)
+- Admin oturumundaki bir istek `X-Profile: 1` başlığı veya `?_profile=1` parametresiyle işaretlenirse
+  view + şablon render süresince cProfile ile deterministik profil alınır
+- SQL süreleri sorgu parmak izine ve sorguyu çalıştıran uygulama satırına (dosya:satır fonksiyon) göre toplanır
+- Sonuç REQUEST_PROFILE_DIR altına .prof (pstats / snakeviz ile açılır) ve .json özet olarak yazılır;
+  tüm worker'lar aynı klasörü kullandığı için admin sayfası hepsini listeler
+
+Ek maliyet sınırları: işaretsiz isteklerde sadece bir başlık/parametre kontrolü yapılır; profil aynı anda
+worker başına tek istekte ve dakikada en fazla REQUEST_PROFILE_MAX_PER_MINUTE kez alınır, klasörde en
+fazla REQUEST_PROFILE_MAX_FILES profil tutulur (eskiler silinir).
+Akış (stream) yanıtlarında sadece yanıt başlayana kadarki kısım profillenir.
+"""
+
+import cProfile
+import itertools
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import request, session
+
+from .database import add_sql_listener
+from .metrics import current_request_stats
+from .sql_profiler import fingerprint
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_ARG = '_profile'
+ENVIRON_KEY = 'stok.profile'
+# Özet JSON'daki fonksiyon ve SQL satırı sayısı
+OZET_SATIR_SAYISI = 40
+# SQL çağrı yeri aranırken atlanan çerçeveler (ölçüm katmanı)
+_ATLANAN_FONKSIYONLAR = {'execute', 'executemany', '_fetch', 'fetchone', 'fetchmany', 'fetchall', '_sql_bildir'}
+_PROFIL_ID_RE = re.compile(r'^[0-9]{8}-[0-9]{6}-[0-9]+-[0-9]+$')
+
+_aktif = threading.local()
+_calisiyor = threading.Lock()
+_son_profiller = deque()
+_sayac = itertools.count(1)
+_ayarlar = {'acik': True, 'dizin': 'profiles', 'dakika_limiti': 6, 'max_dosya': 100}
+_proje_koku = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_database_dosyasi = os.path.join(_proje_koku, 'utils', 'database.py')
+
+
+class _IstekProfili:
+    __slots__ = ('profiler', 'baslangic', 'sql')
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.baslangic = time.perf_counter()
+        # (parmak izi, çağrı yeri) -> [sayı, süre]
+        self.sql = {}
+
+
+def _istendi_mi():
+    deger = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_ARG)
+    return deger not in (None, '', '0')
+
+
+def _kota_var_mi():
+    """Dakikalık limit - sadece işaretli admin isteklerinde çağrılır"""
+    simdi = time.monotonic()
+    while _son_profiller and simdi - _son_profiller[0] > 60:
+        _son_profiller.popleft()
+    if len(_son_profiller) >= _ayarlar['dakika_limiti']:
+        return False
+    _son_profiller.append(simdi)
+    return True
+
+
+def _baslat():
+    if not _ayarlar['acik'] or not _istendi_mi() or session.get('user_role') != 'admin':
+        return
+    if not _calisiyor.acquire(blocking=False):
+        request.environ[ENVIRON_KEY] = 'Aynı anda tek profil alınabilir'
+        return
+    if not _kota_var_mi():
+        _calisiyor.release()
+        request.environ[ENVIRON_KEY] = 'Dakikalık profil limiti aşıldı'
+        return
+    profil = _IstekProfili()
+    request.environ[ENVIRON_KEY] = profil
+    _aktif.profil = profil
+    profil.profiler.enable()
+
+
+def _durdur(response):
+    profil = request.environ.get(ENVIRON_KEY)
+    if isinstance(profil, str):
+        response.headers['X-Profile-Skipped'] = profil
+        return response
+    if profil is None:
+        return response
+    _bitir(profil)
+    try:
+        profil_id = _kaydet(profil, response.status_code)
+        response.headers['X-Profile-Id'] = profil_id
+    except Exception as e:
+        logger.warning(f"İstek profili kaydedilemedi: {str(e)}")
+    return response
+
+
+def _temizle(error=None):
+    """Yanıt üretilemeden biten isteklerde profili kapat"""
+    profil = request.environ.get(ENVIRON_KEY)
+    if isinstance(profil, _IstekProfili) and getattr(_aktif, 'profil', None) is profil:
+        _bitir(profil)
+
+
+def _bitir(profil):
+    profil.profiler.disable()
+    _aktif.profil = None
+    _calisiyor.release()
+
+
+def _cagri_yeri():
+    """SQL'i çalıştıran ilk uygulama çerçevesi (ölçüm katmanı ve kütüphaneler atlanır)"""
+    frame = sys._getframe(3)
+    while frame is not None:
+        kod = frame.f_code
+        dosya = kod.co_filename
+        if dosya.startswith(_proje_koku) and dosya != __file__ and not (
+                dosya == _database_dosyasi and kod.co_name in _ATLANAN_FONKSIYONLAR):
+            return f'{os.path.relpath(dosya, _proje_koku)}:{frame.f_lineno} {kod.co_name}'
+        frame = frame.f_back
+    return '<bilinmiyor>'
+
+
+def _on_sql(sql, sure, fetch):
+    profil = getattr(_aktif, 'profil', None)
+    if profil is None:
+        return
+    anahtar = (fingerprint(sql), _cagri_yeri())
+    kayit = profil.sql.get(anahtar)
+    if kayit is None:
+        kayit = profil.sql[anahtar] = [0, 0.0]
+    if not fetch:
+        kayit[0] += 1
+    kayit[1] += sure
+
+
+def _kisa_dosya(dosya):
+    if dosya.startswith(_proje_koku):
+        return os.path.relpath(dosya, _proje_koku)
+    for yol in sorted(sys.path, key=len, reverse=True):
+        if yol and dosya.startswith(yol):
+            return os.path.relpath(dosya, yol)
+    return dosya
+
+
+def _fonksiyon_ozeti(stats, siralama):
+    satirlar = []
+    for (dosya, satir, fonksiyon), (cc, nc, tt, ct, _) in stats.stats.items():
+        satirlar.append({
+            'function': f'{_kisa_dosya(dosya)}:{satir} {fonksiyon}' if satir else fonksiyon,
+            'calls': nc,
+            'tottime_ms': round(tt * 1000, 2),
+            'cumtime_ms': round(ct * 1000, 2),
+        })
+    anahtar = 'cumtime_ms' if siralama == 'cumulative' else 'tottime_ms'
+    satirlar.sort(key=lambda s: s[anahtar], reverse=True)
+    return satirlar[:OZET_SATIR_SAYISI]
+
+
+def _kaydet(profil, status):
+    sure = time.perf_counter() - profil.baslangic
+    profil_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_sayac)}"
+    dizin = _ayarlar['dizin']
+    os.makedirs(dizin, exist_ok=True)
+
+    stats = pstats.Stats(profil.profiler)
+    stats.dump_stats(os.path.join(dizin, f'{profil_id}.prof'))
+
+    sql_satirlari = sorted((
+        {'sql': fp, 'caller': yer, 'count': sayi, 'time_ms': round(sql_sure * 1000, 2)}
+        for (fp, yer), (sayi, sql_sure) in profil.sql.items()
+    ), key=lambda s: s['time_ms'], reverse=True)
+    istek_olcumu = current_request_stats()
+    ozet = {
+        'id': profil_id,
+        'zaman': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'endpoint': request.endpoint,
+        'status': status,
+        'user': session.get('username'),
+        'pid': os.getpid(),
+        'duration_ms': round(sure * 1000, 1),
+        'sql_count': sum(s['count'] for s in sql_satirlari),
+        'sql_ms': round(sum(s['time_ms'] for s in sql_satirlari), 1),
+        'render_ms': round(istek_olcumu.render_time * 1000, 1) if istek_olcumu else None,
+        'top_cumulative': _fonksiyon_ozeti(stats, 'cumulative'),
+        'top_tottime': _fonksiyon_ozeti(stats, 'tottime'),
+        'sql': sql_satirlari[:OZET_SATIR_SAYISI],
+    }
+    yol = os.path.join(dizin, f'{profil_id}.json')
+    with open(f'{yol}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(ozet, f, ensure_ascii=False)
+    os.replace(f'{yol}.tmp', yol)
+    _eski_profilleri_sil(dizin)
+    logger.info(f"İstek profili kaydedildi: {profil_id} {ozet['path']} ({ozet['duration_ms']} ms)")
+    return profil_id
+
+
+def _eski_profilleri_sil(dizin):
+    ozetler = sorted(ad for ad in os.listdir(dizin) if ad.endswith('.json'))
+    for ad in ozetler[:max(0, len(ozetler) - _ayarlar['max_dosya'])]:
+        profil_id = ad[:-len('.json')]
+        for uzanti in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(dizin, profil_id + uzanti))
+            except OSError:
+                pass
+
+
+def init_request_profiler(app):
+    """Profil kancalarını kaydet - REQUEST_PROFILING_ENABLED / REQUEST_PROFILE_* ayarları"""
+    app.config.setdefault('REQUEST_PROFILING_ENABLED', True)
+    app.config.setdefault('REQUEST_PROFILE_DIR', 'profiles')
+    app.config.setdefault('REQUEST_PROFILE_MAX_PER_MINUTE', 6)
+    app.config.setdefault('REQUEST_PROFILE_MAX_FILES', 100)
+    _ayarlar['acik'] = bool(app.config['REQUEST_PROFILING_ENABLED'])
+    _ayarlar['dizin'] = app.config['REQUEST_PROFILE_DIR']
+    _ayarlar['dakika_limiti'] = app.config['REQUEST_PROFILE_MAX_PER_MINUTE']
+    _ayarlar['max_dosya'] = app.config['REQUEST_PROFILE_MAX_FILES']
+
+    app.before_request(_baslat)
+    app.after_request(_durdur)
+    app.teardown_request(_temizle)
+    add_sql_listener(_on_sql)
+
+
+def list_profiles():
+    """Kayıtlı profillerin özetleri (en yeni önce, fonksiyon listeleri hariç)"""
+    dizin = _ayarlar['dizin']
+    try:
+        adlar = sorted((ad for ad in os.listdir(dizin) if ad.endswith('.json')), reverse=True)
+    except OSError:
+        return []
+    profiller = []
+    for ad in adlar:
+        try:
+            with open(os.path.join(dizin, ad), encoding='utf-8') as f:
+                ozet = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for alan in ('top_cumulative', 'top_tottime', 'sql'):
+            ozet.pop(alan, None)
+        profiller.append(ozet)
+    return profiller
+
+
+def profile_path(profil_id, uzanti):
+    """Profil dosyasının yolu (geçersiz id veya olmayan dosya için None)"""
+    if not _PROFIL_ID_RE.match(profil_id or '') or uzanti not in ('json', 'prof'):
+        return None
+    yol = os.path.abspath(os.path.join(_ayarlar['dizin'], f'{profil_id}.{uzanti}'))
+    return yol if os.path.exists(yol) else None
+
+
+def load_profile(profil_id):
+    yol = profile_path(profil_id, 'json')
+    if yol is None:
+        return None
+    with open(yol, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def clear_profiles():
+    """Tüm kayıtlı profilleri sil"""
+    dizin = _ayarlar['dizin']
+    silinen = 0
+    try:
+        adlar = os.listdir(dizin)
+    except OSError:
+        return 0
+    for ad in adlar:
+        if ad.endswith(('.json', '.prof')):
+            try:
+                os.remove(os.path.join(dizin, ad))
+                silinen += ad.endswith('.json')
+            except OSError:
+                pass
+    return silinen
+
+
+def get_request_profiler_settings():
+    return {'enabled': _ayarlar['acik'], 'max_per_minute': _ayarlar['dakika_limiti'],
+            'max_files': _ayarlar['max_dosya'], 'header': PROFILE_HEADER, 'query_arg': PROFILE_QUERY_ARG}
@@ -0,0 +1,50 @@
+"""
+Worker'lar arası paylaşılan çalışma klasörleri (kabul kontrolü yuvaları, single-flight sonuçları)
+- Varsayılan yer veritabanının yanıdır (<DATABASE_PATH>-<ad>, SQLite'ın -wal / -shm dosyaları gibi):
+  her kurulumun kendi klasörü olur ve herkesin yazabildiği /tmp'deki tahmin edilebilir bir yol kullanılmaz
+- Dosya adında pid'i olan worker dosyaları, worker kapandıktan sonra pid_yasiyor ile ayıklanır
+- Klasör içeriğine güvenilir (single-flight sonuçları pickle olarak okunur); bu yüzden klasör sadece
+  bu kullanıcıya aitse ve 0700 ise kullanılır, değilse özellik kapatılır
+"""
+
+import logging
+import os
+import stat
+
+logger = logging.getLogger(__name__)
+
+
+def varsayilan_klasor(app, ad):
+    """Veritabanı dosyasının yanında bu kuruluma özel klasör yolu"""
+    return f"{os.path.abspath(app.config.get('DATABASE_PATH', 'stok_takip_dev.db'))}-{ad}"
+
+
+def ozel_klasor_hazirla(yol):
+    """Klasörü 0700 oluştur; sahibi bu kullanıcı ve modu 0700 değilse False (klasör kullanılmamalı)"""
+    try:
+        os.makedirs(yol, mode=0o700, exist_ok=True)
+        bilgi = os.lstat(yol)
+    except OSError as e:
+        logger.error(f"Çalışma klasörü oluşturulamadı ({yol}): {str(e)}")
+        return False
+    if not stat.S_ISDIR(bilgi.st_mode):
+        logger.error(f"Çalışma klasörü bir klasör değil (sembolik bağ olabilir): {yol}")
+        return False
+    if hasattr(os, 'geteuid') and bilgi.st_uid != os.geteuid():
+        logger.error(f"Çalışma klasörü başka bir kullanıcıya ait (uid {bilgi.st_uid}): {yol}")
+        return False
+    if os.name == 'posix' and stat.S_IMODE(bilgi.st_mode) != 0o700:
+        logger.error(f"Çalışma klasörünün izinleri 0700 değil ({oct(stat.S_IMODE(bilgi.st_mode))}): {yol}")
+        return False
+    return True
+
+
+def pid_yasiyor(pid):
+    """Süreç hâlâ çalışıyor mu (yeniden başlatılan worker'ların kalan dosyalarını ayıklamak için)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
@@ -0,0 +1,207 @@
+"""
+Eşzamanlı aynı okumaların birleştirilmesi (single-flight)
+- Pahalı bir hesaplama (dashboard, stok raporu sayfası) ad + normalize edilmiş parametreler + veri sürümü
+  anahtarıyla çalıştırılır; aynı anahtarı isteyen diğer istekler hesaplamayı tekrarlamaz, bitmesini bekleyip
+  sonucunu kullanır
+- Tüm gunicorn worker'larında geçerlidir: anahtar başına SINGLE_FLIGHT_DIR'de bir kilit dosyası (flock) ve
+  hesaplamayı yapan isteğin yazdığı sonuç dosyası (pickle) vardır
+- Sonuç SINGLE_FLIGHT_RESULT_TTL saniye saklanır; içeri aktarma sonrası aynı anda açılan sayfalar da aynı
+  hesaplamayı paylaşır. Veri sürümü anahtarda olduğundan veri değişince eski sonuç kullanılmaz
+- Hesaplama SINGLE_FLIGHT_WAIT saniyeden uzun sürerse bekleyen istek kendisi hesaplar;
+  hesaplayan istek hata alırsa bekleyenlerden biri hesaplamayı devralır
+- Yanıtta X-Single-Flight başlığı: leader (hesapladı), coalesced (bekledi), shared (hazır sonucu kullandı),
+  timeout (beklemekten vazgeçip kendisi hesapladı)
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+
+from flask import g, has_request_context
+
+from .database import get_veri_surumu
+from .runtime_dirs import varsayilan_klasor, ozel_klasor_hazirla
+
+try:
+    import fcntl
+except ImportError:  # Windows - birleştirme yapılmaz
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Bekleme sırasında kilidin boşalması bu aralıklarla (artarak) kontrol edilir
+BEKLEME_ADIMI = 0.01
+BEKLEME_ADIMI_MAX = 0.1
+# Eski sonuç / kilit dosyaları bu sıklıkla ve bu yaştan büyükse silinir (saniye)
+TEMIZLIK_ARALIGI = 60
+KILIT_DOSYASI_OMRU = 600
+
+_lock = threading.Lock()
+_ayarlar = {'acik': True, 'klasor': None, 'bekleme': 30.0, 'ttl': 5.0}
+_son_temizlik = 0.0
+
+
+def _normalize(deger):
+    """Parametreleri sıralı ve hash'lenebilir hale getir (dict sırası / liste tipi anahtarı değiştirmesin)"""
+    if isinstance(deger, dict):
+        return tuple(sorted((str(k), _normalize(v)) for k, v in deger.items()))
+    if isinstance(deger, (list, tuple)):
+        return tuple(_normalize(v) for v in deger)
+    if isinstance(deger, str):
+        return deger.strip()
+    return deger
+
+
+def make_key(ad, parametreler, surum):
+    return hashlib.sha1(repr((ad, _normalize(parametreler), surum)).encode('utf-8')).hexdigest()
+
+
+def _isaretle(ad, sonuc):
+    logger.debug("Single-flight %s: %s", ad, sonuc)
+    if has_request_context():
+        g.single_flight = sonuc
+
+
+def _kilitle(fd):
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _sonucu_oku(yol):
+    """TTL içindeki sonucu (bulundu, değer) olarak döndür"""
+    try:
+        if time.time() - os.stat(yol).st_mtime > _ayarlar['ttl']:
+            return False, None
+        with open(yol, 'rb') as f:
+            return True, pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return False, None
+
+
+def _sonucu_yaz(yol, deger):
+    try:
+        gecici = f'{yol}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(gecici, 'wb') as f:
+            pickle.dump(deger, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(gecici, yol)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+        logger.warning(f"Single-flight sonucu yazılamadı: {str(e)}")
+
+
+def _temizle():
+    """Süresi geçmiş sonuç dosyalarını ve uzun süredir kullanılmayan kilit dosyalarını sil"""
+    global _son_temizlik
+    with _lock:
+        if time.monotonic() - _son_temizlik < TEMIZLIK_ARALIGI:
+            return
+        _son_temizlik = time.monotonic()
+    klasor = _ayarlar['klasor']
+    simdi = time.time()
+    try:
+        adlar = os.listdir(klasor)
+    except OSError:
+        return
+    for ad in adlar:
+        yol = os.path.join(klasor, ad)
+        try:
+            yas = simdi - os.stat(yol).st_mtime
+            if ad.endswith('.pickle') or ad.endswith('.tmp'):
+                if yas > max(_ayarlar['ttl'], 1.0) * 2:
+                    os.remove(yol)
+            elif ad.endswith('.lock') and yas > KILIT_DOSYASI_OMRU:
+                # Sadece o an kimsenin tutmadığı kilit dosyası silinir
+                fd = os.open(yol, os.O_RDWR)
+                try:
+                    if _kilitle(fd):
+                        os.remove(yol)
+                finally:
+                    os.close(fd)
+        except OSError:
+            continue
+
+
+def single_flight(ad, parametreler, hesapla):
+    """hesapla() sonucunu aynı (ad, parametreler, veri sürümü) için eşzamanlı isteklerle paylaş
+
+    Sonuç pickle ile diğer worker'lara aktarılır - sqlite3.Row yerine dict / list döndürülmeli.
+    """
+    if not _ayarlar['acik'] or fcntl is None or not _ayarlar['klasor']:
+        return hesapla()
+
+    anahtar = make_key(ad, parametreler, get_veri_surumu())
+    sonuc_yolu = os.path.join(_ayarlar['klasor'], f'{anahtar}.pickle')
+
+    bulundu, deger = _sonucu_oku(sonuc_yolu)
+    if bulundu:
+        _isaretle(ad, 'shared')
+        return deger
+
+    fd = os.open(os.path.join(_ayarlar['klasor'], f'{anahtar}.lock'), os.O_CREAT | os.O_RDWR, 0o600)
+    try:
+        if not _kilitle(fd):
+            # Başka bir istek hesaplıyor - bitmesini bekle
+            son = time.monotonic() + _ayarlar['bekleme']
+            adim = BEKLEME_ADIMI
+            while True:
+                time.sleep(adim)
+                adim = min(adim * 1.5, BEKLEME_ADIMI_MAX)
+                if _kilitle(fd):
+                    break
+                if time.monotonic() >= son:
+                    _isaretle(ad, 'timeout')
+                    logger.warning(f"Single-flight: {ad} hesaplaması {_ayarlar['bekleme']:g} sn'de bitmedi, "
+                                   f"ayrıca hesaplanıyor")
+                    return hesapla()
+            bulundu, deger = _sonucu_oku(sonuc_yolu)
+            if bulundu:
+                _isaretle(ad, 'coalesced')
+                return deger
+        else:
+            # Kilidi alana kadar başka bir istek hesaplamayı bitirmiş olabilir
+            bulundu, deger = _sonucu_oku(sonuc_yolu)
+            if bulundu:
+                _isaretle(ad, 'shared')
+                return deger
+
+        deger = hesapla()
+        _sonucu_yaz(sonuc_yolu, deger)
+        _isaretle(ad, 'leader')
+        return deger
+    finally:
+        # Kilit fd kapanınca bırakılır
+        os.close(fd)
+        _temizle()
+
+
+def _add_header(response):
+    sonuc = g.pop('single_flight', None)
+    if sonuc:
+        response.headers['X-Single-Flight'] = sonuc
+    return response
+
+
+def init_single_flight(app):
+    """SINGLE_FLIGHT_ENABLED / SINGLE_FLIGHT_DIR / SINGLE_FLIGHT_WAIT / SINGLE_FLIGHT_RESULT_TTL"""
+    app.config.setdefault('SINGLE_FLIGHT_ENABLED', True)
+    app.config.setdefault('SINGLE_FLIGHT_WAIT', 30)
+    app.config.setdefault('SINGLE_FLIGHT_RESULT_TTL', 5)
+    if not app.config.get('SINGLE_FLIGHT_DIR'):
+        app.config['SINGLE_FLIGHT_DIR'] = varsayilan_klasor(app, 'single-flight')
+
+    _ayarlar['acik'] = bool(app.config['SINGLE_FLIGHT_ENABLED'])
+    # Sonuç dosyaları pickle - başkasının yazabildiği bir klasördeki dosya okunursa kod çalıştırılabilir
+    if _ayarlar['acik'] and not ozel_klasor_hazirla(app.config['SINGLE_FLIGHT_DIR']):
+        logger.warning("Single-flight kapatıldı: SINGLE_FLIGHT_DIR güvenli değil")
+        _ayarlar['acik'] = False
+        _ayarlar['klasor'] = None
+    else:
+        _ayarlar['klasor'] = app.config['SINGLE_FLIGHT_DIR']
+    _ayarlar['bekleme'] = float(app.config['SINGLE_FLIGHT_WAIT'])
+    _ayarlar['ttl'] = float(app.config['SINGLE_FLIGHT_RESULT_TTL'])
+    app.after_request(_add_header)
@@ -0,0 +1,201 @@
+"""
+SQL sorgu profili
+- Her sorgu parmak izine (sabitler ve IN/VALUES listeleri atılmış hali) göre gruplanır:
+  çalışma sayısı, toplam süre, en uzun süre ve son örneklerden p95
+- Eşiği aşan sorgular EXPLAIN QUERY PLAN çıktısıyla yavaş sorgu kaydına yazılır
+- Veriler InstrumentedConnection dinleyicisinden gelir; sorgu başına ek maliyet birkaç mikrosaniyedir
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import has_app_context, has_request_context, request
+
+from .database import add_sql_listener, get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Parmak izi başına saklanan son süre örnekleri (p95 bu pencereden hesaplanır)
+ORNEK_SAYISI = 512
+# Aynı parmak izi için sorgu planı en fazla bu sıklıkla yeniden alınır (saniye)
+PLAN_YENILEME_SURESI = 600
+# Bellekte tutulan yavaş sorgu kaydı sayısı
+YAVAS_SORGU_KAYIT_SAYISI = 200
+# Parmak izi önbelleği (aynı SQL metni tekrar tekrar normalize edilmez)
+PARMAK_IZI_ONBELLEK_BOYUTU = 4096
+
+_PLAN_ALINABILIR = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE')
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_VALUES_ROWS_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+')
+_SPACE_RE = re.compile(r'\s+')
+_BINDING_COUNT_RE = re.compile(r'statement uses (\d+)')
+
+_lock = threading.Lock()
+_aktif = threading.local()
+_istatistikler = {}
+_yavas_sorgular = deque(maxlen=YAVAS_SORGU_KAYIT_SAYISI)
+_parmak_izi_onbellegi = {}
+_ayarlar = {'esik': 0.2, 'acik': True}
+
+
+def fingerprint(sql):
+    """SQL metnini parmak izine çevir: sabitler '?', değişken uzunluklu listeler '(...)' olur"""
+    fp = _parmak_izi_onbellegi.get(sql)
+    if fp is not None:
+        return fp
+    fp = _STRING_RE.sub('?', sql)
+    fp = _NUMBER_RE.sub('?', fp)
+    fp = _IN_LIST_RE.sub('IN (...)', fp)
+    fp = _VALUES_ROWS_RE.sub('(...)', fp)
+    fp = _SPACE_RE.sub(' ', fp).strip()
+    if len(_parmak_izi_onbellegi) >= PARMAK_IZI_ONBELLEK_BOYUTU:
+        _parmak_izi_onbellegi.clear()
+    _parmak_izi_onbellegi[sql] = fp
+    return fp
+
+
+class _SorguIstatistigi:
+    __slots__ = ('sql', 'count', 'total', 'max', 'samples', 'plan', 'plan_time', 'endpoints')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=ORNEK_SAYISI)
+        self.plan = None
+        self.plan_time = 0.0
+        self.endpoints = {}
+
+
+def _percentile(values, oran):
+    if not values:
+        return 0.0
+    sirali = sorted(values)
+    return sirali[min(len(sirali) - 1, int(round(oran * (len(sirali) - 1))))]
+
+
+def _endpoint():
+    if has_request_context():
+        return request.endpoint or request.path
+    return '<arka plan>'
+
+
+def explain_query_plan(sql):
+    """Sorgunun EXPLAIN QUERY PLAN çıktısı (parametreler NULL kabul edilir)"""
+    if not has_app_context() or not sql.lstrip().upper().startswith(_PLAN_ALINABILIR):
+        return None
+    _aktif.plan_aliniyor = True
+    try:
+        db = get_db_connection()
+        try:
+            rows = db.execute(f'EXPLAIN QUERY PLAN {sql}').fetchall()
+        except sqlite3.ProgrammingError as e:
+            # sqlite3 parametre sayısı tutmadan çalıştırmaz; sayı hata mesajından alınıp NULL verilir
+            match = _BINDING_COUNT_RE.search(str(e))
+            if not match:
+                raise
+            rows = db.execute(f'EXPLAIN QUERY PLAN {sql}', [None] * int(match.group(1))).fetchall()
+        return [row['detail'] for row in rows]
+    except Exception as e:
+        return [f'Plan alınamadı: {str(e)}']
+    finally:
+        _aktif.plan_aliniyor = False
+
+
+def _on_sql(sql, sure, fetch):
+    if not _ayarlar['acik'] or getattr(_aktif, 'plan_aliniyor', False):
+        return
+    fp = fingerprint(sql)
+    with _lock:
+        stat = _istatistikler.get(fp)
+        if stat is None:
+            stat = _istatistikler[fp] = _SorguIstatistigi(fp)
+        stat.total += sure
+        if fetch and getattr(_aktif, 'son_fp', None) == fp and stat.samples:
+            # Fetch süresi aynı çalıştırmanın örneğine eklenir
+            stat.samples[-1] += sure
+            toplam = stat.samples[-1]
+        else:
+            stat.count += 1
+            stat.samples.append(sure)
+            toplam = sure
+        _aktif.son_fp = fp
+        if toplam > stat.max:
+            stat.max = toplam
+
+    if toplam >= _ayarlar['esik'] and (toplam - sure) < _ayarlar['esik']:
+        _yavas_sorgu(stat, sql, toplam)
+
+
+def _yavas_sorgu(stat, sql, sure):
+    """Eşiği ilk aşan çalıştırmayı planıyla birlikte kaydet"""
+    simdi = time.monotonic()
+    if stat.plan is None or simdi - stat.plan_time > PLAN_YENILEME_SURESI:
+        stat.plan = explain_query_plan(sql)
+        stat.plan_time = simdi
+    endpoint = _endpoint()
+    with _lock:
+        stat.endpoints[endpoint] = stat.endpoints.get(endpoint, 0) + 1
+        _yavas_sorgular.append({
+            'zaman': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'sure_ms': round(sure * 1000, 1),
+            'endpoint': endpoint,
+            'sql': stat.sql,
+            'plan': stat.plan or [],
+        })
+    plan_metni = ' | '.join(stat.plan or [])
+    logger.warning(f"Yavaş sorgu ({sure * 1000:.0f} ms, {endpoint}): {stat.sql[:500]} -- PLAN: {plan_metni}")
+
+
+def init_sql_profiler(app):
+    """Profil dinleyicisini kaydet - SQL_PROFILER_ENABLED / SQL_SLOW_QUERY_MS ayarları"""
+    app.config.setdefault('SQL_PROFILER_ENABLED', True)
+    app.config.setdefault('SQL_SLOW_QUERY_MS', 200)
+    _ayarlar['acik'] = bool(app.config['SQL_PROFILER_ENABLED'])
+    _ayarlar['esik'] = app.config['SQL_SLOW_QUERY_MS'] / 1000.0
+    add_sql_listener(_on_sql)
+
+
+def get_top_queries(siralama='total', limit=50):
+    """En maliyetli sorgu parmak izleri (toplam, p95, count veya max süreye göre)"""
+    with _lock:
+        rows = [{
+            'sql': stat.sql,
+            'count': stat.count,
+            'total_ms': stat.total * 1000,
+            'avg_ms': stat.total * 1000 / stat.count if stat.count else 0.0,
+            'p95_ms': _percentile(stat.samples, 0.95) * 1000,
+            'max_ms': stat.max * 1000,
+            'plan': stat.plan,
+            'slow_endpoints': dict(stat.endpoints),
+        } for stat in _istatistikler.values()]
+    anahtar = {'total': 'total_ms', 'p95': 'p95_ms', 'count': 'count', 'max': 'max_ms'}.get(siralama, 'total_ms')
+    rows.sort(key=lambda row: row[anahtar], reverse=True)
+    return rows[:limit]
+
+
+def get_slow_queries():
+    """Son yavaş sorgular (en yeni önce)"""
+    with _lock:
+        return list(reversed(_yavas_sorgular))
+
+
+def get_profiler_settings():
+    return {'enabled': _ayarlar['acik'], 'slow_query_ms': _ayarlar['esik'] * 1000,
+            'fingerprints': len(_istatistikler)}
+
+
+def reset_sql_profile():
+    """Toplanan istatistikleri ve yavaş sorgu kaydını sıfırla"""
+    with _lock:
+        _istatistikler.clear()
+        _yavas_sorgular.clear()